@@ -9,6 +9,10 @@ Usage:
     export GAEA_OFFICIAL_PROJECTS_DIR="/path/to/official/projects"
     export GAEA_USER_PROJECTS_DIR="/path/to/user/projects"
     python analyze_gaea_projects.py
+
+    Large collections are parsed in parallel; with --index, later runs only
+    parse the projects that changed:
+    python analyze_gaea_projects.py --user-dir /path/to/user --index gaea2_corpus.sqlite3
 """
 
 import argparse
@@ -30,13 +34,17 @@ except ImportError:
     sys.exit(1)
 
 
-async def analyze_real_projects(official_dir=None, user_dir=None, output_file="gaea2_workflow_analysis.json"):
+async def analyze_real_projects(
+    official_dir=None, user_dir=None, output_file="gaea2_workflow_analysis.json", workers=None, index_path=None
+):
     """Analyze all real Gaea2 projects
 
     Args:
         official_dir: Path to official Gaea projects directory
         user_dir: Path to user projects directory
         output_file: Path to save analysis results
+        workers: Number of processes parsing projects (defaults to one per CPU)
+        index_path: SQLite file of project summaries reused by later runs
     """
     print("=== Gaea2 Project Analysis ===\n")
 
@@ -67,8 +75,9 @@ async def analyze_real_projects(official_dir=None, user_dir=None, output_file="g
         official_results = {"projects_analyzed": 0}
     else:
         print(f"Analyzing official projects in: {official_dir}")
-        official_results = analyzer.analyze_directory(official_dir)
+        official_results = analyzer.analyze_directory(official_dir, workers=workers, index_path=index_path)
         print(f"✓ Analyzed {official_results['projects_analyzed']} official projects")
+        print(f"  ({official_results['files_parsed']} parsed, {official_results['files_unchanged']} unchanged)")
 
     # Analyze user projects
     if not os.path.exists(user_dir):
@@ -77,8 +86,9 @@ async def analyze_real_projects(official_dir=None, user_dir=None, output_file="g
         user_results = {"projects_analyzed": official_results["projects_analyzed"]}
     else:
         print(f"\nAnalyzing user projects in: {user_dir}")
-        user_results = analyzer.analyze_directory(user_dir)
+        user_results = analyzer.analyze_directory(user_dir, workers=workers, index_path=index_path)
         print(f"✓ Analyzed {user_results['projects_analyzed'] - official_results['projects_analyzed']} user projects")
+        print(f"  ({user_results['files_parsed']} parsed, {user_results['files_unchanged']} unchanged)")
 
     # Get overall statistics
     stats = analyzer.get_statistics()
@@ -231,9 +241,9 @@ async def generate_knowledge_base(analysis_file="gaea2_workflow_analysis.json"):
     print("✓ Documentation saved to GAEA2_PATTERNS.md")
 
 
-async def main(official_dir=None, user_dir=None, output_file="gaea2_workflow_analysis.json"):
+async def main(official_dir=None, user_dir=None, output_file="gaea2_workflow_analysis.json", workers=None, index_path=None):
     """Main function"""
-    success = await analyze_real_projects(official_dir, user_dir, output_file)
+    success = await analyze_real_projects(official_dir, user_dir, output_file, workers, index_path)
     if success:
         await generate_knowledge_base(output_file)
         print("\n✅ Analysis complete!")
@@ -261,7 +271,9 @@ Environment variables:
         default="gaea2_workflow_analysis.json",
         help="Output file for analysis results (default: gaea2_workflow_analysis.json)",
     )
+    parser.add_argument("--workers", type=int, help="Processes parsing projects (default: one per CPU)")
+    parser.add_argument("--index", type=str, help="SQLite file of project summaries; later runs only parse changed projects")
 
     args = parser.parse_args()
 
-    asyncio.run(main(args.official_dir, args.user_dir, args.output))
+    asyncio.run(main(args.official_dir, args.user_dir, args.output, args.workers, args.index))
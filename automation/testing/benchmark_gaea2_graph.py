@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Benchmark the Gaea2 workflow graph engine on large synthetic workflows
+
+Two shapes are generated per size: a layered workflow (a few generators fanning
+into chains of filters with Combine nodes merging branches) and a single deep
+chain, the shape that used to exhaust the recursion limit. Each graph analysis
+and the connection validator are timed, next to the recursive cycle detection
+the validator used before the graph engine as a reference.
+
+Usage:
+    python automation/testing/benchmark_gaea2_graph.py
+    python automation/testing/benchmark_gaea2_graph.py --sizes 1000 10000 50000 --runs 5
+    python automation/testing/benchmark_gaea2_graph.py --json > graph_bench.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tools.mcp.gaea2.utils.gaea2_graph import WorkflowGraph  # noqa: E402
+from tools.mcp.gaea2.validation.gaea2_connection_validator import Gaea2ConnectionValidator  # noqa: E402
+
+GENERATORS = ["Mountain", "Ridge", "Canyon", "Island"]
+FILTERS = ["Erosion2", "Terrace", "Thermal2", "Adjust", "Blur", "Rivers", "TextureBase", "SatMap"]
+
+
+def layered_workflow(size: int, seed: int = 0) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Generators feeding filter chains, with a Combine merging two earlier nodes every tenth node"""
+    rng = random.Random(seed)
+    generators = max(1, size // 100)
+    nodes = [{"id": i, "type": GENERATORS[i % len(GENERATORS)]} for i in range(generators)]
+    connections = []
+    for node_id in range(generators, size):
+        if node_id % 10 == 0 and node_id > 1:
+            nodes.append({"id": node_id, "type": "Combine"})
+            sources = rng.sample(range(node_id), 2)
+        else:
+            nodes.append({"id": node_id, "type": FILTERS[node_id % len(FILTERS)]})
+            sources = [rng.randrange(max(0, node_id - 50), node_id)]
+        connections.extend({"from_node": source, "to_node": node_id} for source in sources)
+    return nodes, connections
+
+
+def chain_workflow(size: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    nodes = [{"id": 0, "type": "Mountain"}] + [{"id": i, "type": FILTERS[i % len(FILTERS)]} for i in range(1, size)]
+    connections = [{"from_node": i, "to_node": i + 1} for i in range(size - 1)]
+    return nodes, connections
+
+
+def legacy_detect_cycles(connections: List[Dict[str, Any]]) -> List[List[int]]:
+    """The recursive DFS the connection validator used before WorkflowGraph"""
+    graph = defaultdict(list)
+    for conn in connections:
+        graph[conn.get("from_node")].append(conn.get("to_node"))
+
+    cycles = []
+    visited = set()
+    rec_stack = set()
+
+    def dfs(node, path):
+        visited.add(node)
+        rec_stack.add(node)
+        path.append(node)
+        for neighbor in graph.get(node, []):
+            if neighbor not in visited:
+                if dfs(neighbor, path.copy()):
+                    return True
+            elif neighbor in rec_stack:
+                cycles.append(path[path.index(neighbor) :] + [neighbor])
+        rec_stack.remove(node)
+        return False
+
+    for node in list(graph.keys()):
+        if node not in visited:
+            dfs(node, [])
+    return cycles
+
+
+def best_of(runs: int, func: Callable[[], Any]) -> Dict[str, Any]:
+    """Best wall time of several runs in milliseconds, or the error the call raised"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        try:
+            func()
+        except RecursionError:
+            return {"error": "RecursionError"}
+        best = min(best, time.perf_counter() - start)
+    return {"ms": round(best * 1000, 3)}
+
+
+def bench_workflow(nodes: List[Dict[str, Any]], connections: List[Dict[str, Any]], runs: int) -> Dict[str, Any]:
+    graph = WorkflowGraph(nodes, connections)
+    entry = graph.sources()[0]
+    validator = Gaea2ConnectionValidator()
+
+    # Every analysis gets a fresh graph so its cache does not hide the work
+    def fresh() -> WorkflowGraph:
+        return WorkflowGraph(nodes, connections)
+
+    return {
+        "nodes": len(nodes),
+        "connections": len(connections),
+        "build": best_of(runs, fresh),
+        "scc_and_cycles": best_of(runs, lambda: fresh().cycles()),
+        "topological_order": best_of(runs, lambda: fresh().topological_order()),
+        "dominators": best_of(runs, lambda: fresh().immediate_dominators()),
+        "reachable": best_of(runs, lambda: fresh().reachable(entry)),
+        "shortest_path": best_of(runs, lambda: fresh().shortest_path_to_type(entry, "SatMap", max_length=6)),
+        "validate_connections": best_of(runs, lambda: validator.validate_connections(nodes, connections)),
+        "legacy_detect_cycles": best_of(runs, lambda: legacy_detect_cycles(connections)),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Node counts to generate")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement; the best is reported")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = []
+    for size in args.sizes:
+        for shape, build in (("layered", layered_workflow), ("chain", chain_workflow)):
+            nodes, connections = build(size)
+            report.append({"shape": shape, **bench_workflow(nodes, connections, args.runs)})
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    columns = [key for key in report[0] if key not in ("shape", "nodes", "connections")]
+    print(f"{'shape':<8} {'nodes':>7} " + " ".join(f"{column:>22}" for column in columns))
+    for row in report:
+        cells = [f"{row[c]['ms']:.2f} ms" if "ms" in row[c] else row[c]["error"] for c in columns]
+        print(f"{row['shape']:<8} {row['nodes']:>7} " + " ".join(f"{cell:>22}" for cell in cells))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
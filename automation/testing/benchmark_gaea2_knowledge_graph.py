@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Micro-benchmark knowledge-graph enhancement against workflow size
+
+enhance_workflow_with_knowledge is timed on synthetic workflows built from the
+node types the knowledge graph knows about. With the relationship and pattern
+indexes the time per node should stay flat as workflows grow; the pre-index
+queries (a scan of every relationship inside a pairwise loop over nodes) are
+timed next to it for the smaller sizes.
+
+Usage:
+    python automation/testing/benchmark_gaea2_knowledge_graph.py
+    python automation/testing/benchmark_gaea2_knowledge_graph.py --sizes 100 1000 10000 100000 --legacy-max 1000
+    python automation/testing/benchmark_gaea2_knowledge_graph.py --json > knowledge_bench.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tools.mcp.gaea2.utils import gaea2_knowledge_graph  # noqa: E402
+from tools.mcp.gaea2.utils.gaea2_knowledge_graph import (  # noqa: E402
+    Gaea2KnowledgeGraph,
+    NodeRelationship,
+    RelationType,
+    enhance_workflow_with_knowledge,
+)
+
+
+class LegacyKnowledgeGraph(Gaea2KnowledgeGraph):
+    """The relationship scan and pairwise conflict loop used before the indexes"""
+
+    def get_relationships(
+        self, node: str, relation_type: Optional[RelationType] = None, direction: Optional[str] = None
+    ) -> List[NodeRelationship]:
+        return [
+            rel
+            for rel in self.relationships
+            if (rel.from_node == node or rel.to_node == node) and (relation_type is None or rel.relation_type == relation_type)
+        ]
+
+    def validate_workflow(self, nodes: List[str], connections: List[Tuple[str, str]]) -> Dict[str, Any]:
+        issues = []
+        for i, node_a in enumerate(nodes):
+            for node_b in nodes[i + 1 :]:
+                for rel in self.get_relationships(node_a, RelationType.CONFLICTS):
+                    if rel.to_node == node_b:
+                        issues.append(f"{node_a} conflicts with {node_b}: {rel.description}")
+        for node in nodes:
+            for rel in self.get_relationships(node, RelationType.REQUIRES):
+                if rel.from_node == node and rel.to_node not in nodes:
+                    issues.append(f"{node} typically requires {rel.to_node}")
+        return {"valid": not issues, "issues": issues, "warnings": [], "suggestions": []}
+
+
+def synthetic_workflow(
+    size: int, graph: Gaea2KnowledgeGraph, seed: int = 0
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    rng = random.Random(seed)
+    known = sorted({rel.from_node for rel in graph.relationships} | {n for p in graph.patterns for n in p.nodes})
+    nodes = [{"name": rng.choice(known), "properties": {}} for _ in range(size)]
+    connections = [{"from_node": a["name"], "to_node": b["name"]} for a, b in zip(nodes, nodes[1:])]
+    return nodes, connections
+
+
+def best_of(runs: int, func: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def with_graph(graph: Gaea2KnowledgeGraph, nodes, connections) -> Callable[[], Any]:
+    def run():
+        previous = gaea2_knowledge_graph._knowledge_graph
+        gaea2_knowledge_graph._knowledge_graph = graph
+        try:
+            return enhance_workflow_with_knowledge(nodes, connections)
+        finally:
+            gaea2_knowledge_graph._knowledge_graph = previous
+
+    return run
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Workflow node counts")
+    parser.add_argument("--legacy-max", type=int, default=1000, help="Largest size to time the pre-index queries at")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement; the best is reported")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    indexed = Gaea2KnowledgeGraph()
+    legacy = LegacyKnowledgeGraph()
+    report = []
+    for size in args.sizes:
+        nodes, connections = synthetic_workflow(size, indexed)
+        seconds = best_of(args.runs, with_graph(indexed, nodes, connections))
+        row: Dict[str, Any] = {
+            "nodes": size,
+            "indexed_ms": round(seconds * 1000, 3),
+            "indexed_us_per_node": round(seconds * 1e6 / size, 3),
+        }
+        if size <= args.legacy_max:
+            legacy_seconds = best_of(1, with_graph(legacy, nodes, connections))
+            row["legacy_ms"] = round(legacy_seconds * 1000, 3)
+            row["speedup"] = round(legacy_seconds / seconds, 1)
+        report.append(row)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{'nodes':>8} {'indexed':>12} {'per node':>12} {'legacy':>12} {'speedup':>9}")
+    for row in report:
+        legacy_cell = f"{row['legacy_ms']:.1f} ms" if "legacy_ms" in row else "-"
+        speedup_cell = f"{row['speedup']}x" if "speedup" in row else "-"
+        print(
+            f"{row['nodes']:>8} {row['indexed_ms']:>9.2f} ms {row['indexed_us_per_node']:>9.2f} us "
+            f"{legacy_cell:>12} {speedup_cell:>9}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
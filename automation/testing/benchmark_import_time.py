@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Measure cold import time of each MCP server entry point
+
+Each server module is imported in a fresh interpreter with ``-X importtime``.
+The cumulative time of the server module and the slowest modules it pulls in
+are reported, so regressions in stdio start-up cost are easy to spot.
+
+Usage:
+    python automation/testing/benchmark_import_time.py
+    python automation/testing/benchmark_import_time.py --servers gaea2 blender --runs 5
+    python automation/testing/benchmark_import_time.py --json > import_times.json
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SERVERS_DIR = REPO_ROOT / "tools" / "mcp"
+
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def discover_servers() -> List[str]:
+    """Names of all server packages with a server.py entry point"""
+    return sorted(path.parent.name for path in SERVERS_DIR.glob("*/server.py") if path.parent.name != "core")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` output into per-module timings (microseconds)"""
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append(
+                {
+                    "module": match.group(4),
+                    "self_us": int(match.group(1)),
+                    "cumulative_us": int(match.group(2)),
+                    "depth": len(match.group(3)) // 2,
+                }
+            )
+    return modules
+
+
+def measure(module: str) -> Dict[str, Any]:
+    """Import a module in a fresh interpreter and collect its timings"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    modules = parse_importtime(proc.stderr)
+    top_level = [entry for entry in modules if entry["depth"] == 0]
+    error: Optional[str] = None
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit code {proc.returncode}"
+    return {
+        "total_us": sum(entry["cumulative_us"] for entry in top_level),
+        "modules": modules,
+        "error": error,
+    }
+
+
+def benchmark_server(name: str, runs: int, top: int) -> Dict[str, Any]:
+    """Best-of-N import time for one server and its slowest imports"""
+    module = f"tools.mcp.{name}.server"
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(runs):
+        result = measure(module)
+        if result["error"]:
+            return {"server": name, "module": module, "error": result["error"]}
+        if best is None or result["total_us"] < best["total_us"]:
+            best = result
+
+    assert best is not None
+    slowest = sorted(best["modules"], key=lambda entry: entry["self_us"], reverse=True)[:top]
+    heavy = {"fastapi", "uvicorn", "mcp", "httpx", "aiohttp", "PIL", "numpy"}
+    loaded = sorted({entry["module"].split(".")[0] for entry in best["modules"]} & heavy)
+    return {
+        "server": name,
+        "module": module,
+        "total_ms": round(best["total_us"] / 1000, 1),
+        "modules_imported": len(best["modules"]),
+        "heavy_dependencies": loaded,
+        "slowest": [{"module": entry["module"], "self_ms": round(entry["self_us"] / 1000, 1)} for entry in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP server import time")
+    parser.add_argument("--servers", nargs="*", help="Server packages to measure (default: all)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per server; the fastest is reported")
+    parser.add_argument("--top", type=int, default=5, help="Number of slowest modules to list")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    servers = args.servers or discover_servers()
+    results = [benchmark_server(name, args.runs, args.top) for name in servers]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for result in results:
+        if "error" in result:
+            print(f"{result['server']:<20} import failed: {result['error']}")
+            continue
+        heavy = ", ".join(result["heavy_dependencies"]) or "-"
+        print(f"{result['server']:<20} {result['total_ms']:>8.1f} ms  {result['modules_imported']:>5} modules  heavy: {heavy}")
+        for entry in result["slowest"]:
+            print(f"    {entry['self_ms']:>8.1f} ms  {entry['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,675 @@
+#!/usr/bin/env python3
+"""Benchmark and load-test MCP servers against stubbed external services
+
+Each server is driven over three transports at a configurable concurrency:
+
+- ``http``: POST /mcp/execute, against the server's ASGI app in-process
+- ``jsonrpc``: tools/call over POST /messages, also in-process
+- ``stdio``: a ``--mode stdio`` subprocess speaking newline-delimited JSON-RPC
+
+Blender, Gaea2, ComfyUI and ElevenLabs are replaced by the fakes in
+benchmark_stubs.py, so the numbers measure the MCP servers themselves.
+
+For every tool and transport the report gives throughput, latency percentiles
+and error counts, plus the resident set size after the run (the harness for
+in-process transports, the server process for stdio). Start-up is measured in
+a fresh interpreter (import and construction) and for the stdio process (time
+to answer ``initialize`` and to complete the first call).
+
+The report is JSON. Comparing it against a stored baseline fails with exit
+code 1 when a latency or start-up time regresses beyond the tolerance or a
+tool starts failing, so the script can gate CI.
+
+Usage:
+    python automation/testing/benchmark_servers.py
+    python automation/testing/benchmark_servers.py --servers gaea2 meme_generator --concurrency 8 --requests 200
+    python automation/testing/benchmark_servers.py --json --output bench.json
+    python automation/testing/benchmark_servers.py --baseline tests/performance/mcp_baseline.json
+    python automation/testing/benchmark_servers.py --baseline tests/performance/mcp_baseline.json --update-baseline
+    python automation/testing/benchmark_servers.py --history tests/gaea2/performance_log.json
+"""
+
+import argparse
+import asyncio
+import importlib
+import itertools
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from benchmark_stubs import StubServices
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+TRANSPORTS = ("http", "jsonrpc", "stdio")
+PROTOCOL_VERSION = "2024-11-05"
+
+SMALL_WORKFLOW = {
+    "nodes": [
+        {"id": "1", "type": "Mountain", "name": "Mountain", "position": {"x": 0, "y": 0}},
+        {"id": "2", "type": "Erosion2", "name": "Erosion", "position": {"x": 300, "y": 0}},
+        {"id": "3", "type": "SatMap", "name": "Colors", "position": {"x": 600, "y": 0}},
+    ],
+    "connections": [
+        {"from_node": "1", "from_port": "Out", "to_node": "2", "to_port": "In"},
+        {"from_node": "2", "from_port": "Out", "to_node": "3", "to_port": "In"},
+    ],
+}
+
+
+@dataclass
+class ToolCall:
+    """A tool and the arguments every benchmark request sends it"""
+
+    tool: str
+    arguments: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ServerSpec:
+    """How to construct and start a server, and which tools to load-test"""
+
+    name: str
+    module: str
+    class_name: str
+    calls: List[ToolCall]
+    kwargs: Callable[[StubServices], Dict[str, Any]] = lambda stubs: {}
+    stdio_args: Callable[[StubServices], List[str]] = lambda stubs: []
+
+
+SERVERS: Dict[str, ServerSpec] = {
+    spec.name: spec
+    for spec in [
+        ServerSpec(
+            name="gaea2",
+            module="tools.mcp.gaea2.server",
+            class_name="Gaea2MCPServer",
+            calls=[
+                ToolCall("validate_and_fix_workflow", {"workflow": SMALL_WORKFLOW}),
+                ToolCall("create_gaea2_from_template", {"template_name": "basic_terrain", "project_name": "bench"}),
+                ToolCall("suggest_gaea2_nodes", {"current_nodes": ["Mountain", "Erosion2"]}),
+            ],
+            kwargs=lambda stubs: {"gaea_path": stubs.gaea_path, "output_dir": str(stubs.output_dir / "gaea2")},
+            stdio_args=lambda stubs: ["--gaea-path", stubs.gaea_path, "--output-dir", str(stubs.output_dir / "gaea2")],
+        ),
+        ServerSpec(
+            name="meme_generator",
+            module="tools.mcp.meme_generator.server",
+            class_name="MemeGeneratorMCPServer",
+            calls=[
+                ToolCall("list_meme_templates"),
+                ToolCall(
+                    "generate_meme",
+                    {"template": "ol_reliable", "texts": {"top": "Benchmarks", "bottom": "Stubs"}, "upload": False},
+                ),
+            ],
+            kwargs=lambda stubs: {"output_dir": str(stubs.output_dir / "memes")},
+            stdio_args=lambda stubs: ["--output", str(stubs.output_dir / "memes")],
+        ),
+        ServerSpec(
+            name="elevenlabs_speech",
+            module="tools.mcp.elevenlabs_speech.server",
+            class_name="ElevenLabsSpeechMCPServer",
+            calls=[
+                ToolCall("list_available_voices"),
+                ToolCall(
+                    "synthesize_speech_v3",
+                    {"text": "Benchmark run", "voice_id": "21m00Tcm4TlvDq8ikWAM", "upload": False},
+                ),
+            ],
+            kwargs=lambda stubs: {"project_root": str(stubs.output_dir / "elevenlabs")},
+            stdio_args=lambda stubs: ["--project-root", str(stubs.output_dir / "elevenlabs")],
+        ),
+        ServerSpec(
+            name="comfyui",
+            module="tools.mcp.comfyui.server",
+            class_name="ComfyUIMCPServer",
+            calls=[
+                ToolCall("list_models", {"type": "checkpoint"}),
+                ToolCall("get_system_info"),
+                ToolCall("get_object_info"),
+            ],
+        ),
+        ServerSpec(
+            name="blender",
+            module="tools.mcp.blender.server",
+            class_name="BlenderMCPServer",
+            calls=[
+                ToolCall("list_projects"),
+                ToolCall("create_blender_project", {"name": "bench", "template": "basic_scene"}),
+            ],
+            kwargs=lambda stubs: {"base_dir": str(stubs.output_dir / "blender")},
+        ),
+        ServerSpec(
+            name="code_quality",
+            module="tools.mcp.code_quality.server",
+            class_name="CodeQualityMCPServer",
+            calls=[ToolCall("check_markdown_links", {"path": "README.md", "check_external": False})],
+        ),
+    ]
+}
+
+
+# Measurement helpers
+
+
+def rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Resident set size of a process in MiB (the current one by default)"""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if pid is None:
+        try:
+            import resource
+
+            # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+        except ImportError:
+            pass
+    return None
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, concurrency: int) -> Dict[str, Any]:
+    """Throughput and latency percentiles (ms) of one load run"""
+    ordered = sorted(latencies)
+    ms = [value * 1000 for value in ordered]
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ms) / len(ms), 2) if ms else 0.0,
+            "p50": round(percentile(ms, 50), 2),
+            "p95": round(percentile(ms, 95), 2),
+            "p99": round(percentile(ms, 99), 2),
+            "max": round(ms[-1], 2) if ms else 0.0,
+        },
+    }
+
+
+async def run_load(call: Callable[[], Awaitable[bool]], requests: int, concurrency: int) -> Dict[str, Any]:
+    """Issue ``requests`` calls from ``concurrency`` concurrent workers"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                ok = await call()
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, requests)))))
+    return summarize(latencies, errors, time.perf_counter() - started, concurrency)
+
+
+def is_error_result(result: Any) -> bool:
+    """Whether a tool result reports failure without raising"""
+    if isinstance(result, dict):
+        return result.get("success") is False or bool(result.get("error"))
+    return False
+
+
+def is_error_content(result: Dict[str, Any]) -> bool:
+    """Whether a JSON-RPC tools/call result reports failure"""
+    if result.get("isError"):
+        return True
+    for item in result.get("content", []):
+        text = item.get("text", "")
+        if text.startswith("Error"):
+            return True
+        try:
+            if is_error_result(json.loads(text)):
+                return True
+        except ValueError:
+            pass
+    return False
+
+
+# Transports
+
+
+class InProcessTarget:
+    """Calls a server's ASGI app in-process through httpx"""
+
+    def __init__(self, server: Any, transport: str):
+        import httpx
+
+        self.transport = transport
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://mcp-bench")
+        self.headers: Dict[str, str] = {}
+        self._ids = itertools.count(1)
+
+    async def start(self) -> None:
+        if self.transport != "jsonrpc":
+            return
+        response = await self.client.post(
+            "/messages",
+            json={
+                "jsonrpc": "2.0",
+                "id": next(self._ids),
+                "method": "initialize",
+                "params": {
+                    "protocolVersion": PROTOCOL_VERSION,
+                    "capabilities": {},
+                    "clientInfo": {"name": "mcp-bench", "version": "1.0"},
+                },
+            },
+        )
+        session_id = response.headers.get("Mcp-Session-Id")
+        if session_id:
+            self.headers["Mcp-Session-Id"] = session_id
+        await self.client.post(
+            "/messages", json={"jsonrpc": "2.0", "method": "notifications/initialized"}, headers=self.headers
+        )
+
+    async def call(self, tool: str, arguments: Dict[str, Any]) -> bool:
+        if self.transport == "http":
+            response = await self.client.post("/mcp/execute", json={"tool": tool, "arguments": arguments})
+            if response.status_code != 200:
+                return False
+            body = response.json()
+            return bool(body.get("success")) and not is_error_result(body.get("result"))
+
+        payload = {
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": "tools/call",
+            "params": {"name": tool, "arguments": arguments},
+        }
+        response = await self.client.post("/messages", json=payload, headers=self.headers)
+        if response.status_code != 200:
+            return False
+        body = response.json()
+        return "error" not in body and not is_error_content(body.get("result", {}))
+
+    def rss_mb(self) -> Optional[float]:
+        return rss_mb()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class StdioTarget:
+    """Runs a server with ``--mode stdio`` and pipelines JSON-RPC requests to it"""
+
+    transport = "stdio"
+
+    def __init__(self, spec: ServerSpec, stubs: StubServices):
+        self.spec = spec
+        self.stubs = stubs
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.ready_ms: Optional[float] = None
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._reader: Optional["asyncio.Task[None]"] = None
+
+    async def start(self) -> None:
+        started = time.perf_counter()
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            self.spec.module,
+            "--mode",
+            "stdio",
+            *self.spec.stdio_args(self.stubs),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=str(REPO_ROOT),
+            env={**os.environ, **self.stubs.env},
+            limit=64 * 1024 * 1024,
+        )
+        self._reader = asyncio.create_task(self._read_responses())
+        await asyncio.wait_for(
+            self.request(
+                "initialize",
+                {
+                    "protocolVersion": PROTOCOL_VERSION,
+                    "capabilities": {},
+                    "clientInfo": {"name": "mcp-bench", "version": "1.0"},
+                },
+            ),
+            timeout=60,
+        )
+        self.ready_ms = round((time.perf_counter() - started) * 1000, 1)
+        await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        assert self.process is not None and self.process.stdin is not None
+        self.process.stdin.write(json.dumps(message).encode() + b"\n")
+        await self.process.stdin.drain()
+
+    async def _read_responses(self) -> None:
+        assert self.process is not None and self.process.stdout is not None
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            future = self._pending.pop(message.get("id"), None) if isinstance(message, dict) else None
+            if future is not None and not future.done():
+                future.set_result(message)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("server process exited"))
+
+    async def request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        await self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        return await future
+
+    async def call(self, tool: str, arguments: Dict[str, Any]) -> bool:
+        response = await self.request("tools/call", {"name": tool, "arguments": arguments})
+        return "error" not in response and not is_error_content(response.get("result", {}))
+
+    def rss_mb(self) -> Optional[float]:
+        return rss_mb(self.process.pid) if self.process is not None else None
+
+    async def close(self) -> None:
+        if self.process is None:
+            return
+        if self.process.stdin is not None:
+            self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+        if self._reader is not None:
+            self._reader.cancel()
+
+
+# Benchmark
+
+
+def measure_startup(name: str, stubs: StubServices) -> Dict[str, Any]:
+    """Import and construct a server in a fresh interpreter"""
+    proc = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--startup-probe", name, "--stub-root", str(stubs.root)],
+        cwd=REPO_ROOT,
+        env={**os.environ, **stubs.env},
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        stderr = proc.stderr.strip().splitlines()
+        return {"error": stderr[-1] if stderr else f"exit code {proc.returncode}"}
+    return dict(json.loads(lines[-1]))
+
+
+def startup_probe(name: str, stub_root: str) -> None:
+    """Child side of measure_startup(): print import and construction time as JSON"""
+    spec = SERVERS[name]
+    logging.disable(logging.CRITICAL)
+    started = time.perf_counter()
+    module = importlib.import_module(spec.module)
+    imported = time.perf_counter()
+    getattr(module, spec.class_name)(**spec.kwargs(StubServices(root=stub_root)))
+    constructed = time.perf_counter()
+    result = {
+        "import_ms": round((imported - started) * 1000, 1),
+        "construct_ms": round((constructed - imported) * 1000, 1),
+        "rss_mb": rss_mb(),
+    }
+    print(json.dumps(result))
+
+
+async def benchmark_server(
+    spec: ServerSpec, stubs: StubServices, transports: List[str], requests: int, concurrency: int
+) -> Dict[str, Any]:
+    """Start-up figures and per-tool load results for one server"""
+    result: Dict[str, Any] = {"startup": measure_startup(spec.name, stubs), "tools": {}}
+    if "error" in result["startup"]:
+        result["error"] = result["startup"]["error"]
+        return result
+
+    server = None
+    if any(t != "stdio" for t in transports):
+        module = importlib.import_module(spec.module)
+        server = getattr(module, spec.class_name)(**spec.kwargs(stubs))
+
+    for transport in transports:
+        target: Any = StdioTarget(spec, stubs) if transport == "stdio" else InProcessTarget(server, transport)
+        try:
+            await target.start()
+            for index, tool_call in enumerate(spec.calls):
+                # The first call warms caches and lazily built state and is timed separately
+                started = time.perf_counter()
+                ok = await target.call(tool_call.tool, tool_call.arguments)
+                first_call_ms = round((time.perf_counter() - started) * 1000, 1)
+                if transport == "stdio" and index == 0:
+                    result["startup"]["stdio_ready_ms"] = target.ready_ms
+                    result["startup"]["stdio_first_call_ms"] = first_call_ms
+
+                stats = await run_load(
+                    lambda c=tool_call: target.call(c.tool, c.arguments), requests, concurrency  # type: ignore[misc]
+                )
+                stats["first_call_ms"] = first_call_ms
+                stats["first_call_ok"] = ok
+                stats["rss_mb"] = target.rss_mb()
+                result["tools"].setdefault(tool_call.tool, {})[transport] = stats
+        except Exception as e:
+            result.setdefault("transport_errors", {})[transport] = f"{type(e).__name__}: {e}"
+        finally:
+            await target.close()
+
+    if server is not None and hasattr(server, "tool_executor"):
+        server.tool_executor.shutdown()
+    return result
+
+
+# Baselines
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta_ms: float) -> List[str]:
+    """Regressions of ``current`` relative to ``baseline``
+
+    A time regresses when it exceeds the baseline by more than ``tolerance``
+    (a fraction) and by more than ``min_delta_ms``, which keeps sub-millisecond
+    noise from failing a run. A tool or server that worked in the baseline and
+    now fails is always a regression. Entries missing from either report are
+    not compared.
+    """
+    regressions: List[str] = []
+
+    def slower(label: str, now: Optional[float], before: Optional[float]) -> None:
+        if now is None or before is None:
+            return
+        if now > before * (1 + tolerance) and now - before > min_delta_ms:
+            regressions.append(f"{label}: {now:.1f} ms vs baseline {before:.1f} ms")
+
+    for name, base_server in baseline.get("servers", {}).items():
+        server = current.get("servers", {}).get(name)
+        if server is None or "error" in base_server:
+            continue
+        if "error" in server:
+            regressions.append(f"{name}: failed to start ({server['error']})")
+            continue
+        for key in ("import_ms", "construct_ms", "stdio_ready_ms"):
+            slower(f"{name} startup {key}", server["startup"].get(key), base_server["startup"].get(key))
+        for tool, transports in base_server.get("tools", {}).items():
+            for transport, before in transports.items():
+                now = server.get("tools", {}).get(tool, {}).get(transport)
+                if now is None:
+                    continue
+                label = f"{name}.{tool} [{transport}]"
+                if now["errors"] > before["errors"]:
+                    regressions.append(f"{label}: {now['errors']} errors vs baseline {before['errors']}")
+                slower(f"{label} p50", now["latency_ms"]["p50"], before["latency_ms"]["p50"])
+                slower(f"{label} p95", now["latency_ms"]["p95"], before["latency_ms"]["p95"])
+    return regressions
+
+
+def check_history(report: Dict[str, Any], history_file: Path, tolerance: float) -> List[str]:
+    """Compare p50 latencies with a performance log and append this run to it
+
+    The log has the format of tests/gaea2/performance_log.json: a ``tests``
+    list of ``{test, duration, success, timestamp}`` entries, durations in
+    seconds. Each result is compared with the average of its last 10
+    successful runs; the log keeps the newest 1000 entries.
+    """
+    log_data: Dict[str, Any] = {"tests": []}
+    if history_file.exists():
+        with open(history_file) as f:
+            log_data = json.load(f)
+
+    regressions = []
+    timestamp = datetime.now().isoformat()
+    for name, server in report["servers"].items():
+        for tool, transports in server.get("tools", {}).items():
+            for transport, stats in transports.items():
+                test_name = f"benchmark.{name}.{tool}.{transport}"
+                duration = stats["latency_ms"]["p50"] / 1000
+                success = stats["errors"] == 0
+                historical = [t["duration"] for t in log_data["tests"] if t["test"] == test_name and t.get("success")]
+                if success and historical:
+                    average = sum(historical[-10:]) / len(historical[-10:])
+                    if duration > average * (1 + tolerance):
+                        regressions.append(f"{test_name}: p50 {duration * 1000:.1f} ms vs average {average * 1000:.1f} ms")
+                log_data["tests"].append({"test": test_name, "duration": duration, "success": success, "timestamp": timestamp})
+
+    log_data["tests"] = log_data["tests"][-1000:]
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_file, "w") as f:
+        json.dump(log_data, f, indent=2)
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    for name, server in report["servers"].items():
+        if "error" in server:
+            print(f"{name:<20} failed: {server['error']}")
+            continue
+        startup = server["startup"]
+        print(
+            f"{name:<20} import {startup.get('import_ms', 0):>7.1f} ms  construct {startup.get('construct_ms', 0):>7.1f} ms"
+            f"  stdio ready {startup.get('stdio_ready_ms') or 0:>7.1f} ms  rss {startup.get('rss_mb') or 0:>6.1f} MiB"
+        )
+        for tool, transports in server["tools"].items():
+            for transport, stats in transports.items():
+                latency = stats["latency_ms"]
+                print(
+                    f"    {tool:<32} {transport:<8} {stats['throughput_rps']:>8.1f} req/s"
+                    f"  p50 {latency['p50']:>8.2f}  p95 {latency['p95']:>8.2f}  p99 {latency['p99']:>8.2f} ms"
+                    f"  errors {stats['errors']}"
+                )
+        for transport, error in server.get("transport_errors", {}).items():
+            print(f"    {transport} transport failed: {error}")
+
+
+async def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "transports": args.transports,
+        },
+        "servers": {},
+    }
+    with StubServices(delay=args.stub_delay) as stubs:
+        # Servers read these at import or construction time
+        os.environ.update(stubs.env)
+        for name in args.servers or list(SERVERS):
+            report["servers"][name] = await benchmark_server(
+                SERVERS[name], stubs, args.transports, args.requests, args.concurrency
+            )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and load-test MCP servers")
+    parser.add_argument("--servers", nargs="*", choices=sorted(SERVERS), help="Servers to benchmark (default: all)")
+    parser.add_argument("--transports", nargs="*", choices=TRANSPORTS, default=list(TRANSPORTS), help="Transports to drive")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per tool and transport")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent requests in flight")
+    parser.add_argument("--stub-delay", type=float, default=0.0, help="Seconds the stub APIs wait before answering")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="Baseline report to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run to --baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown as a fraction (0.5 = 50%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--history", help="Performance log to compare with and append to (performance_log.json format)")
+    parser.add_argument("--startup-probe", help=argparse.SUPPRESS)
+    parser.add_argument("--stub-root", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.startup_probe:
+        startup_probe(args.startup_probe, args.stub_root)
+        return
+
+    logging.basicConfig(level=logging.WARNING)
+    report = asyncio.run(run_benchmarks(args))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    regressions: List[str] = []
+    if args.baseline:
+        baseline_file = Path(args.baseline)
+        if args.update_baseline or not baseline_file.exists():
+            baseline_file.parent.mkdir(parents=True, exist_ok=True)
+            baseline_file.write_text(json.dumps(report, indent=2))
+            print(f"Baseline written to {baseline_file}", file=sys.stderr)
+        else:
+            regressions.extend(compare(report, json.loads(baseline_file.read_text()), args.tolerance, args.min_delta_ms))
+    if args.history:
+        regressions.extend(check_history(report, Path(args.history), args.tolerance))
+
+    if regressions:
+        print("Performance regressions:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Stand-ins for the external services MCP servers talk to
+
+Used by benchmark_servers.py so that servers can be load-tested without
+Blender, Gaea2, ComfyUI or an ElevenLabs account:
+
+- a local HTTP server answering the ComfyUI and ElevenLabs endpoints the
+  servers call, with canned responses
+- fake ``blender`` and ``gaea`` executables that accept the servers' command
+  lines, print what the servers look for and exit successfully
+
+``StubServices.env`` holds the environment variables that point the servers
+at the stubs. Apply it before importing server modules, since some of them
+(ComfyUI) read their configuration at import time.
+"""
+
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Models reported by the stub ComfyUI /object_info endpoint
+COMFYUI_OBJECT_INFO = {
+    "CheckpointLoaderSimple": {
+        "input": {"required": {"ckpt_name": [["sd_xl_base_1.0.safetensors", "flux1-dev.safetensors"]]}}
+    },
+    "LoraLoader": {"input": {"required": {"lora_name": [["detail_tweaker.safetensors"]]}}},
+    "VAELoader": {"input": {"required": {"vae_name": [["sdxl_vae.safetensors"]]}}},
+}
+
+COMFYUI_SYSTEM_STATS = {
+    "system": {"os": "posix", "python_version": sys.version.split()[0], "embedded_python": False},
+    "devices": [{"name": "stub", "type": "cpu", "vram_total": 0, "vram_free": 0}],
+}
+
+ELEVENLABS_VOICES = {
+    "voices": [
+        {"voice_id": "21m00Tcm4TlvDq8ikWAM", "name": "Rachel", "category": "premade", "labels": {"gender": "female"}},
+        {"voice_id": "pNInz6obpgDQGcFmaJgB", "name": "Adam", "category": "premade", "labels": {"gender": "male"}},
+    ]
+}
+
+ELEVENLABS_USER = {"subscription": {"tier": "stub", "character_count": 0, "character_limit": 1000000}}
+
+ELEVENLABS_MODELS = [{"model_id": "eleven_multilingual_v2", "name": "Eleven Multilingual v2"}]
+
+# An MPEG audio frame header followed by padding; enough for the server to write a file
+FAKE_MP3 = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+FAKE_GAEA = """#!{python}
+# Fake Gaea.Swarm: prints what Gaea prints when it opens a file, or fails to.
+# Files that are not JSON fail to load. FAKE_GAEA_LOG names a file to append
+# each opened path to; FAKE_GAEA_HOLD keeps the process running for that many
+# seconds after opening, as Gaea does. Builds (--output=DIR) report progress
+# for three nodes, FAKE_GAEA_STEP seconds apart, and write one file per node.
+import json, os, sys, time
+args = sys.argv[1:]
+filename = args[args.index("--Filename") + 1] if "--Filename" in args else None
+options = dict(arg[2:].split("=", 1) for arg in args if arg.startswith("--") and "=" in arg)
+if "output" in options:
+    for i in range(1, 4):
+        print("[%d/3] Baking Node%d" % (i, i), flush=True)
+        time.sleep(float(os.environ.get("FAKE_GAEA_STEP", "0")))
+        open(os.path.join(options["output"], "Node%d.%s" % (i, options.get("format", "exr"))), "wb").close()
+if filename and os.environ.get("FAKE_GAEA_LOG"):
+    with open(os.environ["FAKE_GAEA_LOG"], "a") as log:
+        log.write(filename + "\\n")
+print("Preparing Gaea", flush=True)
+if filename:
+    try:
+        with open(filename) as f:
+            json.load(f)
+    except (OSError, ValueError):
+        print("Failed to load " + os.path.basename(filename) + ": file is corrupt", flush=True)
+        sys.exit(1)
+    print("Opening " + os.path.basename(filename), flush=True)
+time.sleep(float(os.environ.get("FAKE_GAEA_HOLD", "0")))
+"""
+
+FAKE_BLENDER = """#!{python}
+# Fake Blender: creates the requested project file and exits successfully
+import json, os, sys
+args = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+if args and os.path.exists(args[0]):
+    with open(args[0]) as f:
+        params = json.load(f)
+    for key in ("project_path", "output_path"):
+        if params.get(key):
+            os.makedirs(os.path.dirname(params[key]) or ".", exist_ok=True)
+            open(params[key], "ab").close()
+print("Blender 4.0.0 (stub)", flush=True)
+"""
+
+
+def write_executable(path: Path, source: str) -> None:
+    """Write one of the fake executables above, runnable with this Python"""
+    path.write_text(source.format(python=sys.executable))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Routes for the ComfyUI API (under /) and the ElevenLabs API (under /v1)"""
+
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def _send(self, status: int, body: Any, content_type: str = "application/json") -> None:
+        if self.delay:
+            time.sleep(self.delay)
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def do_GET(self) -> None:  # noqa: N802
+        path = self.path.split("?", 1)[0].rstrip("/")
+        routes = {
+            "/object_info": COMFYUI_OBJECT_INFO,
+            "/system_stats": COMFYUI_SYSTEM_STATS,
+            "/queue": {"queue_running": [], "queue_pending": []},
+            "/v1/voices": ELEVENLABS_VOICES,
+            "/v1/user": ELEVENLABS_USER,
+            "/v1/models": ELEVENLABS_MODELS,
+        }
+        if path in routes:
+            self._send(200, routes[path])
+        elif path.startswith("/history/"):
+            prompt_id = path.rsplit("/", 1)[1]
+            self._send(200, {prompt_id: {"status": {"completed": True}, "outputs": {}}})
+        elif path.startswith("/v1/voices/"):
+            voice_id = path.rsplit("/", 1)[1]
+            voice = next((v for v in ELEVENLABS_VOICES["voices"] if v["voice_id"] == voice_id), None)
+            if voice:
+                self._send(200, voice)
+            else:
+                self._send(404, {"detail": "voice not found"})
+        else:
+            self._send(404, {"error": f"no stub for GET {path}"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        path = self.path.split("?", 1)[0].rstrip("/")
+        self._read_json()
+        if path == "/prompt":
+            self._send(200, {"prompt_id": f"stub-{time.monotonic_ns()}", "number": 0, "node_errors": {}})
+        elif path.startswith("/v1/text-to-speech/") or path == "/v1/sound-generation":
+            self._send(200, FAKE_MP3, content_type="audio/mpeg")
+        else:
+            self._send(404, {"error": f"no stub for POST {path}"})
+
+
+class StubServices:
+    """Stub HTTP APIs and fake executables, started and stopped together
+
+    Usage::
+
+        with StubServices() as stubs:
+            os.environ.update(stubs.env)
+            ...
+    """
+
+    def __init__(self, root: Optional[str] = None, delay: float = 0.0):
+        self._own_root = root is None
+        self.root = Path(root or tempfile.mkdtemp(prefix="mcp-bench-"))
+        self.bin_dir = self.root / "bin"
+        self.output_dir = self.root / "output"
+        self.delay = delay
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        assert self._httpd is not None, "stub services are not running"
+        return int(self._httpd.server_address[1])
+
+    @property
+    def gaea_path(self) -> str:
+        return str(self.bin_dir / "gaea")
+
+    @property
+    def blender_path(self) -> str:
+        return str(self.bin_dir / "blender")
+
+    @property
+    def env(self) -> Dict[str, str]:
+        """Environment variables pointing the servers at the stubs"""
+        return {
+            "COMFYUI_HOST": "127.0.0.1",
+            "COMFYUI_PORT": str(self.port),
+            "COMFYUI_PATH": str(self.root / "comfyui"),
+            "ELEVENLABS_API_URL": f"http://127.0.0.1:{self.port}/v1",
+            "ELEVENLABS_API_KEY": "stub-key",
+            "ELEVENLABS_CACHE_DIR": str(self.root / "elevenlabs_cache"),
+            "GAEA2_PATH": self.gaea_path,
+            "GAEA2_TEST_MODE": "1",
+            "MCP_OUTPUT_DIR": str(self.output_dir),
+            "PATH": f"{self.bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        }
+
+    def start(self) -> "StubServices":
+        self.bin_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for sub in ("models", "output", "input"):
+            (self.root / "comfyui" / sub).mkdir(parents=True, exist_ok=True)
+        write_executable(Path(self.gaea_path), FAKE_GAEA)
+        write_executable(Path(self.blender_path), FAKE_BLENDER)
+
+        handler = type("StubHandler", (_StubHandler,), {"delay": self.delay})
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mcp-bench-stubs", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._own_root:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self) -> "StubServices":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
@@ -53,12 +53,17 @@ SERVERS = {
         "url": "http://localhost:8007",
         "expected_tools": [
             "create_gaea2_project",
+            "create_gaea2_projects_batch",
             "create_gaea2_from_template",
             "validate_and_fix_workflow",
+            "start_gaea2_validation_session",
+            "patch_gaea2_validation_session",
+            "close_gaea2_validation_session",
             "analyze_workflow_patterns",
             "optimize_gaea2_properties",
             "suggest_gaea2_nodes",
             "repair_gaea2_project",
+            "analyze_gaea2_heightmaps",
             "download_gaea2_project",
             "list_gaea2_projects",
         ],
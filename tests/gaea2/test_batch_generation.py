@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Test batch project generation from parameter sweeps"""
+
+import json
+import os
+import sys
+import unittest.mock
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from tools.mcp.gaea2.generation import batch  # noqa: E402
+from tools.mcp.gaea2.server import Gaea2MCPServer  # noqa: E402
+
+WORKFLOW = {
+    "nodes": [
+        {"id": 101, "type": "Mountain", "name": "Peak", "properties": {"Scale": 1.0}},
+        {"id": 102, "type": "Erosion2", "name": "Erosion", "properties": {}},
+        {"id": 103, "type": "Export", "name": "Export", "properties": {}},
+    ],
+    "connections": [
+        {"from_node": 101, "to_node": 102, "from_port": "Out", "to_port": "In"},
+        {"from_node": 102, "to_node": 103, "from_port": "Out", "to_port": "In"},
+    ],
+}
+
+
+class TestSweep:
+    """Test suite for sweep parsing, expansion and value checks"""
+
+    def test_parse_and_expand(self):
+        """Test nodes resolve by id or name and axes combine as grid or zip"""
+        axes = batch.parse_sweep(
+            [
+                {"node": "Peak", "property": "seed", "range": {"start": 1, "stop": 4}},
+                {"node": 101, "property": "Scale", "values": [0.5, 1.5, 2.5]},
+            ],
+            WORKFLOW["nodes"],
+        )
+
+        assert [(a.node_id, a.property, a.values) for a in axes] == [(101, "Seed", (1, 2, 3)), (101, "Scale", (0.5, 1.5, 2.5))]
+        assert len(batch.expand_variants(axes, "grid")) == 9
+        assert batch.expand_variants(axes, "zip") == [(0, 0), (1, 1), (2, 2)]
+        with pytest.raises(ValueError):
+            batch.parse_sweep([{"node": "Missing", "property": "Seed", "values": [1]}], WORKFLOW["nodes"])
+
+    @pytest.mark.parametrize(
+        "spec, expected",
+        [
+            ({"start": 0, "stop": 1, "step": 0.3}, [0, 0.3, 0.6, 0.9]),
+            ({"start": 0, "stop": 1, "step": 0.4}, [0, 0.4, 0.8]),
+            ({"start": 0, "stop": 1, "step": 0.25}, [0, 0.25, 0.5, 0.75]),
+            ({"start": 1, "stop": 0, "step": -0.3}, [1, 0.7, 0.4, 0.1]),
+            ({"start": 1, "stop": 0, "step": 0.3}, []),
+            ({"start": 1, "stop": 7, "step": 2}, [1, 3, 5]),
+        ],
+    )
+    def test_range_values(self, spec, expected):
+        """Test float ranges stop before stop like range(), without dropping the last value"""
+        assert batch._range_values(spec) == pytest.approx(expected)
+
+    def test_value_checks_and_apply(self):
+        """Test bad values are rejected per value and variants only copy varied nodes"""
+        axes = batch.parse_sweep([{"node": "Peak", "property": "Style", "values": ["Alpine", "Jagged"]}], WORKFLOW["nodes"])
+        errors, _ = batch.check_axis_values(axes, WORKFLOW["nodes"])
+
+        assert list(errors) == [(0, 1)]
+        nodes = batch.apply_variant(WORKFLOW["nodes"], axes, ("Alpine",))
+        assert nodes[0]["properties"] == {"Scale": 1.0, "Style": "Alpine"}
+        assert WORKFLOW["nodes"][0]["properties"] == {"Scale": 1.0}
+        assert nodes[1] is WORKFLOW["nodes"][1]
+
+
+@pytest.mark.asyncio
+async def test_batch_tool(tmp_path):
+    """Test the tool writes compact projects and a manifest, skipping invalid values"""
+    env = {"GAEA2_TEST_MODE": "1", "GAEA2_BYPASS_FILE_VALIDATION_FOR_TESTS": "1"}
+    with unittest.mock.patch.dict(os.environ, env):
+        server = Gaea2MCPServer()
+        try:
+            result = await server.create_gaea2_projects_batch(
+                project_name="sweep",
+                workflow=WORKFLOW,
+                sweep=[
+                    {"node": "Peak", "property": "Seed", "values": [1, 2, 3]},
+                    {"node": "Peak", "property": "Style", "values": ["Alpine", "Jagged"]},
+                ],
+                output_dir=str(tmp_path),
+            )
+        finally:
+            server.tool_executor.shutdown()
+
+    assert result["variant_count"] == 6
+    assert result["generated"] == 3 and result["failed"] == 3
+    assert "projects" not in result
+    assert [p["index"] for p in result["failures"]] == [1, 3, 5]
+    assert "not in valid options" in result["failures"][0]["error"]
+    manifest = json.loads(Path(result["manifest_path"]).read_text())
+    assert manifest["generated"] == 3
+    generated = [p for p in manifest["projects"] if "path" in p]
+    assert [p["values"]["101.Seed"] for p in generated] == [1, 2, 3]
+    text = Path(generated[0]["path"]).read_text()
+    assert "\n" not in text and json.loads(text)
+
+
+@pytest.mark.asyncio
+async def test_batch_project_name_stays_in_output_dir(tmp_path):
+    """Test that a project name with path components cannot escape the batch directory"""
+    env = {"GAEA2_TEST_MODE": "1", "GAEA2_BYPASS_FILE_VALIDATION_FOR_TESTS": "1"}
+    batch_dir = tmp_path / "batch"
+    with unittest.mock.patch.dict(os.environ, env):
+        server = Gaea2MCPServer()
+        try:
+            result = await server.create_gaea2_projects_batch(
+                project_name="../../escaped",
+                workflow=WORKFLOW,
+                sweep=[{"node": "Peak", "property": "Seed", "values": [1]}],
+                output_dir=str(batch_dir),
+            )
+        finally:
+            server.tool_executor.shutdown()
+
+    assert result["generated"] == 1
+    assert [path.name for path in batch_dir.glob("*.terrain")] == ["escaped_0000.terrain"]
+    assert not list(tmp_path.glob("*.terrain"))
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Test the Gaea2 CLI build queue"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import unittest.mock
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from automation.testing.benchmark_stubs import FAKE_GAEA, write_executable  # noqa: E402
+from tools.mcp.gaea2.cli.automation import READ_CHUNK_SIZE, read_lines  # noqa: E402
+from tools.mcp.gaea2.cli.build_queue import BuildJobStore, BuildQueue, parse_progress  # noqa: E402
+from tools.mcp.gaea2.server import Gaea2MCPServer  # noqa: E402
+
+
+def make_queue(tmp_path, run, **kwargs):
+    events = []
+    store = BuildJobStore(str(tmp_path / "builds.sqlite3"), max_history=kwargs.pop("max_history", 1000))
+    queue = BuildQueue(run, store, poll_interval=0.1, on_event=lambda job, event: events.append((job["id"], event)), **kwargs)
+    return queue, events
+
+
+class TestBuildQueue:
+    """Test suite for lanes, cancellation, progress and history"""
+
+    def test_parse_progress(self):
+        """Test percentages and step counts in Gaea2 output"""
+        assert parse_progress("Building... 45%") == 45.0
+        assert parse_progress("[3/12] Baking Erosion2") == 25.0
+        assert parse_progress("Node 2 of 4") == 50.0
+        assert parse_progress("Opening terrain.terrain") is None
+
+    @pytest.mark.asyncio
+    async def test_lanes_progress_and_history(self, tmp_path):
+        """Test higher lanes run first, progress is published and history stays bounded"""
+        order = []
+        started, gate = asyncio.Event(), asyncio.Event()
+
+        async def run(project_path, on_line, **params):
+            order.append(project_path)
+            if project_path == "gate":
+                # Keeps the worker busy until the other jobs are queued
+                started.set()
+                await gate.wait()
+            on_line("stdout", "[1/2] Baking Mountain")
+            return {"success": project_path != "low", "error": None if project_path != "low" else "exit 1"}
+
+        queue, events = make_queue(tmp_path, run, workers=1, max_history=2)
+        await queue.submit("gate", {"project_path": "gate"})
+        await asyncio.wait_for(started.wait(), 5)
+        jobs = [await queue.submit(name, {"project_path": name}, lane=name) for name in ("low", "high", "normal")]
+        assert [job["queue_position"] for job in jobs] == [0, 0, 1]
+        gate.set()
+
+        last = await queue.wait(jobs[0]["id"])
+        await queue.close()
+
+        assert order == ["gate", "high", "normal", "low"] and last["status"] == "failed"
+        assert [event for _, event in events if event != "progress"] == ["started", "completed"] * 3 + ["started", "failed"]
+        assert (jobs[1]["id"], "progress") in events
+        history = queue.store.history(last_n=10)
+        assert history["total"] == 2 and queue.store.get(jobs[1]["id"]) is None
+        assert history["by_status"] == {"completed": 1, "failed": 1}
+        assert history["common_errors"] == [("exit 1", 1)]
+
+    @pytest.mark.asyncio
+    async def test_cancel(self, tmp_path):
+        """Test queued jobs are dropped and running ones are stopped"""
+        started = asyncio.Event()
+
+        async def run(project_path, on_line, **params):
+            started.set()
+            await asyncio.sleep(30)
+            return {"success": True}
+
+        queue, _ = make_queue(tmp_path, run, workers=1)
+        running = await queue.submit("a", {"project_path": "a"})
+        queued = await queue.submit("b", {"project_path": "b"})
+        await asyncio.wait_for(started.wait(), 5)
+
+        assert await queue.cancel(queued["id"]) == "cancelled"
+        assert await queue.cancel(running["id"]) == "cancelling"
+        job = await asyncio.wait_for(queue.wait(running["id"]), 5)
+        await queue.close()
+
+        assert job["status"] == "cancelled"
+        assert queue.store.get(queued["id"])["status"] == "cancelled"
+        assert await queue.cancel(running["id"]) == "cancelled"
+
+    @pytest.mark.asyncio
+    async def test_store_calls_off_loop(self, tmp_path):
+        """Test store calls run in the executor and progress is stored with the heartbeat, not per line"""
+        threads, progress = set(), []
+
+        async def run(project_path, on_line, **params):
+            for step in range(1, 101):
+                on_line("stdout", f"[{step}/100] Baking")
+            await asyncio.sleep(0.3)
+            return {"success": False, "error": "exit 1"}
+
+        queue, events = make_queue(tmp_path, run, workers=1)
+        for name in ("add", "claim", "heartbeat", "set_progress", "finish"):
+            method = getattr(queue.store, name)
+
+            def record(*args, _method=method, _name=name):
+                threads.add((_name, threading.current_thread() is threading.main_thread()))
+                if _name == "set_progress":
+                    progress.append(args[1])
+                return _method(*args)
+
+            setattr(queue.store, name, record)
+
+        job = await queue.submit("p", {"project_path": "p"})
+        job = await asyncio.wait_for(queue.wait(job["id"]), 5)
+        await queue.close()
+
+        assert job["status"] == "failed" and job["progress"] == 100
+        assert sum(event == "progress" for _, event in events) == 100
+        assert 1 <= len(progress) <= 5 and progress[-1] == 100
+        assert {on_main for _, on_main in threads} == {False}
+        assert {name for name, _ in threads} == {"add", "claim", "heartbeat", "set_progress", "finish"}
+
+    @pytest.mark.asyncio
+    async def test_start_resumes_stale_jobs(self, tmp_path):
+        """Test start() requeues builds of a stopped server and runs them without a submit"""
+        finished = asyncio.Event()
+
+        async def run(project_path, on_line, **params):
+            finished.set()
+            return {"success": True}
+
+        queue, events = make_queue(tmp_path, run, workers=1)
+        job = queue.store.add("p", {"project_path": "p"}, "normal")
+        queue.store.claim("stopped-server", 1)
+
+        with unittest.mock.patch("time.time", return_value=0.0):
+            queue.store.heartbeat([job["id"]])
+        assert await queue.start() == 1
+        await asyncio.wait_for(finished.wait(), 5)
+        job = await asyncio.wait_for(queue.wait(job["id"]), 5)
+        await queue.close()
+
+        assert job["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_read_lines_long_and_carriage_return_output():
+    """Test Gaea2 output with bare carriage returns and oversized lines is drained, not dropped"""
+    stream = asyncio.StreamReader()
+    stream.feed_data(b"Opening\r\n" + b"".join(f"Building {i}%\r".encode() for i in range(100)))
+    stream.feed_data(b"x" * (3 * READ_CHUNK_SIZE) + "\ndone \u00e9".encode())
+    stream.feed_eof()
+    lines = []
+
+    await read_lines(stream, lines.append)
+
+    assert lines[0] == "Opening" and lines[100] == "Building 99%"
+    assert "".join(lines[101:-1]) == "x" * (3 * READ_CHUNK_SIZE)
+    assert lines[-1] == "done \u00e9"
+
+
+@pytest.mark.asyncio
+async def test_run_project_tool(tmp_path):
+    """Test run_gaea2_project builds through the queue and indexes the output files"""
+    gaea_path = tmp_path / "gaea"
+    write_executable(gaea_path, FAKE_GAEA)
+    project = tmp_path / "peak.terrain"
+    project.write_text(json.dumps({"Assets": {}}))
+
+    env = {"GAEA2_TEST_MODE": "1", "GAEA2_BUILD_DB": str(tmp_path / "builds.sqlite3")}
+    with unittest.mock.patch.dict(os.environ, env):
+        server = Gaea2MCPServer(gaea_path=str(gaea_path))
+        try:
+            result = await server.run_gaea2_project(project_path=str(project), format="png")
+            job = await server.get_gaea2_build_job(job_id=result["job_id"])
+            history = await server.analyze_execution_history(project_path=str(project), output_format="png")
+        finally:
+            await server.build_queue.close()
+            server.tool_executor.shutdown()
+
+    assert result["success"] and len(result["output_files"]) == 3
+    assert job["job"]["status"] == "completed" and job["job"]["progress"] == 100
+    assert [output["format"] for output in job["job"]["outputs"]] == ["png"] * 3
+    analysis = history["analysis"]
+    assert analysis["total_executions"] == 1 and analysis["outputs"]["png"]["files"] == 3
+    assert analysis["executions"][0]["result"]["success"]
+    assert sorted(output["path"] for output in analysis["output_files"]) == sorted(result["output_files"])
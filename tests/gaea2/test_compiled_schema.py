@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Test the compiled (indexed) Gaea2 schema"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from tools.mcp.gaea2.schema import gaea2_schema  # noqa: E402
+from tools.mcp.gaea2.schema.compiled_schema import CompiledSchema  # noqa: E402
+
+
+def compile_schema(**kwargs) -> CompiledSchema:
+    return CompiledSchema.load(
+        gaea2_schema.NODE_CATEGORIES,
+        gaea2_schema.NODE_PROPERTY_DEFINITIONS,
+        gaea2_schema.COMMON_NODE_PROPERTIES,
+        gaea2_schema.NODE_PORT_DEFINITIONS,
+        gaea2_schema.PORT_COMPATIBILITY,
+        source_files=[gaea2_schema.__file__],
+        **kwargs,
+    )
+
+
+class TestCompiledSchema:
+    """Test suite for indexed lookups and precompiled validators"""
+
+    def test_lookups(self):
+        """Test categories, ports and case-insensitive aliases"""
+        schema = compile_schema()
+
+        for category, node_types in gaea2_schema.NODE_CATEGORIES.items():
+            for node_type in node_types:
+                assert schema.category(node_type) == category
+        assert schema.category("NotANode") == "unknown"
+        assert schema.ports("Combine") is gaea2_schema.NODE_PORT_DEFINITIONS["combine"]
+        assert schema.ports("Mountain") is gaea2_schema.NODE_PORT_DEFINITIONS["terrain"]
+        assert schema.ports("NotANode")["outputs"] == [{"name": "Out", "type": "heightfield"}]
+        assert schema.resolve_type("erosion2") == "Erosion2"
+        assert schema.resolve_type("NotANode") is None
+        assert schema.resolve_property("Mountain", "style") == "Style"
+        assert schema.resolve_property("Mountain", "SEED") == "Seed"
+
+    def test_property_validation(self):
+        """Test range warnings, type errors, enum options and unknown properties"""
+        errors, warnings = gaea2_schema.validate_node_properties(
+            "Mountain", {"Scale": 50.0, "Style": "Jagged", "Seed": "1", "Bogus": 1, "Bulk": ["High"]}
+        )
+
+        assert "Property 'Scale' value 50.0 outside recommended range [0.1, 5.0]" in warnings
+        assert "Unknown property 'Bogus' for node type Mountain" in warnings
+        assert "Property 'Style' value 'Jagged' not in valid options: Basic, Eroded, Old, Alpine, Strata" in errors
+        assert "Property 'Seed' should be integer, got str" in errors
+        assert len(errors) == 3
+        assert gaea2_schema.validate_node_properties("Mountain", {"Scale": 2.0, "Style": "Alpine"}) == ([], [])
+
+    def test_connections_and_defaults(self):
+        """Test connection checks and default filling"""
+        mountain = {"type": "Mountain", "name": "Mountain"}
+        erosion = {"type": "Erosion2", "name": "Erosion"}
+
+        assert gaea2_schema.validate_connection(mountain, erosion, "Out", "In") == (True, "")
+        assert gaea2_schema.validate_connection(erosion, mountain, "Out", "In") == (
+            False,
+            "Node Mountain has no input port 'In'",
+        )
+        defaults = gaea2_schema.apply_default_properties("Mountain", {"Scale": 2.0})
+        assert defaults["Scale"] == 2.0
+        assert defaults["Style"] == "Basic"
+        assert defaults["Seed"] == 0
+
+    def test_disk_cache(self, tmp_path):
+        """Test the pickled schema is written once and reused"""
+        first = compile_schema(cache_dir=str(tmp_path))
+        cached = list(tmp_path.glob("gaea2_schema-*.pickle"))
+        second = compile_schema(cache_dir=str(tmp_path))
+
+        assert len(cached) == 1
+        assert second.source_hash == first.source_hash
+        assert second.validate_properties("Mountain", {"Scale": 50.0}) == first.validate_properties(
+            "Mountain", {"Scale": 50.0}
+        )
+
+
+def test_server_loads_schema_in_warmup():
+    """Test that importing the server defers the schema and knowledge graph to warmup()"""
+    import subprocess
+
+    script = (
+        "import os, sys\n"
+        "os.environ['GAEA2_TEST_MODE'] = '1'\n"
+        "from tools.mcp.gaea2.server import Gaea2MCPServer\n"
+        "lazy = [m for m in sys.modules if m.endswith(('gaea2_schema', 'knowledge_graph'))]\n"
+        "assert lazy == [], lazy\n"
+        "server = Gaea2MCPServer()\n"
+        "server.warmup()\n"
+        "server.tool_executor.shutdown()\n"
+        "assert 'tools.mcp.gaea2.schema.gaea2_schema' in sys.modules\n"
+        "assert sys.modules['tools.mcp.gaea2.schema.gaea2_schema']._compiled_schema is not None\n"
+        "assert sys.modules['tools.mcp.gaea2.utils.gaea2_knowledge_graph']._knowledge_graph is not None\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=Path(__file__).parent.parent.parent, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
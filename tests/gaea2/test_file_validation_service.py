@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Test Gaea2 file validation against a stub Gaea.Swarm executable"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import sys
+import time
+import unittest.mock
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from automation.testing.benchmark_stubs import FAKE_GAEA, write_executable  # noqa: E402
+from tools.mcp.gaea2.server import Gaea2MCPServer  # noqa: E402
+from tools.mcp.gaea2.validation import gaea2_file_validator  # noqa: E402
+from tools.mcp.gaea2.validation.gaea2_file_validator import AdaptiveConcurrency, Gaea2FileValidator  # noqa: E402
+
+PROJECT = {"Assets": {"$values": [{"Terrain": {"Nodes": {"$id": "1", "183": {"$type": "Mountain"}}}}]}}
+
+
+@pytest.fixture
+def gaea(tmp_path):
+    """A fake Gaea.Swarm that logs every file it opens"""
+    gaea_path = tmp_path / "gaea"
+    write_executable(gaea_path, FAKE_GAEA)
+    log = tmp_path / "opened.log"
+    with unittest.mock.patch.dict(os.environ, {"FAKE_GAEA_LOG": str(log)}):
+        yield Gaea2FileValidator(gaea_path), log
+
+
+def opened(log):
+    return log.read_text().splitlines() if log.exists() else []
+
+
+class TestFileValidation:
+    """Test suite for the result cache and the stream reader"""
+
+    @pytest.mark.asyncio
+    async def test_identical_content_opens_once(self, gaea, tmp_path):
+        """Test files with the same JSON reuse the result, however they are formatted"""
+        validator, log = gaea
+        first, second, corrupt = tmp_path / "a.terrain", tmp_path / "b.terrain", tmp_path / "c.terrain"
+        first.write_text(json.dumps(PROJECT, indent=2))
+        second.write_text(json.dumps(PROJECT, separators=(",", ":")))
+        corrupt.write_text('{"Assets": ')
+
+        results = [await validator.validate_file(str(path)) for path in (first, second, corrupt, corrupt)]
+
+        assert [r["success"] for r in results] == [True, True, False, False]
+        assert [r.get("cached", False) for r in results] == [False, True, False, True]
+        assert results[1]["file_path"] == str(second)
+        assert "corrupt" in results[3]["error"]
+        assert opened(log) == [str(first), str(corrupt)]
+
+    @pytest.mark.asyncio
+    async def test_returns_when_pattern_fires(self, gaea, tmp_path):
+        """Test validation returns once success is confirmed instead of waiting for Gaea2 to exit"""
+        validator, _ = gaea
+        validator.confirm_seconds = 0.2
+        path = tmp_path / "held.terrain"
+        path.write_text(json.dumps(PROJECT))
+
+        with unittest.mock.patch.dict(os.environ, {"FAKE_GAEA_HOLD": "30"}):
+            start = time.monotonic()
+            result = await validator.validate_file(str(path), timeout=20, use_cache=False)
+
+        assert result["success"] and result["success_detected"]
+        assert time.monotonic() - start < 10
+        assert result["return_code"] is not None
+
+
+class TestAdaptiveConcurrency:
+    """Test suite for the adaptive validation slots"""
+
+    def test_target(self):
+        """Test slots follow idle CPUs and free memory, without counting our own load"""
+        resources = [8, 0.0, 100000.0]
+        limiter = AdaptiveConcurrency(max_workers=4, mb_per_process=1024, probe=lambda: tuple(resources))
+
+        assert limiter.target() == 4
+        resources[1] = 6.0
+        assert limiter.target() == 2
+        limiter.active = 2
+        assert limiter.target() == 4
+        resources[2] = 1500.0
+        assert limiter.target() == 3
+        limiter.active = 0
+        resources[2] = 100.0
+        assert limiter.target() == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_slots(self, gaea, tmp_path):
+        """Test a batch never runs more Gaea2 processes than there are slots"""
+        validator, log = gaea
+        seen = []
+
+        def probe():
+            seen.append(validator.concurrency.active)
+            return 2, 0.0, None
+
+        validator.concurrency = AdaptiveConcurrency(max_workers=8, probe=probe)
+        paths = []
+        for i in range(6):
+            path = tmp_path / f"variant_{i}.terrain"
+            path.write_text(json.dumps({**PROJECT, "Id": i}))
+            paths.append(str(path))
+
+        summary = await validator.validate_batch(paths + paths[:1])
+
+        assert summary["successful"] == 7 and summary["cached"] == 1
+        assert max(seen) == 2
+        assert sorted(opened(log)) == sorted(paths)
+
+    @pytest.mark.asyncio
+    async def test_tool_calls_on_executor_loops(self, gaea, tmp_path):
+        """Test create_gaea2_project calls, each on its own thread-executor loop, share the slots"""
+        validator, log = gaea
+        seen = []
+
+        def probe():
+            seen.append(validator.concurrency.active)
+            return 1, 0.0, None
+
+        validator.concurrency = AdaptiveConcurrency(max_workers=1, probe=probe)
+        validator.confirm_seconds = 0.2
+        workflow = {"nodes": [{"id": 1, "type": "Mountain", "properties": {}}], "connections": []}
+        paths = [str(tmp_path / f"{name}.terrain") for name in ("first", "second")]
+        env = {"GAEA2_TEST_MODE": "1", "FAKE_GAEA_HOLD": "0.5"}
+        validators = {str(validator.gaea_path): validator}
+        with unittest.mock.patch.dict(os.environ, env), unittest.mock.patch.dict(gaea2_file_validator._validators, validators):
+            server = Gaea2MCPServer(gaea_path=str(validator.gaea_path))
+            try:
+                calls = [{"project_name": Path(path).stem, "workflow": workflow, "output_path": path} for path in paths]
+                results = await asyncio.wait_for(
+                    asyncio.gather(*(server.dispatch_tool("create_gaea2_project", call) for call in calls)), 30
+                )
+            finally:
+                server.tool_executor.shutdown()
+
+        assert [(result["success"], result["file_validation_performed"]) for result in results] == [(True, True)] * 2
+        assert max(seen) == 1 and validator.concurrency.active == 0
+        assert sorted(opened(log)) == paths
+        assert all(os.path.exists(path) for path in paths)
+
+    def test_same_content_on_two_loops(self, gaea, tmp_path):
+        """Test a validation in progress on one loop is shared with a caller on another"""
+        validator, log = gaea
+        path = tmp_path / "shared.terrain"
+        path.write_text(json.dumps(PROJECT))
+
+        with unittest.mock.patch.dict(os.environ, {"FAKE_GAEA_HOLD": "0.5"}):
+            with concurrent.futures.ThreadPoolExecutor(2) as pool:
+                runs = [pool.submit(asyncio.run, validator.validate_file(str(path))) for _ in range(2)]
+                results = [run.result(30) for run in runs]
+
+        assert [result["success"] for result in results] == [True, True]
+        assert sorted(result.get("cached", False) for result in results) == [False, True]
+        assert opened(log) == [str(path)]
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Test the bounded Gaea2 operation cache"""
+
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from tools.mcp.gaea2.utils.gaea2_cache import Gaea2Cache  # noqa: E402
+
+
+class TestGaea2Cache:
+    """Test suite for eviction, namespaces and persistence"""
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first"""
+        cache = Gaea2Cache(max_entries=2)
+        cache.set("op", {"n": 1}, "one")
+        cache.set("op", {"n": 2}, "two")
+        assert cache.get("op", {"n": 1}) == "one"
+        cache.set("op", {"n": 3}, "three")
+
+        assert cache.get("op", {"n": 2}) is None
+        assert cache.get("op", {"n": 1}) == "one"
+        assert cache.stats()["operations"]["op"]["evictions"] == 1
+
+    def test_size_bound_and_ttl(self):
+        """Test entries are evicted by size and expire after their TTL"""
+        cache = Gaea2Cache(max_entries=100, max_bytes=250)
+        for n in range(5):
+            cache.set("op", {"n": n}, "x" * 100)
+        cache.set("short", {}, "value", ttl=-1)
+
+        assert len(cache) <= 3
+        assert cache.stats()["bytes"] <= 250
+        assert cache.get("short", {}) is None
+        assert cache.stats()["operations"]["short"]["expirations"] == 1
+
+    def test_clear_operation(self):
+        """Test clearing one operation leaves the others"""
+        cache = Gaea2Cache()
+        cache.set("validate_node", {"node_type": "Mountain"}, [1])
+        cache.set("workflow_analysis", {"workflow": ["Mountain"]}, {"ok": True})
+
+        cache.clear("validate_node")
+
+        assert cache.get("validate_node", {"node_type": "Mountain"}) is None
+        assert cache.get("workflow_analysis", {"workflow": ["Mountain"]}) == {"ok": True}
+
+    def test_persistence_keeps_tuples(self, tmp_path):
+        """Test results survive a restart, including tuple results and tuple params"""
+        params = {"node_type": "Mountain", "properties": {"Scale": 1.0}, "pattern": [(1, 2)]}
+        result = (True, [], {"Scale": 1.0})
+        Gaea2Cache(str(tmp_path)).set("validate_node", params, result)
+
+        reopened = Gaea2Cache(str(tmp_path))
+
+        assert reopened.get("validate_node", params) == result
+        assert reopened.stats()["operations"]["validate_node"]["hits"] == 1
+
+    def test_compaction(self, tmp_path):
+        """Test compaction drops expired entries from disk"""
+        cache = Gaea2Cache(str(tmp_path))
+        cache.set("op", {"n": 1}, "old", ttl=0.01)
+        cache.set("op", {"n": 2}, "new")
+        time.sleep(0.02)
+
+        assert cache.compact() == 2
+        assert Gaea2Cache(str(tmp_path)).get("op", {"n": 2}) == "new"
+
+    @pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+    def test_forked_worker_reopens_store(self, tmp_path):
+        """Test a forked process writes through its own connection, not the parent's"""
+        cache = Gaea2Cache(str(tmp_path))
+        cache.set("op", {"n": 1}, "parent")
+
+        child = multiprocessing.get_context("fork").Process(target=cache.set, args=("op", {"n": 2}, "child"))
+        child.start()
+        child.join(30)
+
+        assert child.exitcode == 0 and cache._disk._pid == os.getpid()
+        assert Gaea2Cache(str(tmp_path)).get("op", {"n": 2}) == "child"
+        assert cache.get("op", {"n": 1}) == "parent"
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Test the shared Gaea2 workflow graph engine"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from tools.mcp.gaea2.repair.gaea2_project_repair import Gaea2ProjectRepair  # noqa: E402
+from tools.mcp.gaea2.utils.gaea2_graph import WorkflowGraph  # noqa: E402
+from tools.mcp.gaea2.validation.gaea2_connection_validator import Gaea2ConnectionValidator  # noqa: E402
+
+
+def make_graph(types, edges, key=("from_node", "to_node")) -> WorkflowGraph:
+    nodes = [{"id": i, "type": node_type, "name": f"{node_type}{i}"} for i, node_type in enumerate(types)]
+    return WorkflowGraph(nodes, [{key[0]: a, key[1]: b} for a, b in edges])
+
+
+class TestWorkflowGraph:
+    """Test suite for components, ordering, reachability and dominators"""
+
+    def test_components_and_cycles(self):
+        """Test cycles are reported once per component, including self-loops"""
+        graph = make_graph(["A"] * 6, [(0, 1), (1, 2), (2, 0), (2, 3), (3, 3), (4, 5)], key=("source", "target"))
+
+        assert sorted(map(sorted, graph.strongly_connected_components())) == [[0, 1, 2], [3], [4], [5]]
+        assert graph.cycles() == [[0, 1, 2, 0], [3, 3]]
+        assert graph.topological_order() == [4, 5]
+        assert not graph.is_acyclic()
+
+    def test_deep_chain(self):
+        """Test a chain far deeper than the recursion limit"""
+        size = sys.getrecursionlimit() * 5
+        graph = make_graph(["Mountain"] + ["Adjust"] * (size - 1), [(i, i + 1) for i in range(size - 1)])
+
+        assert graph.cycles() == []
+        assert graph.depth() == size
+        assert len(graph.reachable(0)) == size - 1
+        assert len(graph.dominators(size - 1)) == size
+
+    def test_dominators_and_paths(self):
+        """Test dominators, shortest paths and the main sequence on a diamond"""
+        graph = make_graph(
+            ["Mountain", "Erosion2", "Terrace", "Combine", "SatMap"],
+            [(0, 1), (0, 2), (1, 3), (2, 3), (3, 4)],
+        )
+
+        assert graph.immediate_dominators() == {0: None, 1: 0, 2: 0, 3: 0, 4: 3}
+        assert graph.dominators(4) == {0, 3, 4}
+        assert graph.shortest_path_to_type(0, "SatMap") == [0, 1, 3, 4]
+        assert graph.shortest_path_to_type(0, "SatMap", max_length=3) is None
+        assert graph.main_sequence() == [0, 1, 3, 4]
+
+    def test_callers(self):
+        """Test the validator, repair and optimizer results built on the graph"""
+        nodes = [
+            {"id": 1, "type": "Mountain", "name": "Mountain"},
+            {"id": 2, "type": "Combine", "name": "Combine", "properties": {}},
+            {"id": 3, "type": "Erosion2", "name": "Erosion"},
+            {"id": 4, "type": "Blur", "name": "Lonely"},
+        ]
+        connections = [{"from_node": 1, "to_node": 2}, {"from_node": 2, "to_node": 3}, {"from_node": 3, "to_node": 1}]
+
+        _, errors, warnings = Gaea2ConnectionValidator().validate_connections(nodes, connections)
+
+        assert "Circular dependency detected: 1 → 2 → 3 → 1" in errors
+        assert "Node 'Lonely' (Blur) is not connected" in warnings
+        assert Gaea2ProjectRepair()._find_redundant_nodes(nodes, connections) == [2]
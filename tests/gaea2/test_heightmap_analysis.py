@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Test tiled analysis of Gaea2 heightmap outputs"""
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from tools.mcp.gaea2.server import Gaea2MCPServer  # noqa: E402
+from tools.mcp.gaea2.utils import gaea2_heightmap  # noqa: E402
+
+
+def terrain(size, seed=0):
+    """Smooth hills with some noise, normalized to 0..1"""
+    y, x = np.mgrid[0:size, 0:size] / size
+    heights = np.sin(x * 7) * np.cos(y * 5) + np.random.default_rng(seed).random((size, size)) * 0.05
+    return (heights - heights.min()) / (heights.max() - heights.min())
+
+
+def write_r16(path, heights):
+    np.round(heights * 65535).astype("<u2").tofile(path)
+
+
+class TestHeightmapStatistics:
+    """Test suite for the tiled elevation and slope statistics"""
+
+    @pytest.mark.parametrize("suffix", [".r16", ".r32"])
+    def test_tiles_match_whole_map(self, tmp_path, suffix):
+        """Test statistics computed tile by tile equal those of the whole map"""
+        path = tmp_path / f"Out{suffix}"
+        heights = terrain(300)
+        if suffix == ".r16":
+            write_r16(path, heights)
+            heights = np.fromfile(path, dtype="<u2").reshape(300, 300) / 65535
+        else:
+            heights.astype("<f4").tofile(path)
+            heights = np.fromfile(path, dtype="<f4").reshape(300, 300).astype(np.float64)
+
+        result = gaea2_heightmap.analyze_heightmap(str(path), tile_size=64, terrain_width=3000, terrain_height=1000)
+
+        grad_y, grad_x = np.gradient(heights * 1000, 10.0)
+        slopes = np.degrees(np.arctan(np.hypot(grad_x, grad_y)))
+        expected = np.histogram(slopes, bins=gaea2_heightmap.DEFAULT_SLOPE_BINS)[0]
+        assert (result["width"], result["height"]) == (300, 300)
+        assert result["elevation"]["mean"] == pytest.approx(heights.mean() * 1000, rel=1e-5)
+        assert result["elevation"]["std"] == pytest.approx(heights.std() * 1000, rel=1e-4)
+        assert result["elevation"]["max"] == pytest.approx(heights.max() * 1000, rel=1e-5)
+        assert result["slope"]["mean"] == pytest.approx(slopes.mean(), rel=1e-4)
+        assert np.abs(np.array(result["slope"]["histogram"]["counts"]) - expected).sum() <= 2
+
+    def test_memory_is_bounded_by_tile_size(self, tmp_path):
+        """Test a large map is analyzed without loading it whole"""
+        path = tmp_path / "Large.r16"
+        np.zeros((2048, 2048), dtype="<u2").tofile(path)
+
+        tracemalloc.start()
+        try:
+            gaea2_heightmap.analyze_heightmap(str(path), tile_size=128)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        assert peak < 2048 * 2048 * 4 / 4
+
+    def test_size_must_be_known(self, tmp_path):
+        """Test a file that is not a square map needs its width"""
+        path = tmp_path / "Wide.r16"
+        np.zeros((10, 30), dtype="<u2").tofile(path)
+
+        with pytest.raises(ValueError):
+            gaea2_heightmap.analyze_heightmap(str(path))
+        assert gaea2_heightmap.analyze_heightmap(str(path), width=30)["height"] == 10
+
+
+@pytest.mark.asyncio
+async def test_build_directory(tmp_path):
+    """Test the tool reports heightmaps, erosion coverage and seams between tiles"""
+    heights = terrain(128)[:64] * 0.9
+    write_r16(tmp_path / "Terrain_x0_y0.r16", heights[:, :64])
+    write_r16(tmp_path / "Terrain_x1_y0.r16", heights[:, 63:127] + 0.01)
+    wear = np.zeros((64, 64))
+    wear[:16] = 0.5
+    write_r16(tmp_path / "Erosion2_Wear.r16", wear)
+    (tmp_path / "Broken.r32").write_bytes(b"\0" * 7)
+
+    server = Gaea2MCPServer()
+    try:
+        result = await server.analyze_gaea2_heightmaps(path=str(tmp_path), tile_size=32)
+    finally:
+        server.tool_executor.shutdown()
+
+    assert result["success"]
+    assert sorted(result["heightmaps"]) == ["Terrain_x0_y0.r16", "Terrain_x1_y0.r16"]
+    assert result["erosion_coverage"]["Erosion2_Wear.r16"]["coverage"] == 0.25
+    assert list(result["errors"]) == ["Broken.r32"]
+    seams = result["tile_seams"]["Terrain.r16"]
+    assert seams["tile_count"] == 2 and len(seams["seams"]) == 1
+    assert seams["max_delta"] == pytest.approx(26.0, abs=0.1)
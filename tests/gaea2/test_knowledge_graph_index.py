@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Test the indexed Gaea2 knowledge graph queries"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from tools.mcp.gaea2.utils.gaea2_knowledge_graph import Gaea2KnowledgeGraph, RelationType  # noqa: E402
+
+
+def scan(graph, node, relation_type=None):
+    return [
+        rel
+        for rel in graph.relationships
+        if node in (rel.from_node, rel.to_node) and relation_type in (None, rel.relation_type)
+    ]
+
+
+class TestKnowledgeGraphIndex:
+    """Test suite for relationship and pattern indexes"""
+
+    def test_relationship_index(self):
+        """Test indexed lookups match a scan and pick up new relationships"""
+        graph = Gaea2KnowledgeGraph()
+        for node in {rel.from_node for rel in graph.relationships}:
+            assert graph.get_relationships(node) == scan(graph, node)
+            assert graph.get_relationships(node, RelationType.PRECEDES) == scan(graph, node, RelationType.PRECEDES)
+
+        graph.add_relationship("Mountain", "Lakes", RelationType.REQUIRES, 0.5, "test")
+
+        assert graph.get_relationships("Lakes", RelationType.REQUIRES, "incoming")[-1].from_node == "Mountain"
+        assert graph.get_relationships("Lakes", RelationType.REQUIRES, "outgoing") == []
+        assert "Mountain typically requires Lakes" in graph.validate_workflow(["Mountain"], [])["warnings"]
+
+    def test_lists_are_read_only(self):
+        """Test relationships and patterns can only change through the add methods"""
+        graph = Gaea2KnowledgeGraph()
+        graph.get_relationships("Mountain")
+
+        with pytest.raises(AttributeError):
+            graph.relationships.append(graph.relationships[0])
+        with pytest.raises(AttributeError):
+            graph.patterns.append(graph.patterns[0])
+        count = len(graph.relationships)
+        graph.add_relationship("Lakes", "Mountain", RelationType.ENHANCES)
+        assert len(graph.relationships) == count + 1
+        assert graph.get_relationships("Lakes", RelationType.ENHANCES, "outgoing")[0].to_node == "Mountain"
+
+    def test_conflicts_in_order(self):
+        """Test conflicts are reported for every later node, in node order"""
+        graph = Gaea2KnowledgeGraph()
+        conflict = next(rel for rel in graph.relationships if rel.relation_type == RelationType.CONFLICTS)
+        nodes = [conflict.from_node, "Mountain", conflict.from_node, conflict.to_node]
+
+        issues = graph.validate_workflow(nodes, [])["issues"]
+
+        expected = f"{conflict.from_node} conflicts with {conflict.to_node}: {conflict.description}"
+        assert issues == [expected] * 2
+
+    def test_pattern_queries(self):
+        """Test similarity and pattern-based suggestions use the pattern index"""
+        graph = Gaea2KnowledgeGraph()
+        pattern = graph.patterns[0]
+
+        assert graph.find_similar_patterns(pattern.nodes, threshold=1.0) == [pattern]
+        assert graph.find_similar_patterns(["NotANode"], threshold=0.1) == []
+        assert len(graph.find_similar_patterns(["NotANode"], threshold=0)) == len(graph.patterns)
+
+        suggested = dict(graph.get_suggested_next_nodes(pattern.nodes[:1]))
+        assert all(node in suggested for node in pattern.nodes[1:])
+        assert graph.get_suggested_next_nodes(["NotANode"]) == []
+
+        graph.add_pattern("Test", "test", ["NotANode", "Lakes"], [("NotANode", "Lakes")])
+        assert dict(graph.get_suggested_next_nodes(["NotANode"])) == {"Lakes": 0.8}
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Test incremental Gaea2 validation sessions"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from tools.mcp.gaea2.validation import Gaea2Validator  # noqa: E402
+from tools.mcp.gaea2.validation.gaea2_validation_session import ValidationSessionManager  # noqa: E402
+
+WORKFLOW = {
+    "nodes": [
+        {"id": 1, "type": "Mountain", "name": "Mountain", "properties": {"Scale": 1.0}},
+        {"id": 2, "type": "Erosion2", "name": "Erosion", "properties": {"Duration": 0.07}},
+        {"id": 3, "type": "Export", "name": "Export", "properties": {}},
+    ],
+    "connections": [
+        {"from_node": 1, "to_node": 2, "from_port": "Out", "to_port": "In"},
+        {"from_node": 2, "to_node": 3, "from_port": "Out", "to_port": "In"},
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def validator():
+    return Gaea2Validator()
+
+
+@pytest.fixture
+def sessions(validator):
+    return ValidationSessionManager(validator)
+
+
+class TestValidationSession:
+    """Test suite for patch-by-patch revalidation"""
+
+    def test_patch_revalidates_only_touched_nodes(self, sessions):
+        """Test adding a node revalidates it and the node it connects to"""
+        report = sessions.start(WORKFLOW)
+        assert report["valid"]
+        assert report["revalidated"]["nodes"] == 3
+
+        report = sessions.patch(
+            report["session_id"],
+            [
+                {"op": "add_node", "node": {"id": 4, "type": "Rivers", "properties": {}}},
+                {"op": "add_connection", "connection": {"from_node": 2, "to_node": 4}},
+            ],
+        )
+
+        assert report["version"] == 1
+        assert report["node_count"] == 4
+        assert report["revalidated"] == {"nodes": 1, "connections": 1, "memo_hits": 0}
+
+    def test_node_results_are_memoized(self, sessions):
+        """Test identical nodes reuse the memoized node checks"""
+        session_id = sessions.start(WORKFLOW)["session_id"]
+
+        report = sessions.patch(
+            session_id,
+            [{"op": "add_node", "node": {"id": 9, "type": "Mountain", "name": "Copy", "properties": {"Scale": 1.0}}}],
+        )
+
+        assert report["revalidated"]["memo_hits"] == 1
+        assert "Node 'Mountain' (id: 9) is not connected to any other nodes" in report["warnings"]
+
+    def test_errors_follow_patches(self, sessions):
+        """Test errors appear and clear as nodes and connections change"""
+        session_id = sessions.start(WORKFLOW)["session_id"]
+
+        report = sessions.patch(
+            session_id,
+            [
+                {"op": "add_connection", "connection": {"from_node": 3, "to_node": 1}},
+                {"op": "update_node", "id": 2, "type": "NotANode"},
+                {"op": "add_connection", "connection": {"from_node": 3, "to_node": 7}},
+            ],
+        )
+        assert "Circular dependency detected: 3 → 1 → 2 → 3" in report["errors"]
+        assert "Invalid node type 'NotANode' for node id '2'" in report["errors"]
+        assert "Connection references non-existent target node: 7" in report["errors"]
+
+        report = sessions.patch(
+            session_id,
+            [
+                {"op": "remove_connection", "connection": {"from_node": 3, "to_node": 1}},
+                {"op": "set_property", "id": 2, "name": "Duration", "value": 0.05},
+                {"op": "update_node", "id": 2, "type": "Erosion2"},
+                {"op": "add_node", "node": {"id": 7, "type": "SatMap", "properties": {}}},
+            ],
+        )
+        assert report["errors"] == []
+
+    def test_failed_patch_leaves_session_unchanged(self, sessions):
+        """Test a patch that does not apply is rejected as a whole"""
+        session_id = sessions.start(WORKFLOW)["session_id"]
+
+        with pytest.raises(ValueError, match="no node with id 42"):
+            sessions.patch(session_id, [{"op": "remove_node", "id": 1}, {"op": "remove_node", "id": 42}])
+        report = sessions.report(session_id)
+
+        assert report["node_count"] == 3
+        assert report["version"] == 0
+        with pytest.raises(KeyError):
+            sessions.patch("missing", [])
+
+    def test_close_returns_workflow(self, sessions):
+        """Test closing returns the patched workflow and forgets the session"""
+        session_id = sessions.start(WORKFLOW)["session_id"]
+        sessions.patch(session_id, [{"op": "remove_property", "id": 1, "name": "Scale"}])
+
+        workflow = sessions.close(session_id)
+
+        assert workflow["nodes"][0]["properties"] == {}
+        assert len(workflow["connections"]) == 2
+        with pytest.raises(KeyError):
+            sessions.report(session_id)
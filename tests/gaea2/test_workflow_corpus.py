@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Test parallel and incremental Gaea2 project corpus analysis"""
+
+import json
+import os
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from tools.mcp.gaea2.utils import gaea2_corpus  # noqa: E402
+from tools.mcp.gaea2.utils.gaea2_workflow_analyzer import Gaea2WorkflowAnalyzer  # noqa: E402
+
+NODE_TYPES = ["Mountain", "Ridge", "Erosion2", "Rivers", "Terraces", "Thermal", "Snow", "SatMap", "Combine", "Export"]
+
+
+def project(types, seed=1):
+    """A .terrain document chaining nodes of the given types"""
+    nodes = {"$id": "1"}
+    for i, node_type in enumerate(types):
+        node_id = 100 + i
+        node = {"$type": f"QuadSpinner.Gaea.Nodes.{node_type}, Gaea.Nodes", "Id": node_id, "Seed": seed + i}
+        if i:
+            node["Ports"] = {"$values": [{"Name": "In", "Record": {"From": node_id - 1, "To": node_id}}]}
+        nodes[str(node_id)] = node
+    return {"Assets": {"$values": [{"Terrain": {"Nodes": nodes}}]}}
+
+
+def write_corpus(directory, count=12):
+    rng = random.Random(7)
+    for i in range(count):
+        types = rng.sample(NODE_TYPES[:4], 2) + rng.sample(NODE_TYPES[4:], 2)
+        (directory / f"p{i:02d}.terrain").write_text(json.dumps(project(types, seed=i % 3)))
+    (directory / "corrupt.terrain").write_text('{"Assets": ')
+
+
+def statistics(analyzer):
+    return (
+        analyzer.projects_analyzed,
+        dict(analyzer.node_frequency),
+        {node: Counter(following) for node, following in analyzer.node_sequences.items()},
+        {tuple(p.nodes): p.frequency for p in analyzer.patterns},
+        {node: {prop: sorted(v) for prop, v in props.items() if v} for node, props in analyzer.property_distributions.items()},
+    )
+
+
+class TestPatternSimilarity:
+    """Test suite for MinHash/LSH pattern lookups"""
+
+    def test_candidates_cover_similar_sets(self):
+        """Test every set with Jaccard similarity above one half is a candidate"""
+        rng = random.Random(3)
+        types = [f"Node{i}" for i in range(30)]
+        index = gaea2_corpus.LSHIndex()
+        sets = {i: rng.sample(types, rng.randint(2, 8)) for i in range(400)}
+        for key, nodes in sets.items():
+            index.add(key, nodes)
+
+        for query in (rng.sample(types, 5) for _ in range(50)):
+            expected = {key for key, nodes in sets.items() if gaea2_corpus.jaccard(query, nodes) > 0.5}
+            assert expected <= index.candidates(query)
+
+    def test_recommendations_use_index(self, tmp_path):
+        """Test similar patterns are found and removed patterns are not"""
+        analyzer = Gaea2WorkflowAnalyzer()
+        analyzer._merge_summary(gaea2_corpus.summarize_project(project(["Mountain", "Erosion2", "SatMap"])))
+        summary = gaea2_corpus.summarize_project(project(["Ridge", "Snow"]))
+        analyzer._merge_summary(summary)
+
+        similar = analyzer.get_recommendations(["Mountain", "Erosion2"])["similar_patterns"]
+        assert [p["nodes"] for p in similar] == [["Mountain", "Erosion2", "SatMap"]]
+        analyzer._merge_summary(summary, remove=True)
+        assert analyzer.get_recommendations(["Ridge", "Snow"])["similar_patterns"] == []
+        assert "Ridge" not in analyzer.node_frequency and analyzer.projects_analyzed == 1
+
+
+class TestDirectoryAnalysis:
+    """Test suite for the process pool and the incremental index"""
+
+    def test_pool_matches_sequential(self, tmp_path):
+        """Test merging summaries from worker processes gives the per-file statistics"""
+        write_corpus(tmp_path)
+        sequential = Gaea2WorkflowAnalyzer()
+        for path in sorted(tmp_path.glob("*.terrain")):
+            sequential.analyze_project(str(path))
+
+        analyzer = Gaea2WorkflowAnalyzer()
+        result = analyzer.analyze_directory(str(tmp_path), workers=2)
+
+        assert result["projects_analyzed"] == 12 and result["files_parsed"] == 13
+        assert not result["results"][0]["result"]["success"]
+        assert statistics(analyzer) == statistics(sequential)
+
+    def test_incremental(self, tmp_path):
+        """Test unchanged, touched and edited files across runs and analyzers"""
+        corpus, index = tmp_path / "corpus", str(tmp_path / "index.sqlite3")
+        corpus.mkdir()
+        write_corpus(corpus)
+        analyzer = Gaea2WorkflowAnalyzer()
+        first = analyzer.analyze_directory(str(corpus), index_path=index)
+
+        again = Gaea2WorkflowAnalyzer().analyze_directory(str(corpus), index_path=index)
+        assert (first["files_parsed"], again["files_parsed"], again["files_unchanged"]) == (13, 0, 13)
+
+        touched, edited = corpus / "p00.terrain", corpus / "p01.terrain"
+        os.utime(touched, ns=(1, 1))
+        edited.write_text(json.dumps(project(["Mountain", "Snow", "Export"])))
+        result = analyzer.analyze_directory(str(corpus), index_path=index)
+
+        assert (result["files_parsed"], result["files_unchanged"]) == (1, 12)
+        fresh = Gaea2WorkflowAnalyzer()
+        fresh.analyze_directory(str(corpus), workers=1)
+        assert statistics(analyzer) == statistics(fresh)
+        assert Gaea2WorkflowAnalyzer().analyze_directory(str(corpus), index_path=index)["files_parsed"] == 0
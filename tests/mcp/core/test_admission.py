@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Unit tests for admission control, rate limiting and the client registry
+"""
+
+import asyncio
+
+import pytest
+
+from tools.mcp.core.admission import AdmissionController, AdmissionRejected, ConcurrencyLimiter, TokenBucket
+from tools.mcp.core.base_server import BaseMCPServer, ToolRequest
+from tools.mcp.core.client_registry import ClientRegistry
+
+
+class BusyServer(BaseMCPServer):
+    """Server with a slow tool and tight limits"""
+
+    def __init__(self, **limits):
+        super().__init__(name="Busy MCP Server", version="1.0.0", port=0)
+        self.admission = AdmissionController(**limits)
+        self.release = asyncio.Event()
+
+    def get_tools(self):
+        return {"block": {"description": "Wait until released", "parameters": {}}}
+
+    async def block(self):
+        await self.release.wait()
+        return {"done": True}
+
+
+class TestConcurrencyLimiter:
+    """Test suite for the in-flight limit and its queue"""
+
+    @pytest.mark.asyncio
+    async def test_queue_then_reject(self):
+        """Test callers beyond the limit queue, then are rejected when the queue is full"""
+        limiter = ConcurrencyLimiter("test", limit=1, max_waiting=1)
+
+        assert limiter.reserve() is None
+        waiter = limiter.reserve()
+        assert waiter is not None
+        with pytest.raises(AdmissionRejected) as excinfo:
+            limiter.reserve()
+        assert excinfo.value.reason == "test"
+        assert excinfo.value.retry_after >= 1
+
+        limiter.release()
+        await limiter.wait(waiter)
+        assert limiter.stats() == {"limit": 1, "max_waiting": 1, "in_flight": 1, "waiting": 0, "rejected": 1}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test that a cancelled waiter frees its place in the queue"""
+        limiter = ConcurrencyLimiter("test", limit=1, max_waiting=1)
+        await limiter.acquire()
+
+        task = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert limiter.waiting == 0
+        limiter.release()
+        assert limiter.in_flight == 0
+
+
+class TestRateLimit:
+    """Test suite for token buckets"""
+
+    def test_token_bucket_refills(self):
+        """Test burst capacity and refill rate"""
+        bucket = TokenBucket(rate=2, burst=2)
+        start = bucket.updated
+
+        assert bucket.take(start) == 0
+        assert bucket.take(start) == 0
+        assert bucket.take(start) == pytest.approx(0.5)
+        assert bucket.take(start + 0.5) == 0
+
+    def test_rate_limit_per_client(self):
+        """Test that each client has its own bucket"""
+        admission = AdmissionController(rate_limit=0.001, rate_burst=1)
+
+        admission.check_rate("a")
+        admission.check_rate("b")
+        with pytest.raises(AdmissionRejected) as excinfo:
+            admission.check_rate("a")
+
+        assert excinfo.value.reason == "rate_limit"
+        assert admission.stats()["rate_limit"]["rejected"] == 1
+
+
+class TestServerAdmission:
+    """Test suite for rejections surfaced by the transports"""
+
+    @pytest.mark.asyncio
+    async def test_jsonrpc_rejection(self):
+        """Test that a full queue yields JSON-RPC error -32000 with a retry hint"""
+        server = BusyServer(max_in_flight=1, max_queued=0)
+        running = asyncio.ensure_future(server.dispatch_tool("block"))
+        await asyncio.sleep(0)
+
+        response = await server._process_jsonrpc_request(
+            {"jsonrpc": "2.0", "method": "tools/call", "params": {"name": "block"}, "id": 1}
+        )
+
+        assert response["error"]["code"] == -32000
+        assert response["error"]["data"]["reason"] == "in_flight"
+        assert response["error"]["data"]["retryAfter"] >= 1
+
+        server.release.set()
+        assert await running == {"done": True}
+
+    @pytest.mark.asyncio
+    async def test_http_rejection(self):
+        """Test that /mcp/execute answers 429 with Retry-After when rate limited"""
+        server = BusyServer(rate_limit=0.001, rate_burst=1)
+        server.release.set()
+
+        first = await server.execute_tool(ToolRequest(tool="block", client_id="c1"))
+        second = await server.execute_tool(ToolRequest(tool="block", client_id="c1"))
+
+        assert first.success
+        assert second.status_code == 429
+        assert int(second.headers["Retry-After"]) >= 1
+
+    @pytest.mark.asyncio
+    async def test_background_job_queue(self):
+        """Test that background jobs beyond the queue are rejected without running"""
+        server = BusyServer(max_background_jobs=1, max_queued_jobs=1)
+        started = []
+
+        async def job(name):
+            started.append(name)
+            await server.release.wait()
+
+        first = server.run_background_job(job("first"), "1")
+        second = server.run_background_job(job("second"), "2")
+        with pytest.raises(AdmissionRejected):
+            server.run_background_job(job("third"), "3")
+        await asyncio.sleep(0)
+
+        assert started == ["first"]
+        server.release.set()
+        await asyncio.gather(first, second)
+        assert started == ["first", "second"]
+
+
+class TestClientRegistry:
+    """Test suite for the in-memory client registry"""
+
+    def test_register_and_track(self):
+        """Test registration, activity counting and statistics"""
+        registry = ClientRegistry()
+
+        first = registry.register_client("claude", {"client_id": "claude_simple"})
+        again = registry.register_client("claude", {"client_id": "claude_simple"})
+        registry.update_client_activity("claude_simple")
+
+        assert not first["is_update"]
+        assert again["is_update"]
+        assert registry.get_client("claude_simple")["request_count"] == 1
+        assert registry.get_client_stats()["total_clients"] == 1
+        assert registry.deactivate_client("claude_simple")
+        assert registry.list_clients() == []
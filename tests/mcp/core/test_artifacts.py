@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the content-addressed artifact store
+"""
+
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from tools.mcp.core.artifacts import ArtifactStore, parse_range
+
+
+def link_parts(reference):
+    """(digest, filename, expires, sig) of a reference's URL"""
+    url = urlsplit(reference["url"])
+    _, _, digest, filename = url.path.split("/")
+    query = parse_qs(url.query)
+    return digest, filename, query["expires"][0], query["sig"][0]
+
+
+class TestArtifactStore:
+    """Test suite for storing and signing artifacts"""
+
+    def test_put_is_content_addressed(self, tmp_path):
+        """Test identical content is stored once under its SHA-256"""
+        store = ArtifactStore(str(tmp_path / "store"), secret=b"key")
+        source = tmp_path / "project.terrain"
+        source.write_bytes(b'{"Assets": []}')
+
+        from_file = store.put_file(str(source))
+        from_bytes = store.put_bytes(b'{"Assets": []}', "copy.terrain")
+
+        assert from_file["sha256"] == from_bytes["sha256"]
+        assert from_file["size"] == 14
+        assert from_file["filename"] == "project.terrain"
+        assert from_file["url"].startswith(f"/artifacts/{from_file['sha256']}/project.terrain?")
+        assert len(list((tmp_path / "store" / "objects").glob("*/*"))) == 1
+
+    def test_default_encoding(self, tmp_path, monkeypatch):
+        """Test links are the default only where something serves them"""
+        monkeypatch.delenv("MCP_ARTIFACT_BASE_URL", raising=False)
+        monkeypatch.setenv("MCP_ARTIFACT_DIR", str(tmp_path))
+        store = ArtifactStore.from_env("test", 8000)
+        assert store.base_url == "http://localhost:8000" and store.default_encoding() == "base64"
+        store.serving = True
+        assert store.default_encoding() == "url"
+
+        monkeypatch.setenv("MCP_ARTIFACT_BASE_URL", "https://files.example")
+        assert ArtifactStore.from_env("test", 8000).default_encoding() == "url"
+
+    def test_copy_is_isolated_from_source(self, tmp_path):
+        """Test rewriting the source file does not change stored content"""
+        store = ArtifactStore(str(tmp_path / "store"), secret=b"key")
+        source = tmp_path / "image.png"
+        source.write_bytes(b"first")
+
+        reference = store.put_file(str(source))
+        source.write_bytes(b"second")
+
+        assert store.path_for(reference["sha256"]).read_bytes() == b"first"
+
+    def test_signed_links(self, tmp_path):
+        """Test links verify until they expire and cannot be altered"""
+        store = ArtifactStore(str(tmp_path), secret=b"key", ttl=60)
+        digest, filename, expires, sig = link_parts(store.put_bytes(b"data", "a.bin"))
+
+        assert store.verify(digest, filename, expires, sig)
+        assert not store.verify(digest, "b.bin", expires, sig)
+        assert not store.verify(digest, filename, str(int(expires) + 60), sig)
+        expired = int(time.time()) - 1
+        assert not store.verify(digest, filename, str(expired), store.sign(digest, filename, expired))
+        assert not ArtifactStore(str(tmp_path), secret=b"other").verify(digest, filename, expires, sig)
+
+    def test_generated_secret_is_shared(self, tmp_path):
+        """Test stores on the same directory agree on a generated key"""
+        first = ArtifactStore(str(tmp_path))
+        second = ArtifactStore(str(tmp_path))
+
+        digest, filename, expires, sig = link_parts(first.put_bytes(b"data", "a.bin"))
+
+        assert second.verify(digest, filename, expires, sig)
+
+    def test_prune(self, tmp_path):
+        """Test objects older than the cut-off are removed"""
+        store = ArtifactStore(str(tmp_path), secret=b"key")
+        store.put_bytes(b"old", "old.bin")
+
+        assert store.prune(time.time() - 3600) == 0
+        assert store.prune(time.time() + 1) == 1
+
+
+class TestArtifactResponses:
+    """Test suite for serving artifacts"""
+
+    def test_parse_range(self):
+        """Test single byte ranges, suffixes and unsatisfiable ranges"""
+        assert parse_range(None, 100) is None
+        assert parse_range("bytes=0-9", 100) == (0, 9)
+        assert parse_range("bytes=90-", 100) == (90, 99)
+        assert parse_range("bytes=-10", 100) == (90, 99)
+        assert parse_range("bytes=50-500", 100) == (50, 99)
+        assert parse_range("bytes=0-1,5-6", 100) is None
+        assert parse_range("bytes=100-", 100) == "unsatisfiable"
+
+    @pytest.mark.asyncio
+    async def test_range_request(self, tmp_path):
+        """Test a Range request returns 206 with just the requested bytes"""
+        store = ArtifactStore(str(tmp_path), secret=b"key")
+        reference = store.put_bytes(bytes(range(256)) * 4, "model.safetensors")
+
+        response = store.response(reference["sha256"], "model.safetensors", {"range": "bytes=1000-1023"})
+        body = b"".join([chunk async for chunk in response.body_iterator])
+
+        assert response.status_code == 206
+        assert response.headers["Content-Range"] == "bytes 1000-1023/1024"
+        assert body == (bytes(range(256)) * 4)[1000:1024]
+
+    def test_full_and_conditional_requests(self, tmp_path):
+        """Test whole-file, If-None-Match and unsatisfiable requests"""
+        store = ArtifactStore(str(tmp_path), secret=b"key")
+        reference = store.put_bytes(b"x" * 10, "a.bin")
+        digest = reference["sha256"]
+
+        full = store.response(digest, "a.bin", {})
+        cached = store.response(digest, "a.bin", {"if-none-match": f'"{digest}"'})
+        outside = store.response(digest, "a.bin", {"range": "bytes=20-30"})
+
+        assert full.status_code == 200
+        assert full.path == store.path_for(digest)
+        assert "path" not in reference
+        assert cached.status_code == 304
+        assert outside.status_code == 416
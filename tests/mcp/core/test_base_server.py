@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Unit tests for BaseMCPServer dispatch and JSON-RPC handling
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from tools.mcp.core.base_server import BaseMCPServer
+from tools.mcp.core.event_bus import current_progress_token, current_session_id
+
+
+class SampleServer(BaseMCPServer):
+    """Minimal server used to exercise the base class"""
+
+    def __init__(self):
+        super().__init__(name="Sample MCP Server", version="1.0.0", port=0)
+
+    def get_tools(self):
+        return {
+            "sleep": {
+                "description": "Sleep and echo",
+                "parameters": {
+                    "type": "object",
+                    "properties": {"delay": {"type": "number"}, "value": {"type": "string"}},
+                    "required": ["delay", "value"],
+                },
+            },
+        }
+
+    async def sleep(self, delay: float, value: str):
+        await asyncio.sleep(delay)
+        return {"value": value}
+
+
+def _call(req_id, delay, value):
+    return {
+        "jsonrpc": "2.0",
+        "method": "tools/call",
+        "params": {"name": "sleep", "arguments": {"delay": delay, "value": value}},
+        "id": req_id,
+    }
+
+
+class TestToolDispatch:
+    """Test suite for the shared tool dispatch path"""
+
+    @pytest.mark.asyncio
+    async def test_call_tool_compact_result(self):
+        """Test that tools/call returns compact JSON text"""
+        server = SampleServer()
+        result = await server._jsonrpc_call_tool({"name": "sleep", "arguments": {"delay": 0, "value": "x"}})
+
+        assert result["content"][0]["text"] == '{"value":"x"}'
+        assert server.payload_stats.snapshot()["sleep"]["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_call_tool_invalid_arguments(self):
+        """Test that schema violations are reported as tool errors"""
+        server = SampleServer()
+        result = await server._jsonrpc_call_tool({"name": "sleep", "arguments": {"value": "x"}})
+
+        assert result["isError"] is True
+        assert "delay" in result["content"][0]["text"]
+
+    @pytest.mark.asyncio
+    async def test_register_tool(self):
+        """Test that runtime-registered tools are listed and callable"""
+        server = SampleServer()
+        assert len((await server._jsonrpc_list_tools({}))["tools"]) == 1
+
+        async def extra(name: str):
+            return {"hello": name}
+
+        await server.register_tool("extra", "Extra tool", {"type": "object", "properties": {}}, extra)
+
+        assert len((await server._jsonrpc_list_tools({}))["tools"]) == 2
+        assert await server.dispatch_tool("extra", {"name": "world"}) == {"hello": "world"}
+
+    @pytest.mark.asyncio
+    async def test_dispatch_records_metrics(self):
+        """Test that dispatched calls and failures are counted per tool"""
+        server = SampleServer()
+        await server._jsonrpc_call_tool({"name": "sleep", "arguments": {"delay": 0, "value": "x"}})
+        await server._jsonrpc_call_tool({"name": "sleep", "arguments": {"value": "x"}})
+
+        stats = server.tool_metrics.snapshot()["sleep"]
+        assert stats["calls"] == 2
+        assert stats["errors"] == 1
+
+
+class CachingServer(SampleServer):
+    """Server with a cacheable tool that counts its invocations"""
+
+    def __init__(self):
+        super().__init__()
+        self.lookups = 0
+
+    def get_tools(self):
+        tools = super().get_tools()
+        tools["lookup"] = {
+            "description": "Cached lookup",
+            "parameters": {"type": "object", "properties": {"key": {"type": "string"}}},
+            "cacheable": {"ttl": 60, "key_fields": ["key"]},
+        }
+        return tools
+
+    async def lookup(self, key: str):
+        self.lookups += 1
+        return {"key": key, "calls": self.lookups}
+
+
+class TestResponseCaching:
+    """Test suite for cacheable tool dispatch"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_calls_served_from_cache(self):
+        """Test that repeated calls do not invoke the tool again"""
+        server = CachingServer()
+
+        first = await server.dispatch_tool("lookup", {"key": "a"})
+        second = await server.dispatch_tool("lookup", {"key": "a"})
+        other = await server.dispatch_tool("lookup", {"key": "b"})
+
+        assert first == second == {"key": "a", "calls": 1}
+        assert other["calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_bypass_refreshes_cache(self):
+        """Test that _bypass_cache runs the tool and stores the fresh result"""
+        server = CachingServer()
+        await server.dispatch_tool("lookup", {"key": "a"})
+
+        fresh = await server.dispatch_tool("lookup", {"key": "a", "_bypass_cache": True})
+
+        assert fresh["calls"] == 2
+        assert await server.dispatch_tool("lookup", {"key": "a"}) == fresh
+
+
+class TestJsonRpcBatch:
+    """Test suite for concurrent JSON-RPC batch processing"""
+
+    @pytest.mark.asyncio
+    async def test_batch_runs_concurrently(self):
+        """Test that batch entries overlap instead of running sequentially"""
+        server = SampleServer()
+        batch = [_call(i, 0.2, str(i)) for i in range(5)]
+
+        start = asyncio.get_running_loop().time()
+        responses = await server._process_jsonrpc_batch(batch)
+        elapsed = asyncio.get_running_loop().time() - start
+
+        assert elapsed < 0.6
+        assert [r["id"] for r in responses] == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_batch_concurrency_cap(self):
+        """Test that the per-server concurrency cap is respected"""
+        server = SampleServer()
+        server.batch_concurrency = 1
+        batch = [_call(i, 0.05, str(i)) for i in range(4)]
+
+        start = asyncio.get_running_loop().time()
+        await server._process_jsonrpc_batch(batch)
+        elapsed = asyncio.get_running_loop().time() - start
+
+        assert elapsed >= 0.2
+
+    @pytest.mark.asyncio
+    async def test_stream_completion_order(self):
+        """Test that streamed batch responses arrive in completion order"""
+        server = SampleServer()
+        batch = [_call("slow", 0.2, "a"), _call("fast", 0.0, "b")]
+
+        ids = [response["id"] async for response in server._iter_jsonrpc_batch(batch)]
+
+        assert ids == ["fast", "slow"]
+
+    @pytest.mark.asyncio
+    async def test_request_timeout(self):
+        """Test that slow requests time out with their id preserved"""
+        server = SampleServer()
+        server.request_timeout = 0.05
+        responses = await server._process_jsonrpc_batch([_call(7, 1.0, "a"), _call(8, 0.0, "b")])
+
+        assert responses[0]["id"] == 7
+        assert responses[0]["error"]["code"] == -32000
+        assert json.loads(responses[1]["result"]["content"][0]["text"]) == {"value": "b"}
+
+    @pytest.mark.asyncio
+    async def test_invalid_batch_entry(self):
+        """Test that non-object batch entries produce Invalid Request errors"""
+        server = SampleServer()
+        responses = await server._process_jsonrpc_batch([42])
+
+        assert responses[0]["error"]["code"] == -32600
+
+
+class TestNotifications:
+    """Test suite for session notifications"""
+
+    @pytest.mark.asyncio
+    async def test_progress_uses_request_context(self):
+        """Test that progress reports go to the calling session with its token"""
+        server = SampleServer()
+        current_session_id.set("session-1")
+        current_progress_token.set("token-1")
+
+        event_id = server.report_progress(1, total=2, message="half")
+
+        assert event_id is not None
+        history = list(server.event_bus._channels["session-1"].history)
+        assert history[0][1]["params"] == {"progressToken": "token-1", "progress": 1, "total": 2, "message": "half"}
+
+    @pytest.mark.asyncio
+    async def test_progress_without_token(self):
+        """Test that progress is not published without a progress token"""
+        server = SampleServer()
+        assert server.report_progress(1, session_id="session-1") is None
+
+    @pytest.mark.asyncio
+    async def test_background_job_completion(self):
+        """Test that background jobs publish a completion notification"""
+        server = SampleServer()
+        current_session_id.set("session-2")
+
+        async def work():
+            return 42
+
+        assert await server.run_background_job(work(), "job-1", "render") == 42
+
+        message = list(server.event_bus._channels["session-2"].history)[0][1]
+        assert message["method"] == "notifications/job/completed"
+        assert message["params"] == {"jobId": "job-1", "jobType": "render"}
+
+
+class TestLazyStartup:
+    """Test suite for deferred HTTP app creation and warmup"""
+
+    def test_app_created_on_first_access(self):
+        """Test that the FastAPI app is only built when requested"""
+        server = SampleServer()
+        assert server._app is None
+
+        app = server.app
+
+        assert app is server.app
+
+    @pytest.mark.asyncio
+    async def test_warmup_builds_registry(self):
+        """Test that background warmup prepares the tool table"""
+        server = SampleServer()
+
+        await server.start_warmup()
+
+        assert server.tool_registry._list_result is not None
+
+    def test_multiple_workers_need_shared_state(self, monkeypatch):
+        """Test that the memory backend refuses forked HTTP workers"""
+        import uvicorn
+
+        server = SampleServer()
+        started = []
+        monkeypatch.setattr(uvicorn, "run", lambda app, **kwargs: started.append(app))
+        monkeypatch.setattr(server, "_run_http_workers", lambda workers: pytest.fail("forked workers"))
+
+        server.run_http(workers=4)
+
+        assert started == [server.app]
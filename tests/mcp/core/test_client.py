@@ -6,7 +6,26 @@ Unit tests for MCPClient
 import os
 from unittest.mock import Mock, patch
 
-from tools.mcp.core.client import MCPClient
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from tools.mcp.core import client as client_module
+from tools.mcp.core.client import AsyncMCPClient, CircuitBreaker, MCPClient
+
+
+def refused():
+    """The error requests raises when nothing listens on the port"""
+    reason = NewConnectionError(None, "Connection refused")
+    return requests.ConnectionError(MaxRetryError(None, "/tools/execute", reason))
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Circuit breakers are shared per server URL; isolate them between tests"""
+    client_module._breakers.clear()
+    yield
+    client_module._breakers.clear()
 
 
 class TestMCPClient:
@@ -32,7 +51,7 @@ class TestMCPClient:
         client = MCPClient()
         assert client.base_url == "http://localhost:8010"
 
-    @patch("tools.mcp.core.client.requests.post")
+    @patch("tools.mcp.core.client.requests.Session.post")
     def test_execute_tool_success(self, mock_post):
         """Test successful tool execution"""
         # Setup mock response
@@ -50,9 +69,10 @@ class TestMCPClient:
         mock_post.assert_called_once_with(
             "http://localhost:8010/tools/execute",
             json={"tool": "test_tool", "arguments": {"param": "value"}},
+            timeout=60.0,
         )
 
-    @patch("tools.mcp.core.client.requests.post")
+    @patch("tools.mcp.core.client.requests.Session.post")
     def test_execute_tool_failure(self, mock_post):
         """Test tool execution with network error"""
         # Setup mock to raise exception
@@ -66,7 +86,7 @@ class TestMCPClient:
         assert result["success"] is False
         assert "Network error" in result["error"]
 
-    @patch("tools.mcp.core.client.requests.get")
+    @patch("tools.mcp.core.client.requests.Session.get")
     def test_list_tools_success(self, mock_get):
         """Test successful tool listing"""
         # Setup mock response
@@ -81,9 +101,9 @@ class TestMCPClient:
 
         # Verify
         assert result == {"tools": ["tool1", "tool2"]}
-        mock_get.assert_called_once_with("http://localhost:8010/tools")
+        mock_get.assert_called_once_with("http://localhost:8010/tools", timeout=60.0)
 
-    @patch("tools.mcp.core.client.requests.get")
+    @patch("tools.mcp.core.client.requests.Session.get")
     def test_list_tools_failure(self, mock_get):
         """Test tool listing with network error"""
         # Setup mock to raise exception
@@ -96,7 +116,7 @@ class TestMCPClient:
         # Verify empty response on error
         assert result == {}
 
-    @patch("tools.mcp.core.client.requests.get")
+    @patch("tools.mcp.core.client.requests.Session.get")
     def test_health_check_success(self, mock_get):
         """Test successful health check"""
         # Setup mock response
@@ -112,7 +132,7 @@ class TestMCPClient:
         assert result is True
         mock_get.assert_called_once_with("http://localhost:8010/health", timeout=5)
 
-    @patch("tools.mcp.core.client.requests.get")
+    @patch("tools.mcp.core.client.requests.Session.get")
     def test_health_check_failure(self, mock_get):
         """Test health check with server down"""
         # Setup mock response
@@ -127,7 +147,7 @@ class TestMCPClient:
         # Verify
         assert result is False
 
-    @patch("tools.mcp.core.client.requests.get")
+    @patch("tools.mcp.core.client.requests.Session.get")
     def test_health_check_timeout(self, mock_get):
         """Test health check with timeout"""
         # Setup mock to raise timeout
@@ -170,3 +190,240 @@ class TestMCPClient:
 
         client = MCPClient(server_name="code_quality")
         assert client.base_url == "http://custom:9000"
+
+    @patch("tools.mcp.core.client.time.sleep")
+    @patch("tools.mcp.core.client.requests.Session.post")
+    def test_execute_tool_retries_connection_errors(self, mock_post, mock_sleep):
+        """Test that connection errors are retried with backoff"""
+        mock_response = Mock(status_code=200)
+        mock_response.json.return_value = {"success": True}
+        mock_post.side_effect = [refused(), requests.exceptions.ConnectTimeout("timeout"), mock_response]
+
+        client = MCPClient(base_url="http://localhost:8010")
+        result = client.execute_tool("test_tool", {})
+
+        assert result == {"success": True}
+        assert mock_post.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    @patch("tools.mcp.core.client.time.sleep")
+    @patch("tools.mcp.core.client.requests.Session.post")
+    def test_execute_tool_does_not_retry_after_sending(self, mock_post, mock_sleep):
+        """Test that a connection dropped after the request was sent is not retried"""
+        mock_post.side_effect = requests.ConnectionError("Connection aborted: RemoteDisconnected")
+
+        client = MCPClient(base_url="http://localhost:8010")
+        result = client.execute_tool("test_tool", {})
+
+        assert result["success"] is False
+        assert mock_post.call_count == 1
+        mock_sleep.assert_not_called()
+
+    @patch("tools.mcp.core.client.time.sleep")
+    @patch("tools.mcp.core.client.requests.Session.post")
+    def test_execute_tool_retries_are_bounded(self, mock_post, mock_sleep):
+        """Test that retries stop after max_retries"""
+        mock_post.side_effect = refused()
+
+        client = MCPClient(base_url="http://localhost:8010", max_retries=2)
+        result = client.execute_tool("test_tool", {})
+
+        assert result["success"] is False
+        assert mock_post.call_count == 3
+
+    @patch("tools.mcp.core.client.requests.Session.get")
+    @patch("tools.mcp.core.client.requests.Session.post")
+    def test_circuit_breaker_opens_and_probes(self, mock_post, mock_get):
+        """Test that repeated failures open the circuit until health_check passes"""
+        mock_post.side_effect = requests.ConnectionError("refused")
+        client = MCPClient(base_url="http://localhost:8010", max_retries=0)
+        client.circuit_breaker.reset_timeout = 0
+
+        for _ in range(client.circuit_breaker.failure_threshold):
+            client.execute_tool("test_tool", {})
+        assert client.circuit_breaker.is_open
+
+        # Probe fails: call is rejected without posting
+        mock_get.return_value = Mock(status_code=500)
+        calls_before = mock_post.call_count
+        result = client.execute_tool("test_tool", {})
+        assert "Circuit open" in result["error"]
+        assert mock_post.call_count == calls_before
+
+        # Probe succeeds: circuit closes and the call goes through
+        mock_get.return_value = Mock(status_code=200)
+        mock_response = Mock(status_code=200)
+        mock_response.json.return_value = {"success": True}
+        mock_post.side_effect = None
+        mock_post.return_value = mock_response
+        assert client.execute_tool("test_tool", {}) == {"success": True}
+        assert not client.circuit_breaker.is_open
+
+    @patch("tools.mcp.core.client.requests.Session.post")
+    def test_client_errors_do_not_trip_circuit(self, mock_post):
+        """Test that 4xx responses are not counted as server failures"""
+        mock_response = Mock(status_code=404)
+        mock_response.raise_for_status.side_effect = requests.HTTPError(response=mock_response)
+        mock_post.return_value = mock_response
+
+        client = MCPClient(base_url="http://localhost:8010")
+        for _ in range(10):
+            client.execute_tool("missing_tool", {})
+
+        assert not client.circuit_breaker.is_open
+
+    @patch("tools.mcp.core.client.requests.Session.post")
+    def test_execute_many_preserves_order(self, mock_post):
+        """Test concurrent execution of several calls"""
+
+        def respond(url, json, timeout):
+            response = Mock(status_code=200)
+            response.json.return_value = {"success": True, "result": json["arguments"]["n"]}
+            return response
+
+        mock_post.side_effect = respond
+
+        client = MCPClient(base_url="http://localhost:8010")
+        results = client.execute_many([("tool", {"n": n}) for n in range(5)] + [{"tool": "tool", "arguments": {"n": 5}}])
+
+        assert [r["result"] for r in results] == [0, 1, 2, 3, 4, 5]
+
+
+class TestCircuitBreaker:
+    """Test suite for CircuitBreaker"""
+
+    def test_opens_after_threshold(self):
+        """Test that the breaker opens after consecutive failures"""
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        assert not breaker.is_open
+        breaker.record_failure()
+        assert breaker.is_open
+
+    def test_success_resets(self):
+        """Test that a success resets the failure count"""
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert not breaker.is_open
+
+
+class TestAsyncMCPClient:
+    """Test suite for AsyncMCPClient"""
+
+    @staticmethod
+    def make_client(handler, **kwargs):
+        import httpx
+
+        client = AsyncMCPClient(base_url="http://localhost:8010", **kwargs)
+        client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return client
+
+    @pytest.mark.asyncio
+    async def test_retries_connect_errors_and_statuses(self):
+        """Test that failures to connect and 503 responses are retried"""
+        import httpx
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("refused", request=request)
+            if len(calls) == 2:
+                return httpx.Response(503, headers={"Retry-After": "0"})
+            return httpx.Response(200, json={"success": True})
+
+        with patch("tools.mcp.core.client.asyncio.sleep") as mock_sleep:
+            async with self.make_client(handler, backoff_factor=0) as client:
+                result = await client.execute_tool("test_tool", {"n": 1})
+
+        assert result == {"success": True}
+        assert len(calls) == 3 and mock_sleep.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_after_sending(self):
+        """Test that a read error, after the request reached the server, is not retried"""
+        import httpx
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadError("connection reset", request=request)
+
+        async with self.make_client(handler) as client:
+            result = await client.execute_tool("test_tool", {})
+
+        assert result["success"] is False
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_circuit_opens_and_probes(self):
+        """Test that repeated failures open the circuit until health_check passes"""
+        import httpx
+
+        state = {"healthy": False, "posts": 0}
+
+        def handler(request):
+            if request.url.path == "/health":
+                return httpx.Response(200 if state["healthy"] else 500)
+            state["posts"] += 1
+            if state["healthy"]:
+                return httpx.Response(200, json={"success": True})
+            raise httpx.ConnectError("refused", request=request)
+
+        async with self.make_client(handler, max_retries=0) as client:
+            client.circuit_breaker.reset_timeout = 0
+            for _ in range(client.circuit_breaker.failure_threshold):
+                await client.execute_tool("test_tool", {})
+            assert client.circuit_breaker.is_open
+
+            # Probe fails: call is rejected without posting
+            posts_before = state["posts"]
+            result = await client.execute_tool("test_tool", {})
+            assert "Circuit open" in result["error"]
+            assert state["posts"] == posts_before
+
+            # Probe succeeds: circuit closes and the call goes through
+            state["healthy"] = True
+            assert await client.execute_tool("test_tool", {}) == {"success": True}
+            assert not client.circuit_breaker.is_open
+
+    @pytest.mark.asyncio
+    async def test_pooled_connection_reused(self):
+        """Test that sequential calls share one keep-alive connection"""
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        connections = set()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                connections.add(self.client_address)
+                self.rfile.read(int(self.headers["Content-Length"]))
+                body = b'{"success": true}'
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            async with AsyncMCPClient(base_url=f"http://127.0.0.1:{server.server_port}") as client:
+                results = [await client.execute_tool("test_tool", {"n": n}) for n in range(5)]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert results == [{"success": True}] * 5
+        assert len(connections) == 1
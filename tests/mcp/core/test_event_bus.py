@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the per-session SSE event bus
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from tools.mcp.core.event_bus import SessionEventBus, format_sse
+
+
+async def _collect(stream, count):
+    events = []
+    async for event in stream:
+        events.append(event)
+        if len(events) == count:
+            break
+    return events
+
+
+class TestSessionEventBus:
+    """Test suite for SessionEventBus"""
+
+    def test_publish_without_session(self):
+        """Test that publishing without a session is a no-op"""
+        bus = SessionEventBus()
+        assert bus.publish(None, {"method": "x"}) is None
+        assert bus.stats()["published"] == 0
+
+    @pytest.mark.asyncio
+    async def test_live_delivery(self):
+        """Test that subscribers receive events for their session only"""
+        bus = SessionEventBus()
+        stream = bus.subscribe("a", keepalive=1)
+        task = asyncio.ensure_future(_collect(stream, 1))
+        await asyncio.sleep(0)
+
+        bus.publish("b", {"n": 0})
+        event_id = bus.publish("a", {"n": 1})
+
+        events = await asyncio.wait_for(task, timeout=1)
+        assert events == [(event_id, {"n": 1})]
+
+    @pytest.mark.asyncio
+    async def test_resume_from_last_event_id(self):
+        """Test Last-Event-ID replay of buffered events"""
+        bus = SessionEventBus()
+        first = bus.publish("a", {"n": 1})
+        bus.publish("a", {"n": 2})
+        bus.publish("a", {"n": 3})
+
+        events = await _collect(bus.subscribe("a", last_event_id=str(first)), 2)
+        assert [message["n"] for _, message in events] == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_history_is_bounded(self):
+        """Test that only the most recent events are kept for replay"""
+        bus = SessionEventBus(history_size=2)
+        for n in range(5):
+            bus.publish("a", {"n": n})
+
+        events = await _collect(bus.subscribe("a", last_event_id="0"), 2)
+        assert [message["n"] for _, message in events] == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_drop_on_backpressure(self):
+        """Test that a full subscriber queue drops events instead of blocking"""
+        bus = SessionEventBus(queue_size=1)
+        stream = bus.subscribe("a", keepalive=1)
+        task = asyncio.ensure_future(_collect(stream, 1))
+        await asyncio.sleep(0)
+
+        for n in range(3):
+            bus.publish("a", {"n": n})
+
+        await asyncio.wait_for(task, timeout=1)
+        assert bus.stats()["dropped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_keepalive(self):
+        """Test that idle streams yield None for pings"""
+        bus = SessionEventBus()
+        events = await _collect(bus.subscribe("a", keepalive=0.01), 1)
+        assert events == [None]
+
+    @pytest.mark.asyncio
+    async def test_publish_from_other_threads(self):
+        """Test that tools running in a thread pool or on a private loop can publish"""
+        bus = SessionEventBus()
+        task = asyncio.ensure_future(_collect(bus.subscribe("a", keepalive=1), 40))
+        await asyncio.sleep(0)
+
+        def worker(start):
+            for n in range(start, start + 20):
+                bus.publish("a", {"n": n})
+
+        async def private_loop_worker():
+            worker(20)
+
+        threads = [
+            threading.Thread(target=worker, args=(0,)),
+            threading.Thread(target=asyncio.run, args=(private_loop_worker(),)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        events = await asyncio.wait_for(task, timeout=1)
+        assert [event_id for event_id, _ in events] == list(range(1, 41))
+        assert sorted(message["n"] for _, message in events) == list(range(40))
+
+    def test_max_sessions(self):
+        """Test that idle sessions are evicted beyond the session limit"""
+        bus = SessionEventBus(max_sessions=2)
+        for session in ("a", "b", "c"):
+            bus.publish(session, {})
+        assert bus.stats()["sessions"] == 2
+
+    def test_format_sse(self):
+        """Test SSE frame formatting"""
+        assert format_sse({"a": 1}) == 'data: {"a":1}\n\n'
+        assert format_sse({"a": 1}, event_id=5) == 'id: 5\ndata: {"a":1}\n\n'
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Unit tests for executor-routed tool dispatch
+"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+from tools.mcp.core.base_server import BaseMCPServer
+from tools.mcp.core.executors import ExecutionPolicy
+
+
+class ExecutorServer(BaseMCPServer):
+    """Server with inline, thread, process and capped tools"""
+
+    def __init__(self):
+        super().__init__(name="Executor MCP Server", version="1.0.0", port=0)
+        self.tool_executor.process_workers = 2
+        self.tool_executor.thread_workers = 2
+        self.active = 0
+        self.peak = 0
+
+    def get_tools(self):
+        return {
+            "where_inline": {"description": "Report the caller", "parameters": {}},
+            "where_thread": {"description": "Report the caller", "parameters": {}, "executor": "thread"},
+            "where_process": {"description": "Report the caller", "parameters": {}, "executor": "process"},
+            "capped": {"description": "Track concurrency", "parameters": {}, "max_concurrency": 1},
+        }
+
+    def where_inline(self):
+        return {"pid": os.getpid(), "thread": threading.get_ident()}
+
+    def where_thread(self):
+        return {"pid": os.getpid(), "thread": threading.get_ident()}
+
+    async def where_process(self):
+        await asyncio.sleep(0)
+        return {"pid": os.getpid(), "thread": threading.get_ident()}
+
+    async def capped(self):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return {"ok": True}
+
+
+class TestExecutionPolicy:
+    """Test suite for executor metadata parsing"""
+
+    def test_from_metadata(self):
+        """Test executor and max_concurrency are read from the declaration"""
+        policy = ExecutionPolicy.from_metadata({"executor": "thread", "max_concurrency": 3})
+
+        assert policy == ExecutionPolicy(executor="thread", max_concurrency=3)
+        assert ExecutionPolicy.from_metadata({}) is None
+
+    def test_invalid_declarations(self):
+        """Test unknown executors and non-positive caps are rejected"""
+        with pytest.raises(ValueError):
+            ExecutionPolicy.from_metadata({"executor": "gpu"})
+        with pytest.raises(ValueError):
+            ExecutionPolicy.from_metadata({"max_concurrency": 0})
+
+
+class TestToolExecutor:
+    """Test suite for routing tools to worker pools"""
+
+    @pytest.mark.asyncio
+    async def test_thread_executor(self):
+        """Test that thread tools run off the event loop thread"""
+        server = ExecutorServer()
+        try:
+            inline = await server.dispatch_tool("where_inline")
+            threaded = await server.dispatch_tool("where_thread")
+        finally:
+            server.tool_executor.shutdown(wait=True)
+
+        assert inline["thread"] == threading.get_ident()
+        assert threaded["thread"] != threading.get_ident()
+        assert threaded["pid"] == os.getpid()
+
+    @pytest.mark.asyncio
+    async def test_process_executor(self):
+        """Test that process tools run in a warm worker process"""
+        server = ExecutorServer()
+        try:
+            server.warmup()
+            assert server.tool_executor.stats()["pools"]["process"]["workers"] == 2
+
+            result = await server.dispatch_tool("where_process")
+        finally:
+            server.tool_executor.shutdown(wait=True)
+
+        assert result["pid"] != os.getpid()
+
+    @pytest.mark.asyncio
+    async def test_max_concurrency(self):
+        """Test that concurrent calls beyond the cap wait for a slot"""
+        server = ExecutorServer()
+
+        results = await asyncio.gather(*(server.dispatch_tool("capped") for _ in range(4)))
+
+        assert results == [{"ok": True}] * 4
+        assert server.peak == 1
+        assert server.tool_executor.stats()["tools"]["capped"]["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_metrics_exposition(self):
+        """Test that pool and queue gauges are exported"""
+        server = ExecutorServer()
+        await server.dispatch_tool("capped")
+
+        response = await server.get_metrics()
+        text = response.body.decode()
+
+        assert 'mcp_executor_queue_depth{server="Executor MCP Server",executor="process"} 0' in text
+        assert 'mcp_tool_queue_depth{server="Executor MCP Server",tool="capped"} 0' in text
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the HTTP proxy's pooled upstream client and streaming relay
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from tools.mcp.core.http_proxy import HTTPProxy
+
+
+async def streamed(*chunks):
+    """An upstream body that arrives chunk by chunk, like one read from the network"""
+    for chunk in chunks:
+        yield chunk
+
+
+def make_proxy(handler):
+    """Proxy whose upstream is an httpx MockTransport, and a client for the proxy app"""
+    proxy = HTTPProxy(service_name="Test", remote_url="http://upstream", port=0)
+    proxy._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=proxy.app), base_url="http://proxy")
+    return proxy, client
+
+
+class TestHTTPProxy:
+    """Test suite for forwarding, streaming and error responses"""
+
+    @pytest.mark.asyncio
+    async def test_forwards_with_shared_client(self):
+        """Test bodies are forwarded both ways and every request reuses the pooled client"""
+        seen = []
+
+        async def handler(request):
+            seen.append((request.method, request.url.path, await request.aread()))
+            body = json.dumps({"jsonrpc": "2.0", "id": len(seen), "result": {}}).encode()
+            return httpx.Response(200, content=streamed(body), headers={"X-Upstream": "1"})
+
+        proxy, client = make_proxy(handler)
+        pooled = proxy._client
+        async with client:
+            first = await client.post("/mcp", json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+            second = await client.post("/mcp/execute", json={"tool": "echo", "arguments": {}})
+            tools = await client.get("/mcp/tools")
+        await proxy.close()
+
+        assert [r.status_code for r in (first, second, tools)] == [200, 200, 200]
+        assert first.json()["id"] == 1 and tools.json()["id"] == 3
+        assert first.headers["x-upstream"] == "1"
+        assert [(method, path) for method, path, _ in seen] == [
+            ("POST", "/mcp"),
+            ("POST", "/mcp/execute"),
+            ("GET", "/mcp/tools"),
+        ]
+        assert json.loads(seen[1][2]) == {"tool": "echo", "arguments": {}}
+        assert proxy._get_client() is not pooled and pooled.is_closed
+        assert proxy.metrics.responses == {"200": 3}
+
+    @pytest.mark.asyncio
+    async def test_relay_streams_body(self):
+        """Test the first chunk reaches the client before the upstream body is complete"""
+        finish = asyncio.Event()
+
+        async def chunks():
+            yield b'{"partial": '
+            await finish.wait()
+            yield b"true}"
+
+        proxy, _ = make_proxy(lambda request: httpx.Response(200, content=chunks()))
+        response = await proxy._send_upstream("POST", "/mcp", content=b"{}")
+        body = proxy._relay(response).body_iterator
+
+        assert await asyncio.wait_for(body.__anext__(), 5) == b'{"partial": '
+        finish.set()
+        assert [chunk async for chunk in body] == [b"true}"]
+        assert response.is_closed and proxy.metrics.total.count == 1
+        await proxy.close()
+
+    @pytest.mark.asyncio
+    async def test_error_shapes(self):
+        """Test upstream errors, timeouts and network failures keep their MCP error responses"""
+        failures = iter(
+            [
+                httpx.Response(500, content=streamed(b"boom")),
+                httpx.ReadTimeout("slow"),
+                httpx.ConnectError("refused"),
+                httpx.Response(404, content=streamed(b"no such tool")),
+            ]
+        )
+
+        def handler(request):
+            failure = next(failures)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+
+        proxy, client = make_proxy(handler)
+        async with client:
+            errors = [(await client.post("/mcp", json={"method": "x"})).json()["error"] for _ in range(3)]
+            execute = await client.post("/mcp/execute", json={"tool": "missing"})
+        await proxy.close()
+
+        assert errors[0] == {
+            "code": -32603,
+            "message": "Internal error",
+            "data": {"error": "Remote server error: boom"},
+        }
+        assert errors[1] == {"code": -32000, "message": "Request timeout", "data": {"remote_url": "http://upstream"}}
+        assert errors[2] == {"code": -32000, "message": "Network error", "data": {"error": "refused"}}
+        assert execute.status_code == 500 and "no such tool" in execute.json()["detail"]
+        assert proxy.metrics.errors == {"timeout": 1, "network": 1}
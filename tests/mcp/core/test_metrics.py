@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared metric primitives
+"""
+
+import pytest
+
+from tools.mcp.core import metrics
+
+
+class TestHistogram:
+    """Test suite for Histogram"""
+
+    def test_quantiles(self):
+        """Test quantile estimates fall within the observed buckets"""
+        histogram = metrics.Histogram(buckets=(0.1, 0.2, 0.5, 1.0))
+        for _ in range(90):
+            histogram.observe(0.05)
+        for _ in range(10):
+            histogram.observe(0.8)
+
+        assert histogram.quantile(0.5) <= 0.1
+        assert 0.5 <= histogram.quantile(0.99) <= 0.8
+        assert histogram.summary()["count"] == 100
+
+    def test_empty(self):
+        """Test an empty histogram reports zeros"""
+        assert metrics.Histogram().summary()["p99"] == 0.0
+
+    def test_exposition(self):
+        """Test Prometheus text output for a labelled histogram"""
+        histogram = metrics.Histogram(buckets=(1.0,))
+        histogram.observe(0.5)
+        histogram.observe(2.0)
+
+        lines = metrics.format_histogram("latency_seconds", histogram, {"tool": 'say "hi"'})
+
+        assert lines[0] == 'latency_seconds_bucket{tool="say \\"hi\\"",le="1.0"} 1'
+        assert lines[1] == 'latency_seconds_bucket{tool="say \\"hi\\"",le="+Inf"} 2'
+        assert lines[-1] == 'latency_seconds_count{tool="say \\"hi\\""} 2'
+
+
+class TestToolMetrics:
+    """Test suite for ToolMetrics"""
+
+    def test_track_success_and_error(self):
+        """Test calls, errors and in-flight accounting"""
+        tool_metrics = metrics.ToolMetrics()
+
+        with tool_metrics.track("ok"):
+            assert tool_metrics.snapshot()["ok"]["in_flight"] == 1
+        with pytest.raises(RuntimeError):
+            with tool_metrics.track("ok"):
+                raise RuntimeError("boom")
+
+        stats = tool_metrics.snapshot()["ok"]
+        assert stats["calls"] == 2
+        assert stats["errors"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["latency"]["count"] == 2
+
+    def test_render_prometheus(self):
+        """Test the exposition includes tool and payload series"""
+        tool_metrics = metrics.ToolMetrics()
+        with tool_metrics.track("render"):
+            pass
+
+        text = tool_metrics.render_prometheus(
+            labels={"server": "test"},
+            payloads={"render": {"calls": 1, "total_bytes": 10, "max_bytes": 10}},
+        )
+
+        assert 'mcp_tool_calls_total{server="test",tool="render"} 1' in text
+        assert 'mcp_tool_latency_seconds_count{server="test",tool="render"} 1' in text
+        assert 'mcp_tool_result_bytes_total{server="test",tool="render"} 10' in text
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the tool response cache
+"""
+
+import time
+
+from tools.mcp.core.response_cache import CachePolicy, ResponseCache, is_cacheable_result
+
+
+class TestCachePolicy:
+    """Test suite for cacheable metadata parsing"""
+
+    def test_from_metadata(self):
+        """Test ttl and key_fields are read from the declaration"""
+        policy = CachePolicy.from_metadata({"cacheable": {"ttl": 10, "key_fields": ["a"]}})
+
+        assert policy == CachePolicy(ttl=10.0, key_fields=("a",))
+        assert CachePolicy.from_metadata({}) is None
+
+    def test_key_fields(self):
+        """Test that only key fields affect the cache key"""
+        policy = CachePolicy(key_fields=("a",))
+
+        assert policy.key({"a": 1, "b": 2}) == policy.key({"b": 3, "a": 1})
+        assert policy.key({"a": 1}) != policy.key({"a": 2})
+
+    def test_error_results_not_cacheable(self):
+        """Test that failed results are not cached"""
+        assert is_cacheable_result({"success": True})
+        assert not is_cacheable_result({"success": False})
+        assert not is_cacheable_result({"error": "boom"})
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache"""
+
+    def test_hit_and_miss(self):
+        """Test hit/miss counting and copy-on-read"""
+        cache = ResponseCache()
+        assert cache.get("tool", "k") == (False, None)
+
+        cache.put("tool", "k", {"items": [1]}, ttl=60)
+        hit, value = cache.get("tool", "k")
+        value["items"].append(2)
+
+        assert hit is True
+        assert cache.get("tool", "k")[1] == {"items": [1]}
+        assert cache.stats()["tools"]["tool"] == {"hits": 2, "misses": 1, "evictions": 0}
+
+    def test_expiry(self):
+        """Test that entries expire after their ttl"""
+        cache = ResponseCache()
+        cache.put("tool", "k", 1, ttl=0.01)
+        time.sleep(0.02)
+
+        assert cache.get("tool", "k") == (False, None)
+
+    def test_lru_bound(self):
+        """Test that the least recently used entry is evicted"""
+        cache = ResponseCache(max_entries=2)
+        cache.put("tool", "a", 1, ttl=60)
+        cache.put("tool", "b", 2, ttl=60)
+        cache.get("tool", "a")
+        cache.put("tool", "c", 3, ttl=60)
+
+        assert cache.get("tool", "b") == (False, None)
+        assert cache.get("tool", "a") == (True, 1)
+
+    def test_disk_backing(self, tmp_path):
+        """Test that results survive a new cache instance"""
+        path = str(tmp_path / "cache.sqlite3")
+        ResponseCache(disk_path=path).put("tool", "k", {"value": 1}, ttl=60)
+
+        assert ResponseCache(disk_path=path).get("tool", "k") == (True, {"value": 1})
+
+    def test_disk_reopens_after_fork(self, tmp_path):
+        """Test that a forked process opens its own SQLite connection"""
+        cache = ResponseCache(disk_path=str(tmp_path / "cache.sqlite3"))
+        cache.put("tool", "k", {"value": 1}, ttl=60)
+        parent_conn = cache._disk._conn
+        cache._entries.clear()
+
+        cache._disk._pid = -1  # As seen from a forked child
+
+        assert cache.get("tool", "k") == (True, {"value": 1})
+        assert cache._disk._conn is not parent_conn
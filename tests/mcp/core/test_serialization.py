@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Unit tests for MCP result serialization
+"""
+
+import json
+
+from tools.mcp.core import serialization
+
+
+class TestSerialization:
+    """Test suite for the serialization helpers"""
+
+    def test_dumps_is_compact(self):
+        """Test that results are encoded without whitespace"""
+        text = serialization.dumps({"a": [1, 2], "b": {"c": "d"}})
+        assert "\n" not in text
+        assert " " not in text
+        assert json.loads(text) == {"a": [1, 2], "b": {"c": "d"}}
+
+    def test_dumps_bytes_round_trip(self):
+        """Test byte encoding including non-ASCII text"""
+        data = {"name": "Schnee ❄", "values": [1.5, None, True]}
+        assert json.loads(serialization.dumps_bytes(data).decode("utf-8")) == data
+
+    def test_iter_json_chunks_bounded(self):
+        """Test that streamed chunks respect the chunk size and reassemble"""
+        data = {"blob": "x" * 10000, "items": list(range(500))}
+        chunks = list(serialization.iter_json_chunks(data, chunk_size=1024))
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 1024 * 2 for chunk in chunks)
+        assert json.loads(b"".join(chunks)) == data
+
+    def test_iter_json_chunks_escapes_long_strings_in_slices(self, monkeypatch):
+        """Test that a large text content is not escaped into one second copy"""
+        text = json.dumps({"rows": [{"name": "Schnee ❄", "note": 'say "hi"\n'}] * 20000}, ensure_ascii=False)
+        data = {"result": {"content": [{"type": "text", "text": text}]}, "id": 1, 2: None, True: 1.5}
+        encoded_lengths = []
+        encode = serialization._ENCODER.encode
+
+        def record(obj):
+            encoded = encode(obj)
+            encoded_lengths.append(len(encoded))
+            return encoded
+
+        monkeypatch.setattr(serialization._ENCODER, "encode", record)
+        chunks = list(serialization.iter_json_chunks(data, chunk_size=1024))
+
+        assert b"".join(chunks) == json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        assert max(encoded_lengths) <= 2 * 1024 + 2
+
+    def test_content_size_hint(self):
+        """Test size estimation from JSON-RPC text content"""
+        response = {"result": {"content": [{"type": "text", "text": "abc"}, {"type": "text", "text": "de"}]}}
+        assert serialization.content_size_hint(response) == 5
+        assert serialization.content_size_hint({"error": {}}) == 0
+        assert serialization.content_size_hint(None) == 0
+
+    def test_serialize_tool_result(self):
+        """Test conversion of tool results to MCP text content"""
+        assert json.loads(serialization.serialize_tool_result({"ok": True})) == {"ok": True}
+        assert serialization.serialize_tool_result("plain") == "plain"
+
+    def test_encoded_length(self):
+        """Test UTF-8 length accounting"""
+        assert serialization.encoded_length("abc") == 3
+        assert serialization.encoded_length("❄") == 3
+
+    def test_payload_stats(self):
+        """Test per-tool byte counters"""
+        stats = serialization.PayloadStats()
+        stats.record("tool", 10)
+        stats.record("tool", 30)
+
+        assert stats.snapshot() == {"tool": {"calls": 2, "total_bytes": 40, "max_bytes": 30}}
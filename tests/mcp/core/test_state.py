@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared state backends
+"""
+
+import threading
+
+import pytest
+
+from tools.mcp.core.state import MemoryStateBackend, RedisStateBackend, create_state_backend
+
+
+class TestMemoryStateBackend:
+    """Test suite for the in-memory backend"""
+
+    def test_mapping_merge(self):
+        """Test dict access and field merging"""
+        jobs = MemoryStateBackend().mapping("jobs")
+        jobs["a"] = {"status": "queued", "prompt": "x"}
+
+        updated = jobs.merge("a", status="completed")
+
+        assert updated == {"status": "completed", "prompt": "x"}
+        assert jobs["a"]["status"] == "completed"
+        assert "a" in jobs and len(jobs) == 1
+        assert dict(jobs.items()) == {"a": updated}
+
+    def test_named_collections_shared(self):
+        """Test that the same name returns the same collection"""
+        backend = MemoryStateBackend()
+        backend.mapping("jobs")["a"] = {}
+
+        assert "a" in backend.mapping("jobs")
+        assert "a" not in backend.mapping("other")
+
+    def test_list_cap_and_tail(self):
+        """Test that lists keep only the newest items"""
+        history = MemoryStateBackend().list("history", max_length=3)
+        for i in range(5):
+            history.append({"i": i})
+
+        assert len(history) == 3
+        assert history.tail(2) == [{"i": 3}, {"i": 4}]
+        assert history.tail(0) == []
+
+    def test_mapping_max_items(self):
+        """Test that capped mappings drop the least recently written items"""
+        sessions = MemoryStateBackend().mapping("sessions", max_items=2)
+        sessions["a"] = {}
+        sessions["b"] = {}
+        sessions["a"] = {"seen": 2}
+        sessions.merge("c", seen=1)
+
+        assert sorted(sessions) == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_call(self):
+        """Test that calls run inline for the memory backend"""
+        backend = MemoryStateBackend()
+        jobs = backend.mapping("jobs")
+
+        assert await backend.call(jobs.merge, "a", status="queued") == {"status": "queued"}
+
+
+class TestRedisStateBackend:
+    """Test suite for the Redis backend, against fakeredis"""
+
+    @pytest.fixture
+    def backend(self, monkeypatch):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        monkeypatch.setattr("redis.Redis.from_url", lambda url: fakeredis.FakeRedis(server=server))
+        return RedisStateBackend("redis://localhost", "test")
+
+    def test_mapping_max_items(self, backend):
+        """Test that the oldest items are dropped from the hash and the order set"""
+        sessions = backend.mapping("sessions", max_items=2)
+        for key in "abc":
+            sessions[key] = {"key": key}
+        sessions.merge("b", seen=True)
+        sessions.merge("d", seen=True)
+
+        assert sorted(sessions) == ["c", "d"]
+        assert backend._client.zcard("mcp:test:sessions:order") == 2
+        del sessions["c"]
+        assert backend._client.zrange("mcp:test:sessions:order", 0, -1) == [b"d"]
+
+    @pytest.mark.asyncio
+    async def test_call_runs_off_loop(self, backend):
+        """Test that calls run in a worker thread, not on the event loop"""
+        jobs = backend.mapping("jobs")
+
+        def merge(key):
+            assert threading.current_thread() is not threading.main_thread()
+            return jobs.merge(key, status="queued")
+
+        assert await backend.call(merge, "a") == {"status": "queued"}
+        assert await backend.call(len, jobs) == 1
+
+
+class TestCreateStateBackend:
+    """Test suite for backend selection"""
+
+    def test_default_is_memory(self, monkeypatch):
+        """Test that memory is used unless configured otherwise"""
+        monkeypatch.delenv("MCP_STATE_BACKEND", raising=False)
+        assert isinstance(create_state_backend("test"), MemoryStateBackend)
+
+    def test_unknown_backend(self):
+        """Test that unknown backends are rejected"""
+        with pytest.raises(ValueError):
+            create_state_backend("test", backend="etcd")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the tool dispatch registry
+"""
+
+import json
+
+import pytest
+
+from tools.mcp.core.tool_registry import SchemaValidator, ToolArgumentError, ToolRegistry
+
+
+class FakeServer:
+    """Minimal server exposing get_tools() and tool methods"""
+
+    def __init__(self):
+        self.get_tools_calls = 0
+        self._registered_tools = {}
+
+    def get_tools(self):
+        self.get_tools_calls += 1
+        return {
+            "echo": {
+                "description": "Echo a message",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "message": {"type": "string"},
+                        "count": {"type": "integer"},
+                        "mode": {"type": "string", "enum": ["plain", "loud"]},
+                    },
+                    "required": ["message"],
+                },
+            },
+            "missing": {"description": "Declared but not implemented", "parameters": {}},
+        }
+
+    async def echo(self, message, count=1, mode="plain"):
+        return {"message": message * count, "mode": mode}
+
+
+class TestSchemaValidator:
+    """Test suite for SchemaValidator"""
+
+    def test_required_arguments(self):
+        """Test that missing required arguments are rejected"""
+        validator = SchemaValidator({"properties": {"a": {"type": "string"}}, "required": ["a"]})
+        validator.validate({"a": "x"})
+        with pytest.raises(ToolArgumentError, match="a"):
+            validator.validate({})
+
+    def test_type_checks(self):
+        """Test primitive type checking"""
+        validator = SchemaValidator({"properties": {"n": {"type": "integer"}, "x": {"type": "number"}}})
+        validator.validate({"n": 3, "x": 1.5})
+        validator.validate({"x": 2})
+        with pytest.raises(ToolArgumentError):
+            validator.validate({"n": "3"})
+        with pytest.raises(ToolArgumentError):
+            validator.validate({"n": 2.5})
+        with pytest.raises(ToolArgumentError):
+            validator.validate({"x": "1.5"})
+
+    def test_lenient_numbers(self):
+        """Test that inputs tools received before validation existed are still accepted"""
+        validator = SchemaValidator({"properties": {"n": {"type": "integer"}, "x": {"type": "number"}}})
+        arguments = {"n": 2.0, "x": True}
+
+        validator.validate(arguments)
+        validator.validate({"n": False})
+
+        assert arguments == {"n": 2.0, "x": True}
+
+    def test_optional_null_and_unknown_types(self):
+        """Test that optional nulls and untyped properties are accepted"""
+        validator = SchemaValidator({"properties": {"n": {"type": "integer"}, "any": {}}})
+        validator.validate({"n": None, "any": object()})
+
+    def test_enum(self):
+        """Test enum membership checks"""
+        validator = SchemaValidator({"properties": {"mode": {"type": "string", "enum": ["a", "b"]}}})
+        validator.validate({"mode": "a"})
+        with pytest.raises(ToolArgumentError):
+            validator.validate({"mode": "c"})
+
+
+class TestToolRegistry:
+    """Test suite for ToolRegistry"""
+
+    def test_built_once(self):
+        """Test that get_tools() is only called once across lookups"""
+        server = FakeServer()
+        registry = ToolRegistry(server)
+
+        assert "echo" in registry
+        assert registry.get("echo") is not None
+        registry.list_result()
+        registry.http_list_payload()
+
+        assert server.get_tools_calls == 1
+
+    def test_declared_but_not_implemented(self):
+        """Test that tools without a handler are listed but not dispatchable"""
+        registry = ToolRegistry(FakeServer())
+        assert "missing" in registry
+        assert registry.get("missing") is None
+        assert [tool["name"] for tool in registry.list_result()["tools"]] == ["echo", "missing"]
+
+    def test_handler_is_bound_method(self):
+        """Test that handlers resolve to the server's bound methods"""
+        server = FakeServer()
+        entry = ToolRegistry(server).get("echo")
+        assert entry.handler.__self__ is server
+
+    def test_http_payload_is_serialized(self):
+        """Test the pre-serialized /mcp/tools payload"""
+        payload = json.loads(ToolRegistry(FakeServer()).http_list_payload())
+        assert payload["tools"][0]["parameters"]["required"] == ["message"]
+
+    def test_invalidate_picks_up_registered_tools(self):
+        """Test that invalidation rebuilds the table with registered tools"""
+        server = FakeServer()
+        registry = ToolRegistry(server)
+        assert "extra" not in registry
+
+        async def extra():
+            return "ok"
+
+        server._registered_tools["extra"] = {"description": "", "parameters": {}, "handler": extra}
+        assert "extra" not in registry
+
+        registry.invalidate()
+        assert registry.get("extra").handler is extra
+        assert server.get_tools_calls == 2
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Unit tests for core logging utilities
+"""
+
+import json
+import logging
+
+from tools.mcp.core.utils import setup_logging, should_sample, stop_logging, truncate_for_log
+
+
+class TestSetupLogging:
+    """Test suite for the queued logging pipeline"""
+
+    def test_records_written_by_listener(self, capsys):
+        """Test that queued records reach stdout once the listener flushes"""
+        # Restart the listener so it writes to the captured stdout
+        stop_logging()
+        logger = setup_logging("test-queued-logger")
+        logger.info("hello from the queue")
+        stop_logging()
+
+        assert "hello from the queue" in capsys.readouterr().out
+
+    def test_repeated_setup_adds_one_handler(self):
+        """Test that calling setup_logging twice does not duplicate output"""
+        setup_logging("test-repeat-logger")
+        logger = setup_logging("test-repeat-logger")
+        stop_logging()
+
+        assert len(logger.handlers) == 1
+        assert logger.level == logging.INFO
+
+
+class TestBodyLogging:
+    """Test suite for size-capped, sampled body logging"""
+
+    def test_small_body_unchanged(self):
+        """Test that small bodies are logged in full"""
+        body = {"method": "tools/call", "params": {"name": "x"}}
+        assert json.loads(truncate_for_log(body)) == body
+
+    def test_large_body_truncated(self):
+        """Test that large bodies are cut at the size cap"""
+        body = {"data": "A" * 100000}
+        logged = truncate_for_log(body, max_bytes=100)
+
+        assert len(logged) < 200
+        assert logged.endswith("[truncated, >100 chars]")
+
+    def test_huge_string_cut_before_encoding(self, monkeypatch):
+        """Test that a 10 MB field is capped without escaping the whole string"""
+        encoded_lengths = []
+        encode = json.encoder.encode_basestring_ascii
+
+        def record(text):
+            encoded_lengths.append(len(text))
+            return encode(text)
+
+        monkeypatch.setattr(json.encoder, "encode_basestring_ascii", record)
+        body = {"method": "tools/call", "params": {"data": "\u00e9" * (10 * 1024 * 1024), "rest": list(range(10**6))}}
+
+        logged = truncate_for_log(body, max_bytes=2048)
+
+        assert logged.startswith('{"method": "tools/call", "params": {"data": "\\u00e9')
+        assert logged.endswith("[truncated, >2048 chars]")
+        assert max(encoded_lengths) <= 2049
+
+    def test_sampling_bounds(self):
+        """Test that rates of 0 and 1 never and always sample"""
+        assert should_sample(1.0)
+        assert not should_sample(0.0)
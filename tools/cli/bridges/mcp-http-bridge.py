@@ -6,11 +6,14 @@ Forwards MCP requests to remote MCP servers
 
 import logging
 import os
-from typing import Any, Dict, Optional
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional
 
 import httpx
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Configure logging
@@ -33,6 +36,24 @@ app.add_middleware(
 REMOTE_MCP_URL = os.getenv("REMOTE_MCP_URL", "http://localhost:8000")
 SERVICE_NAME = os.getenv("SERVICE_NAME", "mcp-bridge")
 TIMEOUT = int(os.getenv("TIMEOUT", "30"))
+MAX_CONNECTIONS = int(os.getenv("MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+# Headers that describe a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "te",
+        "trailers",
+        "transfer-encoding",
+        "upgrade",
+        "host",
+        "content-length",
+    }
+)
 
 
 class MCPRequest(BaseModel):
@@ -49,6 +70,118 @@ class MCPResponse(BaseModel):
     error: Optional[Dict[str, Any]] = None
 
 
+class LatencyWindow:
+    """Rolling window of recent latencies with percentile summaries"""
+
+    def __init__(self, size: int = 1000):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": 0}
+
+        def pick(q: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 6)
+
+        return {"count": self.count, "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+upstream_latency = {"connect": LatencyWindow(), "ttfb": LatencyWindow(), "total": LatencyWindow()}
+upstream_errors: Dict[str, int] = {}
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Get the pooled upstream client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+@app.on_event("startup")
+async def startup_event():
+    get_client()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def send_upstream(
+    method: str,
+    path: str,
+    content: Any = None,
+    json_body: Any = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> httpx.Response:
+    """Send a request upstream and return once response headers arrive"""
+    timing: Dict[str, float] = {}
+
+    async def trace(event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.started":
+            timing["connect_started"] = time.perf_counter()
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            timing["connected"] = time.perf_counter()
+
+    client = get_client()
+    start = time.perf_counter()
+    request = client.build_request(method, f"{REMOTE_MCP_URL}{path}", content=content, json=json_body, headers=headers)
+    request.extensions["trace"] = trace
+    try:
+        response = await client.send(request, stream=True)
+    except httpx.HTTPError as e:
+        kind = "timeout" if isinstance(e, httpx.TimeoutException) else "network"
+        upstream_errors[kind] = upstream_errors.get(kind, 0) + 1
+        raise
+
+    upstream_latency["ttfb"].observe(time.perf_counter() - start)
+    if "connect_started" in timing and "connected" in timing:
+        upstream_latency["connect"].observe(timing["connected"] - timing["connect_started"])
+    response.extensions["bridge_start"] = start
+    return response
+
+
+async def read_and_close(response: httpx.Response) -> bytes:
+    """Read a (small) upstream body and release the connection"""
+    try:
+        return await response.aread()
+    finally:
+        await response.aclose()
+        upstream_latency["total"].observe(time.perf_counter() - response.extensions["bridge_start"])
+
+
+def relay(response: httpx.Response) -> StreamingResponse:
+    """Relay an upstream response chunk by chunk without buffering it"""
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            async for chunk in response.aiter_raw():
+                yield chunk
+        finally:
+            await response.aclose()
+            upstream_latency["total"].observe(time.perf_counter() - response.extensions["bridge_start"])
+
+    headers = {key: value for key, value in response.headers.items() if key.lower() not in HOP_BY_HOP_HEADERS}
+    return StreamingResponse(body(), status_code=response.status_code, headers=headers)
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -63,31 +196,42 @@ async def root():
 async def health():
     """Health check endpoint"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{REMOTE_MCP_URL}/health", timeout=5.0)
+        response = await get_client().get(f"{REMOTE_MCP_URL}/health", timeout=5.0)
 
         return {"status": "healthy", "remote_status": response.status_code == 200}
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
 
 
+# JSON, so not served at /metrics, where the MCP servers and HTTPProxy expose
+# Prometheus text. The bridge ships as a single file without tools.mcp.core,
+# hence its own LatencyWindow rather than core.metrics.Histogram.
+@app.get("/stats")
+async def stats():
+    """Upstream connect, time-to-first-byte and total latency (seconds)"""
+    return {
+        "upstream": {name: window.summary() for name, window in upstream_latency.items()},
+        "errors": upstream_errors,
+    }
+
+
 @app.post("/mcp")
-async def handle_mcp_request(request: MCPRequest) -> MCPResponse:
-    """Forward MCP request to remote server"""
+async def handle_mcp_request(request: Request):
+    """Forward MCP request to remote server, streaming both bodies"""
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            # Forward the request
-            response = await client.post(f"{REMOTE_MCP_URL}/mcp", json=request.dict())
-
-            # Check response
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Remote server error: {response.text}",
-                )
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+        response = await send_upstream("POST", "/mcp", content=request.stream(), headers=headers)
+
+        # Check response
+        if response.status_code != 200:
+            body = await read_and_close(response)
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Remote server error: {body.decode(errors='replace')}",
+            )
 
-            # Return response
-            return MCPResponse(**response.json())
+        # Relay response as it arrives
+        return relay(response)
 
     except httpx.TimeoutException:
         logger.error(f"Timeout forwarding request to {REMOTE_MCP_URL}")
@@ -125,13 +269,12 @@ async def handle_mcp_request(request: MCPRequest) -> MCPResponse:
 async def list_tools():
     """List available tools from remote server"""
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            response = await client.get(f"{REMOTE_MCP_URL}/tools")
+        response = await send_upstream("GET", "/tools")
 
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(status_code=response.status_code, detail="Failed to list tools")
+        if response.status_code == 200:
+            return relay(response)
+        await read_and_close(response)
+        raise HTTPException(status_code=response.status_code, detail="Failed to list tools")
     except Exception as e:
         logger.error(f"Error listing tools: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -141,19 +284,19 @@ async def list_tools():
 async def execute_tool(tool_name: str, arguments: Dict[str, Any] = {}):
     """Execute a tool on the remote server"""
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-            response = await client.post(
-                f"{REMOTE_MCP_URL}/tools/execute",
-                json={"tool": tool_name, "arguments": arguments},
-            )
+        response = await send_upstream(
+            "POST",
+            "/tools/execute",
+            json_body={"tool": tool_name, "arguments": arguments},
+        )
 
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Tool execution failed: {response.text}",
-                )
+        if response.status_code == 200:
+            return relay(response)
+        body = await read_and_close(response)
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=f"Tool execution failed: {body.decode(errors='replace')}",
+        )
     except Exception as e:
         logger.error(f"Error executing tool {tool_name}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -4,6 +4,7 @@ import asyncio
 import base64
 import binascii
 import os
+import re
 import shutil
 import sys
 import uuid
@@ -23,6 +24,22 @@ CONFIGS_PATH = Path(AI_TOOLKIT_PATH) / "config"  # AI Toolkit uses 'config' not
 sys.path.insert(0, AI_TOOLKIT_PATH)
 
 
+def _read_training_progress(log_file: str) -> int:
+    """Percentage of the last "step current/total" line in a training log, or 0"""
+    try:
+        with open(log_file, "r") as f:
+            lines = f.readlines()
+    except (OSError, ValueError):
+        return 0
+    for line in reversed(lines[-100:]):  # Check last 100 lines
+        if "step" in line.lower() and "/" in line:
+            match = re.search(r"(\d+)/(\d+)", line)
+            if match and int(match.group(2)):
+                current, total = int(match.group(1)), int(match.group(2))
+                return int((current / total) * 100)
+    return 0
+
+
 class AIToolkitMCPServer(BaseMCPServer):
     """MCP Server for AI Toolkit - Functional AI model training management"""
 
@@ -35,8 +52,14 @@ class AIToolkitMCPServer(BaseMCPServer):
 
         # Initialize server state
         self.logger = setup_logging("ai_toolkit_mcp")
-        self.training_jobs: Dict[str, Any] = {}
+        # Job records are shared by HTTP workers; processes and log handles
+        # belong to the worker that started the job
+        self.training_jobs = self.state.mapping("training_jobs")
         self.training_processes: Dict[str, asyncio.subprocess.Process] = {}
+        self.training_log_handles: Dict[str, Any] = {}
+        # Tasks publishing progress of training runs started by this worker
+        self.training_monitors: Dict[str, "asyncio.Task[None]"] = {}
+        self.training_progress_interval = float(os.environ.get("AI_TOOLKIT_PROGRESS_INTERVAL", "5"))
 
         # Ensure directories exist
         DATASETS_PATH.mkdir(parents=True, exist_ok=True)
@@ -198,8 +221,11 @@ class AIToolkitMCPServer(BaseMCPServer):
                         "model_name": {"type": "string", "description": "Model name to download"},
                         "encoding": {
                             "type": "string",
-                            "enum": ["base64", "raw"],
-                            "default": "base64",
+                            "enum": ["url", "base64", "raw"],
+                            "description": (
+                                "'url' returns a signed download link; 'base64' and 'raw' inline the file. "
+                                "Defaults to 'url' when links can be downloaded (HTTP mode), else 'base64'"
+                            ),
                         },
                     },
                     "required": ["model_name"],
@@ -433,13 +459,13 @@ class AIToolkitMCPServer(BaseMCPServer):
             )
 
             self.training_processes[job_id] = process
-            self.training_jobs[job_id] = {
-                "status": "running",
-                "config": config_name,
-                "log_file": str(log_file),
-                "pid": process.pid,
-                "log_handle": log_handle,  # Store handle for cleanup
-            }
+            self.training_log_handles[job_id] = log_handle  # Store handle for cleanup
+            job = {"status": "running", "config": config_name, "log_file": str(log_file), "pid": process.pid}
+            await self.state.call(self.training_jobs.__setitem__, job_id, job)
+
+            monitor = asyncio.ensure_future(self._monitor_training(job_id, process, str(log_file)))
+            self.training_monitors[job_id] = monitor
+            monitor.add_done_callback(lambda _: self.training_monitors.pop(job_id, None))
 
             self.logger.info(f"Started training job {job_id} with config {config_name}")
             return {"status": "success", "job_id": job_id, "pid": process.pid}
@@ -454,6 +480,38 @@ class AIToolkitMCPServer(BaseMCPServer):
             self.logger.error(f"Failed to start training: {e}")
             return {"error": f"Failed to start training: {str(e)}"}
 
+    async def _monitor_training(self, job_id: str, process: asyncio.subprocess.Process, log_file: str) -> None:
+        """Publish progress parsed from a training log to the session that started it, until the run exits"""
+        loop = asyncio.get_running_loop()
+        last = -1
+        while process.returncode is None:
+            try:
+                await asyncio.wait_for(process.wait(), timeout=self.training_progress_interval)
+            except asyncio.TimeoutError:
+                pass
+            progress = await loop.run_in_executor(None, _read_training_progress, log_file)
+            if progress != last:
+                last = progress
+                self.report_progress(progress, 100, f"Training job {job_id}: {progress}%")
+        await self.state.call(self._reap_training_process, job_id)
+
+    def _close_log_handle(self, job_id: str) -> None:
+        """Close the training log file opened by this worker, if any"""
+        log_handle = self.training_log_handles.pop(job_id, None)
+        if log_handle is not None:
+            log_handle.close()
+
+    def _reap_training_process(self, job_id: str) -> Dict[str, Any]:
+        """Record completion of a finished local training process and return the job"""
+        process = self.training_processes.get(job_id)
+        if process is None or process.returncode is None:
+            job: Dict[str, Any] = self.training_jobs[job_id]
+            return job
+
+        self._close_log_handle(job_id)
+        del self.training_processes[job_id]
+        return self.training_jobs.merge(job_id, status="completed", exit_code=process.returncode)
+
     async def stop_training(self, **kwargs) -> Dict[str, Any]:
         """Stop a running training job"""
         job_id = kwargs.get("job_id")
@@ -471,11 +529,9 @@ class AIToolkitMCPServer(BaseMCPServer):
                     await process.wait()
 
                 # Close log file handle if exists
-                job_info = self.training_jobs.get(job_id, {})
-                if "log_handle" in job_info:
-                    job_info["log_handle"].close()
+                self._close_log_handle(job_id)
 
-                self.training_jobs[job_id]["status"] = "stopped"
+                await self.state.call(self.training_jobs.merge, job_id, status="stopped")
                 del self.training_processes[job_id]
 
                 return {"status": "success", "job_id": job_id}
@@ -486,40 +542,13 @@ class AIToolkitMCPServer(BaseMCPServer):
         """Get training job status"""
         job_id = kwargs.get("job_id")
 
-        if job_id in self.training_jobs:
-            job = self.training_jobs[job_id]
-
+        if await self.state.call(self.training_jobs.__contains__, job_id):
             # Check if process is still running
-            if job_id in self.training_processes:
-                process = self.training_processes[job_id]
-                if process.returncode is None:
-                    job["status"] = "running"
-                else:
-                    job["status"] = "completed"
-                    job["exit_code"] = process.returncode
-                    # Close log file handle if exists
-                    if "log_handle" in job:
-                        job["log_handle"].close()
-                    del self.training_processes[job_id]
-
-            # Try to parse progress from log file
+            job = await self.state.call(self._reap_training_process, job_id)
+
             progress = 0
-            if "log_file" in job and Path(job["log_file"]).exists():
-                try:
-                    with open(job["log_file"], "r") as f:
-                        lines = f.readlines()
-                        for line in reversed(lines[-100:]):  # Check last 100 lines
-                            if "step" in line.lower() and "/" in line:
-                                # Try to extract step progress
-                                import re
-
-                                match = re.search(r"(\d+)/(\d+)", line)
-                                if match:
-                                    current, total = int(match.group(1)), int(match.group(2))
-                                    progress = int((current / total) * 100)
-                                    break
-                except Exception:
-                    pass
+            if "log_file" in job:
+                progress = await asyncio.get_running_loop().run_in_executor(None, _read_training_progress, job["log_file"])
 
             return {
                 "status": job.get("status", "unknown"),
@@ -533,13 +562,10 @@ class AIToolkitMCPServer(BaseMCPServer):
     async def list_training_jobs(self, **kwargs) -> Dict[str, Any]:
         """List all training jobs"""
         jobs = []
-        for job_id, job_data in self.training_jobs.items():
+        for job_id, job_data in await self.state.call(self.training_jobs.items):
             # Update status for running jobs
             if job_id in self.training_processes:
-                process = self.training_processes[job_id]
-                if process.returncode is not None:
-                    job_data["status"] = "completed"
-                    del self.training_processes[job_id]
+                job_data = await self.state.call(self._reap_training_process, job_id)
 
             jobs.append(
                 {
@@ -598,7 +624,7 @@ class AIToolkitMCPServer(BaseMCPServer):
     async def download_model(self, **kwargs) -> Dict[str, Any]:
         """Download a model"""
         model_name = kwargs.get("model_name")
-        encoding = kwargs.get("encoding", "base64")
+        encoding = kwargs.get("encoding") or self.artifacts.default_encoding()
 
         model_path = None
         for ext in [".safetensors", ".ckpt", ".pt"]:
@@ -609,6 +635,16 @@ class AIToolkitMCPServer(BaseMCPServer):
 
         if model_path:
             try:
+                if encoding == "url":
+                    artifact = await self.artifacts.publish_file(str(model_path))
+                    return {
+                        "status": "success",
+                        "model": model_name,
+                        "url": artifact["url"],
+                        "artifact": artifact,
+                        "size": artifact["size"],
+                    }
+
                 with open(model_path, "rb") as f:
                     data = f.read()
 
@@ -664,8 +700,8 @@ class AIToolkitMCPServer(BaseMCPServer):
         job_id = kwargs.get("job_id")
         lines = kwargs.get("lines", 100)
 
-        if job_id in self.training_jobs:
-            job = self.training_jobs[job_id]
+        job = await self.state.call(self.training_jobs.get, job_id)
+        if job is not None:
             log_file = job.get("log_file")
 
             if log_file and Path(log_file).exists():
@@ -686,13 +722,10 @@ class AIToolkitMCPServer(BaseMCPServer):
         """Get training information"""
         # Update job statuses
         for job_id in list(self.training_processes.keys()):
-            process = self.training_processes[job_id]
-            if process.returncode is not None:
-                self.training_jobs[job_id]["status"] = "completed"
-                del self.training_processes[job_id]
+            await self.state.call(self._reap_training_process, job_id)
 
         return {
-            "total_jobs": len(self.training_jobs),
+            "total_jobs": await self.state.call(len, self.training_jobs),
             "active_jobs": len(self.training_processes),
             "configs": len(list(CONFIGS_PATH.glob("*.yaml"))),
             "datasets": len(list(d for d in DATASETS_PATH.iterdir() if d.is_dir())),
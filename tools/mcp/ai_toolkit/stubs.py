@@ -152,12 +152,12 @@ async def list_exported_models() -> Dict[str, List[str]]:
     return {}
 
 
-async def download_model(model_name: str, encoding: str = "base64") -> Dict[str, Any]:
+async def download_model(model_name: str, encoding: str = "url") -> Dict[str, Any]:
     """Download a trained model.
 
     Args:
         model_name: Model name to download
-        encoding: Encoding format ("base64" or "raw")
+        encoding: "url" for a signed download link, or "base64"/"raw" to inline the data
 
     Returns:
         Model data and metadata
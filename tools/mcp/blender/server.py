@@ -7,7 +7,6 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import asyncio  # noqa: E402
 import logging  # noqa: E402
 import os  # noqa: E402
 import uuid  # noqa: E402
@@ -18,6 +17,7 @@ from blender.core.blender_executor import BlenderExecutor  # noqa: E402
 from blender.core.job_manager import JobManager  # noqa: E402
 from blender.core.templates import TemplateManager  # noqa: E402
 from blender.tools import get_all_tool_definitions, get_tool_handlers  # noqa: E402
+from core.admission import AdmissionRejected  # noqa: E402
 from core.base_server import BaseMCPServer, ToolRequest, ToolResponse  # noqa: E402
 
 # Configure logging
@@ -31,6 +31,7 @@ class BlenderMCPServer(BaseMCPServer):
     def __init__(self, base_dir: Optional[str] = None, port: int = 8017):
         super().__init__(name="blender-mcp", version="1.0.0", port=port)
         self.description = "Blender 3D content creation and rendering"
+        self._tool_handlers: Optional[Dict[str, Any]] = None
 
         # Set up paths
         if base_dir is None:
@@ -683,8 +684,11 @@ class BlenderMCPServer(BaseMCPServer):
 
         return tool_dict  # type: ignore
 
-    async def execute_tool(self, request: ToolRequest):
-        """Execute a tool with given arguments."""
+    def _get_tool_handlers(self) -> Dict[str, Any]:
+        """Build the tool handler mapping once and reuse it for every call."""
+        if self._tool_handlers is not None:
+            return self._tool_handlers
+
         # Tool handler mapping for cleaner dispatch
         tool_handlers = {
             # Project Management
@@ -723,6 +727,13 @@ class BlenderMCPServer(BaseMCPServer):
 
             tool_handlers[tool_name] = make_handler(handler_func)
 
+        self._tool_handlers = tool_handlers
+        return tool_handlers
+
+    async def execute_tool(self, request: ToolRequest):
+        """Execute a tool with given arguments."""
+        tool_handlers = self._get_tool_handlers()
+
         try:
             name = request.tool
             handler = tool_handlers.get(name)
@@ -730,12 +741,15 @@ class BlenderMCPServer(BaseMCPServer):
             if not handler:
                 return ToolResponse(success=False, result=None, error=f"Unknown tool: {name}")
 
-            # Execute the handler
-            if name == "list_projects":
-                result = await handler({})  # No arguments needed
-            else:
-                arguments = request.get_args()
-                result = await handler(arguments)
+            # Execute the handler within the base server's admission limits
+            self.admission.check_rate(request.client_id or "anonymous")
+            async with self.admission.requests.slot():
+                with self.tool_metrics.track(name):
+                    if name == "list_projects":
+                        result = await handler({})  # No arguments needed
+                    else:
+                        arguments = request.get_args()
+                        result = await handler(arguments)
 
             # Special handling for job status queries
             if name in ("get_job_status", "get_job_result"):
@@ -745,6 +759,8 @@ class BlenderMCPServer(BaseMCPServer):
 
             return ToolResponse(success=success, result=result)
 
+        except AdmissionRejected as e:
+            return self._rejection_response(e)
         except Exception as e:
             logger.error(f"Error in {request.tool}: {str(e)}")
             return ToolResponse(success=False, result=None, error=str(e))
@@ -871,15 +887,12 @@ class BlenderMCPServer(BaseMCPServer):
         frame = args.get("frame", 1)
         settings = args.get("settings", {})
 
-        # Create render job
         job_id = str(uuid.uuid4())
-        self.job_manager.create_job(job_id=job_id, job_type="render_image", parameters=args)
 
         # Organize renders in outputs/renders folder
         renders_output_dir = self.outputs_dir / "renders"
         renders_output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Start async rendering
         script_args = {
             "operation": "render_image",
             "project": project,
@@ -888,8 +901,9 @@ class BlenderMCPServer(BaseMCPServer):
             "output_path": str(renders_output_dir / f"{job_id}.png"),
         }
 
-        # This runs asynchronously
-        asyncio.create_task(self.blender_executor.execute_script("render.py", script_args, job_id))
+        # Start async rendering; raises AdmissionRejected before any job is recorded
+        self.run_background_job(self.blender_executor.execute_script("render.py", script_args, job_id), job_id, "render_image")
+        self.job_manager.create_job(job_id=job_id, job_type="render_image", parameters=args)
 
         return {
             "success": True,
@@ -906,9 +920,7 @@ class BlenderMCPServer(BaseMCPServer):
         end_frame = args.get("end_frame", 250)
         settings = args.get("settings", {})
 
-        # Create render job
         job_id = str(uuid.uuid4())
-        self.job_manager.create_job(job_id=job_id, job_type="render_animation", parameters=args)
 
         # Organize animations in outputs/animations folder
         animations_output_dir = self.outputs_dir / "animations" / job_id
@@ -923,8 +935,11 @@ class BlenderMCPServer(BaseMCPServer):
             "output_path": str(animations_output_dir) + "/",
         }
 
-        # Start async rendering
-        asyncio.create_task(self.blender_executor.execute_script("render.py", script_args, job_id))
+        # Start async rendering; raises AdmissionRejected before any job is recorded
+        self.run_background_job(
+            self.blender_executor.execute_script("render.py", script_args, job_id), job_id, "render_animation"
+        )
+        self.job_manager.create_job(job_id=job_id, job_type="render_animation", parameters=args)
 
         return {
             "success": True,
@@ -967,7 +982,6 @@ class BlenderMCPServer(BaseMCPServer):
         end_frame = args.get("end_frame", 250)
 
         job_id = str(uuid.uuid4())
-        self.job_manager.create_job(job_id=job_id, job_type="bake_simulation", parameters=args)
 
         script_args = {
             "operation": "bake_simulation",
@@ -976,7 +990,10 @@ class BlenderMCPServer(BaseMCPServer):
             "end_frame": end_frame,
         }
 
-        asyncio.create_task(self.blender_executor.execute_script("physics_sim.py", script_args, job_id))
+        self.run_background_job(
+            self.blender_executor.execute_script("physics_sim.py", script_args, job_id), job_id, "bake_simulation"
+        )
+        self.job_manager.create_job(job_id=job_id, job_type="bake_simulation", parameters=args)
 
         return {
             "success": True,
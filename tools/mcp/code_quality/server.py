@@ -3,16 +3,17 @@
 import subprocess
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 # Add tools directory to path to import shared module
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from tools.cli.utilities.markdown_link_checker import MarkdownLinkChecker  # noqa: E402
-
 from ..core.base_server import BaseMCPServer  # noqa: E402
 from ..core.utils import setup_logging  # noqa: E402
 
+if TYPE_CHECKING:
+    from tools.cli.utilities.markdown_link_checker import MarkdownLinkChecker
+
 
 class CodeQualityMCPServer(BaseMCPServer):
     """MCP Server for code quality tools - formatting and linting"""
@@ -24,7 +25,21 @@ class CodeQualityMCPServer(BaseMCPServer):
             port=8010,  # New port for code quality server
         )
         self.logger = setup_logging("CodeQualityMCP")
-        self.link_checker = MarkdownLinkChecker()
+        self._link_checker: Optional["MarkdownLinkChecker"] = None
+
+    @property
+    def link_checker(self) -> "MarkdownLinkChecker":
+        """Markdown link checker, imported on first use (pulls in aiohttp and mistune)"""
+        if self._link_checker is None:
+            from tools.cli.utilities.markdown_link_checker import MarkdownLinkChecker
+
+            self._link_checker = MarkdownLinkChecker()
+        return self._link_checker
+
+    def warmup(self) -> None:
+        """Build the tool table and load the link checker"""
+        super().warmup()
+        _ = self.link_checker
 
     def get_tools(self) -> Dict[str, Dict[str, Any]]:
         """Return available code quality tools"""
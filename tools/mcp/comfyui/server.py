@@ -36,7 +36,7 @@ class ComfyUIMCPServer(BaseMCPServer):
 
         # Initialize server state
         self.logger = setup_logging("comfyui_mcp")
-        self.generation_jobs: Dict[str, Any] = {}
+        self.generation_jobs = self.state.mapping("generation_jobs")
         self.client_id = str(uuid.uuid4())
 
         # Configurable timeout for generation (in seconds)
@@ -166,8 +166,11 @@ class ComfyUIMCPServer(BaseMCPServer):
                         "filename": {"type": "string", "description": "LoRA filename"},
                         "encoding": {
                             "type": "string",
-                            "enum": ["base64", "raw"],
-                            "default": "base64",
+                            "enum": ["url", "base64", "raw"],
+                            "description": (
+                                "'url' returns a signed download link; 'base64' and 'raw' inline the file. "
+                                "Defaults to 'url' when links can be downloaded (HTTP mode), else 'base64'"
+                            ),
                         },
                     },
                     "required": ["filename"],
@@ -176,6 +179,7 @@ class ComfyUIMCPServer(BaseMCPServer):
             {
                 "name": "get_object_info",
                 "description": "Get ComfyUI node and model information",
+                "cacheable": {"ttl": 300},
                 "inputSchema": {"type": "object", "properties": {}},
             },
             {
@@ -209,6 +213,8 @@ class ComfyUIMCPServer(BaseMCPServer):
         for tool in self.tools:
             tool_name = str(tool["name"])
             tools_dict[tool_name] = {"description": tool.get("description", ""), "parameters": tool.get("inputSchema", {})}
+            if "cacheable" in tool:
+                tools_dict[tool_name]["cacheable"] = tool["cacheable"]
         return tools_dict
 
     def _create_default_workflow(
@@ -285,6 +291,9 @@ class ComfyUIMCPServer(BaseMCPServer):
                 prompt_history = history[prompt_id]
                 if prompt_history.get("outputs"):
                     return True
+            # ComfyUI's history has no step counts; report elapsed seconds against the timeout
+            elapsed = int(time.time() - start_time)
+            self.report_progress(elapsed, timeout, f"Waiting for ComfyUI prompt {prompt_id} ({elapsed}s)")
             await asyncio.sleep(1)
         return False
 
@@ -322,7 +331,8 @@ class ComfyUIMCPServer(BaseMCPServer):
 
         # Create job entry
         job_id = str(uuid.uuid4())
-        self.generation_jobs[job_id] = {"prompt_id": prompt_id, "status": "queued", "prompt": prompt, "workflow": workflow}
+        job = {"prompt_id": prompt_id, "status": "queued", "prompt": prompt, "workflow": workflow}
+        await self.state.call(self.generation_jobs.__setitem__, job_id, job)
 
         # Wait for completion with optional timeout override
         completed = await self._wait_for_completion(prompt_id, timeout=timeout)
@@ -344,16 +354,15 @@ class ComfyUIMCPServer(BaseMCPServer):
                                 }
                             )
 
-                self.generation_jobs[job_id]["status"] = "completed"
-                self.generation_jobs[job_id]["images"] = images
+                await self.state.call(self.generation_jobs.merge, job_id, status="completed", images=images)
 
                 return {"status": "success", "job_id": job_id, "prompt_id": prompt_id, "images": images}
             else:
                 # Completed but no history found
-                self.generation_jobs[job_id]["status"] = "completed"
+                await self.state.call(self.generation_jobs.merge, job_id, status="completed")
                 return {"status": "success", "job_id": job_id, "prompt_id": prompt_id, "images": []}
         else:
-            self.generation_jobs[job_id]["status"] = "timeout"
+            await self.state.call(self.generation_jobs.merge, job_id, status="timeout")
             return {"error": "Generation timed out", "job_id": job_id}
 
     async def list_workflows(self, **kwargs) -> Dict[str, Any]:
@@ -485,7 +494,7 @@ class ComfyUIMCPServer(BaseMCPServer):
     async def download_lora(self, **kwargs) -> Dict[str, Any]:
         """Download a LoRA model from ComfyUI"""
         filename = kwargs.get("filename")
-        encoding = kwargs.get("encoding", "base64")
+        encoding = kwargs.get("encoding") or self.artifacts.default_encoding()
 
         if not filename:
             return {"error": "Missing required field: filename"}
@@ -494,6 +503,16 @@ class ComfyUIMCPServer(BaseMCPServer):
 
         if lora_path.exists():
             try:
+                if encoding == "url":
+                    artifact = await self.artifacts.publish_file(str(lora_path))
+                    return {
+                        "status": "success",
+                        "filename": filename,
+                        "url": artifact["url"],
+                        "artifact": artifact,
+                        "size": artifact["size"],
+                    }
+
                 with open(lora_path, "rb") as f:
                     data = f.read()
 
@@ -550,12 +569,8 @@ class ComfyUIMCPServer(BaseMCPServer):
 
         # Create job entry
         job_id = str(uuid.uuid4())
-        self.generation_jobs[job_id] = {
-            "prompt_id": prompt_id,
-            "status": "queued",
-            "workflow": workflow,
-            "client_id": client_id,
-        }
+        job = {"prompt_id": prompt_id, "status": "queued", "workflow": workflow, "client_id": client_id}
+        await self.state.call(self.generation_jobs.__setitem__, job_id, job)
 
         return {"status": "success", "job_id": job_id, "prompt_id": prompt_id, "message": "Workflow queued for execution"}
 
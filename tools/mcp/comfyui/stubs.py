@@ -134,12 +134,12 @@ async def list_loras() -> Dict[str, List[str]]:
     return {}
 
 
-async def download_lora(filename: str, encoding: str = "base64") -> Dict[str, Any]:
+async def download_lora(filename: str, encoding: str = "url") -> Dict[str, Any]:
     """Download a LoRA model from ComfyUI.
 
     Args:
         filename: LoRA filename
-        encoding: Encoding format ("base64" or "raw")
+        encoding: "url" for a signed download link, or "base64"/"raw" to inline the data
 
     Returns:
         LoRA data and metadata
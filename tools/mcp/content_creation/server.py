@@ -52,11 +52,13 @@ class ContentCreationMCPServer(BaseMCPServer):
             self.latex_output_dir = ensure_directory(os.path.join(temp_dir, "latex"))
             self.logger.warning(f"Using fallback temp directory: {temp_dir}")
 
-    def _process_image_for_feedback(self, image_path: str) -> Dict[str, Any]:
+    def _process_image_for_feedback(self, image_path: str, encoding: str = "base64") -> Dict[str, Any]:
         """Process image for visual feedback with compression and format conversion
 
         Args:
             image_path: Path to the image file (PNG)
+            encoding: "url" stores the JPEG in the artifact store and returns a link,
+                "base64" inlines it
 
         Returns:
             Dictionary with visual feedback data or error information
@@ -89,6 +91,15 @@ class ContentCreationMCPServer(BaseMCPServer):
                     img.save(buffer, format="JPEG", quality=JPEG_QUALITY_LOW, optimize=True)
                     img_data = buffer.getvalue()
 
+                if encoding == "url":
+                    filename = os.path.splitext(os.path.basename(image_path))[0] + ".jpg"
+                    return {
+                        "format": "jpeg",
+                        "encoding": "url",
+                        "size_kb": len(img_data) / 1024,
+                        **self.artifacts.put_bytes(img_data, filename, content_type="image/jpeg"),
+                    }
+
                 img_base64 = base64.b64encode(img_data).decode("utf-8")
                 return {
                     "format": "jpeg",
@@ -132,6 +143,8 @@ class ContentCreationMCPServer(BaseMCPServer):
         return {
             "create_manim_animation": {
                 "description": "Create mathematical animations using Manim",
+                "executor": "thread",
+                "max_concurrency": 2,
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -162,6 +175,7 @@ class ContentCreationMCPServer(BaseMCPServer):
             },
             "compile_latex": {
                 "description": "Compile LaTeX documents to various formats",
+                "executor": "thread",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -186,12 +200,19 @@ class ContentCreationMCPServer(BaseMCPServer):
                             "default": True,
                             "description": "Return PNG preview image for visual verification",
                         },
+                        "feedback_encoding": {
+                            "type": "string",
+                            "enum": ["url", "base64"],
+                            "default": "base64",
+                            "description": "Return the preview image as a download link, or inline it as base64",
+                        },
                     },
                     "required": ["content"],
                 },
             },
             "render_tikz": {
                 "description": "Render TikZ diagrams as standalone images",
+                "executor": "thread",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -205,6 +226,12 @@ class ContentCreationMCPServer(BaseMCPServer):
                             "default": "pdf",
                             "description": "Output format for the diagram",
                         },
+                        "feedback_encoding": {
+                            "type": "string",
+                            "enum": ["url", "base64"],
+                            "default": "base64",
+                            "description": "Return the preview image as a download link, or inline it as base64",
+                        },
                     },
                     "required": ["tikz_code"],
                 },
@@ -315,6 +342,7 @@ class ContentCreationMCPServer(BaseMCPServer):
         format: str = "pdf",
         template: str = "article",
         visual_feedback: bool = True,
+        feedback_encoding: str = "base64",
     ) -> Dict[str, Any]:
         """Compile LaTeX document to various formats
 
@@ -323,6 +351,7 @@ class ContentCreationMCPServer(BaseMCPServer):
             format: Output format (pdf, dvi, ps)
             template: Document template to use
             visual_feedback: Whether to return PNG preview image
+            feedback_encoding: "url" for an artifact link to the preview, "base64" to inline it
 
         Returns:
             Dictionary with compiled document path and metadata
@@ -412,7 +441,7 @@ class ContentCreationMCPServer(BaseMCPServer):
 
                             # Process the PNG image for visual feedback
                             if os.path.exists(png_path):
-                                feedback_result = self._process_image_for_feedback(png_path)
+                                feedback_result = self._process_image_for_feedback(png_path, feedback_encoding)
                                 if "error" in feedback_result:
                                     result_data["visual_feedback_error"] = feedback_result["error"]
                                 else:
@@ -446,13 +475,20 @@ class ContentCreationMCPServer(BaseMCPServer):
             self.logger.error(f"LaTeX compilation error: {str(e)}")
             return {"success": False, "error": str(e)}
 
-    async def render_tikz(self, tikz_code: str, output_format: str = "pdf", visual_feedback: bool = True) -> Dict[str, Any]:
+    async def render_tikz(
+        self,
+        tikz_code: str,
+        output_format: str = "pdf",
+        visual_feedback: bool = True,
+        feedback_encoding: str = "base64",
+    ) -> Dict[str, Any]:
         """Render TikZ diagram as standalone image
 
         Args:
             tikz_code: TikZ code for the diagram
             output_format: Output format (pdf, png, svg)
             visual_feedback: Whether to return image data for visual verification
+            feedback_encoding: "url" for an artifact link to the preview, "base64" to inline it
 
         Returns:
             Dictionary with rendered diagram path and optional visual data
@@ -468,7 +504,7 @@ class ContentCreationMCPServer(BaseMCPServer):
         """
 
         # First compile to PDF
-        result = await self.compile_latex(latex_content, format="pdf", template="custom")
+        result = await self.compile_latex(latex_content, format="pdf", template="custom", feedback_encoding=feedback_encoding)
 
         if not result["success"]:
             return result
@@ -501,7 +537,7 @@ class ContentCreationMCPServer(BaseMCPServer):
 
                     # Add visual feedback for PNG format
                     if visual_feedback and output_format == "png":
-                        feedback_result = self._process_image_for_feedback(output_path)
+                        feedback_result = self._process_image_for_feedback(output_path, feedback_encoding)
                         if "error" in feedback_result:
                             result_data["visual_feedback_error"] = feedback_result["error"]
                         else:
@@ -554,7 +590,7 @@ class ContentCreationMCPServer(BaseMCPServer):
                 )
 
                 if os.path.exists(png_path):
-                    feedback_result = self._process_image_for_feedback(png_path)
+                    feedback_result = self._process_image_for_feedback(png_path, feedback_encoding)
                     if "error" in feedback_result:
                         result["visual_feedback_error"] = feedback_result["error"]
                     else:
@@ -1,21 +1,36 @@
 """Core utilities and base classes for MCP servers"""
 
+from typing import Any
+
 from .base_server import BaseMCPServer
-from .http_proxy import HTTPProxy
 from .utils import setup_logging, validate_environment
 
-# MCPClient is optional - only import if requests is available
-# This allows servers to run without the client dependency
-try:
-    from .client import MCPClient  # noqa: F401
-
-    __all__ = [
-        "BaseMCPServer",
-        "MCPClient",
-        "HTTPProxy",
-        "setup_logging",
-        "validate_environment",
-    ]
-except ImportError:
-    # Client not available (likely running in server container without requests)
-    __all__ = ["BaseMCPServer", "HTTPProxy", "setup_logging", "validate_environment"]
+__all__ = [
+    "BaseMCPServer",
+    "MCPClient",
+    "AsyncMCPClient",
+    "HTTPProxy",
+    "setup_logging",
+    "validate_environment",
+]
+
+# HTTPProxy (httpx + FastAPI) and the clients (requests) are imported on first
+# access so that servers, which only need BaseMCPServer, start without them.
+# MCPClient is optional - it raises ImportError if requests is not installed.
+_LAZY_EXPORTS = {
+    "HTTPProxy": ".http_proxy",
+    "MCPClient": ".client",
+    "AsyncMCPClient": ".client",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,266 @@
+"""Admission control and per-client rate limiting for tool calls
+
+Three independent limits protect a server from bursts:
+
+- A global in-flight limit on tool calls (MCP_MAX_IN_FLIGHT). Calls beyond
+  it wait in a bounded queue (MCP_MAX_QUEUED) and are rejected once the
+  queue is full.
+- A limit on background jobs started with run_background_job()
+  (MCP_MAX_BACKGROUND_JOBS, queue MCP_MAX_QUEUED_JOBS), so that a burst of
+  render requests cannot spawn an unbounded number of tasks.
+- A token bucket per client (MCP_RATE_LIMIT calls per second, bursts of
+  MCP_RATE_BURST), keyed by client_id or MCP session.
+
+Rejections raise AdmissionRejected, which the transports turn into HTTP 429
+or JSON-RPC error -32000 with a retry-after hint.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from . import metrics
+
+
+class AdmissionRejected(Exception):
+    """Raised when a call is refused because a limit is exhausted"""
+
+    def __init__(self, reason: str, retry_after: float, message: Optional[str] = None):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(message or f"Server busy ({reason}), retry after {retry_after:g}s")
+
+    @property
+    def retry_after_header(self) -> str:
+        """Value for the Retry-After header (whole seconds)"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+    def to_jsonrpc_error(self) -> Dict[str, Any]:
+        """JSON-RPC error object for this rejection"""
+        return {
+            "code": -32000,
+            "message": str(self),
+            "data": {"reason": self.reason, "retryAfter": self.retry_after},
+        }
+
+
+class ConcurrencyLimiter:
+    """In-flight limit with a bounded FIFO queue of waiters
+
+    ``reserve()`` decides synchronously whether a caller runs now, waits, or
+    is rejected, so callers that must answer before doing the work (e.g. a
+    tool that returns a job id) can fail fast.
+    """
+
+    def __init__(self, name: str, limit: Optional[int], max_waiting: Optional[int] = None):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.in_flight = 0
+        self.rejected = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        # Smoothed time a slot is held, used for the retry-after hint
+        self._avg_hold = 1.0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> float:
+        """Rough seconds until a slot frees up for a new caller"""
+        if not self.limit:
+            return 1.0
+        return round(max(1.0, self._avg_hold * (len(self._waiters) + 1) / self.limit), 1)
+
+    def reserve(self) -> Optional["asyncio.Future[None]"]:
+        """Take a slot now (None), or a place in the queue (a future to await)
+
+        Raises:
+            AdmissionRejected: If the slot limit and the queue are both full
+        """
+        if self.limit is None or (self.in_flight < self.limit and not self._waiters):
+            self.in_flight += 1
+            return None
+        if self.max_waiting is not None and len(self._waiters) >= self.max_waiting:
+            self.rejected += 1
+            raise AdmissionRejected(self.name, self.retry_after())
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        return waiter
+
+    async def wait(self, waiter: Optional["asyncio.Future[None]"]) -> None:
+        """Wait for a queued reservation to be granted a slot"""
+        if waiter is None:
+            return
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in the queue if needed"""
+        await self.wait(self.reserve())
+
+    def release(self, held_for: Optional[float] = None) -> None:
+        """Give a slot back, handing it to the oldest waiter"""
+        if held_for is not None:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * held_for
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block"""
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "max_waiting": self.max_waiting,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "rejected": self.rejected,
+        }
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now: Optional[float] = None) -> float:
+        """Consume one token; returns 0 on success or the seconds until one is available"""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets per client, keeping at most ``max_clients`` buckets"""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_clients = max_clients
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def check(self, client_key: str) -> None:
+        """Charge one call to a client
+
+        Raises:
+            AdmissionRejected: If the client has no tokens left
+        """
+        with self._lock:
+            bucket = self._buckets.get(client_key)
+            if bucket is None:
+                bucket = self._buckets[client_key] = TokenBucket(self.rate, self.burst)
+                if len(self._buckets) > self.max_clients:
+                    # The least recently seen client has most likely refilled its bucket by now
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client_key)
+            wait = bucket.take()
+            if wait:
+                self.rejected += 1
+        if wait:
+            raise AdmissionRejected("rate_limit", round(wait, 3), f"Rate limit exceeded for client '{client_key}'")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"rate": self.rate, "burst": self.burst, "clients": len(self._buckets), "rejected": self.rejected}
+
+
+class AdmissionController:
+    """Global call limit, background job limit and per-client rate limits"""
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        max_queued: Optional[int] = 100,
+        max_background_jobs: Optional[int] = None,
+        max_queued_jobs: Optional[int] = 100,
+        rate_limit: Optional[float] = None,
+        rate_burst: float = 10,
+    ):
+        self.requests = ConcurrencyLimiter("in_flight", max_in_flight, max_queued)
+        self.background = ConcurrencyLimiter("background_jobs", max_background_jobs, max_queued_jobs)
+        self.rate_limiter = RateLimiter(rate_limit, rate_burst) if rate_limit else None
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Create a controller from the MCP_MAX_* and MCP_RATE_* variables (0 disables a limit)"""
+
+        def limit(name: str, default: str) -> Optional[int]:
+            return int(os.environ.get(name, default)) or None
+
+        return cls(
+            max_in_flight=limit("MCP_MAX_IN_FLIGHT", "0"),
+            max_queued=limit("MCP_MAX_QUEUED", "100"),
+            max_background_jobs=limit("MCP_MAX_BACKGROUND_JOBS", "0"),
+            max_queued_jobs=limit("MCP_MAX_QUEUED_JOBS", "100"),
+            rate_limit=float(os.environ.get("MCP_RATE_LIMIT", "0")) or None,
+            rate_burst=float(os.environ.get("MCP_RATE_BURST", "10")),
+        )
+
+    def check_rate(self, client_key: str) -> None:
+        """Charge one call to a client's token bucket, if rate limiting is on"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.check(client_key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests.stats(),
+            "background_jobs": self.background.stats(),
+            "rate_limit": self.rate_limiter.stats() if self.rate_limiter is not None else None,
+        }
+
+    def prometheus_lines(self, labels: Optional[metrics.Labels] = None) -> List[str]:
+        """Exposition lines for admitted, queued and rejected calls"""
+        labels = labels or {}
+        limiters = (self.requests, self.background)
+        lines = []
+        gauges = (
+            ("mcp_admission_in_flight", "Calls or jobs holding a slot", "in_flight"),
+            ("mcp_admission_waiting", "Calls or jobs waiting for a slot", "waiting"),
+        )
+        for name, help_text, attribute in gauges:
+            lines.extend(metrics.format_metric_header(name, "gauge", help_text))
+            for limiter in limiters:
+                value = getattr(limiter, attribute)
+                lines.append(metrics.format_sample(name, value, {**labels, "limit": limiter.name}))
+
+        name = "mcp_admission_rejected_total"
+        lines.extend(metrics.format_metric_header(name, "counter", "Calls rejected by admission control"))
+        for limiter in limiters:
+            lines.append(metrics.format_sample(name, limiter.rejected, {**labels, "limit": limiter.name}))
+        rate_rejected = self.rate_limiter.rejected if self.rate_limiter is not None else 0
+        lines.append(metrics.format_sample(name, rate_rejected, {**labels, "limit": "rate_limit"}))
+        return lines
@@ -0,0 +1,322 @@
+"""Content-addressed artifact store with signed, expiring download links
+
+Tools that produce files (terrain projects, models, images) hand them to the
+store instead of inlining them as base64 in the JSON result::
+
+    ref = self.artifacts.put_file(path)
+    return {"success": True, "artifact": ref}
+
+The file is copied (with sendfile/copy_file_range where available) to
+``<root>/objects/<aa>/<sha256>`` and the tool returns a small reference with a
+URL of the form ``/artifacts/<sha256>/<filename>?expires=...&sig=...``. The
+signature is an HMAC over the digest, file name and expiry, so links cannot be
+forged or extended, and the route in BaseMCPServer serves them with
+FileResponse (zero-copy where the ASGI server supports it) and HTTP Range
+support for resumable downloads.
+
+Links only resolve when something serves ``/artifacts``: the server in HTTP
+mode, or whatever MCP_ARTIFACT_BASE_URL points at. ``default_encoding()``
+tells tools whether to return links or fall back to inline data.
+
+Identical content is stored once. Objects not written or re-published for
+MCP_ARTIFACT_MAX_AGE seconds are pruned. Forked workers and multiple HTTP
+workers share the store as long as they share its directory: the signing key
+is MCP_ARTIFACT_SECRET or a key file created in the store directory.
+"""
+
+import asyncio
+import functools
+import hashlib
+import hmac
+import logging
+import mimetypes
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Optional
+from urllib.parse import quote
+
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+HASH_CHUNK_BYTES = 1024 * 1024
+RANGE_CHUNK_BYTES = 256 * 1024
+
+
+class ArtifactStore:
+    """Files stored by SHA-256 and published through signed, expiring URLs"""
+
+    def __init__(
+        self,
+        root: str,
+        secret: Optional[bytes] = None,
+        ttl: float = 3600,
+        max_age: float = 86400,
+        base_url: str = "",
+        serving: bool = False,
+    ):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_age = max_age
+        self.base_url = base_url.rstrip("/")
+        # Whether links resolve; BaseMCPServer.run_http() sets it for its own route
+        self.serving = serving
+        self.logger = logging.getLogger("ArtifactStore")
+        self._secret = secret
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    @classmethod
+    def from_env(cls, server_name: str, port: int) -> "ArtifactStore":
+        """Create a store configured by the MCP_ARTIFACT_* variables"""
+        directory = "".join(c if c.isalnum() else "_" for c in server_name.lower())
+        root = os.environ.get("MCP_ARTIFACT_DIR") or os.path.join(tempfile.gettempdir(), "mcp-artifacts", directory)
+        secret = os.environ.get("MCP_ARTIFACT_SECRET")
+        base_url = os.environ.get("MCP_ARTIFACT_BASE_URL")
+        return cls(
+            root=root,
+            secret=secret.encode() if secret else None,
+            ttl=float(os.environ.get("MCP_ARTIFACT_TTL", "3600")),
+            max_age=float(os.environ.get("MCP_ARTIFACT_MAX_AGE", "86400")),
+            base_url=base_url or f"http://localhost:{port}",
+            serving=bool(base_url),
+        )
+
+    def default_encoding(self) -> str:
+        """ "url" when links can be downloaded, else "base64" (e.g. a stdio server)"""
+        return "url" if self.serving else "base64"
+
+    # Signing
+
+    @property
+    def secret(self) -> bytes:
+        """Signing key, read from (or created in) the store directory unless configured"""
+        if self._secret is None:
+            with self._lock:
+                if self._secret is None:
+                    self._secret = self._load_secret()
+        return self._secret
+
+    def _load_secret(self) -> bytes:
+        self.root.mkdir(parents=True, exist_ok=True)
+        key_file = self.root / ".secret"
+        try:
+            fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # Created by another worker; wait for it to be written
+            for _ in range(50):
+                key = key_file.read_bytes()
+                if key:
+                    return key
+                time.sleep(0.01)
+            raise RuntimeError(f"Artifact key file is empty: {key_file}")
+        key = secrets.token_hex(32).encode()
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+
+    def sign(self, digest: str, filename: str, expires: int) -> str:
+        message = f"{digest}/{filename}/{expires}".encode()
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()[:32]
+
+    def verify(self, digest: str, filename: str, expires: Optional[str], signature: Optional[str]) -> bool:
+        """Whether a link's signature is valid and it has not expired"""
+        if not expires or not signature or not DIGEST_PATTERN.match(digest):
+            return False
+        try:
+            expires_at = int(expires)
+        except ValueError:
+            return False
+        if expires_at < time.time():
+            return False
+        return hmac.compare_digest(self.sign(digest, filename, expires_at), signature)
+
+    # Storage
+
+    def path_for(self, digest: str) -> Path:
+        if not DIGEST_PATTERN.match(digest):
+            raise ValueError(f"Invalid artifact digest: {digest}")
+        return self.root / "objects" / digest[:2] / digest
+
+    def _store(self, digest: str, write: Callable[[str], Any]) -> Path:
+        """Store content under its digest unless already present
+
+        ``write`` fills a temporary path that is then renamed into place, so
+        readers never see a partial object.
+        """
+        target = self.path_for(digest)
+        if target.exists():
+            # Refresh the age used for pruning
+            os.utime(target)
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, target)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return target
+
+    def put_file(self, path: str, filename: Optional[str] = None, content_type: Optional[str] = None) -> Dict[str, Any]:
+        """Store a copy of a file and return a reference to it
+
+        The file is copied rather than linked, so later changes to the
+        original cannot alter stored content. Blocking; use publish_file()
+        from async code.
+        """
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(functools.partial(f.read, HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+
+        # copyfile() uses sendfile/copy_file_range where the OS provides them
+        self._store(digest.hexdigest(), lambda tmp_path: shutil.copyfile(path, tmp_path))
+        self._maybe_prune()
+        return self.reference(digest.hexdigest(), filename or os.path.basename(path), content_type)
+
+    def put_bytes(self, data: bytes, filename: str, content_type: Optional[str] = None) -> Dict[str, Any]:
+        """Store in-memory content and return a reference to it"""
+        digest = hashlib.sha256(data).hexdigest()
+        self._store(digest, lambda tmp_path: Path(tmp_path).write_bytes(data))
+        self._maybe_prune()
+        return self.reference(digest, filename, content_type)
+
+    async def publish_file(
+        self, path: str, filename: Optional[str] = None, content_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """put_file() without blocking the event loop"""
+        return await asyncio.to_thread(self.put_file, path, filename, content_type)
+
+    def reference(self, digest: str, filename: str, content_type: Optional[str] = None) -> Dict[str, Any]:
+        """Signed reference to stored content, valid for ``ttl`` seconds"""
+        path = self.path_for(digest)
+        filename = os.path.basename(filename) or digest
+        expires = int(time.time() + self.ttl)
+        query = f"expires={expires}&sig={self.sign(digest, filename, expires)}"
+        return {
+            "url": f"{self.base_url}/artifacts/{digest}/{quote(filename)}?{query}",
+            "sha256": digest,
+            "filename": filename,
+            "content_type": content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            "size": path.stat().st_size,
+            "expires_at": expires,
+        }
+
+    def _maybe_prune(self) -> None:
+        now = time.time()
+        if now - self._last_prune < min(self.max_age, 3600):
+            return
+        self._last_prune = now
+        try:
+            self.prune(now - self.max_age)
+        except OSError as e:
+            self.logger.warning(f"Artifact pruning failed: {e}")
+
+    def prune(self, older_than: float) -> int:
+        """Delete objects last stored before ``older_than`` (a timestamp)"""
+        removed = 0
+        objects = self.root / "objects"
+        if not objects.exists():
+            return 0
+        for path in objects.glob("*/*"):
+            try:
+                if path.stat().st_mtime < older_than:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            self.logger.info(f"Pruned {removed} artifacts")
+        return removed
+
+    # Serving
+
+    def response(self, digest: str, filename: str, headers: Dict[str, str]) -> Response:
+        """Response for a verified download request, honouring Range and If-None-Match"""
+        path = self.path_for(digest)
+        size = path.stat().st_size
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        common = {
+            "ETag": f'"{digest}"',
+            "Accept-Ranges": "bytes",
+            # Content never changes under a digest; the link itself expires
+            "Cache-Control": "private, max-age=31536000, immutable",
+        }
+
+        if headers.get("if-none-match") == common["ETag"]:
+            return Response(status_code=304, headers=common)
+
+        byte_range = None
+        # A conditional range for other content gets the whole (current) file
+        if headers.get("if-range", common["ETag"]) == common["ETag"]:
+            byte_range = parse_range(headers.get("range"), size)
+        if byte_range == "unsatisfiable":
+            return Response(status_code=416, headers={**common, "Content-Range": f"bytes */{size}"})
+        if byte_range is None:
+            return FileResponse(path, media_type=content_type, filename=filename, headers=common)
+
+        start, end = byte_range
+        return StreamingResponse(
+            _iter_file_range(path, start, end),
+            status_code=206,
+            media_type=content_type,
+            headers={
+                **common,
+                "Content-Range": f"bytes {start}-{end}/{size}",
+                "Content-Length": str(end - start + 1),
+                "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}",
+            },
+        )
+
+
+def parse_range(header: Optional[str], size: int) -> Any:
+    """Parse a single-range ``Range`` header
+
+    Returns:
+        (start, end) inclusive, None to serve the whole file (no header,
+        multiple ranges or an unknown unit), or "unsatisfiable"
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes=") :].strip().partition("-")
+    try:
+        if not start_text:
+            # Suffix range: the last N bytes
+            length = int(end_text)
+            if length <= 0:
+                return "unsatisfiable"
+            return (max(0, size - length), size - 1) if size else "unsatisfiable"
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return "unsatisfiable"
+    return start, min(end, size - 1)
+
+
+def _read_at(f: BinaryIO, position: int, length: int) -> bytes:
+    f.seek(position)
+    return f.read(length)
+
+
+async def _iter_file_range(path: Path, start: int, end: int) -> AsyncIterator[bytes]:
+    """Yield bytes ``start``..``end`` of a file, reading in a worker thread"""
+    loop = asyncio.get_running_loop()
+    with open(path, "rb") as f:
+        position = start
+        while position <= end:
+            length = min(RANGE_CHUNK_BYTES, end - position + 1)
+            chunk = await loop.run_in_executor(None, _read_at, f, position, length)
+            if not chunk:
+                break
+            position += len(chunk)
+            yield chunk
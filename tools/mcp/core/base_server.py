@@ -3,19 +3,34 @@
 import asyncio
 import json
 import logging
-import os  # noqa: F401
+import os
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional
 
-import mcp.server.stdio
-import mcp.types as types
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse, RedirectResponse, Response
-from mcp.server import InitializationOptions, NotificationOptions, Server
 from pydantic import BaseModel
 
-# from .client_registry import ClientRegistry  # Disabled for home lab use
+# Request/response types come from starlette (which FastAPI re-exports) so that
+# importing a server does not load FastAPI itself. FastAPI, uvicorn and the mcp
+# stdio server are imported only by the transport that needs them.
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
+
+from . import metrics, serialization
+from .admission import AdmissionController, AdmissionRejected
+from .artifacts import ArtifactStore
+from .client_registry import ClientRegistry
+from .event_bus import SessionEventBus, current_progress_token, current_session_id, format_sse
+from .executors import ToolExecutor
+from .response_cache import BYPASS_ARGUMENT, ResponseCache, is_cacheable_result
+from .state import create_state_backend
+from .tool_registry import ToolRegistry
+from .utils import should_sample, truncate_for_log
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
 
 
 class ToolRequest(BaseModel):
@@ -39,19 +54,76 @@ class ToolResponse(BaseModel):
     error: Optional[str] = None
 
 
+def _env_timeout(name: str) -> Optional[float]:
+    """Read an optional timeout in seconds from the environment"""
+    value = os.environ.get(name)
+    if not value:
+        return None
+    timeout = float(value)
+    return timeout if timeout > 0 else None
+
+
 class BaseMCPServer(ABC):
     """Base class for all MCP servers"""
 
+    # Maximum number of JSON-RPC batch entries processed concurrently.
+    # Subclasses may override this to suit their workload.
+    batch_concurrency: int = int(os.environ.get("MCP_BATCH_CONCURRENCY", "8"))
+    # Timeout in seconds for each JSON-RPC request in a batch (None disables it)
+    request_timeout: Optional[float] = _env_timeout("MCP_REQUEST_TIMEOUT")
+    # Run warmup() in a background thread when the server starts
+    warmup_on_start: bool = os.environ.get("MCP_WARMUP", "0") == "1"
+    # Request body logging in handle_messages: fraction of requests logged and
+    # maximum characters logged per body
+    log_body_sample_rate: float = float(os.environ.get("MCP_LOG_BODY_SAMPLE_RATE", "1.0"))
+    log_body_max_bytes: int = int(os.environ.get("MCP_LOG_BODY_MAX_BYTES", "2048"))
+    # Number of HTTP worker processes started by run_http()
+    http_workers: int = int(os.environ.get("MCP_HTTP_WORKERS", "1"))
+    # Sessions remembered in the shared state backend
+    max_sessions: int = 1000
+
     def __init__(self, name: str, version: str = "1.0.0", port: int = 8000):
         self.name = name
         self.version = version
         self.port = port
         self.logger = logging.getLogger(name)
-        self.app = FastAPI(title=name, version=version)
-        # Skip client registry for home lab use
-        # self.client_registry = ClientRegistry()
-        self._setup_routes()
-        self._setup_events()
+        # FastAPI app, built on first access to self.app (HTTP mode only)
+        self._app: Optional["FastAPI"] = None
+        self._warmup_task: Optional["asyncio.Future[None]"] = None
+        # Tools registered at runtime via register_tool(), merged with get_tools()
+        self._registered_tools: Dict[str, Dict[str, Any]] = {}
+        # Dispatch table shared by the HTTP, JSON-RPC and stdio transports
+        self.tool_registry = ToolRegistry(self)
+        # Serialized result sizes per tool
+        self.payload_stats = serialization.PayloadStats()
+        # Call counts, errors, in-flight and latency per tool, served at /metrics
+        self.tool_metrics = metrics.ToolMetrics()
+        # Results of tools that declare "cacheable" in their metadata
+        self.response_cache = ResponseCache.from_env(name)
+        # Thread and process pools for tools that declare an "executor"
+        self.tool_executor = ToolExecutor.from_env(self)
+        # Job tables and histories shared by all HTTP workers (MCP_STATE_BACKEND)
+        self.state = create_state_backend(name)
+        self.sessions = self.state.mapping("sessions", max_items=self.max_sessions)
+        # Progress/completion notifications pushed to SSE streams by session
+        self.event_bus = SessionEventBus()
+        # Registered clients, kept in the state backend rather than a file
+        self.client_registry = ClientRegistry(self.state.mapping("clients"))
+        # Global in-flight, background job and per-client rate limits
+        self.admission = AdmissionController.from_env()
+        # Files returned by tools as signed links instead of inline base64
+        self.artifacts = ArtifactStore.from_env(name, port)
+
+    @property
+    def app(self) -> "FastAPI":
+        """FastAPI application, created with its routes on first access"""
+        if self._app is None:
+            from fastapi import FastAPI
+
+            self._app = FastAPI(title=self.name, version=self.version)
+            self._setup_routes()
+            self._setup_events()
+        return self._app
 
     def _setup_events(self):
         """Setup startup/shutdown events"""
@@ -61,6 +133,45 @@ class BaseMCPServer(ABC):
             self.logger.info(f"{self.name} starting on port {self.port}")
             self.logger.info(f"Server version: {self.version}")
             self.logger.info("Server initialized successfully")
+            if self.warmup_on_start:
+                self.start_warmup()
+
+        @self.app.on_event("shutdown")
+        async def shutdown_event():
+            self.tool_executor.shutdown()
+
+    def warmup(self) -> None:
+        """Build caches and load heavy dependencies ahead of the first request
+
+        Runs in a worker thread. Subclasses extend this to initialize their
+        lazily created components; the default builds the tool dispatch table
+        and starts the worker pools its tools declare.
+        """
+        self.tool_registry.list_result()
+        kinds = {
+            entry.execution_policy.executor
+            for entry in self.tool_registry.entries.values()
+            if entry.execution_policy is not None and entry.execution_policy.executor
+        }
+        if kinds:
+            self.tool_executor.warm(sorted(kinds))
+
+    def start_warmup(self) -> "asyncio.Future[None]":
+        """Run warmup() in the background without delaying startup"""
+        if self._warmup_task is None:
+
+            async def runner():
+                loop = asyncio.get_running_loop()
+                started = loop.time()
+                try:
+                    await loop.run_in_executor(None, self.warmup)
+                except Exception as e:
+                    self.logger.warning(f"Warmup failed: {e}")
+                    return
+                self.logger.info(f"Warmup completed in {loop.time() - started:.2f}s")
+
+            self._warmup_task = asyncio.ensure_future(runner())
+        return self._warmup_task
 
     def _setup_routes(self):
         """Setup common HTTP routes"""
@@ -80,6 +191,8 @@ class BaseMCPServer(ABC):
         self.app.get("/mcp/clients")(self.list_clients)
         self.app.get("/mcp/clients/{client_id}")(self.get_client_info)
         self.app.get("/mcp/stats")(self.get_stats)
+        self.app.get("/metrics")(self.get_metrics)
+        self.app.get("/artifacts/{digest}/{filename}")(self.get_artifact)
         # OAuth discovery endpoints
         self.app.get("/.well-known/oauth-authorization-server")(self.oauth_discovery)
         self.app.get("/.well-known/oauth-authorization-server/mcp")(self.oauth_discovery)
@@ -105,12 +218,12 @@ class BaseMCPServer(ABC):
         return {"status": "healthy", "server": self.name, "version": self.version}
 
     async def register_client(self, request: Dict[str, Any]):
-        """Register a client - simplified for home lab use"""
+        """Register a client"""
         client_name = request.get("client", request.get("client_name", "unknown"))
         client_id = request.get("client_id", f"{client_name}_simple")
 
-        # Simple response without tracking for home lab
         self.logger.info(f"Client registration request from: {client_name}")
+        registration = await self.state.call(self.client_registry.register_client, client_name, {"client_id": client_id})
 
         return {
             "status": "registered",
@@ -118,14 +231,7 @@ class BaseMCPServer(ABC):
             "client_id": client_id,
             "server": self.name,
             "version": self.version,
-            "registration": {
-                "client_id": client_id,
-                "client_name": client_name,
-                "registered": True,
-                "is_update": False,
-                "registration_time": datetime.utcnow().isoformat(),
-                "server_time": datetime.utcnow().isoformat(),
-            },
+            "registration": registration,
         }
 
     async def register_client_oauth(self, request_data: Dict[str, Any], request: Request):
@@ -134,8 +240,10 @@ class BaseMCPServer(ABC):
         client_name = request_data.get("client_name", request_data.get("client", "claude-code"))
         client_id = f"{client_name}_oauth"
 
-        # Simple OAuth2-compliant response without tracking
         self.logger.info(f"OAuth registration request from: {client_name}")
+        await self.state.call(
+            self.client_registry.register_client, client_name, {"client_id": client_id, "redirect_uris": redirect_uris}
+        )
 
         return {
             "client_id": client_id,
@@ -221,10 +329,9 @@ class BaseMCPServer(ABC):
         # For HTTP Stream Transport, GET is used to establish SSE stream
         import uuid
 
-        from fastapi.responses import StreamingResponse
-
         # Generate session ID
         session_id = request.headers.get("Mcp-Session-Id", str(uuid.uuid4()))
+        last_event_id = request.headers.get("Last-Event-ID")
 
         async def event_generator():
             # Send initial connection event with session ID
@@ -235,13 +342,13 @@ class BaseMCPServer(ABC):
             }
             yield f"data: {json.dumps(connection_data)}\n\n"
 
-            # Keep connection alive with ping messages
-            import asyncio
-
-            while True:
-                await asyncio.sleep(15)  # Ping every 15 seconds as per spec
-                ping_data = {"type": "ping", "timestamp": datetime.utcnow().isoformat()}
-                yield f"data: {json.dumps(ping_data)}\n\n"
+            # Push session notifications, pinging every 15 seconds as per spec when idle
+            async for event in self.event_bus.subscribe(session_id, last_event_id, keepalive=15):
+                if event is None:
+                    ping_data = {"type": "ping", "timestamp": datetime.utcnow().isoformat()}
+                    yield f"data: {json.dumps(ping_data)}\n\n"
+                else:
+                    yield format_sse(event[1], event_id=event[0])
 
         return StreamingResponse(
             event_generator(),
@@ -256,23 +363,26 @@ class BaseMCPServer(ABC):
 
     async def handle_mcp_sse(self, request: Request):
         """Handle SSE requests for authenticated clients"""
-        import asyncio
-
-        from fastapi.responses import StreamingResponse
+        import uuid
 
         # Check authorization
         auth_header = request.headers.get("authorization", "")
         if not auth_header.startswith("Bearer "):
             raise HTTPException(status_code=401, detail="Unauthorized")
 
+        session_id = request.headers.get("Mcp-Session-Id", str(uuid.uuid4()))
+        last_event_id = request.headers.get("Last-Event-ID")
+
         async def event_generator():
             # Send initial connection event
             yield f"data: {json.dumps({'type': 'connected', 'message': 'SSE connection established'})}\n\n"
 
-            # Keep connection alive
-            while True:
-                await asyncio.sleep(30)
-                yield f"data: {json.dumps({'type': 'ping'})}\n\n"
+            # Push session notifications, keeping the connection alive when idle
+            async for event in self.event_bus.subscribe(session_id, last_event_id, keepalive=30):
+                if event is None:
+                    yield f"data: {json.dumps({'type': 'ping'})}\n\n"
+                else:
+                    yield format_sse(event[1], event_id=event[0])
 
         return StreamingResponse(
             event_generator(),
@@ -281,6 +391,7 @@ class BaseMCPServer(ABC):
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
                 "X-Accel-Buffering": "no",
+                "Mcp-Session-Id": session_id,
             },
         )
 
@@ -317,13 +428,15 @@ class BaseMCPServer(ABC):
         protocol_version = request.headers.get("MCP-Protocol-Version")
 
         # Log headers for debugging
-        self.logger.info(f"Messages request headers: {dict(request.headers)}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Messages request headers: {dict(request.headers)}")
         self.logger.info(f"Session ID: {session_id}, Response Mode: {response_mode}, Protocol Version: {protocol_version}")
 
         try:
             # Parse JSON-RPC request
             body = await request.json()
-            self.logger.info(f"Messages request body: {json.dumps(body)}")
+            if self.logger.isEnabledFor(logging.INFO) and should_sample(self.log_body_sample_rate):
+                self.logger.info(f"Messages request body: {truncate_for_log(body, self.log_body_max_bytes)}")
 
             # Check if this is an initialization request to generate session ID
             is_init_request = False
@@ -335,29 +448,33 @@ class BaseMCPServer(ABC):
 
                     session_id = str(uuid.uuid4())
                     self.logger.info(f"Generated new session ID: {session_id}")
+                await self.state.call(self._remember_session, session_id)
+
+            # Tools started by this request publish notifications to its session
+            current_session_id.set(session_id)
 
             # Process based on response mode
             if response_mode == "stream":
                 # Return SSE response for streaming
-                from fastapi.responses import StreamingResponse
 
                 async def event_generator():
+                    current_session_id.set(session_id)
+
                     # Send session info first if available
                     if session_id:
                         yield f"data: {json.dumps({'type': 'session', 'sessionId': session_id})}\n\n"
 
                     # Process the request
                     if isinstance(body, list):
-                        # Batch request
-                        for req in body:
-                            response = await self._process_jsonrpc_request(req)
+                        # Batch request - emit responses in completion order
+                        async for response in self._iter_jsonrpc_batch(body):
                             if response:
-                                yield f"data: {json.dumps(response)}\n\n"
+                                yield f"data: {serialization.dumps(response)}\n\n"
                     else:
                         # Single request
                         response = await self._process_jsonrpc_request(body)
                         if response:
-                            yield f"data: {json.dumps(response)}\n\n"
+                            yield f"data: {serialization.dumps(response)}\n\n"
 
                     # Send completion event
                     yield f"data: {json.dumps({'type': 'completion'})}\n\n"
@@ -377,8 +494,7 @@ class BaseMCPServer(ABC):
                 if isinstance(body, list):
                     responses = []
                     has_notifications = False
-                    for req in body:
-                        response = await self._process_jsonrpc_request(req)
+                    for response in await self._process_jsonrpc_batch(body):
                         if response is None:
                             has_notifications = True
                         else:
@@ -394,12 +510,10 @@ class BaseMCPServer(ABC):
                         )
 
                     # Otherwise return the responses
-                    return JSONResponse(
-                        content=responses,
-                        headers={
-                            "Content-Type": "application/json",
-                            "Mcp-Session-Id": session_id or "",
-                        },
+                    return self._json_response(
+                        responses,
+                        size_hint=sum(serialization.content_size_hint(r) for r in responses),
+                        headers={"Mcp-Session-Id": session_id or ""},
                     )
                 else:
                     response = await self._process_jsonrpc_request(body)
@@ -418,12 +532,10 @@ class BaseMCPServer(ABC):
                         if is_init_request and session_id:
                             self.logger.info(f"Returning session ID in response: {session_id}")
 
-                        return JSONResponse(
-                            content=response,
-                            headers={
-                                "Content-Type": "application/json",
-                                "Mcp-Session-Id": session_id or "",
-                            },
+                        return self._json_response(
+                            response,
+                            size_hint=serialization.content_size_hint(response),
+                            headers={"Mcp-Session-Id": session_id or ""},
                         )
         except Exception as e:
             self.logger.error(f"Messages endpoint error: {e}")
@@ -440,6 +552,16 @@ class BaseMCPServer(ABC):
                 },
             )
 
+    def _json_response(self, content: Any, size_hint: int = 0, headers: Optional[Dict[str, str]] = None) -> Response:
+        """Build a compact JSON response, streaming it in chunks when large"""
+        if size_hint >= serialization.STREAM_THRESHOLD_CHARS:
+            return StreamingResponse(
+                serialization.iter_json_chunks(content),
+                media_type="application/json",
+                headers=headers,
+            )
+        return Response(content=serialization.dumps_bytes(content), media_type="application/json", headers=headers)
+
     async def handle_jsonrpc(self, request: Request):
         """Handle JSON-RPC 2.0 requests for MCP protocol"""
         # Forward to the new streamable handler
@@ -452,11 +574,70 @@ class BaseMCPServer(ABC):
             headers={
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type, Authorization, Mcp-Session-Id, Mcp-Response-Mode",
+                "Access-Control-Allow-Headers": (
+                    "Content-Type, Authorization, Mcp-Session-Id, Mcp-Response-Mode, Last-Event-ID"
+                ),
                 "Access-Control-Max-Age": "86400",
             },
         )
 
+    async def _process_jsonrpc_batch_entry(self, request: Any) -> Optional[Dict[str, Any]]:
+        """Process one entry of a JSON-RPC batch, applying the request timeout"""
+        if not isinstance(request, dict):
+            return {
+                "jsonrpc": "2.0",
+                "error": {"code": -32600, "message": "Invalid Request"},
+                "id": None,
+            }
+
+        if self.request_timeout is None:
+            return await self._process_jsonrpc_request(request)
+
+        try:
+            return await asyncio.wait_for(self._process_jsonrpc_request(request), timeout=self.request_timeout)
+        except asyncio.TimeoutError:
+            method = request.get("method")
+            self.logger.warning(f"JSON-RPC request timed out after {self.request_timeout}s: method={method}")
+            if request.get("id") is None:
+                return None
+            return {
+                "jsonrpc": request.get("jsonrpc", "2.0"),
+                "error": {
+                    "code": -32000,
+                    "message": "Request timed out",
+                    "data": {"timeout": self.request_timeout, "method": method},
+                },
+                "id": request.get("id"),
+            }
+
+    async def _process_jsonrpc_batch(self, requests: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """Process a JSON-RPC batch concurrently, returning responses in request order"""
+        semaphore = asyncio.Semaphore(max(1, self.batch_concurrency))
+
+        async def run(request: Any) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self._process_jsonrpc_batch_entry(request)
+
+        return list(await asyncio.gather(*(run(request) for request in requests)))
+
+    async def _iter_jsonrpc_batch(self, requests: List[Any]) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Process a JSON-RPC batch concurrently, yielding responses as they complete"""
+        semaphore = asyncio.Semaphore(max(1, self.batch_concurrency))
+
+        async def run(request: Any) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self._process_jsonrpc_batch_entry(request)
+
+        tasks = [asyncio.ensure_future(run(request)) for request in requests]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Client went away or generator was closed early
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
     async def _process_jsonrpc_request(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Process a single JSON-RPC request"""
         jsonrpc = request.get("jsonrpc", "2.0")
@@ -505,7 +686,7 @@ class BaseMCPServer(ABC):
             # Return response if not a notification
             if not is_notification:
                 response = {"jsonrpc": jsonrpc, "result": result, "id": req_id}
-                self.logger.info(f"JSON-RPC response: {json.dumps(response)}")
+                self.logger.info(f"JSON-RPC response: method={method}, id={req_id}")
 
                 # After successful initialization, log that we're ready for more requests
                 if method == "initialize" and "protocolVersion" in result:
@@ -516,6 +697,11 @@ class BaseMCPServer(ABC):
                 return response
             return None
 
+        except AdmissionRejected as e:
+            self.logger.warning(f"Rejected {method}: {e}")
+            if not is_notification:
+                return {"jsonrpc": jsonrpc, "error": e.to_jsonrpc_error(), "id": req_id}
+            return None
         except Exception as e:
             self.logger.error(f"Error processing method {method}: {e}")
             if not is_notification:
@@ -553,22 +739,9 @@ class BaseMCPServer(ABC):
 
     async def _jsonrpc_list_tools(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle tools/list request"""
-        tools = self.get_tools()
-        self.logger.info(f"Available tools from get_tools(): {list(tools.keys())}")
-
-        tool_list = []
-
-        for tool_name, tool_info in tools.items():
-            tool_list.append(
-                {
-                    "name": tool_name,
-                    "description": tool_info.get("description", ""),
-                    "inputSchema": tool_info.get("parameters", {}),
-                }
-            )
-
-        self.logger.info(f"Returning {len(tool_list)} tools to client")
-        return {"tools": tool_list}
+        result = self.tool_registry.list_result()
+        self.logger.info(f"Returning {len(result['tools'])} tools to client")
+        return result
 
     async def _jsonrpc_call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle tools/call request"""
@@ -578,33 +751,36 @@ class BaseMCPServer(ABC):
         if not tool_name:
             raise ValueError("Tool name is required")
 
-        # Get available tools
-        tools = self.get_tools()
-        if tool_name not in tools:
+        if tool_name not in self.tool_registry:
             raise ValueError(f"Tool '{tool_name}' not found")
 
-        # Get the tool function
-        tool_func = getattr(self, tool_name, None)
-        if not tool_func:
+        if self.tool_registry.get(tool_name) is None:
             raise ValueError(f"Tool '{tool_name}' not implemented")
 
+        # Expose the client's progress token to the tool and any tasks it spawns
+        meta = params.get("_meta") or {}
+        progress_token = current_progress_token.set(meta.get("progressToken"))
+
         # Execute the tool
         try:
-            result = await tool_func(**arguments)
+            result = await self.dispatch_tool(tool_name, arguments)
 
             # Convert result to MCP content format
-            if isinstance(result, dict):
-                content_text = json.dumps(result, indent=2)
-            else:
-                content_text = str(result)
+            content_text = serialization.serialize_tool_result(result)
+            self.payload_stats.record(tool_name, serialization.encoded_length(content_text))
 
             return {"content": [{"type": "text", "text": content_text}]}
+        except AdmissionRejected:
+            # Reported as a JSON-RPC error so clients can honour the retry hint
+            raise
         except Exception as e:
             self.logger.error(f"Error calling tool {tool_name}: {e}")
             return {
                 "content": [{"type": "text", "text": f"Error executing {tool_name}: {str(e)}"}],
                 "isError": True,
             }
+        finally:
+            current_progress_token.reset(progress_token)
 
     async def mcp_discovery(self):
         """MCP protocol discovery endpoint"""
@@ -659,12 +835,11 @@ class BaseMCPServer(ABC):
 
     async def mcp_capabilities(self):
         """Return server capabilities"""
-        tools = self.get_tools()
         return {
             "capabilities": {
                 "tools": {
-                    "list": list(tools.keys()),
-                    "count": len(tools),
+                    "list": self.tool_registry.names(),
+                    "count": len(self.tool_registry),
                 },
                 "prompts": {
                     "supported": False,
@@ -677,47 +852,44 @@ class BaseMCPServer(ABC):
 
     async def list_tools(self):
         """List available tools"""
-        tools = self.get_tools()
-        return {
-            "tools": [
-                {
-                    "name": tool_name,
-                    "description": tool_info.get("description", ""),
-                    "parameters": tool_info.get("parameters", {}),
-                }
-                for tool_name, tool_info in tools.items()
-            ]
-        }
+        return Response(content=self.tool_registry.http_list_payload(), media_type="application/json")
 
     async def execute_tool(self, request: ToolRequest):
         """Execute a tool with given arguments"""
         try:
-            # Skip client tracking for home lab use
-
-            tools = self.get_tools()
-            if request.tool not in tools:
+            if request.tool not in self.tool_registry:
                 raise HTTPException(status_code=404, detail=f"Tool '{request.tool}' not found")
 
-            # Get the tool function
-            tool_func = getattr(self, request.tool, None)
-            if not tool_func:
+            if self.tool_registry.get(request.tool) is None:
                 raise HTTPException(status_code=501, detail=f"Tool '{request.tool}' not implemented")
 
             # Execute the tool
-            result = await tool_func(**request.get_args())
+            result = await self.dispatch_tool(request.tool, request.get_args(), client_id=request.client_id)
 
             return ToolResponse(success=True, result=result)
 
+        except AdmissionRejected as e:
+            return self._rejection_response(e)
         except Exception as e:
             self.logger.error(f"Error executing tool {request.tool}: {str(e)}")
             return ToolResponse(success=False, result=None, error=str(e))
 
+    def _rejection_response(self, rejection: AdmissionRejected) -> Response:
+        """HTTP 429 response for a call refused by admission control"""
+        self.logger.warning(str(rejection))
+        body = {"success": False, "result": None, "error": str(rejection), "retry_after": rejection.retry_after}
+        return JSONResponse(status_code=429, content=body, headers={"Retry-After": rejection.retry_after_header})
+
     async def list_clients(self, active_only: bool = True):
-        """List clients - returns empty for home lab use"""
-        return {"clients": [], "count": 0, "active_only": active_only}
+        """List registered clients"""
+        clients = await self.state.call(self.client_registry.list_clients, active_only)
+        return {"clients": clients, "count": len(clients), "active_only": active_only}
 
     async def get_client_info(self, client_id: str):
-        """Get client info - returns simple response for home lab use"""
+        """Get client info, synthesized for clients that never registered"""
+        client = await self.state.call(self.client_registry.get_client, client_id)
+        if client is not None:
+            return client
         return {
             "client_id": client_id,
             "client_name": client_id.replace("_oauth", "").replace("_simple", ""),
@@ -727,90 +899,359 @@ class BaseMCPServer(ABC):
 
     async def get_stats(self):
         """Get server statistics - simplified for home lab use"""
+        sessions = await self.state.call(len, self.sessions)
+        clients = await self.state.call(self.client_registry.get_client_stats)
         return {
             "server": {
                 "name": self.name,
                 "version": self.version,
-                "tools_count": len(self.get_tools()),
-            },
-            "clients": {
-                "total_clients": 0,
-                "active_clients": 0,
-                "inactive_clients": 0,
-                "clients_active_last_hour": 0,
-                "total_requests": 0,
+                "tools_count": len(self.tool_registry),
             },
+            "tools": self.tool_metrics.snapshot(),
+            "payloads": self.payload_stats.snapshot(),
+            "cache": self.response_cache.stats(),
+            "executors": self.tool_executor.stats(),
+            "events": self.event_bus.stats(),
+            "sessions": sessions,
+            "admission": self.admission.stats(),
+            "clients": clients,
         }
 
+    async def get_metrics(self):
+        """Per-tool metrics in Prometheus text format"""
+        labels = {"server": self.name}
+        text = self.tool_metrics.render_prometheus(labels=labels, payloads=self.payload_stats.snapshot())
+        text += metrics.render(self.response_cache.prometheus_lines(labels))
+        text += metrics.render(self.tool_executor.prometheus_lines(labels))
+        text += metrics.render(self.admission.prometheus_lines(labels))
+        extra = self.extra_metrics_lines(labels)
+        if extra:
+            text += metrics.render(extra)
+        return Response(content=text, media_type="text/plain; version=0.0.4")
+
+    def extra_metrics_lines(self, labels: metrics.Labels) -> List[str]:
+        """Server-specific Prometheus exposition lines appended to /metrics"""
+        return []
+
+    async def get_artifact(self, digest: str, filename: str, request: Request):
+        """Serve a stored artifact through a signed link (see self.artifacts)"""
+        params = request.query_params
+        if not self.artifacts.verify(digest, filename, params.get("expires"), params.get("sig")):
+            raise HTTPException(status_code=403, detail="Invalid or expired artifact link")
+        if not self.artifacts.path_for(digest).exists():
+            raise HTTPException(status_code=404, detail="Artifact not found")
+        return self.artifacts.response(digest, filename, {k.lower(): v for k, v in request.headers.items()})
+
     @abstractmethod
     def get_tools(self) -> Dict[str, Dict[str, Any]]:
         """Return dictionary of available tools and their metadata"""
         pass
 
+    async def register_tool(
+        self,
+        name: str,
+        description: str,
+        input_schema: Dict[str, Any],
+        handler: Callable[..., Any],
+    ) -> None:
+        """Register an additional tool at runtime
+
+        The tool is merged with those returned by get_tools() and the dispatch
+        table is invalidated so every transport picks it up on the next request.
+        """
+        self._registered_tools[name] = {
+            "description": description,
+            "parameters": input_schema,
+            "handler": handler,
+        }
+        self.tool_registry.invalidate()
+        self.response_cache.clear(name)
+        self.logger.info(f"Registered tool: {name}")
+
+    def publish_notification(
+        self, method: str, params: Optional[Dict[str, Any]] = None, session_id: Optional[str] = None
+    ) -> Optional[int]:
+        """Push a JSON-RPC notification to a session's SSE stream
+
+        Defaults to the session of the request being handled, which is also
+        inherited by background tasks started from a tool call.
+
+        Returns:
+            The SSE event id, or None if there is no session
+        """
+        message = {"jsonrpc": "2.0", "method": method, "params": params or {}}
+        return self.event_bus.publish(session_id or current_session_id.get(), message)
+
+    def report_progress(
+        self,
+        progress: float,
+        total: Optional[float] = None,
+        message: Optional[str] = None,
+        progress_token: Optional[Any] = None,
+        session_id: Optional[str] = None,
+    ) -> Optional[int]:
+        """Publish a notifications/progress message for the current tool call
+
+        The progress token defaults to the one sent by the client in
+        params._meta.progressToken; without a token nothing is published.
+        """
+        token = progress_token if progress_token is not None else current_progress_token.get()
+        if token is None:
+            return None
+        params: Dict[str, Any] = {"progressToken": token, "progress": progress}
+        if total is not None:
+            params["total"] = total
+        if message:
+            params["message"] = message
+        return self.publish_notification("notifications/progress", params, session_id=session_id)
+
+    def run_background_job(self, coro: Any, job_id: str, job_type: str = "job") -> "asyncio.Task[Any]":
+        """Run a coroutine as a background task and publish its completion
+
+        A notifications/job/completed (or notifications/job/failed) message is
+        published to the calling session when the coroutine finishes, so
+        clients can wait on the SSE stream instead of polling a status tool.
+
+        At most MCP_MAX_BACKGROUND_JOBS jobs run at once; the rest wait in a
+        bounded queue.
+
+        Raises:
+            AdmissionRejected: If the job queue is full. Call this before
+                recording the job anywhere, so a rejected job leaves no trace.
+        """
+        session_id = current_session_id.get()
+        limiter = self.admission.background
+        try:
+            waiter = limiter.reserve()
+        except AdmissionRejected:
+            coro.close()
+            raise
+
+        async def runner():
+            try:
+                await limiter.wait(waiter)
+            except asyncio.CancelledError:
+                coro.close()
+                raise
+            started = time.monotonic()
+            try:
+                result = await coro
+            except Exception as e:
+                self.publish_notification(
+                    "notifications/job/failed",
+                    {"jobId": job_id, "jobType": job_type, "error": str(e)},
+                    session_id=session_id,
+                )
+                raise
+            finally:
+                limiter.release(time.monotonic() - started)
+            self.publish_notification(
+                "notifications/job/completed",
+                {"jobId": job_id, "jobType": job_type},
+                session_id=session_id,
+            )
+            return result
+
+        return asyncio.create_task(runner())
+
+    async def dispatch_tool(
+        self, tool_name: str, arguments: Optional[Dict[str, Any]] = None, client_id: Optional[str] = None
+    ) -> Any:
+        """Validate arguments and invoke a tool through the dispatch table
+
+        Calls are charged to the client's rate limit (by ``client_id``, else by
+        MCP session) and run within the global in-flight limit. Results of
+        tools declaring ``cacheable`` metadata are served from response_cache
+        unless the arguments include ``_bypass_cache: true``. Tools declaring
+        ``executor`` or ``max_concurrency`` run through tool_executor.
+
+        Raises:
+            KeyError: If the tool is unknown or has no implementation
+            ToolArgumentError: If the arguments do not match the input schema
+            AdmissionRejected: If a rate limit or queue limit is exhausted
+        """
+        entry = self.tool_registry.get(tool_name)
+        if entry is None:
+            raise KeyError(tool_name)
+
+        self.admission.check_rate(client_id or current_session_id.get() or "anonymous")
+        if client_id:
+            await self.state.call(self.client_registry.update_client_activity, client_id)
+
+        arguments = arguments or {}
+        policy = entry.cache_policy
+        bypass_cache = False
+        if BYPASS_ARGUMENT in arguments:
+            arguments = dict(arguments)
+            bypass_cache = bool(arguments.pop(BYPASS_ARGUMENT))
+
+        with self.tool_metrics.track(tool_name):
+            entry.validator.validate(arguments)
+
+            cache_key = policy.key(arguments) if policy is not None else None
+            if cache_key is not None and not bypass_cache:
+                hit, cached = self.response_cache.get(tool_name, cache_key)
+                if hit:
+                    return cached
+
+            async with self.admission.requests.slot():
+                result = await self.tool_executor.run(tool_name, entry.handler, arguments, entry.execution_policy)
+
+            if policy is not None and cache_key is not None and is_cacheable_result(result):
+                self.response_cache.put(tool_name, cache_key, result, policy.ttl)
+        return result
+
     async def run_stdio(self):
         """Run the server in stdio mode (for Claude desktop app)"""
-        server = Server(self.name)
+        import mcp.server.stdio
+        import mcp.types as types
+        from mcp.server import InitializationOptions, NotificationOptions, Server
 
-        # Store tools and their functions for later access
-        self._tools = self.get_tools()
-        self._tool_funcs = {}
-        for tool_name, tool_info in self._tools.items():
-            tool_func = getattr(self, tool_name, None)
-            if tool_func:
-                self._tool_funcs[tool_name] = tool_func
+        server = Server(self.name)
 
         @server.list_tools()
         async def list_tools() -> List[types.Tool]:
             """List available tools"""
-            tools = []
-            for tool_name, tool_info in self._tools.items():
-                tools.append(
-                    types.Tool(
-                        name=tool_name,
-                        description=tool_info.get("description", ""),
-                        inputSchema=tool_info.get("parameters", {}),
-                    )
-                )
-            return tools
+            return list(self.tool_registry.stdio_tools())
 
         @server.call_tool()
         async def call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
             """Call a tool with given arguments"""
-            if name not in self._tool_funcs:
+            if self.tool_registry.get(name) is None:
                 return [types.TextContent(type="text", text=f"Tool '{name}' not found")]
 
             try:
-                # Call the tool function
-                result = await self._tool_funcs[name](**arguments)
+                # Call the tool through the shared dispatch table
+                result = await self.dispatch_tool(name, arguments)
 
                 # Convert result to MCP response format
-                if isinstance(result, dict):
-                    return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
-                return [types.TextContent(type="text", text=str(result))]
+                content_text = serialization.serialize_tool_result(result)
+                self.payload_stats.record(name, serialization.encoded_length(content_text))
+                return [types.TextContent(type="text", text=content_text)]
             except Exception as e:
                 self.logger.error(f"Error calling tool {name}: {str(e)}")
                 return [types.TextContent(type="text", text=f"Error: {str(e)}")]
 
+        if self.warmup_on_start:
+            self.start_warmup()
+
         # Run the stdio server
-        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-            await server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name=self.name,
-                    server_version=self.version,
-                    capabilities=server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={},
+        try:
+            async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                await server.run(
+                    read_stream,
+                    write_stream,
+                    InitializationOptions(
+                        server_name=self.name,
+                        server_version=self.version,
+                        capabilities=server.get_capabilities(
+                            notification_options=NotificationOptions(),
+                            experimental_capabilities={},
+                        ),
                     ),
-                ),
+                )
+        finally:
+            self.tool_executor.shutdown()
+
+    def _remember_session(self, session_id: str) -> None:
+        """Record a session in the shared state; the mapping drops the oldest beyond max_sessions"""
+        self.sessions[session_id] = {"created": datetime.utcnow().isoformat(), "worker": os.getpid()}
+
+    def run_http(self, workers: Optional[int] = None):
+        """Run the server in HTTP mode
+
+        Args:
+            workers: Number of worker processes (defaults to MCP_HTTP_WORKERS).
+                More than one needs MCP_STATE_BACKEND=redis; with the memory
+                backend each worker would keep its own jobs, sessions and
+                event bus, so a single worker is started instead.
+        """
+        import uvicorn
+
+        workers = workers or self.http_workers
+        if workers > 1 and not hasattr(os, "fork"):
+            self.logger.warning("Multiple HTTP workers need os.fork; starting a single worker")
+            workers = 1
+        if workers > 1 and not self.state.shared:
+            self.logger.error(
+                f"MCP_HTTP_WORKERS={workers} needs MCP_STATE_BACKEND=redis: with the memory backend each worker "
+                "has its own sessions, jobs, admission limits and event bus; starting a single worker"
             )
+            workers = 1
+
+        # The /artifacts route is served from here on, so tools may return links
+        self.artifacts.serving = True
+        if workers <= 1:
+            uvicorn.run(self.app, host="0.0.0.0", port=self.port)
+            return
+
+        self._run_http_workers(workers)
+
+    def _run_http_workers(self, workers: int) -> None:
+        """Serve one listening socket from several forked uvicorn workers
+
+        The parent binds the port, forks the workers, restarts any that exit
+        unexpectedly and stops them all on SIGINT/SIGTERM.
+        """
+        import signal
+        import socket
 
-    def run_http(self):
-        """Run the server in HTTP mode"""
         import uvicorn
 
-        uvicorn.run(self.app, host="0.0.0.0", port=self.port)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("0.0.0.0", self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+
+        # Build the app once so each worker starts from a copy of it
+        app = self.app
+
+        def spawn() -> int:
+            pid = os.fork()
+            if pid == 0:
+                exit_code = 0
+                try:
+                    signal.signal(signal.SIGINT, signal.SIG_DFL)
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    uvicorn.Server(uvicorn.Config(app)).run(sockets=[sock])
+                except BaseException:
+                    exit_code = 1
+                finally:
+                    os._exit(exit_code)
+            return pid
+
+        children = {spawn() for _ in range(workers)}
+        self.logger.info(f"Started {workers} HTTP workers on port {self.port}: {sorted(children)}")
+
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+            for child in children:
+                try:
+                    os.kill(child, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        try:
+            while children:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                children.discard(pid)
+                if not stopping:
+                    self.logger.warning(f"HTTP worker {pid} exited with status {status}; restarting")
+                    children.add(spawn())
+        finally:
+            sock.close()
 
     def run(self, mode: str = "http"):
         """Run the server in specified mode"""
@@ -1,11 +1,19 @@
 """MCP Client for interacting with MCP servers"""
 
+import asyncio
+import importlib.util
 import logging
 import os
-from typing import Any, Dict, Optional
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
 # Load environment variables
 load_dotenv()
@@ -26,26 +34,205 @@ MCP_SERVERS = {
     "crush": os.getenv("MCP_CRUSH_URL", "http://localhost:8015"),
 }
 
+# HTTP statuses that mean the request was not processed and may be retried
+RETRY_STATUSES = frozenset({429, 503})
 
-class MCPClient:
-    """Client for interacting with MCP servers"""
+# A tool call is either (tool, arguments) or {"tool": ..., "arguments": ...}
+ToolCall = Union[Tuple[str, Dict[str, Any]], Dict[str, Any]]
+
+
+def _resolve_base_url(server_name: Optional[str], base_url: Optional[str]) -> str:
+    """Resolve the server URL from an explicit URL or a known server name"""
+    if base_url:
+        return base_url
+    if server_name and server_name in MCP_SERVERS:
+        return MCP_SERVERS[server_name]
+    # Default to code quality server for backward compatibility
+    return MCP_SERVERS["code_quality"]
+
+
+def _normalize_call(call: ToolCall) -> Tuple[str, Dict[str, Any]]:
+    """Convert a tool call to a (tool, arguments) pair"""
+    if isinstance(call, dict):
+        return call["tool"], call.get("arguments") or call.get("parameters") or {}
+    tool, arguments = call
+    return tool, arguments or {}
+
+
+def _backoff_delay(attempt: int, backoff_factor: float, max_backoff: float, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, honoring a Retry-After header"""
+    if retry_after:
+        try:
+            return min(float(retry_after), max_backoff)
+        except ValueError:
+            pass
+    return random.uniform(0, min(max_backoff, backoff_factor * (2**attempt)))
+
+
+def _is_connect_failure(error: requests.ConnectionError) -> bool:
+    """Whether a request failed before reaching the server, so a retry cannot run the call twice"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    # requests wraps urllib3's MaxRetryError, whose reason is the underlying failure
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+
+
+def _is_server_failure(error: Exception) -> bool:
+    """Whether a request error should count against the server's circuit"""
+    response = getattr(error, "response", None)
+    return response is None or response.status_code >= 500
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the server's circuit is open"""
+
+
+class CircuitBreaker:
+    """Per-server circuit breaker
+
+    After ``failure_threshold`` consecutive failed calls the circuit opens
+    and calls are rejected without touching the network. Once
+    ``reset_timeout`` seconds have passed, the server's health check decides
+    whether to close the circuit again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def should_probe(self) -> bool:
+        """Whether an open circuit is due for a health check"""
+        with self._lock:
+            return self.opened_at is not None and time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
 
-    def __init__(self, server_name: Optional[str] = None, base_url: Optional[str] = None):
-        if base_url:
-            self.base_url = base_url
-        elif server_name and server_name in MCP_SERVERS:
-            self.base_url = MCP_SERVERS[server_name]
+    def record_probe(self, healthy: bool) -> None:
+        """Apply the result of a health check on an open circuit"""
+        if healthy:
+            self.record_success()
         else:
-            # Default to code quality server for backward compatibility
-            self.base_url = MCP_SERVERS["code_quality"]
+            with self._lock:
+                self.opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(base_url: str) -> CircuitBreaker:
+    """Get the circuit breaker shared by all clients of a server"""
+    with _breakers_lock:
+        if base_url not in _breakers:
+            _breakers[base_url] = CircuitBreaker()
+        return _breakers[base_url]
+
+
+class MCPClient:
+    """Client for interacting with MCP servers
+
+    Requests go through a pooled keep-alive session. Failures to connect and
+    429/503 responses are retried with jittered exponential backoff, and
+    repeated failures open a per-server circuit breaker.
+    """
+
+    def __init__(
+        self,
+        server_name: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = 60.0,
+        max_retries: int = 2,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 10.0,
+        pool_size: int = 10,
+    ):
+        self.base_url = _resolve_base_url(server_name, base_url)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.circuit_breaker = get_circuit_breaker(self.base_url)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        """Close pooled connections"""
+        self.session.close()
+
+    def __enter__(self) -> "MCPClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _check_circuit(self) -> None:
+        """Reject the call if the circuit is open and the server is still unhealthy"""
+        if not self.circuit_breaker.is_open:
+            return
+        if self.circuit_breaker.should_probe():
+            self.circuit_breaker.record_probe(self.health_check())
+        if self.circuit_breaker.is_open:
+            raise CircuitOpenError(f"Circuit open for {self.base_url}")
+
+    def _post_with_retries(self, url: str, payload: Dict[str, Any]) -> requests.Response:
+        """POST with bounded retries on failures to connect and retryable statuses
+
+        Errors after the request may have reached the server (e.g. a dropped
+        connection while reading the response) are not retried, since the
+        tool call may not be idempotent.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except requests.ConnectionError as e:
+                if not _is_connect_failure(e) or attempt >= self.max_retries:
+                    raise
+                delay = _backoff_delay(attempt, self.backoff_factor, self.max_backoff)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = _backoff_delay(attempt, self.backoff_factor, self.max_backoff, response.headers.get("Retry-After"))
+            attempt += 1
+            logger.debug(f"Retrying {url} in {delay:.2f}s (attempt {attempt}/{self.max_retries})")
+            time.sleep(delay)
 
     def execute_tool(self, tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute an MCP tool"""
         url = f"{self.base_url}/tools/execute"
 
         try:
-            response = requests.post(url, json={"tool": tool, "arguments": arguments})
-            response.raise_for_status()
+            self._check_circuit()
+            try:
+                response = self._post_with_retries(url, {"tool": tool, "arguments": arguments})
+                response.raise_for_status()
+            except requests.RequestException as e:
+                # Client errors (4xx) say nothing about the server's health
+                if _is_server_failure(e):
+                    self.circuit_breaker.record_failure()
+                raise
+            self.circuit_breaker.record_success()
             result = response.json()
             assert isinstance(result, dict)  # Type assertion for mypy
             return result
@@ -53,12 +240,29 @@ class MCPClient:
             logger.error(f"Error executing tool {tool}: {e}")
             return {"success": False, "error": str(e)}
 
+    def execute_many(self, calls: Iterable[ToolCall], max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """Execute several tool calls concurrently against this server
+
+        Args:
+            calls: (tool, arguments) pairs or {"tool", "arguments"} dicts
+            max_concurrency: Maximum number of calls in flight
+
+        Returns:
+            Results in the same order as the calls
+        """
+        normalized = [_normalize_call(call) for call in calls]
+        if not normalized:
+            return []
+        workers = max(1, min(max_concurrency, self.pool_size, len(normalized)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda call: self.execute_tool(*call), normalized))
+
     def list_tools(self) -> Dict[str, Any]:
         """List available MCP tools"""
         url = f"{self.base_url}/tools"
 
         try:
-            response = requests.get(url)
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
             result = response.json()
             assert isinstance(result, dict)  # Type assertion for mypy
@@ -72,7 +276,144 @@ class MCPClient:
         url = f"{self.base_url}/health"
 
         try:
-            response = requests.get(url, timeout=5)
-            return response.status_code == 200
+            response = self.session.get(url, timeout=5)
+            return bool(response.status_code == 200)
+        except Exception:
+            return False
+
+
+class AsyncMCPClient:
+    """Async client for interacting with MCP servers
+
+    Uses a pooled httpx.AsyncClient (HTTP/2 when the h2 package is
+    installed) with the same retry and circuit breaker behavior as
+    MCPClient.
+    """
+
+    def __init__(
+        self,
+        server_name: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = 60.0,
+        max_retries: int = 2,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 10.0,
+        pool_size: int = 10,
+    ):
+        import httpx
+
+        self.base_url = _resolve_base_url(server_name, base_url)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.circuit_breaker = get_circuit_breaker(self.base_url)
+
+        self._httpx = httpx
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            http2=importlib.util.find_spec("h2") is not None,
+        )
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncMCPClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _check_circuit(self) -> None:
+        """Reject the call if the circuit is open and the server is still unhealthy"""
+        if not self.circuit_breaker.is_open:
+            return
+        if self.circuit_breaker.should_probe():
+            self.circuit_breaker.record_probe(await self.health_check())
+        if self.circuit_breaker.is_open:
+            raise CircuitOpenError(f"Circuit open for {self.base_url}")
+
+    async def _post_with_retries(self, url: str, payload: Dict[str, Any]) -> Any:
+        """POST with bounded retries on failures to connect and retryable statuses"""
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.post(url, json=payload)
+            except self._httpx.ConnectError:
+                if attempt >= self.max_retries:
+                    raise
+                delay = _backoff_delay(attempt, self.backoff_factor, self.max_backoff)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = _backoff_delay(attempt, self.backoff_factor, self.max_backoff, response.headers.get("Retry-After"))
+            attempt += 1
+            logger.debug(f"Retrying {url} in {delay:.2f}s (attempt {attempt}/{self.max_retries})")
+            await asyncio.sleep(delay)
+
+    async def execute_tool(self, tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute an MCP tool"""
+        url = f"{self.base_url}/tools/execute"
+
+        try:
+            await self._check_circuit()
+            try:
+                response = await self._post_with_retries(url, {"tool": tool, "arguments": arguments})
+                response.raise_for_status()
+            except self._httpx.HTTPError as e:
+                # Client errors (4xx) say nothing about the server's health
+                if _is_server_failure(e):
+                    self.circuit_breaker.record_failure()
+                raise
+            self.circuit_breaker.record_success()
+            result = response.json()
+            assert isinstance(result, dict)  # Type assertion for mypy
+            return result
+        except Exception as e:
+            logger.error(f"Error executing tool {tool}: {e}")
+            return {"success": False, "error": str(e)}
+
+    async def execute_many(self, calls: Iterable[ToolCall], max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """Execute several tool calls concurrently against this server
+
+        Args:
+            calls: (tool, arguments) pairs or {"tool", "arguments"} dicts
+            max_concurrency: Maximum number of calls in flight
+
+        Returns:
+            Results in the same order as the calls
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.execute_tool(tool, arguments)
+
+        return list(await asyncio.gather(*(run(*_normalize_call(call)) for call in calls)))
+
+    async def list_tools(self) -> Dict[str, Any]:
+        """List available MCP tools"""
+        url = f"{self.base_url}/tools"
+
+        try:
+            response = await self.client.get(url)
+            response.raise_for_status()
+            result = response.json()
+            assert isinstance(result, dict)  # Type assertion for mypy
+            return result
+        except Exception as e:
+            logger.error(f"Error listing tools: {e}")
+            return {}
+
+    async def health_check(self) -> bool:
+        """Check if MCP server is healthy"""
+        url = f"{self.base_url}/health"
+
+        try:
+            response = await self.client.get(url, timeout=5)
+            return bool(response.status_code == 200)
         except Exception:
             return False
@@ -0,0 +1,203 @@
+"""Per-session event bus for pushing notifications over SSE
+
+Long-running tools publish progress and completion notifications to the
+session that started them. Clients receive them on the SSE stream opened
+with the same ``Mcp-Session-Id`` and can resume after a reconnect by
+sending ``Last-Event-ID``.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set, Tuple
+
+from . import serialization
+
+# Session and progress token of the request currently being handled. Tasks
+# spawned from a tool call inherit these, so background jobs can publish to
+# the right session without threading the ids through every call.
+current_session_id: ContextVar[Optional[str]] = ContextVar("mcp_session_id", default=None)
+current_progress_token: ContextVar[Optional[Any]] = ContextVar("mcp_progress_token", default=None)
+
+Event = Tuple[int, Dict[str, Any]]
+
+
+def format_sse(data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Format a message as a Server-Sent Events frame"""
+    if event_id is None:
+        return f"data: {serialization.dumps(data)}\n\n"
+    return f"id: {event_id}\ndata: {serialization.dumps(data)}\n\n"
+
+
+class _SessionChannel:
+    """Replay buffer and live subscribers for one session"""
+
+    def __init__(self, history_size: int):
+        self.history: Deque[Event] = deque(maxlen=history_size)
+        # Queues of open streams and the loops serving them
+        self.subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self.last_active = time.monotonic()
+        self.dropped = 0
+
+
+class SessionEventBus:
+    """Bounded publish/subscribe bus keyed by MCP session id
+
+    Each session keeps the last ``history_size`` events for Last-Event-ID
+    resumption. Every subscriber has a queue of ``queue_size`` events; when
+    a slow client's queue is full new events are dropped for that client
+    (they remain in the replay buffer). Idle sessions without subscribers
+    are evicted after ``session_ttl`` seconds or when ``max_sessions`` is
+    exceeded.
+
+    publish() and broadcast() may be called from any thread, e.g. by tools
+    running in a thread pool: events are handed to each subscriber's loop
+    with call_soon_threadsafe, in event id order.
+    """
+
+    def __init__(
+        self,
+        history_size: int = 100,
+        queue_size: int = 100,
+        max_sessions: int = 1000,
+        session_ttl: float = 3600.0,
+    ):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self._channels: "OrderedDict[str, _SessionChannel]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._published = 0
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def _channel(self, session_id: str) -> _SessionChannel:
+        """Get or create the channel for a session, marking it active"""
+        channel = self._channels.get(session_id)
+        if channel is None:
+            self._evict()
+            channel = _SessionChannel(self.history_size)
+            self._channels[session_id] = channel
+        else:
+            self._channels.move_to_end(session_id)
+        channel.last_active = time.monotonic()
+        return channel
+
+    def _evict(self) -> None:
+        """Drop expired sessions and enforce the session limit"""
+        now = time.monotonic()
+        for session_id in list(self._channels):
+            channel = self._channels[session_id]
+            if channel.subscribers:
+                continue
+            if now - channel.last_active > self.session_ttl or len(self._channels) >= self.max_sessions:
+                del self._channels[session_id]
+            else:
+                # Channels are ordered by activity; the rest are newer
+                break
+
+    def publish(self, session_id: Optional[str], message: Dict[str, Any]) -> Optional[int]:
+        """Publish a message to a session
+
+        Returns:
+            The event id, or None if there is no session to publish to
+        """
+        if not session_id:
+            return None
+
+        with self._lock:
+            channel = self._channel(session_id)
+            event_id = next(self._ids)
+            channel.history.append((event_id, message))
+            self._published += 1
+
+            # Scheduled under the lock, so every loop receives events in id order
+            for loop, queue in list(channel.subscribers):
+                try:
+                    loop.call_soon_threadsafe(self._offer, channel, queue, (event_id, message))
+                except RuntimeError:
+                    # The subscriber's loop has been closed
+                    channel.subscribers.discard((loop, queue))
+        return event_id
+
+    def _offer(self, channel: _SessionChannel, queue: asyncio.Queue, event: Event) -> None:
+        """Queue an event for one subscriber, on that subscriber's loop"""
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            with self._lock:
+                channel.dropped += 1
+                self._dropped += 1
+
+    def broadcast(self, message: Dict[str, Any]) -> int:
+        """Publish a message to every session with an open stream"""
+        with self._lock:
+            sessions = [session_id for session_id, channel in self._channels.items() if channel.subscribers]
+        for session_id in sessions:
+            self.publish(session_id, message)
+        return len(sessions)
+
+    async def subscribe(
+        self,
+        session_id: str,
+        last_event_id: Optional[str] = None,
+        keepalive: float = 15.0,
+    ) -> AsyncIterator[Optional[Event]]:
+        """Stream events for a session
+
+        Replays buffered events newer than ``last_event_id`` first, then
+        yields live events. Yields None whenever ``keepalive`` seconds pass
+        without an event so the caller can send a ping.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            channel = self._channel(session_id)
+            channel.subscribers.add(subscriber)
+
+        try:
+            resume_after = int(last_event_id) if last_event_id else None
+        except ValueError:
+            resume_after = None
+
+        # Highest event id delivered so far; live events published while
+        # replaying are also queued and must not be sent twice
+        last_sent = resume_after or 0
+
+        try:
+            if resume_after is not None:
+                with self._lock:
+                    history = list(channel.history)
+                for event in history:
+                    if event[0] > last_sent:
+                        last_sent = event[0]
+                        yield event
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event[0] <= last_sent:
+                    continue
+                last_sent = event[0]
+                yield event
+        finally:
+            with self._lock:
+                channel.subscribers.discard(subscriber)
+                channel.last_active = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """Bus-wide counters"""
+        with self._lock:
+            return {
+                "sessions": len(self._channels),
+                "subscribers": sum(len(channel.subscribers) for channel in self._channels.values()),
+                "published": self._published,
+                "dropped": self._dropped,
+            }
@@ -0,0 +1,277 @@
+"""Worker pools for CPU-bound and blocking tool handlers
+
+A tool opts in by declaring ``executor`` in its get_tools() metadata::
+
+    "generate_meme": {
+        "description": "...",
+        "parameters": {...},
+        "executor": "process",
+        "max_concurrency": 2,
+    }
+
+``thread`` runs the handler in a shared ThreadPoolExecutor, which suits
+handlers that block on subprocesses, files or C extensions that release the
+GIL. ``process`` runs it in a ProcessPoolExecutor forked from the server, so
+pure-Python CPU work does not hold up the event loop or other tools. Forked
+workers inherit the server, so handlers stay ordinary bound methods, but any
+state they change in the worker is not seen by the server: process tools must
+return everything the caller needs. Where fork is unavailable (Windows)
+process tools run in the thread pool instead.
+
+``max_concurrency`` caps concurrent calls of one tool, with or without an
+executor; further calls wait for a slot. ``max_queue`` bounds the number of
+waiting calls, beyond which calls are rejected with AdmissionRejected.
+
+Async handlers routed to a pool run to completion on a private event loop in
+the worker, so they must not rely on objects bound to the server's loop.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from . import metrics
+from .admission import ConcurrencyLimiter
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+@dataclass(frozen=True)
+class ExecutionPolicy:
+    """Where and how many calls of one tool run at a time"""
+
+    executor: Optional[str] = None
+    max_concurrency: Optional[int] = None
+    max_queue: Optional[int] = None
+
+    @classmethod
+    def from_metadata(cls, metadata: Dict[str, Any]) -> Optional["ExecutionPolicy"]:
+        """Parse the ``executor``, ``max_concurrency`` and ``max_queue`` declarations of a tool, if any"""
+        executor = metadata.get("executor")
+        max_concurrency = metadata.get("max_concurrency")
+        max_queue = metadata.get("max_queue")
+        if executor is None and max_concurrency is None:
+            return None
+        if executor is not None and executor not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor: {executor}. Use 'thread' or 'process'.")
+        if max_concurrency is not None and int(max_concurrency) < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        return cls(
+            executor=executor,
+            max_concurrency=int(max_concurrency) if max_concurrency is not None else None,
+            max_queue=int(max_queue) if max_queue is not None else None,
+        )
+
+
+def _call_handler(handler: Callable[..., Any], arguments: Dict[str, Any]) -> Any:
+    """Call a handler to completion, running coroutines on a private event loop"""
+    result = handler(**arguments)
+    if inspect.isawaitable(result):
+
+        async def wait() -> Any:
+            return await result
+
+        result = asyncio.run(wait())
+    return result
+
+
+# Server inherited by forked process workers
+_worker_server: Any = None
+
+
+def _init_process_worker(server: Any) -> None:
+    global _worker_server
+    _worker_server = server
+
+
+def _call_in_process(tool_name: str, arguments: Dict[str, Any]) -> Any:
+    entry = _worker_server.tool_registry.get(tool_name)
+    if entry is None:
+        raise KeyError(tool_name)
+    return _call_handler(entry.handler, arguments)
+
+
+class ToolExecutor:
+    """Runs tool handlers inline, in a thread pool or in a process pool
+
+    Pools are created on first use (or by warm()), and the process pool is
+    recreated in a forked HTTP worker rather than shared with its parent.
+    """
+
+    def __init__(self, server: Any, thread_workers: Optional[int] = None, process_workers: Optional[int] = None):
+        self.server = server
+        self.thread_workers = thread_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self.logger = logging.getLogger("ToolExecutor")
+        self._lock = threading.Lock()
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_pool_pid: Optional[int] = None
+        self._fork_available = "fork" in multiprocessing.get_all_start_methods()
+        self._fallback_logged = False
+        # Calls handed to each pool and not yet finished
+        self._pending: Dict[str, int] = {kind: 0 for kind in EXECUTOR_KINDS}
+        # Per-tool max_concurrency limits
+        self._limiters: Dict[str, ConcurrencyLimiter] = {}
+
+    @classmethod
+    def from_env(cls, server: Any) -> "ToolExecutor":
+        """Create an executor sized by MCP_THREAD_WORKERS and MCP_PROCESS_WORKERS"""
+        thread_workers = int(os.environ.get("MCP_THREAD_WORKERS", "0")) or None
+        process_workers = int(os.environ.get("MCP_PROCESS_WORKERS", "0")) or None
+        return cls(server, thread_workers=thread_workers, process_workers=process_workers)
+
+    def _resolve_kind(self, kind: str) -> str:
+        if kind == "process" and not self._fork_available:
+            if not self._fallback_logged:
+                self.logger.warning("fork is not available; running process tools in the thread pool")
+                self._fallback_logged = True
+            return "thread"
+        return kind
+
+    def _get_pool(self, kind: str) -> Executor:
+        with self._lock:
+            if kind == "thread":
+                if self._thread_pool is None:
+                    self._thread_pool = ThreadPoolExecutor(
+                        max_workers=self.thread_workers, thread_name_prefix=f"{self.server.name}-tool"
+                    )
+                return self._thread_pool
+
+            if self._process_pool is not None and self._process_pool_pid != os.getpid():
+                # Inherited from the parent of a forked HTTP worker; its workers belong to the parent
+                self._process_pool = None
+            if self._process_pool is None:
+                # Build the dispatch table first so forked workers inherit it
+                self.server.tool_registry.list_result()
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                    initializer=_init_process_worker,
+                    initargs=(self.server,),
+                )
+                self._process_pool_pid = os.getpid()
+            return self._process_pool
+
+    def warm(self, kinds: Optional[List[str]] = None) -> None:
+        """Start the pools used by the given executor kinds ahead of the first call
+
+        A fork-based process pool starts all of its workers on the first task,
+        so one no-op call is enough to have every worker ready.
+        """
+        for kind in {self._resolve_kind(k) for k in (kinds or EXECUTOR_KINDS)}:
+            pool = self._get_pool(kind)
+            if kind == "process":
+                pool.submit(os.getpid).result()
+
+    def _limiter(self, tool_name: str, policy: ExecutionPolicy) -> ConcurrencyLimiter:
+        limiter = self._limiters.get(tool_name)
+        if limiter is None or (limiter.limit, limiter.max_waiting) != (policy.max_concurrency, policy.max_queue):
+            limiter = self._limiters[tool_name] = ConcurrencyLimiter(tool_name, policy.max_concurrency, policy.max_queue)
+        return limiter
+
+    async def run(
+        self,
+        tool_name: str,
+        handler: Callable[..., Any],
+        arguments: Dict[str, Any],
+        policy: Optional[ExecutionPolicy],
+    ) -> Any:
+        """Call a tool handler as its ExecutionPolicy requires
+
+        Raises:
+            AdmissionRejected: If the tool's max_queue is full
+        """
+        if policy is None:
+            return await self._call(tool_name, handler, arguments, None)
+        if policy.max_concurrency is None:
+            return await self._call(tool_name, handler, arguments, policy.executor)
+
+        async with self._limiter(tool_name, policy).slot():
+            return await self._call(tool_name, handler, arguments, policy.executor)
+
+    async def _call(self, tool_name: str, handler: Callable[..., Any], arguments: Dict[str, Any], kind: Optional[str]):
+        if kind is None:
+            result = handler(**arguments)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        kind = self._resolve_kind(kind)
+        if kind == "process":
+            return await self.submit(kind, _call_in_process, tool_name, arguments)
+        # Keep the request context (session, progress token) visible to the handler
+        return await self.submit(kind, contextvars.copy_context().run, _call_handler, handler, arguments)
+
+    async def submit(self, kind: str, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` in the thread or process pool
+
+        Lets a handler fan its own work out over the pools. For the process
+        pool, func must be a module-level function and args must pickle; it
+        runs in a forked worker, so only its return value reaches the caller.
+        """
+        kind = self._resolve_kind(kind)
+        pool = self._get_pool(kind)
+        self._pending[kind] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, functools.partial(func, *args))
+        finally:
+            self._pending[kind] -= 1
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the pools; running calls are allowed to finish when ``wait`` is set"""
+        with self._lock:
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(wait=wait)
+                self._thread_pool = None
+            if self._process_pool is not None and self._process_pool_pid == os.getpid():
+                self._process_pool.shutdown(wait=wait)
+            self._process_pool = None
+
+    def _workers(self, kind: str) -> int:
+        started = self._thread_pool if kind == "thread" else self._process_pool
+        if started is None:
+            return 0
+        return self.thread_workers if kind == "thread" else self.process_workers
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool sizes, pending and queued calls, and per-tool concurrency"""
+        pools = {}
+        for kind in EXECUTOR_KINDS:
+            workers = self._workers(kind)
+            pending = self._pending[kind]
+            pools[kind] = {"workers": workers, "pending": pending, "queue_depth": max(0, pending - workers)}
+        return {
+            "pools": pools,
+            "process_fallback": None if self._fork_available else "thread",
+            "tools": {name: limiter.stats() for name, limiter in sorted(self._limiters.items())},
+        }
+
+    def prometheus_lines(self, labels: Optional[metrics.Labels] = None) -> List[str]:
+        """Exposition lines for pool sizes and queue depths"""
+        labels = labels or {}
+        stats = self.stats()
+        lines = []
+        pool_metrics = (
+            ("mcp_executor_workers", "Workers started in the pool", "workers"),
+            ("mcp_executor_pending", "Calls submitted to the pool and not yet finished", "pending"),
+            ("mcp_executor_queue_depth", "Calls waiting for a free pool worker", "queue_depth"),
+        )
+        for name, help_text, key in pool_metrics:
+            lines.extend(metrics.format_metric_header(name, "gauge", help_text))
+            for kind, pool in stats["pools"].items():
+                lines.append(metrics.format_sample(name, pool[key], {**labels, "executor": kind}))
+
+        name = "mcp_tool_queue_depth"
+        lines.extend(metrics.format_metric_header(name, "gauge", "Calls waiting for the tool's concurrency limit"))
+        for tool_name, queue in stats["tools"].items():
+            lines.append(metrics.format_sample(name, queue["waiting"], {**labels, "tool": tool_name}))
+        return lines
@@ -2,13 +2,31 @@
 
 import logging
 import os
-from typing import Any, Dict, Optional
+import time
+from typing import Any, AsyncIterator, Dict, Optional
 
 import httpx
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
+from . import metrics
+
+# Headers that describe a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "te",
+        "trailers",
+        "transfer-encoding",
+        "upgrade",
+    }
+)
+
 
 class MCPRequest(BaseModel):
     """MCP request model"""
@@ -31,8 +49,53 @@ class ToolRequest(BaseModel):
     arguments: Dict[str, Any] = {}
 
 
+class UpstreamMetrics:
+    """Latency and status counters for requests forwarded upstream"""
+
+    def __init__(self):
+        self.connect = metrics.Histogram()
+        self.ttfb = metrics.Histogram()
+        self.total = metrics.Histogram()
+        self.responses: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record_response(self, status_code: int) -> None:
+        key = str(status_code)
+        self.responses[key] = self.responses.get(key, 0) + 1
+
+    def record_error(self, kind: str) -> None:
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def render_prometheus(self, service_name: str) -> str:
+        """Prometheus text exposition of the upstream metrics"""
+        labels = {"service": service_name}
+        lines = []
+        for name, histogram, help_text in (
+            ("mcp_proxy_upstream_connect_seconds", self.connect, "Time to open new upstream connections"),
+            ("mcp_proxy_upstream_ttfb_seconds", self.ttfb, "Time until upstream response headers arrive"),
+            ("mcp_proxy_upstream_total_seconds", self.total, "Time until the upstream body is fully relayed"),
+        ):
+            lines.extend(metrics.format_metric_header(name, "histogram", help_text))
+            lines.extend(metrics.format_histogram(name, histogram, labels))
+        lines.extend(
+            metrics.format_metric_header("mcp_proxy_upstream_responses_total", "counter", "Upstream responses by status")
+        )
+        for status, count in sorted(self.responses.items()):
+            lines.append(metrics.format_sample("mcp_proxy_upstream_responses_total", count, {**labels, "status": status}))
+        lines.extend(
+            metrics.format_metric_header("mcp_proxy_upstream_errors_total", "counter", "Upstream request failures by kind")
+        )
+        for kind, count in sorted(self.errors.items()):
+            lines.append(metrics.format_sample("mcp_proxy_upstream_errors_total", count, {**labels, "kind": kind}))
+        return metrics.render(lines)
+
+
 class HTTPProxy:
-    """HTTP Proxy for forwarding requests to remote MCP servers"""
+    """HTTP Proxy for forwarding requests to remote MCP servers
+
+    A single pooled httpx.AsyncClient is kept for the lifetime of the app and
+    upstream response bodies are relayed as they arrive, without buffering.
+    """
 
     def __init__(
         self,
@@ -41,12 +104,22 @@ class HTTPProxy:
         port: int,
         timeout: int = 30,
         enable_cors: bool = True,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
     ):
         self.service_name = service_name
         self.remote_url = remote_url
         self.port = port
         self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
         self.logger = logging.getLogger(f"HTTPProxy.{service_name}")
+        self.metrics = UpstreamMetrics()
+        self._client: Optional[httpx.AsyncClient] = None
 
         # Create FastAPI app
         self.app = FastAPI(title=f"{service_name} MCP HTTP Proxy")
@@ -63,15 +136,111 @@ class HTTPProxy:
 
         # Setup routes
         self._setup_routes()
+        self._setup_events()
 
     def _setup_routes(self):
         """Setup HTTP routes"""
         self.app.get("/")(self.root)
         self.app.get("/health")(self.health)
+        self.app.get("/metrics")(self.get_metrics)
         self.app.post("/mcp")(self.handle_mcp_request)
         self.app.get("/mcp/tools")(self.list_tools)
         self.app.post("/mcp/execute")(self.execute_tool)
 
+    def _setup_events(self):
+        """Open the upstream connection pool on startup and close it on shutdown"""
+
+        @self.app.on_event("startup")
+        async def startup_event():
+            self._get_client()
+
+        @self.app.on_event("shutdown")
+        async def shutdown_event():
+            await self.close()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled upstream client, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+        return self._client
+
+    async def close(self):
+        """Close the upstream connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _send_upstream(
+        self,
+        method: str,
+        path: str,
+        content: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        """Send a request upstream and return once response headers arrive
+
+        The response body is left unread; callers either relay it with
+        _relay() or read and close it themselves.
+        """
+        timing: Dict[str, float] = {}
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.started":
+                timing["connect_started"] = time.perf_counter()
+            elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                timing["connected"] = time.perf_counter()
+
+        client = self._get_client()
+        start = time.perf_counter()
+        request = client.build_request(method, f"{self.remote_url}{path}", content=content, headers=headers)
+        request.extensions["trace"] = trace
+        try:
+            response = await client.send(request, stream=True)
+        except httpx.TimeoutException:
+            self.metrics.record_error("timeout")
+            raise
+        except httpx.RequestError:
+            self.metrics.record_error("network")
+            raise
+
+        self.metrics.ttfb.observe(time.perf_counter() - start)
+        if "connect_started" in timing and "connected" in timing:
+            self.metrics.connect.observe(timing["connected"] - timing["connect_started"])
+        self.metrics.record_response(response.status_code)
+        response.extensions["proxy_start"] = start
+        return response
+
+    async def _read_and_close(self, response: httpx.Response) -> bytes:
+        """Read a (small) upstream body and release the connection"""
+        try:
+            return await response.aread()
+        finally:
+            await response.aclose()
+            self.metrics.total.observe(time.perf_counter() - response.extensions["proxy_start"])
+
+    def _relay(self, response: httpx.Response) -> StreamingResponse:
+        """Relay an upstream response to the client chunk by chunk"""
+
+        async def body() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in response.aiter_raw():
+                    yield chunk
+            finally:
+                await response.aclose()
+                self.metrics.total.observe(time.perf_counter() - response.extensions["proxy_start"])
+
+        headers = {key: value for key, value in response.headers.items() if key.lower() not in HOP_BY_HOP_HEADERS}
+        return StreamingResponse(body(), status_code=response.status_code, headers=headers)
+
+    @staticmethod
+    def _forward_headers(request: Request) -> Dict[str, str]:
+        """Request headers to pass upstream"""
+        return {
+            key: value
+            for key, value in request.headers.items()
+            if key.lower() not in HOP_BY_HOP_HEADERS and key.lower() not in ("host", "content-length")
+        }
+
     async def root(self):
         """Root endpoint"""
         return {
@@ -83,26 +252,38 @@ class HTTPProxy:
     async def health(self):
         """Health check endpoint"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.remote_url}/health", timeout=5.0)
+            response = await self._get_client().get(f"{self.remote_url}/health", timeout=5.0)
 
             return {"status": "healthy", "remote_status": response.status_code == 200}
         except Exception as e:
             return {"status": "unhealthy", "error": str(e)}
 
-    async def handle_mcp_request(self, request: MCPRequest) -> MCPResponse:
-        """Forward MCP request to remote server"""
+    async def get_metrics(self):
+        """Upstream connect, TTFB and total latency in Prometheus text format"""
+        return Response(
+            content=self.metrics.render_prometheus(self.service_name),
+            media_type="text/plain; version=0.0.4",
+        )
+
+    async def handle_mcp_request(self, request: Request):
+        """Forward MCP request to remote server, streaming both bodies"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(f"{self.remote_url}/mcp", json=request.dict())
+            response = await self._send_upstream(
+                "POST", "/mcp", content=request.stream(), headers=self._forward_headers(request)
+            )
 
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"Remote server error: {response.text}",
-                    )
+            if response.status_code != 200:
+                body = await self._read_and_close(response)
+                return MCPResponse(
+                    result=None,
+                    error={
+                        "code": -32603,
+                        "message": "Internal error",
+                        "data": {"error": f"Remote server error: {body.decode(errors='replace')}"},
+                    },
+                )
 
-                return MCPResponse(**response.json())
+            return self._relay(response)
 
         except httpx.TimeoutException:
             self.logger.error(f"Timeout forwarding request to {self.remote_url}")
@@ -138,32 +319,32 @@ class HTTPProxy:
     async def list_tools(self):
         """List available tools from remote server"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.remote_url}/mcp/tools")
+            response = await self._send_upstream("GET", "/mcp/tools")
 
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    raise HTTPException(status_code=response.status_code, detail="Failed to list tools")
+            if response.status_code == 200:
+                return self._relay(response)
+            await self._read_and_close(response)
+            raise HTTPException(status_code=response.status_code, detail="Failed to list tools")
         except Exception as e:
             self.logger.error(f"Error listing tools: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    async def execute_tool(self, request: ToolRequest):
-        """Execute a tool on the remote server"""
+    async def execute_tool(self, request: Request):
+        """Execute a tool on the remote server, streaming both bodies"""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(f"{self.remote_url}/mcp/execute", json=request.dict())
-
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"Tool execution failed: {response.text}",
-                    )
+            response = await self._send_upstream(
+                "POST", "/mcp/execute", content=request.stream(), headers=self._forward_headers(request)
+            )
+
+            if response.status_code == 200:
+                return self._relay(response)
+            body = await self._read_and_close(response)
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Tool execution failed: {body.decode(errors='replace')}",
+            )
         except Exception as e:
-            self.logger.error(f"Error executing tool {request.tool}: {e}")
+            self.logger.error(f"Error executing tool: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
     def run(self):
@@ -184,12 +365,21 @@ def create_proxy_from_env(service_name: str, default_port: int = 8191) -> HTTPPr
         REMOTE_MCP_URL: Remote MCP server URL
         TIMEOUT: Request timeout in seconds
         PORT: Port to listen on (optional)
+        MAX_CONNECTIONS: Upstream connection pool size (optional)
+        MAX_KEEPALIVE_CONNECTIONS: Idle upstream connections kept open (optional)
     """
     remote_url = os.getenv("REMOTE_MCP_URL", "http://localhost:8000")
     timeout = int(os.getenv("TIMEOUT", "30"))
     port = int(os.getenv("PORT", str(default_port)))
 
-    return HTTPProxy(service_name=service_name, remote_url=remote_url, port=port, timeout=timeout)
+    return HTTPProxy(
+        service_name=service_name,
+        remote_url=remote_url,
+        port=port,
+        timeout=timeout,
+        max_connections=int(os.getenv("MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("MAX_KEEPALIVE_CONNECTIONS", "20")),
+    )
 
 
 if __name__ == "__main__":
@@ -202,6 +392,8 @@ if __name__ == "__main__":
     parser.add_argument("--port", type=int, default=8191, help="Port to listen on")
     parser.add_argument("--timeout", type=int, default=30, help="Request timeout in seconds")
     parser.add_argument("--no-cors", action="store_true", help="Disable CORS")
+    parser.add_argument("--max-connections", type=int, default=100, help="Upstream connection pool size")
+    parser.add_argument("--max-keepalive", type=int, default=20, help="Idle upstream connections kept open")
 
     args = parser.parse_args()
 
@@ -215,6 +407,8 @@ if __name__ == "__main__":
         port=args.port,
         timeout=args.timeout,
         enable_cors=not args.no_cors,
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_keepalive,
     )
 
     proxy.run()
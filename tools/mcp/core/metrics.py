@@ -0,0 +1,243 @@
+"""Lightweight metric primitives with Prometheus text exposition"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond calls to long renders
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+Labels = Dict[str, str]
+
+
+class Histogram:
+    """Cumulative bucket histogram with quantile estimation"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # One extra slot for observations above the largest bucket (+Inf)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record one observation"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation within its bucket"""
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            rank = q * self.count
+            cumulative = 0
+            for index, bucket_count in enumerate(self.counts):
+                if bucket_count and cumulative + bucket_count >= rank:
+                    lower = self.buckets[index - 1] if index > 0 else 0.0
+                    upper = self.buckets[index] if index < len(self.buckets) else self.max
+                    fraction = (rank - cumulative) / bucket_count
+                    return min(lower + (upper - lower) * fraction, self.max)
+                cumulative += bucket_count
+            return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Count, sum, max and p50/p95/p99 estimates"""
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "max": round(self.max, 6),
+            "p50": round(self.quantile(0.50), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "p99": round(self.quantile(0.99), 6),
+        }
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """(upper bound, cumulative count) pairs including +Inf"""
+        with self._lock:
+            result = []
+            cumulative = 0
+            for bound, bucket_count in zip(list(self.buckets) + [math.inf], self.counts):
+                cumulative += bucket_count
+                result.append((bound, cumulative))
+            return result
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Optional[Labels]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_metric_header(name: str, metric_type: str, help_text: str) -> List[str]:
+    """HELP and TYPE lines for a metric family"""
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+
+
+def format_sample(name: str, value: float, labels: Optional[Labels] = None) -> str:
+    """A single sample line"""
+    return f"{name}{_format_labels(labels)} {_format_value(value)}"
+
+
+def format_histogram(name: str, histogram: Histogram, labels: Optional[Labels] = None) -> List[str]:
+    """Sample lines for one labelled histogram"""
+    labels = labels or {}
+    lines = []
+    for bound, cumulative in histogram.cumulative_buckets():
+        lines.append(format_sample(f"{name}_bucket", cumulative, {**labels, "le": _format_value(bound)}))
+    lines.append(format_sample(f"{name}_sum", histogram.sum, labels))
+    lines.append(format_sample(f"{name}_count", histogram.count, labels))
+    return lines
+
+
+def render(lines: Iterable[str]) -> str:
+    """Join exposition lines into a Prometheus text payload"""
+    return "\n".join(lines) + "\n"
+
+
+class _ToolSeries:
+    """Counters for a single tool"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency = Histogram(buckets)
+
+
+class ToolMetrics:
+    """Per-tool call, error, in-flight and latency metrics
+
+    Series are created on first use, so only tools that were actually
+    dispatched appear in the output.
+    """
+
+    def __init__(self, latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.latency_buckets = tuple(latency_buckets)
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._tools: Dict[str, _ToolSeries] = {}
+
+    def _series(self, tool_name: str) -> _ToolSeries:
+        with self._lock:
+            series = self._tools.get(tool_name)
+            if series is None:
+                series = self._tools[tool_name] = _ToolSeries(self.latency_buckets)
+            return series
+
+    @contextmanager
+    def track(self, tool_name: str) -> Iterator[None]:
+        """Time one tool call, counting it as an error if it raises"""
+        series = self._series(tool_name)
+        with self._lock:
+            series.in_flight += 1
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            series.latency.observe(time.perf_counter() - start)
+            with self._lock:
+                series.in_flight -= 1
+                series.calls += 1
+                if failed:
+                    series.errors += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tool counters and latency summaries (seconds)"""
+        with self._lock:
+            tools = dict(self._tools)
+        return {
+            name: {
+                "calls": series.calls,
+                "errors": series.errors,
+                "in_flight": series.in_flight,
+                "latency": series.latency.summary(),
+            }
+            for name, series in sorted(tools.items())
+        }
+
+    def render_prometheus(
+        self,
+        labels: Optional[Labels] = None,
+        payloads: Optional[Dict[str, Dict[str, int]]] = None,
+    ) -> str:
+        """Prometheus text exposition of the tool metrics
+
+        Args:
+            labels: Labels added to every sample (e.g. the server name)
+            payloads: Serialized result sizes keyed by tool, as returned by
+                serialization.PayloadStats.snapshot()
+        """
+        labels = labels or {}
+        with self._lock:
+            tools = sorted(self._tools.items())
+
+        lines = format_metric_header("mcp_uptime_seconds", "gauge", "Seconds since the server started")
+        lines.append(format_sample("mcp_uptime_seconds", round(time.time() - self.started_at, 3), labels))
+
+        counters = (
+            ("mcp_tool_calls_total", "counter", "Tool calls completed", "calls"),
+            ("mcp_tool_errors_total", "counter", "Tool calls that raised an error", "errors"),
+            ("mcp_tool_in_flight", "gauge", "Tool calls currently executing", "in_flight"),
+        )
+        for name, metric_type, help_text, attribute in counters:
+            lines.extend(format_metric_header(name, metric_type, help_text))
+            for tool_name, series in tools:
+                lines.append(format_sample(name, getattr(series, attribute), {**labels, "tool": tool_name}))
+
+        name = "mcp_tool_latency_seconds"
+        lines.extend(format_metric_header(name, "histogram", "Tool call latency"))
+        for tool_name, series in tools:
+            lines.extend(format_histogram(name, series.latency, {**labels, "tool": tool_name}))
+
+        if payloads is not None:
+            payload_metrics = (
+                ("mcp_tool_result_bytes_total", "counter", "Serialized tool result bytes", "total_bytes"),
+                ("mcp_tool_result_bytes_max", "gauge", "Largest serialized tool result", "max_bytes"),
+            )
+            for name, metric_type, help_text, key in payload_metrics:
+                lines.extend(format_metric_header(name, metric_type, help_text))
+                for tool_name, stats in sorted(payloads.items()):
+                    lines.append(format_sample(name, stats[key], {**labels, "tool": tool_name}))
+
+        return render(lines)
@@ -0,0 +1,243 @@
+"""Response cache for idempotent tools
+
+A tool opts in by declaring ``cacheable`` in its get_tools() metadata::
+
+    "list_meme_templates": {
+        "description": "...",
+        "parameters": {...},
+        "cacheable": {"ttl": 300},
+    }
+
+``ttl`` is the lifetime in seconds and ``key_fields`` optionally limits the
+arguments that make up the cache key (all arguments by default). Callers can
+force a fresh result by passing ``"_bypass_cache": true`` with the arguments;
+the fresh result replaces the cached one.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import metrics
+
+# Argument callers add to skip the cache lookup; removed before dispatch
+BYPASS_ARGUMENT = "_bypass_cache"
+
+DEFAULT_TTL = 300.0
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How results of one tool are cached"""
+
+    ttl: float = DEFAULT_TTL
+    key_fields: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def from_metadata(cls, metadata: Dict[str, Any]) -> Optional["CachePolicy"]:
+        """Parse the ``cacheable`` declaration of a tool, if any"""
+        declaration = metadata.get("cacheable")
+        if not declaration:
+            return None
+        if declaration is True:
+            return cls()
+        key_fields = declaration.get("key_fields")
+        return cls(
+            ttl=float(declaration.get("ttl", DEFAULT_TTL)),
+            key_fields=tuple(key_fields) if key_fields is not None else None,
+        )
+
+    def key(self, arguments: Dict[str, Any]) -> str:
+        """Stable digest of the arguments that identify a result"""
+        if self.key_fields is not None:
+            arguments = {name: arguments.get(name) for name in self.key_fields}
+        encoded = json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def is_cacheable_result(result: Any) -> bool:
+    """Whether a tool result represents a success worth caching"""
+    if isinstance(result, dict):
+        return result.get("success", True) is not False and "error" not in result
+    return True
+
+
+class _DiskStore:
+    """SQLite table of JSON-encoded results shared across restarts and workers"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        with self._lock:
+            self._connection().execute(
+                "CREATE TABLE IF NOT EXISTS responses (tool TEXT, key TEXT, expires REAL, value TEXT, PRIMARY KEY (tool, key))"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # Reopen after a fork; forked HTTP workers must not share the parent's connection
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, tool_name: str, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            row = (
+                self._connection()
+                .execute("SELECT expires, value FROM responses WHERE tool = ? AND key = ?", (tool_name, key))
+                .fetchone()
+            )
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def put(self, tool_name: str, key: str, expires: float, value: Any) -> None:
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError):
+            # Not JSON-serializable; keep it in memory only
+            return
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO responses (tool, key, expires, value) VALUES (?, ?, ?, ?)",
+                (tool_name, key, expires, encoded),
+            )
+
+    def delete(self, tool_name: Optional[str] = None) -> None:
+        with self._lock:
+            if tool_name is None:
+                self._connection().execute("DELETE FROM responses")
+            else:
+                self._connection().execute("DELETE FROM responses WHERE tool = ?", (tool_name,))
+
+    def purge_expired(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+
+
+class ResponseCache:
+    """Bounded LRU cache of tool results with per-tool TTLs
+
+    Entries live in memory, and in an optional SQLite file when ``disk_path``
+    is given. Memory misses fall back to disk, so results survive restarts
+    and are shared between worker processes.
+    """
+
+    def __init__(self, max_entries: int = 1024, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.logger = logging.getLogger("ResponseCache")
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._disk: Optional[_DiskStore] = None
+        if disk_path:
+            try:
+                self._disk = _DiskStore(disk_path)
+                self._disk.purge_expired()
+            except sqlite3.Error as e:
+                self.logger.warning(f"Disk cache disabled, cannot open {disk_path}: {e}")
+
+    @classmethod
+    def from_env(cls, server_name: str) -> "ResponseCache":
+        """Create a cache sized by MCP_CACHE_MAX_ENTRIES, on disk under MCP_CACHE_DIR if set"""
+        max_entries = int(os.environ.get("MCP_CACHE_MAX_ENTRIES", "1024"))
+        cache_dir = os.environ.get("MCP_CACHE_DIR")
+        disk_path = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            file_name = "".join(c if c.isalnum() else "_" for c in server_name.lower())
+            disk_path = os.path.join(cache_dir, f"{file_name}.sqlite3")
+        return cls(max_entries=max_entries, disk_path=disk_path)
+
+    def _count(self, tool_name: str, counter: str) -> None:
+        stats = self._stats.setdefault(tool_name, {"hits": 0, "misses": 0, "evictions": 0})
+        stats[counter] += 1
+
+    def get(self, tool_name: str, key: str) -> Tuple[bool, Any]:
+        """Look up a cached result
+
+        Returns:
+            (True, result) on a hit, (False, None) on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((tool_name, key))
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end((tool_name, key))
+                    self._count(tool_name, "hits")
+                    return True, copy.deepcopy(entry[1])
+                del self._entries[(tool_name, key)]
+
+        if self._disk is not None:
+            stored = self._disk.get(tool_name, key)
+            if stored is not None and stored[0] > now:
+                with self._lock:
+                    self._store(tool_name, key, stored[0], stored[1])
+                    self._count(tool_name, "hits")
+                return True, copy.deepcopy(stored[1])
+
+        with self._lock:
+            self._count(tool_name, "misses")
+        return False, None
+
+    def _store(self, tool_name: str, key: str, expires: float, value: Any) -> None:
+        self._entries[(tool_name, key)] = (expires, value)
+        self._entries.move_to_end((tool_name, key))
+        while len(self._entries) > self.max_entries:
+            (evicted_tool, _), _ = self._entries.popitem(last=False)
+            self._count(evicted_tool, "evictions")
+
+    def put(self, tool_name: str, key: str, value: Any, ttl: float) -> None:
+        """Cache a result for ``ttl`` seconds"""
+        expires = time.time() + ttl
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._store(tool_name, key, expires, value)
+        if self._disk is not None:
+            self._disk.put(tool_name, key, expires, value)
+
+    def clear(self, tool_name: Optional[str] = None) -> None:
+        """Drop cached results for one tool, or for all tools"""
+        with self._lock:
+            if tool_name is None:
+                self._entries.clear()
+            else:
+                for cache_key in [k for k in self._entries if k[0] == tool_name]:
+                    del self._entries[cache_key]
+        if self._disk is not None:
+            self._disk.delete(tool_name)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and per-tool hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk": self._disk.path if self._disk is not None else None,
+                "tools": {name: dict(stats) for name, stats in self._stats.items()},
+            }
+
+    def prometheus_lines(self, labels: Optional[metrics.Labels] = None) -> List[str]:
+        """Exposition lines for the hit/miss/eviction counters"""
+        labels = labels or {}
+        with self._lock:
+            tools = sorted((name, dict(stats)) for name, stats in self._stats.items())
+        lines = []
+        for counter in ("hits", "misses", "evictions"):
+            name = f"mcp_tool_cache_{counter}_total"
+            lines.extend(metrics.format_metric_header(name, "counter", f"Response cache {counter} per tool"))
+            for tool_name, stats in tools:
+                lines.append(metrics.format_sample(name, stats[counter], {**labels, "tool": tool_name}))
+        return lines
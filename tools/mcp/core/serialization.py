@@ -0,0 +1,166 @@
+"""JSON serialization helpers for MCP transports
+
+Tool results are encoded compactly (no indentation) and, when orjson is
+installed, with its faster encoder. Large payloads can be encoded
+incrementally so responses are written in bounded chunks instead of one
+fully materialized body. The object being encoded is still held in full;
+a tool result's text content, for instance, exists once as a string and is
+escaped into the response piece by piece.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+# Results whose text content exceeds this many characters are streamed
+STREAM_THRESHOLD_CHARS = int(os.environ.get("MCP_STREAM_THRESHOLD_CHARS", str(1024 * 1024)))
+# Size of each chunk written for streamed responses
+CHUNK_SIZE = int(os.environ.get("MCP_STREAM_CHUNK_BYTES", str(64 * 1024)))
+
+# Set MCP_JSON_BACKEND=json to force the standard library encoder
+_BACKEND = os.environ.get("MCP_JSON_BACKEND", "auto").lower()
+_USE_ORJSON = HAS_ORJSON and _BACKEND != "json"
+
+_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON"""
+    if _USE_ORJSON:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson is stricter (e.g. integers above 64 bits); fall back
+            pass
+    return _ENCODER.encode(obj).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    """Encode an object as a compact JSON string"""
+    if _USE_ORJSON:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass
+    return _ENCODER.encode(obj)
+
+
+def _iter_json_pieces(obj: Any, slice_size: int) -> Iterator[str]:
+    """Encode containers piece by piece, escaping long strings a slice at a time
+
+    JSONEncoder.iterencode escapes each string in one piece, which for a
+    multi-megabyte text content would be a second full copy of it.
+    """
+    if isinstance(obj, str) and len(obj) > slice_size:
+        yield '"'
+        for start in range(0, len(obj), slice_size):
+            yield _ENCODER.encode(obj[start : start + slice_size])[1:-1]
+        yield '"'
+    elif isinstance(obj, dict):
+        yield "{"
+        for index, (key, value) in enumerate(obj.items()):
+            if not isinstance(key, str):
+                # Same key conversion as JSONEncoder: 1 -> "1", True -> "true", None -> "null"
+                key = _ENCODER.encode(key)
+            yield ("," if index else "") + _ENCODER.encode(key) + ":"
+            yield from _iter_json_pieces(value, slice_size)
+        yield "}"
+    elif isinstance(obj, (list, tuple)):
+        yield "["
+        for index, value in enumerate(obj):
+            if index:
+                yield ","
+            yield from _iter_json_pieces(value, slice_size)
+        yield "]"
+    else:
+        yield _ENCODER.encode(obj)
+
+
+def iter_json_chunks(obj: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Incrementally encode an object, yielding UTF-8 chunks of about chunk_size bytes
+
+    Besides the object itself, only the chunk being assembled is held in
+    memory, so large results are written out without building the full
+    response body or an escaped copy of their strings first.
+    """
+    buffer = []
+    buffered = 0
+    for piece in _iter_json_pieces(obj, chunk_size):
+        data = piece.encode("utf-8")
+        if len(data) >= chunk_size:
+            # Flush what we have, then split the oversized piece
+            if buffer:
+                yield b"".join(buffer)
+                buffer, buffered = [], 0
+            view = memoryview(data)
+            for start in range(0, len(data), chunk_size):
+                yield bytes(view[start : start + chunk_size])
+            continue
+        buffer.append(data)
+        buffered += len(data)
+        if buffered >= chunk_size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def content_size_hint(response: Optional[Dict[str, Any]]) -> int:
+    """Cheap estimate of a JSON-RPC response size: characters of its text content"""
+    if not isinstance(response, dict):
+        return 0
+    result = response.get("result")
+    if not isinstance(result, dict):
+        return 0
+    total = 0
+    for item in result.get("content") or []:
+        if isinstance(item, dict):
+            text = item.get("text")
+            if isinstance(text, str):
+                total += len(text)
+    return total
+
+
+def encoded_length(text: str) -> int:
+    """UTF-8 encoded length of a string without copying ASCII text"""
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-8"))
+
+
+def serialize_tool_result(result: Any) -> str:
+    """Convert a tool result to the text carried in MCP content"""
+    if isinstance(result, dict):
+        return dumps(result)
+    return str(result)
+
+
+class PayloadStats:
+    """Thread-safe per-tool serialized byte counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, tool_name: str, num_bytes: int) -> None:
+        """Record the serialized size of one tool result"""
+        with self._lock:
+            stats = self._stats.setdefault(tool_name, {"calls": 0, "total_bytes": 0, "max_bytes": 0})
+            stats["calls"] += 1
+            stats["total_bytes"] += num_bytes
+            if num_bytes > stats["max_bytes"]:
+                stats["max_bytes"] = num_bytes
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Copy of the current counters keyed by tool name"""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
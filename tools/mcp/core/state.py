@@ -0,0 +1,305 @@
+"""Pluggable storage for server state shared between HTTP workers
+
+Servers keep job tables and histories in collections obtained from a
+StateBackend instead of plain dicts and lists, so that several worker
+processes serving the same port see the same state::
+
+    self.generation_jobs = self.state.mapping("generation_jobs")
+    self.generation_jobs[job_id] = {"status": "queued"}
+    self.generation_jobs.merge(job_id, status="completed")
+
+Values must be JSON-serializable. Nested values are stored by copy, so
+updates to an item go through ``merge()`` rather than mutating the dict
+returned by ``mapping[key]``. A mapping created with ``max_items`` drops its
+least recently written items beyond that size.
+
+Collections of a network backend make a round trip per operation, so async
+code runs them through ``StateBackend.call()``, which keeps them off the
+event loop::
+
+    job = await self.state.call(self.generation_jobs.merge, job_id, status="completed")
+
+The backend is chosen with MCP_STATE_BACKEND: ``memory`` (default, local to
+one process) or ``redis`` (shared, using MCP_REDIS_URL).
+"""
+
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, MutableMapping, Optional
+
+
+class SharedMapping(MutableMapping[str, Any], ABC):
+    """Dict-like collection of JSON values"""
+
+    @abstractmethod
+    def merge(self, key: str, **fields: Any) -> Dict[str, Any]:
+        """Update fields of a dict item in place and return the new item"""
+
+
+class SharedList(ABC):
+    """Append-only list of JSON values, optionally capped to the newest items"""
+
+    @abstractmethod
+    def append(self, value: Any) -> None:
+        """Add an item, dropping the oldest beyond the cap"""
+
+    @abstractmethod
+    def tail(self, count: int) -> List[Any]:
+        """The newest ``count`` items, oldest first"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of items stored"""
+
+
+class StateBackend(ABC):
+    """Factory for named shared collections"""
+
+    # Whether several processes see the same collections
+    shared: bool = False
+
+    @abstractmethod
+    def mapping(self, name: str, max_items: Optional[int] = None) -> SharedMapping:
+        """Get the mapping stored under ``name``, capped at ``max_items`` if given"""
+
+    @abstractmethod
+    def list(self, name: str, max_length: Optional[int] = None) -> SharedList:
+        """Get the list stored under ``name``"""
+
+    async def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``func(*args, **kwargs)``, which uses this backend's collections, without blocking the event loop"""
+        return func(*args, **kwargs)
+
+
+# In-memory backend
+
+
+class MemoryMapping(SharedMapping):
+    """Mapping held in the current process"""
+
+    def __init__(self, max_items: Optional[int] = None):
+        self._data: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._max_items = max_items
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            # Re-inserted so dict order is write order
+            self._data.pop(key, None)
+            self._data[key] = value
+            self._evict()
+
+    def _evict(self) -> None:
+        if self._max_items:
+            while len(self._data) > self._max_items:
+                del self._data[next(iter(self._data))]
+
+    def __delitem__(self, key: str) -> None:
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def merge(self, key: str, **fields: Any) -> Dict[str, Any]:
+        with self._lock:
+            item = self._data.setdefault(key, {})
+            item.update(fields)
+            self._evict()
+            return dict(item)
+
+
+class MemoryList(SharedList):
+    """List held in the current process"""
+
+    def __init__(self, max_length: Optional[int] = None):
+        self._items: Deque[Any] = deque(maxlen=max_length)
+
+    def append(self, value: Any) -> None:
+        self._items.append(value)
+
+    def tail(self, count: int) -> List[Any]:
+        if count <= 0:
+            return []
+        return list(self._items)[-count:]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class MemoryStateBackend(StateBackend):
+    """Process-local state; the default for single-worker servers"""
+
+    def __init__(self):
+        self._mappings: Dict[str, MemoryMapping] = {}
+        self._lists: Dict[str, MemoryList] = {}
+
+    def mapping(self, name: str, max_items: Optional[int] = None) -> SharedMapping:
+        if name not in self._mappings:
+            self._mappings[name] = MemoryMapping(max_items)
+        return self._mappings[name]
+
+    def list(self, name: str, max_length: Optional[int] = None) -> SharedList:
+        return self._lists.setdefault(name, MemoryList(max_length))
+
+
+# Redis backend
+
+
+class RedisMapping(SharedMapping):
+    """Mapping stored as a Redis hash of JSON values
+
+    With ``max_items``, a sorted set beside the hash records when each item
+    was last written, so the oldest can be dropped without reading the hash.
+    """
+
+    def __init__(self, client: Any, key: str, watch_error: type, max_items: Optional[int] = None):
+        self._client = client
+        self._key = key
+        self._watch_error = watch_error
+        self._max_items = max_items
+        self._order_key = f"{key}:order"
+
+    def __getitem__(self, key: str) -> Any:
+        raw = self._client.hget(self._key, key)
+        if raw is None:
+            raise KeyError(key)
+        return json.loads(raw)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if not self._max_items:
+            self._client.hset(self._key, key, json.dumps(value))
+            return
+        with self._client.pipeline() as pipe:
+            pipe.hset(self._key, key, json.dumps(value))
+            pipe.zadd(self._order_key, {key: time.time()})
+            pipe.zcard(self._order_key)
+            size = pipe.execute()[-1]
+        self._evict(size)
+
+    def __delitem__(self, key: str) -> None:
+        if self._max_items:
+            self._client.zrem(self._order_key, key)
+        if not self._client.hdel(self._key, key):
+            raise KeyError(key)
+
+    def _evict(self, size: int) -> None:
+        if size <= self._max_items:  # type: ignore[operator]
+            return
+        stale = [name for name, _ in self._client.zpopmin(self._order_key, size - self._max_items)]
+        if stale:
+            self._client.hdel(self._key, *stale)
+
+    def __iter__(self) -> Iterator[str]:
+        return (k.decode() if isinstance(k, bytes) else k for k in self._client.hkeys(self._key))
+
+    def __len__(self) -> int:
+        return int(self._client.hlen(self._key))
+
+    def __contains__(self, key: object) -> bool:
+        return bool(self._client.hexists(self._key, key))
+
+    def items(self):  # type: ignore[override]
+        # One round trip instead of one per key
+        return [(k.decode() if isinstance(k, bytes) else k, json.loads(v)) for k, v in self._client.hgetall(self._key).items()]
+
+    def merge(self, key: str, **fields: Any) -> Dict[str, Any]:
+        # Optimistic transaction so concurrent merges from other workers are not lost
+        with self._client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self._key)
+                    raw = pipe.hget(self._key, key)
+                    item = json.loads(raw) if raw is not None else {}
+                    item.update(fields)
+                    pipe.multi()
+                    pipe.hset(self._key, key, json.dumps(item))
+                    if self._max_items:
+                        # New items join the eviction order; existing ones keep their place
+                        pipe.zadd(self._order_key, {key: time.time()}, nx=True)
+                        pipe.zcard(self._order_key)
+                    results = pipe.execute()
+                    break
+                except self._watch_error:
+                    continue
+        if self._max_items:
+            self._evict(results[-1])
+        return dict(item)
+
+
+class RedisList(SharedList):
+    """List stored as a Redis list of JSON values"""
+
+    def __init__(self, client: Any, key: str, max_length: Optional[int] = None):
+        self._client = client
+        self._key = key
+        self._max_length = max_length
+
+    def append(self, value: Any) -> None:
+        with self._client.pipeline() as pipe:
+            pipe.rpush(self._key, json.dumps(value))
+            if self._max_length:
+                pipe.ltrim(self._key, -self._max_length, -1)
+            pipe.execute()
+
+    def tail(self, count: int) -> List[Any]:
+        if count <= 0:
+            return []
+        return [json.loads(raw) for raw in self._client.lrange(self._key, -count, -1)]
+
+    def __len__(self) -> int:
+        return int(self._client.llen(self._key))
+
+
+class RedisStateBackend(StateBackend):
+    """State shared through Redis, for multi-worker or multi-container setups"""
+
+    shared = True
+
+    def __init__(self, url: str, namespace: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("MCP_STATE_BACKEND=redis requires the 'redis' package") from e
+
+        self._client = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self._prefix = f"mcp:{namespace}:"
+
+    def mapping(self, name: str, max_items: Optional[int] = None) -> SharedMapping:
+        return RedisMapping(self._client, self._prefix + name, self._watch_error, max_items)
+
+    def list(self, name: str, max_length: Optional[int] = None) -> SharedList:
+        return RedisList(self._client, self._prefix + name, max_length)
+
+    async def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        # The client is thread-safe; each call takes a pooled connection
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+def create_state_backend(namespace: str, backend: Optional[str] = None) -> StateBackend:
+    """Create the backend selected by MCP_STATE_BACKEND
+
+    Args:
+        namespace: Prefix isolating this server's keys (e.g. the server name)
+        backend: ``memory`` or ``redis``; defaults to MCP_STATE_BACKEND
+    """
+    backend = (backend or os.environ.get("MCP_STATE_BACKEND", "memory")).lower()
+    if backend == "memory":
+        return MemoryStateBackend()
+    if backend == "redis":
+        url = os.environ.get("MCP_REDIS_URL", "redis://localhost:6379/0")
+        key = "".join(c if c.isalnum() else "_" for c in namespace.lower())
+        return RedisStateBackend(url, key)
+    raise ValueError(f"Unknown state backend: {backend}. Use 'memory' or 'redis'.")
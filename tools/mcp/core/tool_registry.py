@@ -0,0 +1,245 @@
+"""Precomputed tool dispatch table shared by all MCP transports"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from .executors import ExecutionPolicy
+from .response_cache import CachePolicy
+
+# JSON schema primitive types mapped to the Python types accepted for them.
+# Before validation existed, tools received whatever the client sent, so two
+# common inputs stay accepted: bools where numbers are expected (bool is an
+# int subclass) and integral floats such as 2.0 for integers.
+_JSON_TYPES: Dict[str, Tuple[type, ...]] = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list, tuple),
+    "null": (type(None),),
+}
+
+
+class ToolArgumentError(ValueError):
+    """Raised when tool arguments do not match the tool's input schema"""
+
+
+class SchemaValidator:
+    """Validator compiled once from a tool's input schema
+
+    Only the top level of the schema is checked: required keys, primitive
+    property types and enums. Nested structures are left to the tool itself,
+    which keeps validation cheap and tolerant of loosely written schemas.
+    """
+
+    def __init__(self, schema: Optional[Dict[str, Any]]):
+        schema = schema or {}
+        properties = schema.get("properties") or {}
+        self.required: FrozenSet[str] = frozenset(schema.get("required") or [])
+        self.types: Dict[str, Tuple[type, ...]] = {}
+        self.enums: Dict[str, FrozenSet[Any]] = {}
+
+        for prop_name, prop_schema in properties.items():
+            if not isinstance(prop_schema, dict):
+                continue
+            accepted = self._compile_type(prop_schema.get("type"))
+            if accepted:
+                self.types[prop_name] = accepted
+            enum = prop_schema.get("enum")
+            if enum:
+                try:
+                    self.enums[prop_name] = frozenset(enum)
+                except TypeError:
+                    # Unhashable enum members cannot be checked by set membership
+                    pass
+
+    @staticmethod
+    def _compile_type(schema_type: Any) -> Tuple[type, ...]:
+        """Resolve a JSON schema type (or list of types) to Python types"""
+        names = schema_type if isinstance(schema_type, list) else [schema_type]
+        accepted: Tuple[type, ...] = ()
+        for name in names:
+            if name not in _JSON_TYPES:
+                # Unknown or missing type: accept anything
+                return ()
+            accepted += _JSON_TYPES[name]
+        return accepted
+
+    def validate(self, arguments: Dict[str, Any]) -> None:
+        """Validate arguments, raising ToolArgumentError on the first problem"""
+        missing = self.required.difference(arguments)
+        if missing:
+            raise ToolArgumentError(f"Missing required argument(s): {', '.join(sorted(missing))}")
+
+        for arg_name, value in arguments.items():
+            accepted = self.types.get(arg_name)
+            if accepted:
+                # Optional arguments may be explicitly passed as null
+                if value is None and arg_name not in self.required:
+                    continue
+                if not isinstance(value, accepted) and not self._is_integral_float(value, accepted):
+                    raise ToolArgumentError(f"Argument '{arg_name}' must be of type {self._type_names(accepted)}")
+            enum = self.enums.get(arg_name)
+            if enum is not None:
+                try:
+                    allowed = value in enum
+                except TypeError:
+                    allowed = False
+                if not allowed:
+                    raise ToolArgumentError(f"Argument '{arg_name}' must be one of: {', '.join(map(str, enum))}")
+
+    @staticmethod
+    def _is_integral_float(value: Any, accepted: Tuple[type, ...]) -> bool:
+        """Whether value is a float like 2.0 given for an integer"""
+        return int in accepted and isinstance(value, float) and value.is_integer()
+
+    @staticmethod
+    def _type_names(accepted: Tuple[type, ...]) -> str:
+        return "/".join(sorted({name for name, types in _JSON_TYPES.items() if set(types) <= set(accepted)}))
+
+
+@dataclass
+class ToolEntry:
+    """A single dispatchable tool"""
+
+    name: str
+    description: str
+    input_schema: Dict[str, Any]
+    handler: Callable[..., Any]
+    validator: SchemaValidator
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    # Set when the tool declares "cacheable" in its metadata
+    cache_policy: Optional[CachePolicy] = None
+    # Set when the tool declares "executor" or "max_concurrency" in its metadata
+    execution_policy: Optional[ExecutionPolicy] = None
+
+
+class ToolRegistry:
+    """Dispatch table built once from a server's tool definitions
+
+    The registry resolves tool names to bound handlers, compiles input schema
+    validators and caches the tools/list payloads for every transport. It is
+    built lazily on first use, because several servers populate the state that
+    get_tools() depends on after BaseMCPServer.__init__ has returned, and is
+    only rebuilt after invalidate() is called (e.g. by register_tool).
+    """
+
+    def __init__(self, server: Any):
+        self.server = server
+        self._entries: Optional[Dict[str, ToolEntry]] = None
+        self._definitions: Dict[str, Dict[str, Any]] = {}
+        self._list_result: Optional[Dict[str, Any]] = None
+        self._http_list_payload: Optional[bytes] = None
+        self._stdio_tools: Optional[List[Any]] = None
+
+    def invalidate(self) -> None:
+        """Drop the compiled table so it is rebuilt on next access"""
+        self._entries = None
+        self._definitions = {}
+        self._list_result = None
+        self._http_list_payload = None
+        self._stdio_tools = None
+
+    def _build(self) -> Dict[str, ToolEntry]:
+        """Compile the dispatch table from get_tools() and registered tools"""
+        definitions = dict(self.server.get_tools())
+        definitions.update(getattr(self.server, "_registered_tools", {}))
+
+        entries: Dict[str, ToolEntry] = {}
+        for tool_name, tool_info in definitions.items():
+            handler = tool_info.get("handler") or getattr(self.server, tool_name, None)
+            if handler is None:
+                # Listed but not implemented; callers report it as such
+                continue
+            schema = tool_info.get("parameters", {})
+            metadata = {k: v for k, v in tool_info.items() if k not in ("description", "parameters", "handler")}
+            entries[tool_name] = ToolEntry(
+                name=tool_name,
+                description=tool_info.get("description", ""),
+                input_schema=schema,
+                handler=handler,
+                validator=SchemaValidator(schema),
+                metadata=metadata,
+                cache_policy=CachePolicy.from_metadata(metadata),
+                execution_policy=ExecutionPolicy.from_metadata(metadata),
+            )
+
+        self._definitions = definitions
+        self._entries = entries
+        return entries
+
+    @property
+    def entries(self) -> Dict[str, ToolEntry]:
+        """Compiled entries keyed by tool name"""
+        if self._entries is None:
+            return self._build()
+        return self._entries
+
+    @property
+    def definitions(self) -> Dict[str, Dict[str, Any]]:
+        """Raw tool definitions, including tools without a handler"""
+        if self._entries is None:
+            self._build()
+        return self._definitions
+
+    def __contains__(self, tool_name: object) -> bool:
+        return tool_name in self.definitions
+
+    def __len__(self) -> int:
+        return len(self.definitions)
+
+    def names(self) -> List[str]:
+        """Names of all declared tools"""
+        return list(self.definitions.keys())
+
+    def get(self, tool_name: str) -> Optional[ToolEntry]:
+        """Get the compiled entry for a tool, or None if not implemented"""
+        return self.entries.get(tool_name)
+
+    def list_result(self) -> Dict[str, Any]:
+        """Cached JSON-RPC tools/list result"""
+        if self._list_result is None:
+            self._list_result = {
+                "tools": [
+                    {
+                        "name": tool_name,
+                        "description": tool_info.get("description", ""),
+                        "inputSchema": tool_info.get("parameters", {}),
+                    }
+                    for tool_name, tool_info in self.definitions.items()
+                ]
+            }
+        return self._list_result
+
+    def http_list_payload(self) -> bytes:
+        """Cached, pre-serialized body for GET /mcp/tools"""
+        if self._http_list_payload is None:
+            body = {
+                "tools": [
+                    {
+                        "name": tool_name,
+                        "description": tool_info.get("description", ""),
+                        "parameters": tool_info.get("parameters", {}),
+                    }
+                    for tool_name, tool_info in self.definitions.items()
+                ]
+            }
+            self._http_list_payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        return self._http_list_payload
+
+    def stdio_tools(self) -> List[Any]:
+        """Cached list of mcp.types.Tool for the stdio transport"""
+        if self._stdio_tools is None:
+            import mcp.types as types
+
+            self._stdio_tools = [
+                types.Tool(
+                    name=tool_name,
+                    description=tool_info.get("description", ""),
+                    inputSchema=tool_info.get("parameters", {}),
+                )
+                for tool_name, tool_info in self.definitions.items()
+            ]
+        return self._stdio_tools
@@ -1,14 +1,67 @@
 """Common utilities for MCP servers"""
 
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
 import sys
+import threading
 from typing import Any, Dict, List, Optional
 
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Records from every server logger go through one queue; a single background
+# listener thread formats them and does the blocking write to stdout
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_log_listener: Optional[logging.handlers.QueueListener] = None
+_log_listener_lock = threading.Lock()
+
+
+def _start_log_listener() -> None:
+    """Start the shared background log writer once per process"""
+    global _log_listener
+    with _log_listener_lock:
+        if _log_listener is not None:
+            return
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        _log_listener = logging.handlers.QueueListener(_log_queue, console_handler, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued log records and stop the background writer"""
+    global _log_listener
+    with _log_listener_lock:
+        if _log_listener is not None:
+            _log_listener.stop()
+            _log_listener = None
+
+
+def _restart_log_listener_in_child() -> None:
+    """Forked workers inherit the queue but not the writer thread; start their own"""
+    global _log_listener, _log_listener_lock
+    _log_listener_lock = threading.Lock()
+    if _log_listener is not None:
+        _log_listener = None
+        _start_log_listener()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_log_listener_in_child)
+
 
 def setup_logging(name: str, level: str = "INFO") -> logging.Logger:
     """Setup logging for an MCP server
 
+    Records are handed to a queue and written to stdout by a background
+    thread, so logging never blocks the event loop on I/O. Set
+    MCP_LOG_ASYNC=0 to write synchronously instead.
+
     Args:
         name: Logger name
         level: Logging level (DEBUG, INFO, WARNING, ERROR)
@@ -16,21 +69,74 @@ def setup_logging(name: str, level: str = "INFO") -> logging.Logger:
     Returns:
         Configured logger instance
     """
-    # Configure logging format
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-
-    # Setup console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, level.upper()))
-    logger.addHandler(console_handler)
+
+    # Calling setup_logging again for the same name must not duplicate output
+    if any(getattr(handler, "_mcp_handler", False) for handler in logger.handlers):
+        return logger
+
+    handler: logging.Handler
+    if os.environ.get("MCP_LOG_ASYNC", "1") == "0":
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    else:
+        _start_log_listener()
+        handler = logging.handlers.QueueHandler(_log_queue)
+    setattr(handler, "_mcp_handler", True)
+    logger.addHandler(handler)
 
     return logger
 
 
+def _clip_for_log(value: Any, budget: List[int]) -> Any:
+    """Copy of ``value`` holding only about ``budget[0]`` characters of content
+
+    Long strings and bytes are cut, and containers stop once the budget is
+    spent, so the copy is small no matter how large ``value`` is.
+    """
+    if isinstance(value, (str, bytes)):
+        value = value[: max(budget[0], 0)]
+        budget[0] -= len(value)
+        return value
+    if isinstance(value, dict):
+        clipped = {}
+        for key, item in value.items():
+            if budget[0] <= 0:
+                break
+            budget[0] -= len(str(key))
+            clipped[key] = _clip_for_log(item, budget)
+        return clipped
+    if isinstance(value, (list, tuple)):
+        items = []
+        for item in value:
+            if budget[0] <= 0:
+                break
+            items.append(_clip_for_log(item, budget))
+        return items
+    budget[0] -= 1
+    return value
+
+
+def truncate_for_log(value: Any, max_bytes: int = 2048) -> str:
+    """JSON-encode a value for logging, stopping once ``max_bytes`` is reached
+
+    Strings and containers are cut down before encoding, so a large request
+    body is not serialized in full just to log its first few kilobytes.
+    """
+    # One character over the cap, so the encoding of a cut value is known to exceed it
+    encoded = json.dumps(_clip_for_log(value, [max_bytes + 1]), default=str)
+    if len(encoded) > max_bytes:
+        return encoded[:max_bytes] + f"... [truncated, >{max_bytes} chars]"
+    return encoded
+
+
+def should_sample(rate: float) -> bool:
+    """Randomly decide whether to log an event sampled at ``rate`` (0.0-1.0)"""
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
 def validate_environment(required_vars: List[str]) -> Dict[str, str]:
     """Validate that required environment variables are set
 
@@ -81,8 +187,6 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     Returns:
         Configuration dictionary
     """
-    import json
-
     if config_path is None:
         # Look for .mcp.json in various locations
         search_paths = [
@@ -19,7 +19,8 @@ logger = logging.getLogger(__name__)
 class ElevenLabsClient:
     """Client for ElevenLabs API interactions"""
 
-    BASE_URL = "https://api.elevenlabs.io/v1"
+    # ELEVENLABS_API_URL points the client at a proxy or a local stub (see automation/testing/benchmark_stubs.py)
+    BASE_URL = os.environ.get("ELEVENLABS_API_URL", "https://api.elevenlabs.io/v1").rstrip("/")
     WS_URL = "wss://api.elevenlabs.io/v1/text-to-speech"
 
     def __init__(self, api_key: Optional[str] = None, project_root: Optional[Path] = None, output_dir: Optional[Path] = None):
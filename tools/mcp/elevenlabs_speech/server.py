@@ -586,10 +586,12 @@ class ElevenLabsSpeechMCPServer(BaseMCPServer):
             },
             "list_available_voices": {
                 "description": "List all available voices",
+                "cacheable": {"ttl": 3600},
                 "parameters": {"type": "object", "properties": {}},
             },
             "parse_audio_tags": {
                 "description": "Parse and validate audio tags in text",
+                "cacheable": {"ttl": 3600, "key_fields": ["text"]},
                 "parameters": {
                     "type": "object",
                     "properties": {"text": {"type": "string", "description": "Text containing audio tags"}},
@@ -1,16 +1,56 @@
 """Gaea2 CLI automation for running projects"""
 
 import asyncio
+import codecs
+import collections
 import json  # noqa: F401
 import logging
 import os  # noqa: F401
+import re
 import subprocess
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional
 
 from ..exceptions import Gaea2FileError
 
+# Lines of stdout and stderr kept for the result; earlier output is only passed to on_line
+OUTPUT_TAIL_LINES = 200
+
+# Bytes read from Gaea2's pipes at a time; longer runs without a line break are split at this size
+READ_CHUNK_SIZE = 65536
+
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+async def read_lines(stream: asyncio.StreamReader, on_line: Callable[[str], None]) -> None:
+    """Pass each line of a stream to on_line until EOF
+
+    Lines end at \\r as well as \\n, since Gaea2 redraws progress with bare
+    carriage returns. Unlike StreamReader.readline() this never fails on
+    long lines, so the pipe is always drained.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    pending = ""
+    while True:
+        try:
+            chunk = await stream.read(READ_CHUNK_SIZE)
+        except ConnectionError:
+            break
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        *lines, pending = _LINE_BREAK.split(pending)
+        if len(pending) >= READ_CHUNK_SIZE:
+            lines.append(pending)
+            pending = ""
+        for line in lines:
+            if line:
+                on_line(line)
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        on_line(pending)
+
 
 class Gaea2CLIAutomation:
     """Automate Gaea2 via command line interface"""
@@ -29,8 +69,14 @@ class Gaea2CLIAutomation:
         output_format: str = "exr",
         bake_only: Optional[List[str]] = None,
         timeout: int = 300,
+        on_line: Optional[Callable[[str, str], None]] = None,
     ) -> Dict[str, Any]:
-        """Run a Gaea2 project and generate terrain outputs"""
+        """Run a Gaea2 project and generate terrain outputs
+
+        Output is read line by line as Gaea2 writes it and passed to
+        on_line(stream, line); the result holds the last OUTPUT_TAIL_LINES
+        lines of each stream. Cancelling the call kills Gaea2.
+        """
 
         if not self.gaea_path:
             return {"success": False, "error": "Gaea2 executable path not configured"}
@@ -71,16 +117,39 @@ class Gaea2CLIAutomation:
             process = await asyncio.create_subprocess_exec(
                 *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
             )
+            stdout_tail: Deque[str] = collections.deque(maxlen=OUTPUT_TAIL_LINES)
+            stderr_tail: Deque[str] = collections.deque(maxlen=OUTPUT_TAIL_LINES)
+
+            async def pump(stream: asyncio.StreamReader, name: str, tail: Deque[str]):
+                def record(line: str) -> None:
+                    tail.append(line)
+                    if on_line is not None and line.strip():
+                        on_line(name, line)
+
+                await read_lines(stream, record)
+
+            async def run_to_exit():
+                await asyncio.gather(pump(process.stdout, "stdout", stdout_tail), pump(process.stderr, "stderr", stderr_tail))
+                await process.wait()
 
             try:
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+                await asyncio.wait_for(run_to_exit(), timeout=timeout)
             except asyncio.TimeoutError:
                 process.kill()
+                await process.wait()
                 return {
                     "success": False,
                     "error": f"Process timed out after {timeout} seconds",
+                    "stdout": "\n".join(stdout_tail),
+                    "stderr": "\n".join(stderr_tail),
                 }
+            except asyncio.CancelledError:
+                if process.returncode is None:
+                    process.kill()
+                raise
 
+            stdout = "\n".join(stdout_tail)
+            stderr = "\n".join(stderr_tail)
             execution_time = (datetime.now() - start_time).total_seconds()
 
             # Check results
@@ -93,15 +162,15 @@ class Gaea2CLIAutomation:
                     "output_dir": str(output_dir),
                     "output_files": [str(f) for f in output_files],
                     "execution_time": execution_time,
-                    "stdout": stdout.decode("utf-8", errors="ignore"),
-                    "stderr": stderr.decode("utf-8", errors="ignore"),
+                    "stdout": stdout,
+                    "stderr": stderr,
                 }
             else:
                 return {
                     "success": False,
                     "error": f"Gaea2 exited with code {process.returncode}",
-                    "stdout": stdout.decode("utf-8", errors="ignore"),
-                    "stderr": stderr.decode("utf-8", errors="ignore"),
+                    "stdout": stdout,
+                    "stderr": stderr,
                     "execution_time": execution_time,
                 }
 
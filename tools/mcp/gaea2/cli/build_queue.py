@@ -0,0 +1,596 @@
+"""Persistent queue of Gaea2 CLI builds
+
+Builds (run_gaea2_project calls) are recorded in a SQLite file and run by a
+fixed number of workers, so concurrent requests queue instead of starting
+more Gaea2 processes than the machine can take. The limit counts running
+builds in the file, so it holds across HTTP worker processes sharing it.
+
+- Jobs wait in priority lanes ("high", "normal", "low"); a lane is only
+  served when the lanes before it are empty, first in first out within it.
+- Gaea2's output is parsed line by line for progress, which is passed to
+  the queue's on_event callback together with state changes, and stored
+  with the next heartbeat.
+- Queued and running jobs survive a restart. A running job whose process
+  stops updating its heartbeat is queued again.
+- Finished jobs form the execution history. The oldest are deleted beyond
+  max_history, along with the index of the files each build wrote.
+
+SQLite calls block, so BuildQueue makes them in the default executor
+(``BuildQueue.call``) rather than on the event loop.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LANES = ("high", "normal", "low")
+FINISHED = ("completed", "failed", "cancelled")
+
+# Gaea2 progress output: "45%", "[3/12]" or "3 of 12"
+PERCENT_PATTERN = re.compile(r"(\d{1,3}(?:\.\d+)?)\s*%")
+COUNT_PATTERN = re.compile(r"\[\s*(\d+)\s*/\s*(\d+)\s*\]|\b(\d+)\s+of\s+(\d+)\b")
+
+JOB_COLUMNS = (
+    "id, project, lane, status, params, created, started, finished, progress, message, "
+    "result, error, duration, owner, heartbeat, notify"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT UNIQUE NOT NULL,
+    project TEXT NOT NULL,
+    lane INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    duration REAL,
+    owner TEXT,
+    heartbeat REAL,
+    notify TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, lane, seq);
+CREATE INDEX IF NOT EXISTS jobs_project ON jobs (project, finished);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished);
+CREATE TABLE IF NOT EXISTS outputs (
+    job_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    format TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    modified REAL NOT NULL,
+    PRIMARY KEY (job_id, path)
+);
+CREATE INDEX IF NOT EXISTS outputs_path ON outputs (path);
+CREATE INDEX IF NOT EXISTS outputs_format ON outputs (format);
+"""
+
+
+def parse_progress(line: str) -> Optional[float]:
+    """Percentage of a build reported by a line of Gaea2 output, if any"""
+    match = PERCENT_PATTERN.search(line)
+    if match:
+        return min(100.0, float(match.group(1)))
+    match = COUNT_PATTERN.search(line)
+    if match:
+        done, total = (int(g) for g in (match.group(1, 2) if match.group(1) else match.group(3, 4)))
+        if total:
+            return min(100.0, 100.0 * done / total)
+    return None
+
+
+class BuildJobStore:
+    """SQLite table of build jobs and the files they produced"""
+
+    def __init__(self, path: str, max_history: int = 1000):
+        self.path = path
+        self.max_history = max_history
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Reopen after a fork; SQLite connections must not cross processes
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["lane"] = LANES[job["lane"]]
+        for key in ("params", "result", "notify"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        return job
+
+    def add(self, project: str, params: Dict[str, Any], lane: str, notify: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Queue a job"""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO jobs (id, project, lane, status, params, created, notify) VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, project, LANES.index(lane), json.dumps(params), time.time(), json.dumps(notify) if notify else None),
+            )
+        return self.get(job_id)  # type: ignore[return-value]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job with the files it produced, or None"""
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            outputs = conn.execute(
+                "SELECT path, format, size, modified FROM outputs WHERE job_id = ? ORDER BY path", (job_id,)
+            ).fetchall()
+            position = None
+            if row["status"] == "queued":
+                position = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND (lane < ? OR (lane = ? AND seq < "
+                    "(SELECT seq FROM jobs WHERE id = ?)))",
+                    (row["lane"], row["lane"], job_id),
+                ).fetchone()[0]
+        job = self._job(row)
+        job["outputs"] = [dict(output) for output in outputs]
+        if position is not None:
+            job["queue_position"] = position
+        return job
+
+    def claim(self, owner: str, max_running: int) -> Optional[Dict[str, Any]]:
+        """Atomically start the next queued job, unless max_running jobs are running"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                running = conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('running', 'cancelling')").fetchone()[0]
+                row = None
+                if running < max_running:
+                    row = conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY lane, seq LIMIT 1").fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', started = ?, owner = ?, heartbeat = ?, message = NULL "
+                        "WHERE id = ?",
+                        (now, owner, now, row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"]) if row is not None else None
+
+    def heartbeat(self, job_ids: List[str]) -> None:
+        """Mark running jobs as still alive"""
+        if not job_ids:
+            return
+        with self._lock:
+            self._connection().executemany(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND status IN ('running', 'cancelling')",
+                [(time.time(), job_id) for job_id in job_ids],
+            )
+
+    def requeue_stale(self, older_than: float) -> int:
+        """Queue running jobs again whose heartbeat stopped before older_than
+
+        Jobs that were being cancelled are marked cancelled instead.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished = ?, error = 'Cancelled while running' "
+                "WHERE status = 'cancelling' AND heartbeat < ?",
+                (time.time(), older_than),
+            )
+            return conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, started = NULL, progress = 0, "
+                "message = 'Requeued after its worker stopped' WHERE status = 'running' AND heartbeat < ?",
+                (older_than,),
+            ).rowcount
+
+    def requeue_owned(self, owner: str) -> int:
+        """Queue the running jobs of a worker again, e.g. when it shuts down"""
+        with self._lock:
+            return (
+                self._connection()
+                .execute(
+                    "UPDATE jobs SET status = 'queued', owner = NULL, started = NULL, progress = 0, "
+                    "message = 'Requeued after shutdown' WHERE status IN ('running', 'cancelling') AND owner = ?",
+                    (owner,),
+                )
+                .rowcount
+            )
+
+    def set_progress(self, job_id: str, progress: float, message: Optional[str]) -> None:
+        with self._lock:
+            self._connection().execute(
+                "UPDATE jobs SET progress = ?, message = ?, heartbeat = ? "
+                "WHERE id = ? AND status IN ('running', 'cancelling')",
+                (progress, message, time.time(), job_id),
+            )
+
+    def request_cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued job, or flag a running one for its worker
+
+        Returns:
+            The job's status afterwards ("cancelled", "cancelling" or a
+            finished status), or None if there is no such job
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished = ?, message = 'Cancelled before it started' "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            conn.execute("UPDATE jobs SET status = 'cancelling' WHERE id = ? AND status = 'running'", (job_id,))
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["status"] if row is not None else None
+
+    def cancel_requested(self, job_ids: List[str]) -> List[str]:
+        """Those of the given jobs that were flagged for cancellation"""
+        if not job_ids:
+            return []
+        with self._lock:
+            rows = (
+                self._connection()
+                .execute(
+                    f"SELECT id FROM jobs WHERE status = 'cancelling' AND id IN ({','.join('?' * len(job_ids))})", job_ids
+                )
+                .fetchall()
+            )
+        return [row["id"] for row in rows]
+
+    def finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        outputs: Optional[List[Dict[str, Any]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Record a job's outcome and index its output files"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished = ?, duration = ? - started, result = ?, error = ?, "
+                "progress = CASE WHEN ? = 'completed' THEN 100 ELSE progress END WHERE id = ?",
+                (status, now, now, json.dumps(result) if result is not None else None, error, status, job_id),
+            )
+            if outputs:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO outputs (job_id, path, format, size, modified) VALUES (?, ?, ?, ?, ?)",
+                    [(job_id, o["path"], o["format"], o["size"], o["modified"]) for o in outputs],
+                )
+            self._prune(conn)
+        return self.get(job_id)
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        cutoff = conn.execute(
+            "SELECT finished FROM jobs WHERE finished IS NOT NULL ORDER BY finished DESC LIMIT 1 OFFSET ?",
+            (self.max_history,),
+        ).fetchone()
+        if cutoff is not None:
+            conn.execute(
+                "DELETE FROM outputs WHERE job_id IN (SELECT id FROM jobs WHERE finished IS NOT NULL AND finished <= ?)",
+                (cutoff[0],),
+            )
+            conn.execute("DELETE FROM jobs WHERE finished IS NOT NULL AND finished <= ?", (cutoff[0],))
+
+    def history(
+        self,
+        last_n: int = 10,
+        status: Optional[str] = None,
+        project: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Finished jobs matching the filters: the last_n most recent, and aggregates over all of them"""
+        where: List[str] = ["finished IS NOT NULL"]
+        args: List[Any] = []
+        for clause, value in (("status = ?", status), ("project = ?", project), ("finished >= ?", since)):
+            if value is not None:
+                where.append(clause)
+                args.append(value)
+        condition = " AND ".join(where)
+        with self._lock:
+            conn = self._connection()
+            totals = conn.execute(
+                f"SELECT COUNT(*) AS total, SUM(status = 'completed') AS completed, AVG(duration) AS avg_duration, "
+                f"MAX(duration) AS max_duration FROM jobs WHERE {condition}",
+                args,
+            ).fetchone()
+            by_status = conn.execute(
+                f"SELECT status, COUNT(*) AS count FROM jobs WHERE {condition} GROUP BY status", args
+            ).fetchall()
+            errors = conn.execute(
+                f"SELECT error, COUNT(*) AS count FROM jobs WHERE {condition} AND error IS NOT NULL "
+                "GROUP BY error ORDER BY count DESC LIMIT 5",
+                args,
+            ).fetchall()
+            outputs = conn.execute(
+                f"SELECT format, COUNT(*) AS files, SUM(size) AS bytes FROM outputs WHERE job_id IN "
+                f"(SELECT id FROM jobs WHERE {condition}) GROUP BY format",
+                args,
+            ).fetchall()
+            recent = conn.execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs WHERE {condition} ORDER BY finished DESC LIMIT ?", args + [last_n]
+            ).fetchall()
+        total = totals["total"] or 0
+        return {
+            "total": total,
+            "success_rate": (totals["completed"] or 0) / total if total else 0,
+            "avg_duration": totals["avg_duration"],
+            "max_duration": totals["max_duration"],
+            "by_status": {row["status"]: row["count"] for row in by_status},
+            "common_errors": [(row["error"], row["count"]) for row in errors],
+            "outputs": {row["format"]: {"files": row["files"], "bytes": row["bytes"]} for row in outputs},
+            "jobs": [self._job(row) for row in recent],
+        }
+
+    def find_outputs(
+        self, path_prefix: Optional[str] = None, output_format: Optional[str] = None, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Indexed output files, newest first, with the job and project that produced them"""
+        where: List[str] = ["1"]
+        args: List[Any] = []
+        if path_prefix:
+            # A range rather than LIKE, so the path index is used
+            where.append("o.path >= ? AND o.path < ?")
+            args.extend([path_prefix, path_prefix + "\uffff"])
+        if output_format:
+            where.append("o.format = ?")
+            args.append(output_format)
+        with self._lock:
+            rows = (
+                self._connection()
+                .execute(
+                    "SELECT o.path, o.format, o.size, o.modified, o.job_id, j.project FROM outputs o JOIN jobs j "
+                    f"ON j.id = o.job_id WHERE {' AND '.join(where)} ORDER BY o.modified DESC LIMIT ?",
+                    args + [limit],
+                )
+                .fetchall()
+            )
+        return [dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of queued and running jobs"""
+        with self._lock:
+            rows = (
+                self._connection()
+                .execute("SELECT status, COUNT(*) AS count FROM jobs WHERE finished IS NULL GROUP BY status")
+                .fetchall()
+            )
+        return {row["status"]: row["count"] for row in rows}
+
+
+class BuildQueue:
+    """Runs queued builds with a fixed number of workers
+
+    on_event(job, event) is called with event "started", "progress",
+    "completed", "failed" or "cancelled" for jobs run by this process.
+    """
+
+    def __init__(
+        self,
+        run: Callable[..., Any],
+        store: BuildJobStore,
+        workers: int = 1,
+        poll_interval: float = 2.0,
+        on_event: Optional[Callable[[Dict[str, Any], str], None]] = None,
+    ):
+        self.run = run
+        self.store = store
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.on_event = on_event
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: Dict[str, "asyncio.Task[None]"] = {}
+        self._cancel_events: Dict[str, asyncio.Event] = {}
+        # Latest (progress, message) of running jobs, not yet stored
+        self._progress: Dict[str, Tuple[float, str]] = {}
+        self._closing = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._finished: Optional[asyncio.Condition] = None
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+
+    @classmethod
+    def from_env(cls, run: Callable[..., Any], default_dir: str, **kwargs: Any) -> "BuildQueue":
+        """Queue configured by the GAEA2_BUILD_* variables
+
+        Each Gaea2 build is itself multi-threaded, so the default is one
+        worker per four cores.
+        """
+        store = BuildJobStore(
+            os.environ.get("GAEA2_BUILD_DB") or os.path.join(default_dir, "gaea2_builds.sqlite3"),
+            max_history=int(os.environ.get("GAEA2_BUILD_HISTORY_MAX", "1000")),
+        )
+        workers = int(os.environ.get("GAEA2_BUILD_WORKERS", "0")) or max(1, (os.cpu_count() or 1) // 4)
+        return cls(run, store, workers=workers, **kwargs)
+
+    async def start(self) -> int:
+        """Start dispatching queued builds, e.g. at server startup
+
+        Jobs left running by a process that has stopped are queued again
+        first; returns how many.
+        """
+        requeued = await self.call(self.store.requeue_stale, time.time() - 3 * self.poll_interval)
+        self._start()
+        return requeued
+
+    def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is None or self._dispatcher.done() or self._loop is not loop:
+            self._loop, self._closing = loop, False
+            self._wakeup = asyncio.Event()
+            self._finished = asyncio.Condition()
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+    async def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking store call, e.g. ``await queue.call(queue.store.get, job_id)``, off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def submit(
+        self, project: str, params: Dict[str, Any], lane: str = "normal", notify: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Queue a build; notify is stored with the job for on_event"""
+        if lane not in LANES:
+            raise ValueError(f"Unknown priority: {lane}. Use one of {', '.join(LANES)}")
+        self._start()
+        job = await self.call(self.store.add, project, params, lane, notify)
+        self._wakeup.set()  # type: ignore[union-attr]
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued or running job; returns its status, or None if unknown"""
+        status = await self.call(self.store.request_cancel, job_id)
+        if status == "cancelling" and job_id in self._cancel_events:
+            self._cancel_events[job_id].set()
+        return status
+
+    async def wait(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Wait until a job has finished, wherever it runs"""
+        self._start()
+        while True:
+            job = await self.call(self.store.get, job_id)
+            if job is None or job["status"] in FINISHED:
+                return job
+            async with self._finished:  # type: ignore[union-attr]
+                try:
+                    await asyncio.wait_for(self._finished.wait(), timeout=self.poll_interval)  # type: ignore[union-attr]
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _dispatch(self) -> None:
+        while True:
+            running = list(self._tasks)
+            progress, self._progress = self._progress, {}
+            for job_id in await self.call(self._poll, running, progress):
+                if job_id in self._cancel_events:
+                    self._cancel_events[job_id].set()
+
+            while len(self._tasks) < self.workers:
+                job = await self.call(self.store.claim, self.owner, self.workers)
+                if job is None:
+                    break
+                self._cancel_events[job["id"]] = asyncio.Event()
+                self._tasks[job["id"]] = asyncio.ensure_future(self._run_job(job))
+
+            self._wakeup.clear()  # type: ignore[union-attr]
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)  # type: ignore[union-attr]
+            except asyncio.TimeoutError:
+                pass
+
+    def _poll(self, running: List[str], progress: Dict[str, Tuple[float, str]]) -> List[str]:
+        """Store calls of one dispatcher pass; returns the running jobs flagged for cancellation"""
+        self.store.heartbeat(running)
+        for job_id, (value, message) in progress.items():
+            self.store.set_progress(job_id, value, message)
+        # Also jobs left running by a process that is gone
+        self.store.requeue_stale(time.time() - 3 * self.poll_interval)
+        return self.store.cancel_requested(running)
+
+    def _finish(self, job_id: str, progress: Optional[Tuple[float, str]], *args: Any) -> Optional[Dict[str, Any]]:
+        if progress is not None:
+            self.store.set_progress(job_id, *progress)
+        return self.store.finish(job_id, *args)
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        self._emit(job, "started")
+        last = {"progress": 0.0}
+
+        def on_line(stream: str, line: str) -> None:
+            progress = parse_progress(line)
+            if progress is not None and int(progress) > int(last["progress"]):
+                last["progress"] = progress
+                self._progress[job_id] = (progress, line[:200])
+                self._emit({**job, "progress": progress, "message": line[:200]}, "progress")
+
+        finished = None
+        runner = asyncio.ensure_future(self.run(**job["params"], on_line=on_line))
+        stopper = asyncio.ensure_future(self._cancel_events[job_id].wait())
+        try:
+            await asyncio.wait({runner, stopper}, return_when=asyncio.FIRST_COMPLETED)
+            runner.cancel()
+            stopper.cancel()
+            try:
+                result = await runner
+            except asyncio.CancelledError:
+                # On shutdown close() puts the job back in the queue
+                if not self._closing:
+                    pending = self._progress.pop(job_id, None)
+                    finished = await self.call(self._finish, job_id, pending, "cancelled", None, "Cancelled while running")
+            except Exception as e:
+                logger.error(f"Build {job_id} failed: {e}")
+                pending = self._progress.pop(job_id, None)
+                finished = await self.call(self._finish, job_id, pending, "failed", None, str(e))
+            else:
+                status = "completed" if result.get("success") else "failed"
+                pending = self._progress.pop(job_id, None)
+                finished = await self.call(
+                    self._finish, job_id, pending, status, result, result.get("error"), self._outputs(result)
+                )
+        finally:
+            del self._tasks[job_id]
+            del self._cancel_events[job_id]
+            self._wakeup.set()  # type: ignore[union-attr]
+            async with self._finished:  # type: ignore[union-attr]
+                self._finished.notify_all()  # type: ignore[union-attr]
+        if finished is not None:
+            self._emit(finished, finished["status"])
+
+    @staticmethod
+    def _outputs(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        outputs = []
+        for path in result.get("output_files", []):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            output_format = Path(path).suffix.lstrip(".").lower()
+            outputs.append({"path": path, "format": output_format, "size": stat.st_size, "modified": stat.st_mtime})
+        return outputs
+
+    def _emit(self, job: Dict[str, Any], event: str) -> None:
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(job, event)
+        except Exception as e:
+            logger.warning(f"Build event handler failed: {e}")
+
+    async def close(self) -> None:
+        """Stop dispatching and hand this process's running jobs back to the queue"""
+        self._closing = True
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        for event in self._cancel_events.values():
+            event.set()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._progress.clear()
+        await self.call(self.store.requeue_owned, self.owner)
@@ -7,6 +7,8 @@ import logging
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
+from ..utils.gaea2_graph import WorkflowGraph
+
 logger = logging.getLogger(__name__)
 
 
@@ -126,17 +128,12 @@ class Gaea2ErrorHandler:
         """Validate node connections and add errors"""
         errors = []
         node_ids = {node.get("id") for node in nodes}
+        graph = WorkflowGraph(nodes, connections)
 
         # Check for orphaned nodes
-        connected_nodes = set()
-        for conn in connections:
-            connected_nodes.add(conn.get("from_node"))
-            connected_nodes.add(conn.get("to_node"))
-
-        orphaned = node_ids - connected_nodes
-        for node_id in orphaned:
-            node = next((n for n in nodes if n.get("id") == node_id), None)
-            if node and node.get("type") not in ["Export", "Unity", "Unreal"]:
+        for node_id in graph.orphans():
+            node = graph.nodes[node_id]
+            if node.get("type") not in ["Export", "Unity", "Unreal"]:
                 error = Gaea2Error(
                     message=f"Node '{node.get('name', 'Unnamed')}' is not connected to anything",
                     severity=ErrorSeverity.WARNING,
@@ -162,6 +159,19 @@ class Gaea2ErrorHandler:
                 errors.append(error)
                 self.add_error(error)
 
+        for cycle in graph.cycles():
+            if len(cycle) > 2:
+                error = Gaea2Error(
+                    message=f"Circular dependency detected: {' → '.join(str(n) for n in cycle)}",
+                    severity=ErrorSeverity.ERROR,
+                    category=ErrorCategory.CONNECTION,
+                    node_id=cycle[0],
+                    suggestion="Remove one of the connections in the cycle",
+                    auto_fixable=False,
+                )
+                errors.append(error)
+                self.add_error(error)
+
         # Check for invalid connections
         for conn in connections:
             if conn.get("from_node") not in node_ids:
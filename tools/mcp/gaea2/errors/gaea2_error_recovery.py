@@ -7,6 +7,7 @@ import logging
 from copy import deepcopy
 from typing import Any, Dict, List, Tuple
 
+from tools.mcp.gaea2.utils.gaea2_graph import WorkflowGraph
 from tools.mcp.gaea2.utils.gaea2_pattern_knowledge import get_next_node_suggestions, suggest_properties_for_node
 from tools.mcp.gaea2.validation.gaea2_connection_validator import Gaea2ConnectionValidator
 from tools.mcp.gaea2.validation.gaea2_format_fixes import generate_non_sequential_id
@@ -191,12 +192,8 @@ class Gaea2ErrorRecovery:
     ) -> List[Dict[str, Any]]:
         """Connect orphaned nodes based on patterns"""
         # Find orphaned nodes
-        connected_ids = set()
-        for conn in connections:
-            connected_ids.add(conn["from_node"])
-            connected_ids.add(conn["to_node"])
-
-        orphaned = [n for n in nodes if n["id"] not in connected_ids]
+        graph = WorkflowGraph(nodes, connections)
+        orphaned = [graph.nodes[node_id] for node_id in graph.orphans()]
 
         if not orphaned:
             return connections
@@ -266,16 +263,13 @@ class Gaea2ErrorRecovery:
         if "Erosion2" in node_types and "Rivers" in node_types:
             erosion_nodes = [n for n in nodes if n["type"] == "Erosion2"]
             rivers_nodes = [n for n in nodes if n["type"] == "Rivers"]
+            graph = WorkflowGraph(nodes, connections)
 
             # Make sure at least one erosion connects to rivers
             for river in rivers_nodes:
                 river_id = river["id"]
                 # Check if river has erosion input
-                has_erosion_input = any(
-                    conn["to_node"] == river_id
-                    and any(n["id"] == conn["from_node"] and n["type"] == "Erosion2" for n in nodes)
-                    for conn in connections
-                )
+                has_erosion_input = any(graph.node_type(source) == "Erosion2" for source in graph.predecessors(river_id))
 
                 if not has_erosion_input and erosion_nodes:
                     # Connect nearest erosion to river
@@ -197,7 +197,7 @@ class Gaea2MCPIntegration:
 
         # Register each tool with the MCP server
         for tool_def in enhanced_tools:
-            # Assuming the MCP server has a register_tool method
+            # BaseMCPServer.register_tool invalidates the shared dispatch table
             await mcp_server_instance.register_tool(
                 name=tool_def["name"],
                 description=tool_def["description"],
@@ -0,0 +1,185 @@
+"""Parameter sweeps over a base Gaea2 workflow
+
+A sweep varies properties of nodes in an already validated workflow. Each
+axis names a node (by id or name), a property and its values::
+
+    {"node": "Mountain", "property": "Seed", "range": {"start": 1, "stop": 51}}
+    {"node": 183, "property": "Scale", "values": [0.5, 1.0, 2.0]}
+
+Axes combine as a grid (every combination) or zipped (position by position).
+Only the varied values are checked against the schema; the rest of the
+workflow is validated once for the whole batch.
+
+generate_chunk is the unit of work handed to the process pool: it builds the
+projects of a slice of variants and writes them as compact JSON.
+"""
+
+import asyncio
+import itertools
+import json
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .generator import Gaea2ProjectGenerator
+
+SWEEP_MODES = ("grid", "zip")
+
+
+@dataclass(frozen=True)
+class SweepAxis:
+    """One varied property of one node"""
+
+    node_id: Any
+    node_type: str
+    property: str
+    values: Tuple[Any, ...]
+
+    @property
+    def label(self) -> str:
+        return f"{self.node_id}.{self.property}"
+
+
+def _range_values(spec: Dict[str, Any]) -> List[Any]:
+    start, stop, step = spec.get("start", 0), spec["stop"], spec.get("step", 1)
+    if not step:
+        raise ValueError("Sweep range step must not be zero")
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in (start, stop, step)):
+        return list(range(start, stop, step))
+    # Like range(): values before stop, with slack for float error in the quotient
+    count = max(0, math.ceil((stop - start) / step - 1e-9))
+    return [round(start + i * step, 6) for i in range(count)]
+
+
+def parse_sweep(sweep: List[Dict[str, Any]], nodes: List[Dict[str, Any]]) -> List[SweepAxis]:
+    """Resolve sweep entries against the workflow's nodes
+
+    Raises:
+        ValueError: If an entry names an unknown node or has no values
+    """
+    if not sweep:
+        raise ValueError("Sweep must have at least one entry")
+    by_id = {str(node.get("id")): node for node in nodes}
+    by_name = {node.get("name"): node for node in nodes if node.get("name")}
+    from ..schema.gaea2_schema import get_compiled_schema
+
+    schema = get_compiled_schema()
+
+    axes = []
+    for entry in sweep:
+        ref = entry.get("node")
+        node = by_id.get(str(ref)) or by_name.get(ref)
+        if node is None:
+            raise ValueError(f"Sweep references unknown node: {ref}")
+        if not entry.get("property"):
+            raise ValueError(f"Sweep entry for node {ref} has no property")
+        if "values" in entry:
+            values = list(entry["values"])
+        elif "range" in entry:
+            values = _range_values(entry["range"])
+        else:
+            raise ValueError(f"Sweep entry for {ref}.{entry['property']} needs 'values' or 'range'")
+        if not values:
+            raise ValueError(f"Sweep entry for {ref}.{entry['property']} has no values")
+
+        node_type = node.get("type", "")
+        name = schema.resolve_property(node_type, entry["property"]) or entry["property"]
+        axes.append(SweepAxis(node.get("id"), node_type, name, tuple(values)))
+    return axes
+
+
+def expand_variants(axes: Sequence[SweepAxis], mode: str = "grid") -> List[Tuple[int, ...]]:
+    """Value indices of every variant, one per axis"""
+    if mode == "grid":
+        return list(itertools.product(*(range(len(axis.values)) for axis in axes)))
+    if mode == "zip":
+        lengths = {len(axis.values) for axis in axes}
+        if len(lengths) > 1:
+            raise ValueError(f"Zipped sweep axes must have the same number of values, got {sorted(lengths)}")
+        return [(i,) * len(axes) for i in range(lengths.pop())]
+    raise ValueError(f"Unknown sweep mode: {mode}. Use one of {', '.join(SWEEP_MODES)}")
+
+
+def check_axis_values(
+    axes: Sequence[SweepAxis], nodes: List[Dict[str, Any]], limited_types: Optional[set] = None
+) -> Tuple[Dict[Tuple[int, int], List[str]], List[str]]:
+    """Validate each distinct swept value once
+
+    Returns:
+        - errors keyed by (axis index, value index), for values that make a variant invalid
+        - warnings, such as values outside the recommended range
+    """
+    from ..schema.gaea2_schema import get_compiled_schema
+
+    schema = get_compiled_schema()
+    by_id = {node.get("id"): node for node in nodes}
+    errors: Dict[Tuple[int, int], List[str]] = {}
+    warnings: List[str] = []
+    for a, axis in enumerate(axes):
+        properties = by_id[axis.node_id].get("properties", {})
+        if limited_types and axis.node_type in limited_types and axis.property not in properties and len(properties) >= 3:
+            message = f"{axis.label}: {axis.node_type} nodes must have <= 3 properties to open in Gaea2"
+            errors.update({(a, v): [message] for v in range(len(axis.values))})
+            continue
+        for v, value in enumerate(axis.values):
+            value_errors, value_warnings = schema.validate_properties(axis.node_type, {axis.property: value})
+            if value_errors:
+                errors[(a, v)] = [f"{axis.label}: {message}" for message in value_errors]
+            warnings.extend(f"{axis.label}: {message}" for message in value_warnings)
+    return errors, list(dict.fromkeys(warnings))
+
+
+def apply_variant(nodes: List[Dict[str, Any]], axes: Sequence[SweepAxis], values: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Copy of nodes with the variant's values set; only the varied nodes are copied"""
+    overrides: Dict[Any, Dict[str, Any]] = {}
+    for axis, value in zip(axes, values):
+        overrides.setdefault(axis.node_id, {})[axis.property] = value
+    return [
+        (
+            {**node, "properties": {**node.get("properties", {}), **overrides[node.get("id")]}}
+            if node.get("id") in overrides
+            else node
+        )
+        for node in nodes
+    ]
+
+
+def write_compact(path: str, data: Any) -> int:
+    """Write JSON without indentation, atomically; returns the size in bytes"""
+    payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return len(payload)
+
+
+def generate_chunk(
+    nodes: List[Dict[str, Any]],
+    connections: List[Dict[str, Any]],
+    axes: Sequence[SweepAxis],
+    jobs: List[Tuple[int, str, str, Tuple[Any, ...]]],
+) -> List[Dict[str, Any]]:
+    """Generate and write the projects of (index, name, path, values) jobs
+
+    Runs in a pool worker. Failures are reported per variant, not raised.
+    """
+    generator = Gaea2ProjectGenerator()
+
+    async def generate_all() -> List[Dict[str, Any]]:
+        results = []
+        for index, name, path, values in jobs:
+            result: Dict[str, Any] = {"index": index, "name": name, "values": dict(zip((a.label for a in axes), values))}
+            try:
+                project = await generator.create_project(name, apply_variant(nodes, axes, values), connections)
+                if project.get("success") is False:
+                    raise ValueError(project.get("error", "Project generation failed"))
+                result["bytes"] = write_compact(path, project.get("project", project))
+                result["path"] = path
+            except Exception as e:
+                result["error"] = str(e)
+            results.append(result)
+        return results
+
+    return asyncio.run(generate_all())
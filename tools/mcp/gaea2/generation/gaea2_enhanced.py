@@ -1,7 +1,9 @@
 """Enhanced Gaea 2 MCP Tools with support for advanced features"""
 
+import asyncio
 import base64
 import json
+import os
 import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
@@ -644,12 +646,23 @@ class EnhancedGaea2Tools:
     @staticmethod
     async def analyze_build_outputs(build_directory: str) -> Dict[str, Any]:
         """
-        Analyze build outputs including reports and file sizes
+        Analyze build outputs including reports, file sizes and heightmap statistics
 
-        This would parse report.json and analyze output files
+        Heightmaps are read tile by tile in a worker thread, see utils.gaea2_heightmap
         """
-        return {
-            "success": True,
-            "message": "Analysis functionality would parse build outputs",
-            "directory": build_directory,
-        }
+        from ..utils import gaea2_heightmap
+
+        if not os.path.isdir(build_directory):
+            return {"success": False, "error": f"Build directory not found: {build_directory}"}
+
+        result = await asyncio.get_running_loop().run_in_executor(None, gaea2_heightmap.analyze_build_outputs, build_directory)
+        entries = sorted(os.scandir(build_directory), key=lambda entry: entry.name)
+        result["files"] = {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+        report_path = os.path.join(build_directory, "report.json")
+        if os.path.exists(report_path):
+            try:
+                with open(report_path, "r") as f:
+                    result["report"] = json.load(f)
+            except (OSError, ValueError) as e:
+                result["errors"]["report.json"] = str(e)
+        return result
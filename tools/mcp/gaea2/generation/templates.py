@@ -3,22 +3,30 @@
 import logging
 from typing import Any, Dict, List, Optional
 
-# Import from the real schema
-from ..schema.gaea2_schema import WORKFLOW_TEMPLATES, create_workflow_from_template
-
 
 class Gaea2Templates:
-    """Manage Gaea2 workflow templates"""
+    """Manage Gaea2 workflow templates
+
+    The templates live in the Gaea2 schema module, which is imported on
+    first use rather than with the server.
+    """
 
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.templates = WORKFLOW_TEMPLATES
+
+    @property
+    def templates(self) -> Dict[str, Any]:
+        from ..schema.gaea2_schema import WORKFLOW_TEMPLATES
+
+        return WORKFLOW_TEMPLATES
 
     async def get_template(self, template_name: str) -> Optional[Dict[str, Any]]:
         """Get a workflow template by name"""
         if template_name not in self.templates:
             return None
 
+        from ..schema.gaea2_schema import create_workflow_from_template
+
         # Use existing implementation - returns tuple of (nodes, connections)
         try:
             nodes, connections = create_workflow_from_template(template_name)
@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional
 from ..stubs import knowledge_graph  # noqa: F401
 from ..stubs import COMMON_NODE_SEQUENCES, NODE_COMPATIBILITY, PROPERTY_RANGES  # noqa: F401
 from ..stubs import Gaea2WorkflowAnalyzer as OriginalAnalyzer
+from ..utils.gaea2_graph import WorkflowGraph
 
 
 class Gaea2WorkflowAnalyzer:
@@ -58,6 +59,20 @@ class Gaea2WorkflowAnalyzer:
             "common_sequences": found_sequences,
             "node_distribution": dict(node_distribution),
             "most_used_nodes": node_distribution.most_common(5),
+            "structure": self._analyze_structure(WorkflowGraph(nodes, connections)),
+        }
+
+    def _analyze_structure(self, graph: WorkflowGraph) -> Dict[str, Any]:
+        """Analyze the connection graph: depth, cycles and nodes every output depends on"""
+        outputs = [node_id for node_id in graph.sinks() if graph.in_degree(node_id)]
+        shared = frozenset.intersection(*(graph.dominators(node_id) for node_id in outputs)) if outputs else frozenset()
+
+        return {
+            "acyclic": graph.is_acyclic(),
+            "depth": graph.depth(),
+            "entry_nodes": graph.sources(),
+            "output_nodes": outputs,
+            "bottlenecks": [node_id for node_id in graph.nodes if node_id in shared and node_id not in outputs],
         }
 
     def _analyze_performance(self, nodes: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -7,6 +7,7 @@ import json
 import logging
 from typing import Any, Dict, List, Optional, Tuple
 
+from tools.mcp.gaea2.utils.gaea2_graph import WorkflowGraph
 from tools.mcp.gaea2.utils.workflow_extractor import WorkflowExtractor
 
 from ..errors.gaea2_error_handler import ErrorCategory, ErrorSeverity, Gaea2Error, Gaea2ErrorHandler
@@ -327,15 +328,14 @@ class Gaea2ProjectRepair:
     def _find_redundant_nodes(self, nodes: List[Dict[str, Any]], connections: List[Dict[str, Any]]) -> List[int]:
         """Find redundant nodes that can be removed"""
         redundant: List[int] = []
+        graph = WorkflowGraph(nodes, connections)
 
         # Find pass-through Combine nodes (ratio = 0.5, only one input)
         for node in nodes:
             if node.get("type") == "Combine":
                 node_id = node.get("id")
                 if node_id is not None:
-                    # Count inputs
-                    inputs = [c for c in connections if c.get("to_node") == node_id]
-                    if len(inputs) == 1 and node.get("properties", {}).get("Ratio", 0.5) == 0.5:
+                    if graph.in_degree(node_id) == 1 and node.get("properties", {}).get("Ratio", 0.5) == 0.5:
                         redundant.append(node_id)
 
         return redundant
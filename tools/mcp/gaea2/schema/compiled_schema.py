@@ -0,0 +1,332 @@
+"""Compiled, indexed form of the Gaea2 node schema
+
+gaea2_schema.py keeps the schema as nested dicts that are easy to read and
+edit. Looking things up in them means scanning every category for a node type
+and re-interpreting property definitions on every validation call, so this
+module compiles them once into:
+
+- type -> category, type -> ports and type -> property rule maps
+- case-insensitive aliases for node types and property names
+- one rule object per property with its range, type check or enum options
+  (as a frozenset) resolved up front
+
+The compiled schema is built lazily by ``gaea2_schema.get_compiled_schema()``.
+Set GAEA2_SCHEMA_CACHE_DIR to also keep a pickled copy on disk; the file name
+carries a hash of the schema sources, so editing the schema invalidates it.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Bump when the layout of CompiledSchema changes so old pickles are ignored
+SCHEMA_FORMAT_VERSION = 1
+
+DEFAULT_PORTS: Dict[str, List[Dict[str, Any]]] = {
+    "inputs": [{"name": "In", "type": "heightfield"}],
+    "outputs": [{"name": "Out", "type": "heightfield"}],
+}
+
+# Categories whose nodes get a default Seed
+SEEDED_CATEGORIES = ("primitive", "terrain", "surface")
+
+logger = logging.getLogger(__name__)
+
+
+class PropertyRule:
+    """Validation rule for one property, compiled from its definition"""
+
+    __slots__ = ("name", "spec", "has_default", "default")
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.spec = spec
+        self.has_default = "default" in spec
+        self.default = spec.get("default")
+
+    def check(self, value: Any, errors: List[str], warnings: List[str]) -> None:
+        """Append problems with ``value`` to errors/warnings"""
+
+
+class NumberRule(PropertyRule):
+    """Numeric property with an optional recommended range"""
+
+    __slots__ = ("minimum", "maximum", "has_range")
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        super().__init__(name, spec)
+        self.has_range = "range" in spec
+        value_range = spec.get("range", {})
+        self.minimum = value_range.get("min", float("-inf"))
+        self.maximum = value_range.get("max", float("inf"))
+
+    def check(self, value: Any, errors: List[str], warnings: List[str]) -> None:
+        if not isinstance(value, (int, float)):
+            errors.append(f"Property '{self.name}' should be numeric, got {type(value).__name__}")
+        elif self.has_range and not self.minimum <= value <= self.maximum:
+            warnings.append(f"Property '{self.name}' value {value} outside recommended range [{self.minimum}, {self.maximum}]")
+
+
+class TypeRule(PropertyRule):
+    """Property that must be an instance of a Python type"""
+
+    __slots__ = ("python_type", "label")
+
+    TYPES = {"int": (int, "integer"), "bool": (bool, "boolean"), "string": (str, "string")}
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        super().__init__(name, spec)
+        self.python_type, self.label = self.TYPES[spec["type"]]
+
+    def check(self, value: Any, errors: List[str], warnings: List[str]) -> None:
+        if not isinstance(value, self.python_type):
+            errors.append(f"Property '{self.name}' should be {self.label}, got {type(value).__name__}")
+
+
+class EnumRule(PropertyRule):
+    """Property restricted to a set of options"""
+
+    __slots__ = ("options", "ordered_options", "options_text")
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        super().__init__(name, spec)
+        self.ordered_options = tuple(spec.get("options", []))
+        self.options: FrozenSet[Any] = frozenset(self.ordered_options)
+        self.options_text = ", ".join(str(option) for option in self.ordered_options)
+
+    def check(self, value: Any, errors: List[str], warnings: List[str]) -> None:
+        try:
+            valid = value in self.options
+        except TypeError:
+            # Unhashable values can still compare equal to an option
+            valid = value in self.ordered_options
+        if not valid:
+            errors.append(f"Property '{self.name}' value '{value}' not in valid options: {self.options_text}")
+
+
+def compile_rule(name: str, spec: Dict[str, Any]) -> PropertyRule:
+    """Rule for a property definition; types without checks get a no-op rule"""
+    kind = spec.get("type", "float")
+    if kind == "float":
+        return NumberRule(name, spec)
+    if kind in TypeRule.TYPES:
+        return TypeRule(name, spec)
+    if kind == "enum":
+        return EnumRule(name, spec)
+    return PropertyRule(name, spec)
+
+
+class PortIndex:
+    """Ports of a node type, indexed by name"""
+
+    __slots__ = ("definition", "inputs", "outputs")
+
+    def __init__(self, definition: Dict[str, List[Dict[str, Any]]]):
+        self.definition = definition
+        self.inputs = self._index(definition.get("inputs", []))
+        self.outputs = self._index(definition.get("outputs", []))
+
+    @staticmethod
+    def _index(ports: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+        index: Dict[str, str] = {}
+        for port in ports:
+            # The first port with a name wins, as in a linear search
+            index.setdefault(port["name"], port.get("type", "heightfield"))
+        return index
+
+
+class CompiledSchema:
+    """Indexed node schema with precompiled property validators"""
+
+    def __init__(
+        self,
+        categories: Dict[str, List[str]],
+        node_properties: Dict[str, Dict[str, Any]],
+        common_properties: Dict[str, Dict[str, Any]],
+        port_definitions: Dict[str, Dict[str, List[Dict[str, Any]]]],
+        port_compatibility: Dict[str, List[str]],
+        source_hash: str = "",
+    ):
+        self.source_hash = source_hash
+        self.port_definitions = port_definitions
+
+        self.category_by_type: Dict[str, str] = {}
+        for category, node_types in categories.items():
+            for node_type in node_types:
+                self.category_by_type.setdefault(node_type, category)
+        self.node_types: FrozenSet[str] = frozenset(self.category_by_type)
+
+        known_types = list(self.category_by_type) + [t for t in node_properties if t not in self.category_by_type]
+        self.type_aliases: Dict[str, str] = {}
+        for node_type in known_types:
+            self.type_aliases.setdefault(node_type.lower(), node_type)
+
+        # Property rules: node-specific definitions override common ones
+        self.common_rules: Dict[str, PropertyRule] = {
+            name: compile_rule(name, spec) for name, spec in common_properties.items()
+        }
+        self.rules_by_type: Dict[str, Dict[str, PropertyRule]] = {}
+        self.defaults_by_type: Dict[str, Tuple[Tuple[str, Any], ...]] = {}
+        for node_type, definitions in node_properties.items():
+            rules = dict(self.common_rules)
+            rules.update((name, compile_rule(name, spec)) for name, spec in definitions.items())
+            self.rules_by_type[node_type] = rules
+            self.defaults_by_type[node_type] = tuple(
+                (name, spec["default"]) for name, spec in definitions.items() if "default" in spec
+            )
+        for node_type, category in self.category_by_type.items():
+            defaults = self.defaults_by_type.get(node_type, ())
+            if category in SEEDED_CATEGORIES and all(name != "Seed" for name, _ in defaults):
+                self.defaults_by_type[node_type] = defaults + (("Seed", 0),)
+
+        self.property_aliases: Dict[str, Dict[str, str]] = {}
+        common_aliases = {name.lower(): name for name in self.common_rules}
+        for node_type, rules in self.rules_by_type.items():
+            aliases = dict(common_aliases)
+            aliases.update((name.lower(), name) for name in node_properties[node_type])
+            self.property_aliases[node_type] = aliases
+        self.common_property_aliases = common_aliases
+
+        # Ports: special-cased names, then the category, then one In/Out pair
+        self._default_ports = PortIndex(DEFAULT_PORTS)
+        indexes: Dict[int, PortIndex] = {}
+        self.ports_by_type: Dict[str, PortIndex] = {}
+        for node_type in known_types:
+            definition = self._port_definition(node_type)
+            if definition is None:
+                self.ports_by_type[node_type] = self._default_ports
+            else:
+                self.ports_by_type[node_type] = indexes.setdefault(id(definition), PortIndex(definition))
+
+        self.compatible_types: Dict[str, FrozenSet[str]] = {
+            output_type: frozenset(input_types) for output_type, input_types in port_compatibility.items()
+        }
+
+    def _port_definition(self, node_type: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        definition = self.port_definitions.get(node_type.lower())
+        if definition is None:
+            definition = self.port_definitions.get(self.category(node_type))
+        return definition
+
+    # Loading
+
+    @staticmethod
+    def hash_sources(paths: Iterable[str]) -> str:
+        """Content hash of the files the schema is compiled from"""
+        digest = hashlib.sha256(f"format:{SCHEMA_FORMAT_VERSION}".encode())
+        for path in paths:
+            digest.update(Path(path).read_bytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def load(
+        cls,
+        categories: Dict[str, List[str]],
+        node_properties: Dict[str, Dict[str, Any]],
+        common_properties: Dict[str, Dict[str, Any]],
+        port_definitions: Dict[str, Dict[str, List[Dict[str, Any]]]],
+        port_compatibility: Dict[str, List[str]],
+        source_files: Iterable[str] = (),
+        cache_dir: Optional[str] = None,
+    ) -> "CompiledSchema":
+        """Compile the schema, reusing a pickle in ``cache_dir`` when the sources match"""
+        if not cache_dir:
+            return cls(categories, node_properties, common_properties, port_definitions, port_compatibility)
+
+        source_hash = cls.hash_sources(list(source_files) + [__file__])
+        cache_file = Path(cache_dir) / f"gaea2_schema-{source_hash[:16]}.pickle"
+        try:
+            with open(cache_file, "rb") as f:
+                schema = pickle.load(f)
+            if isinstance(schema, cls) and schema.source_hash == source_hash:
+                return schema
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable compiled schema {cache_file}: {e}")
+
+        schema = cls(categories, node_properties, common_properties, port_definitions, port_compatibility, source_hash)
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(schema, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_file)
+        except OSError as e:
+            logger.warning(f"Could not write compiled schema to {cache_file}: {e}")
+        return schema
+
+    # Lookups
+
+    def resolve_type(self, node_type: str) -> Optional[str]:
+        """Canonical spelling of a node type, matched case-insensitively"""
+        if node_type in self.ports_by_type:
+            return node_type
+        return self.type_aliases.get(node_type.lower())
+
+    def resolve_property(self, node_type: str, name: str) -> Optional[str]:
+        """Canonical spelling of a property of a node type, matched case-insensitively"""
+        aliases = self.property_aliases.get(node_type, self.common_property_aliases)
+        return aliases.get(name.lower())
+
+    def category(self, node_type: str) -> str:
+        return self.category_by_type.get(node_type, "unknown")
+
+    def port_index(self, node_type: str) -> PortIndex:
+        index = self.ports_by_type.get(node_type)
+        if index is None:
+            # Unknown types can still match a special-cased name in another case
+            definition = self._port_definition(node_type)
+            index = self._default_ports if definition is None else PortIndex(definition)
+        return index
+
+    def ports(self, node_type: str) -> Dict[str, List[Dict[str, Any]]]:
+        return self.port_index(node_type).definition
+
+    def property_rules(self, node_type: str) -> Dict[str, PropertyRule]:
+        return self.rules_by_type.get(node_type, self.common_rules)
+
+    # Validation
+
+    def validate_properties(self, node_type: str, properties: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+        errors: List[str] = []
+        warnings: List[str] = []
+        rules = self.property_rules(node_type)
+        for name, value in properties.items():
+            rule = rules.get(name)
+            if rule is None:
+                warnings.append(f"Unknown property '{name}' for node type {node_type}")
+            else:
+                rule.check(value, errors, warnings)
+        return errors, warnings
+
+    def validate_connection(
+        self, from_node: Dict[str, Any], to_node: Dict[str, Any], from_port: str, to_port: str
+    ) -> Tuple[bool, str]:
+        output_type = self.port_index(from_node["type"]).outputs.get(from_port)
+        if output_type is None:
+            return False, f"Node {from_node['name']} has no output port '{from_port}'"
+
+        input_type = self.port_index(to_node["type"]).inputs.get(to_port)
+        if input_type is None:
+            return False, f"Node {to_node['name']} has no input port '{to_port}'"
+
+        compatible = self.compatible_types.get(output_type, frozenset((output_type,)))
+        if input_type not in compatible:
+            return False, (
+                f"Port type mismatch: {from_node['name']}.{from_port} "
+                f"({output_type}) cannot connect to {to_node['name']}.{to_port} "
+                f"({input_type})"
+            )
+        return True, ""
+
+    def apply_defaults(self, node_type: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        result = properties.copy()
+        for name, default in self.defaults_by_type.get(node_type, ()):
+            if name not in result:
+                result[name] = default
+        return result
@@ -6,7 +6,10 @@ based on deep analysis of the official Gaea 2 documentation.
 Updated with accurate node types, properties, and validation rules.
 """
 
-from typing import Any, Dict, List, Tuple
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from .compiled_schema import CompiledSchema
 
 # Complete node types extracted from Gaea 2 documentation
 # Organized by category for better understanding and validation
@@ -2092,69 +2095,36 @@ WORKFLOW_TEMPLATES = {
 }
 
 
+_compiled_schema: Optional[CompiledSchema] = None
+
+
+def get_compiled_schema() -> CompiledSchema:
+    """Get the indexed form of this schema, compiling it on first use.
+
+    Set GAEA2_SCHEMA_CACHE_DIR to reuse a pickled copy across processes.
+    """
+    global _compiled_schema
+    if _compiled_schema is None:
+        _compiled_schema = CompiledSchema.load(
+            NODE_CATEGORIES,
+            NODE_PROPERTY_DEFINITIONS,
+            COMMON_NODE_PROPERTIES,
+            NODE_PORT_DEFINITIONS,
+            PORT_COMPATIBILITY,
+            source_files=[__file__],
+            cache_dir=os.environ.get("GAEA2_SCHEMA_CACHE_DIR"),
+        )
+    return _compiled_schema
+
+
 def get_node_category(node_type: str) -> str:
     """Get the category of a node type."""
-    for category, nodes in NODE_CATEGORIES.items():
-        if node_type in nodes:
-            return category
-    return "unknown"
+    return get_compiled_schema().category(node_type)
 
 
 def get_node_ports(node_type: str) -> Dict[str, List[Dict[str, Any]]]:
     """Get the port definitions for a node type."""
-    # Special cases first - check in lowercase
-    node_type_lower = node_type.lower()
-    if node_type_lower in NODE_PORT_DEFINITIONS:
-        port_def = NODE_PORT_DEFINITIONS[node_type_lower]
-        assert isinstance(port_def, dict)  # Type assertion for mypy
-        return port_def
-
-    # Special cases with specific names
-    if node_type == "Combine":
-        port_def = NODE_PORT_DEFINITIONS["combine"]
-        assert isinstance(port_def, dict)
-        return port_def
-    elif node_type in ["Portal", "PortalTransmit", "PortalReceive"]:
-        port_def = NODE_PORT_DEFINITIONS[node_type.lower()]
-        assert isinstance(port_def, dict)
-        return port_def
-    elif node_type == "Sea":
-        port_def = NODE_PORT_DEFINITIONS["sea"]
-        assert isinstance(port_def, dict)
-        return port_def
-    elif node_type == "Rivers":
-        port_def = NODE_PORT_DEFINITIONS["rivers"]
-        assert isinstance(port_def, dict)
-        return port_def
-    elif node_type == "FractalTerraces":
-        port_def = NODE_PORT_DEFINITIONS["fractalterraces"]
-        assert isinstance(port_def, dict)
-        return port_def
-    elif node_type == "Stratify":
-        port_def = NODE_PORT_DEFINITIONS["stratify"]
-        assert isinstance(port_def, dict)
-        return port_def
-    elif node_type == "Crumble":
-        port_def = NODE_PORT_DEFINITIONS["crumble"]
-        assert isinstance(port_def, dict)
-        return port_def
-    elif node_type == "Erosion2":
-        port_def = NODE_PORT_DEFINITIONS["erosion2"]
-        assert isinstance(port_def, dict)
-        return port_def
-
-    # Get by category
-    category = get_node_category(node_type)
-    if category in NODE_PORT_DEFINITIONS:
-        port_def = NODE_PORT_DEFINITIONS[category]
-        assert isinstance(port_def, dict)
-        return port_def
-
-    # Default: one input, one output
-    return {
-        "inputs": [{"name": "In", "type": "heightfield"}],
-        "outputs": [{"name": "Out", "type": "heightfield"}],
-    }
+    return get_compiled_schema().ports(node_type)
 
 
 def validate_node_properties(node_type: str, properties: Dict[str, Any]) -> Tuple[List[str], List[str]]:
@@ -2163,59 +2133,7 @@ def validate_node_properties(node_type: str, properties: Dict[str, Any]) -> Tupl
     Returns:
         Tuple of (errors, warnings)
     """
-    errors: List[str] = []
-    warnings: List[str] = []
-
-    # Get property definitions for this node type
-    if node_type in NODE_PROPERTY_DEFINITIONS:
-        prop_defs = NODE_PROPERTY_DEFINITIONS[node_type]
-        assert isinstance(prop_defs, dict)  # Type assertion for mypy
-    else:
-        prop_defs = {}
-
-    # Validate each property
-    for prop_name, prop_value in properties.items():
-        # Check if property is defined for this node
-        if prop_name in prop_defs:
-            prop_def = prop_defs[prop_name]
-        elif prop_name in COMMON_NODE_PROPERTIES:
-            prop_def = COMMON_NODE_PROPERTIES[prop_name]
-        else:
-            warnings.append(f"Unknown property '{prop_name}' for node type {node_type}")
-            continue
-
-        # Type validation
-        expected_type = prop_def.get("type", "float")
-
-        if expected_type == "float":
-            if not isinstance(prop_value, (int, float)):
-                errors.append(f"Property '{prop_name}' should be numeric, got {type(prop_value).__name__}")
-            elif "range" in prop_def:
-                min_val = prop_def["range"].get("min", float("-inf"))
-                max_val = prop_def["range"].get("max", float("inf"))
-                if not min_val <= prop_value <= max_val:
-                    warnings.append(
-                        f"Property '{prop_name}' value {prop_value} outside " f"recommended range [{min_val}, {max_val}]"
-                    )
-
-        elif expected_type == "int":
-            if not isinstance(prop_value, int):
-                errors.append(f"Property '{prop_name}' should be integer, got {type(prop_value).__name__}")
-
-        elif expected_type == "bool":
-            if not isinstance(prop_value, bool):
-                errors.append(f"Property '{prop_name}' should be boolean, got {type(prop_value).__name__}")
-
-        elif expected_type == "enum":
-            options = prop_def.get("options", [])
-            if prop_value not in options:
-                errors.append(f"Property '{prop_name}' value '{prop_value}' not in " f"valid options: {', '.join(options)}")
-
-        elif expected_type == "string":
-            if not isinstance(prop_value, str):
-                errors.append(f"Property '{prop_name}' should be string, got {type(prop_value).__name__}")
-
-    return errors, warnings
+    return get_compiled_schema().validate_properties(node_type, properties)
 
 
 def validate_connection(from_node: Dict[str, Any], to_node: Dict[str, Any], from_port: str, to_port: str) -> Tuple[bool, str]:
@@ -2224,70 +2142,12 @@ def validate_connection(from_node: Dict[str, Any], to_node: Dict[str, Any], from
     Returns:
         Tuple of (is_valid, error_message)
     """
-    # Get port definitions
-    from_ports = get_node_ports(from_node["type"])
-    to_ports = get_node_ports(to_node["type"])
-
-    # Find the output port
-    output_port = None
-    for port in from_ports.get("outputs", []):
-        if port["name"] == from_port:
-            output_port = port
-            break
-
-    if not output_port:
-        return False, f"Node {from_node['name']} has no output port '{from_port}'"
-
-    # Find the input port
-    input_port = None
-    for port in to_ports.get("inputs", []):
-        if port["name"] == to_port:
-            input_port = port
-            break
-
-    if not input_port:
-        return False, f"Node {to_node['name']} has no input port '{to_port}'"
-
-    # Check type compatibility
-    output_type = output_port.get("type", "heightfield")
-    input_type = input_port.get("type", "heightfield")
-
-    compatible_types = PORT_COMPATIBILITY.get(output_type, [output_type])
-    if input_type not in compatible_types:
-        return False, (
-            f"Port type mismatch: {from_node['name']}.{from_port} "
-            f"({output_type}) cannot connect to {to_node['name']}.{to_port} "
-            f"({input_type})"
-        )
-
-    return True, ""
+    return get_compiled_schema().validate_connection(from_node, to_node, from_port, to_port)
 
 
 def apply_default_properties(node_type: str, properties: Dict[str, Any]) -> Dict[str, Any]:
     """Apply default values for missing properties."""
-    result = properties.copy()
-
-    # Get property definitions for this node type
-    if node_type in NODE_PROPERTY_DEFINITIONS:
-        prop_defs = NODE_PROPERTY_DEFINITIONS[node_type]
-        assert isinstance(prop_defs, dict)  # Type assertion for mypy
-
-        # Add defaults for missing properties
-        for prop_name, prop_def in prop_defs.items():
-            if prop_name not in result and "default" in prop_def:
-                result[prop_name] = prop_def["default"]
-
-    # Add common defaults (only if not already present)
-    if node_type in VALID_NODE_TYPES:
-        # Seed is common to most nodes
-        if "Seed" not in result and get_node_category(node_type) in [
-            "primitive",
-            "terrain",
-            "surface",
-        ]:
-            result["Seed"] = 0
-
-    return result
+    return get_compiled_schema().apply_defaults(node_type, properties)
 
 
 def create_workflow_from_template(
@@ -2665,4 +2525,5 @@ __all__ = [
     "create_workflow_from_template",
     "get_node_category",
     "get_node_ports",
+    "get_compiled_schema",
 ]
@@ -2,7 +2,7 @@
 """
 Download Gaea2 terrain file from remote server using the new download tool
 """
-import base64
+from urllib.parse import urlsplit
 
 import requests
 
@@ -43,7 +43,7 @@ def download_terrain_file(filename, local_filename, server_url="http://192.168.0
 
     mcp_request = {
         "tool": "download_gaea2_project",
-        "parameters": {"filename": filename_only, "encoding": "base64"},
+        "parameters": {"filename": filename_only, "encoding": "url"},
     }
 
     try:
@@ -53,15 +53,15 @@ def download_terrain_file(filename, local_filename, server_url="http://192.168.0
             result = response.json()
 
             if result.get("success") and result.get("result", {}).get("success"):
-                data = result["result"]["data"]
                 file_info = result["result"]
 
-                # Decode base64 data
-                file_data = base64.b64decode(data)
-
-                # Save to file
+                # Fetch the signed link from the same host we reached the tool on
+                link = urlsplit(file_info["url"])
+                download = requests.get(f"{server_url}{link.path}?{link.query}", stream=True, timeout=30)
+                download.raise_for_status()
                 with open(local_filename, "wb") as f:
-                    f.write(file_data)
+                    for chunk in download.iter_content(chunk_size=65536):
+                        f.write(chunk)
 
                 print(f"✓ Successfully downloaded via MCP tool: {local_filename}")
                 print(f"  Original filename: {file_info['filename']}")
@@ -1,30 +1,43 @@
 """Gaea2 Terrain Generation MCP Server"""
 
-import asyncio  # noqa: F401
+import asyncio
 import base64
 import json
 import logging  # noqa: F401
+import math
 import os
 import platform
+import re
 import sys  # noqa: F401
+import time
 from datetime import datetime
 from glob import glob
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union  # noqa: F401
 
-from aiohttp import web  # noqa: F401
-from fastapi import Request, Response
-from fastapi.responses import FileResponse
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
 
+from ..core import metrics
 from ..core.base_server import BaseMCPServer
+from ..core.event_bus import current_progress_token, current_session_id
 from ..core.utils import check_container_environment, ensure_directory, setup_logging
 from .cli import Gaea2CLIAutomation
+from .cli.build_queue import LANES, BuildQueue
 
 # Import Gaea2 modules (will be reorganized into subdirectories)
-from .generation import Gaea2ProjectGenerator, Gaea2Templates
+from .generation import Gaea2ProjectGenerator, Gaea2Templates, batch
 from .optimization import Gaea2Optimizer, Gaea2WorkflowAnalyzer
 from .repair import Gaea2Repairer
+from .utils.gaea2_cache import COUNTERS, get_cache
 from .validation import Gaea2Validator
+from .validation.gaea2_validation_session import ValidationSessionManager
+
+
+def _safe_project_name(project_name: str) -> str:
+    """Project name reduced to a file name that cannot leave the output directory"""
+    name = os.path.basename(str(project_name).replace("\\", "/"))
+    return re.sub(r"[^\w .-]+", "_", name).strip(" ._") or "project"
 
 
 class Gaea2MCPServer(BaseMCPServer):
@@ -81,24 +94,85 @@ class Gaea2MCPServer(BaseMCPServer):
         self.analyzer = Gaea2WorkflowAnalyzer()
         self.repairer = Gaea2Repairer()
         self.cli = Gaea2CLIAutomation(self.gaea_path) if self.gaea_path else None
-
-        # Execution history for debugging
-        self.execution_history: List[Dict[str, Any]] = []
-
-        # Add custom routes for file download
-        self._setup_custom_routes()
-
-    def _setup_custom_routes(self):
-        """Setup custom routes for Gaea2 server"""
+        # Queue of CLI builds; finished builds are the execution history
+        self.build_queue = (
+            BuildQueue.from_env(self.cli.run_project, self.output_dir, on_event=self._on_build_event) if self.cli else None
+        )
+        # Incremental validation sessions (start/patch/close_gaea2_validation_session)
+        self.validation_sessions = ValidationSessionManager(
+            self.validator, self.state.mapping("validation_sessions", max_items=64), max_sessions=64
+        )
+        # Largest parameter sweep create_gaea2_projects_batch accepts
+        self.batch_max_variants = int(os.environ.get("GAEA2_BATCH_MAX_VARIANTS", "1000"))
+
+    def _setup_events(self):
+        """Setup startup/shutdown events, dispatching queued builds from startup until shutdown"""
+        super()._setup_events()
+
+        @self.app.on_event("startup")
+        async def start_build_queue():
+            await self._start_build_queue()
+
+        @self.app.on_event("shutdown")
+        async def close_build_queue():
+            if self.build_queue:
+                await self.build_queue.close()
+
+    def warmup(self) -> None:
+        """Build the tool table, the node knowledge graph and the compiled schema"""
+        from .schema.gaea2_schema import get_compiled_schema
+        from .utils.gaea2_knowledge_graph import get_knowledge_graph
+
+        super().warmup()
+        get_knowledge_graph()
+        get_compiled_schema()
+
+    async def _start_build_queue(self) -> None:
+        """Resume builds queued before a restart instead of waiting for the next submit"""
+        if not self.build_queue:
+            return
+        requeued = await self.build_queue.start()
+        if requeued:
+            self.logger.info(f"Requeued {requeued} builds left running by a stopped server")
+
+    async def run_stdio(self):
+        """Run the server in stdio mode, dispatching queued builds from the start"""
+        await self._start_build_queue()
+        await super().run_stdio()
+
+    def _setup_routes(self):
+        """Setup HTTP routes, adding file download routes for Gaea2"""
+        super()._setup_routes()
         self.app.get("/download/{filename}")(self.download_file_http)
         self.app.get("/files/{filename}")(self.download_file_http)
         self.app.get("/list")(self.list_files_http)
 
+    async def get_stats(self):
+        """Server statistics, including the Gaea2 operation cache"""
+        stats = await super().get_stats()
+        stats["gaea2_cache"] = get_cache().stats()
+        return stats
+
+    def extra_metrics_lines(self, labels: metrics.Labels) -> List[str]:
+        """Gaea2 operation cache counters and size"""
+        stats = get_cache().stats()
+        lines = []
+        for counter in COUNTERS:
+            name = f"gaea2_cache_{counter}_total"
+            lines.extend(metrics.format_metric_header(name, "counter", f"Gaea2 cache {counter} per operation"))
+            for operation, counters in sorted(stats["operations"].items()):
+                lines.append(metrics.format_sample(name, counters[counter], {**labels, "operation": operation}))
+        for key, help_text in (("entries", "Entries held by the Gaea2 cache"), ("bytes", "Estimated size of the Gaea2 cache")):
+            lines.extend(metrics.format_metric_header(f"gaea2_cache_{key}", "gauge", help_text))
+            lines.append(metrics.format_sample(f"gaea2_cache_{key}", stats[key], labels))
+        return lines
+
     def get_tools(self) -> Dict[str, Dict[str, Any]]:
         """Return available Gaea2 tools"""
         tools = {
             "create_gaea2_project": {
                 "description": "Create a new Gaea2 terrain project with nodes and connections",
+                "executor": "thread",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -140,6 +214,52 @@ class Gaea2MCPServer(BaseMCPServer):
                     "required": ["project_name"],
                 },
             },
+            "create_gaea2_projects_batch": {
+                "description": (
+                    "Create one Gaea2 project per variant of a property sweep over a base workflow. "
+                    "Returns counts and the failed variants; manifest.json in the batch directory lists every variant"
+                ),
+                "max_concurrency": 2,
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "project_name": {
+                            "type": "string",
+                            "description": "Base name; variants are saved as <project_name>_0000.terrain, ...",
+                        },
+                        "workflow": {
+                            "type": "object",
+                            "description": "Base workflow with nodes and connections",
+                            "properties": {
+                                "nodes": {"type": "array", "items": {"type": "object"}},
+                                "connections": {"type": "array", "items": {"type": "object"}},
+                            },
+                        },
+                        "sweep": {
+                            "type": "array",
+                            "description": "Varied properties: {node (id or name), property, values} "
+                            "or {node, property, range: {start, stop, step}}",
+                            "items": {"type": "object"},
+                        },
+                        "mode": {
+                            "type": "string",
+                            "enum": list(batch.SWEEP_MODES),
+                            "default": "grid",
+                            "description": "'grid' creates every combination; 'zip' pairs the values position by position",
+                        },
+                        "output_dir": {
+                            "type": "string",
+                            "description": "Directory for the projects and manifest.json",
+                        },
+                        "auto_validate": {
+                            "type": "boolean",
+                            "default": True,
+                            "description": "Validate and fix the base workflow before sweeping",
+                        },
+                    },
+                    "required": ["project_name", "workflow", "sweep"],
+                },
+            },
             "create_gaea2_from_template": {
                 "description": "Create a Gaea2 project from a predefined template",
                 "parameters": {
@@ -176,6 +296,7 @@ class Gaea2MCPServer(BaseMCPServer):
             },
             "validate_and_fix_workflow": {
                 "description": "Validate and automatically fix a Gaea2 workflow",
+                "executor": "process",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -195,6 +316,76 @@ class Gaea2MCPServer(BaseMCPServer):
                     "required": ["workflow"],
                 },
             },
+            "start_gaea2_validation_session": {
+                "description": (
+                    "Open an incremental validation session on a workflow. Change it with "
+                    "patch_gaea2_validation_session; each patch revalidates only what it touches"
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "workflow": {
+                            "type": "object",
+                            "properties": {
+                                "nodes": {"type": "array"},
+                                "connections": {"type": "array"},
+                            },
+                        },
+                    },
+                    "required": ["workflow"],
+                },
+            },
+            "patch_gaea2_validation_session": {
+                "description": "Apply patches to a validation session and return the updated validation result",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "session_id": {"type": "string"},
+                        "patches": {
+                            "type": "array",
+                            "description": (
+                                "Operations applied in order: add_node {node}, remove_node {id}, "
+                                "update_node {id, type?, properties}, set_property {id, name, value}, "
+                                "remove_property {id, name}, add_connection {connection}, remove_connection {connection}"
+                            ),
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "op": {
+                                        "type": "string",
+                                        "enum": [
+                                            "add_node",
+                                            "remove_node",
+                                            "update_node",
+                                            "set_property",
+                                            "remove_property",
+                                            "add_connection",
+                                            "remove_connection",
+                                        ],
+                                    },
+                                },
+                                "required": ["op"],
+                            },
+                        },
+                    },
+                    "required": ["session_id", "patches"],
+                },
+            },
+            "close_gaea2_validation_session": {
+                "description": "Close a validation session and return its workflow, optionally validated and fixed in full",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "session_id": {"type": "string"},
+                        "fix": {
+                            "type": "boolean",
+                            "default": False,
+                            "description": "Run validate_and_fix_workflow on the final workflow",
+                        },
+                    },
+                    "required": ["session_id"],
+                },
+            },
             "analyze_workflow_patterns": {
                 "description": "Analyze workflow patterns and suggest improvements",
                 "parameters": {
@@ -236,6 +427,7 @@ class Gaea2MCPServer(BaseMCPServer):
             },
             "suggest_gaea2_nodes": {
                 "description": "Get intelligent node suggestions based on current workflow",
+                "cacheable": {"ttl": 600, "key_fields": ["current_nodes", "context"]},
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -254,6 +446,7 @@ class Gaea2MCPServer(BaseMCPServer):
             },
             "repair_gaea2_project": {
                 "description": "Repair a damaged or corrupted Gaea2 project file",
+                "executor": "thread",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -270,6 +463,51 @@ class Gaea2MCPServer(BaseMCPServer):
                     "required": ["project_path"],
                 },
             },
+            "analyze_gaea2_heightmaps": {
+                "description": (
+                    "Elevation and slope statistics, erosion mask coverage and tile seam deltas of the RAW/R16/R32/EXR "
+                    "heightmaps in a Gaea2 build output directory"
+                ),
+                "max_concurrency": 2,
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "path": {
+                            "type": "string",
+                            "description": "Heightmap file or build output directory",
+                        },
+                        "job_id": {
+                            "type": "string",
+                            "description": "Analyze the output directory of this run_gaea2_project build instead",
+                        },
+                        "tile_size": {
+                            "type": "integer",
+                            "default": 1024,
+                            "description": "Heightmaps are read in tiles of this many pixels square",
+                        },
+                        "terrain_width": {
+                            "type": "number",
+                            "default": 5000,
+                            "description": "Terrain width in meters, for slopes",
+                        },
+                        "terrain_height": {
+                            "type": "number",
+                            "default": 2600,
+                            "description": "Height in meters of a fully white heightmap pixel",
+                        },
+                        "slope_bins": {
+                            "type": "array",
+                            "items": {"type": "number"},
+                            "description": "Slope histogram bin edges in degrees",
+                        },
+                        "mask_threshold": {
+                            "type": "number",
+                            "default": 0.05,
+                            "description": "Erosion mask pixels above this value count as covered",
+                        },
+                    },
+                },
+            },
         }
 
         # Add CLI automation tools if Gaea2 is available
@@ -305,10 +543,37 @@ class Gaea2MCPServer(BaseMCPServer):
                                     "default": 300,
                                     "description": "Timeout in seconds",
                                 },
+                                "priority": {
+                                    "type": "string",
+                                    "enum": list(LANES),
+                                    "default": "normal",
+                                    "description": "Queue lane; queued builds in higher lanes run first",
+                                },
+                                "wait": {
+                                    "type": "boolean",
+                                    "default": True,
+                                    "description": "Wait for the build to finish; otherwise return its job id at once",
+                                },
                             },
                             "required": ["project_path"],
                         },
                     },
+                    "get_gaea2_build_job": {
+                        "description": "Get the status, progress and output files of a queued Gaea2 build",
+                        "parameters": {
+                            "type": "object",
+                            "properties": {"job_id": {"type": "string", "description": "Job id from run_gaea2_project"}},
+                            "required": ["job_id"],
+                        },
+                    },
+                    "cancel_gaea2_build_job": {
+                        "description": "Cancel a queued or running Gaea2 build",
+                        "parameters": {
+                            "type": "object",
+                            "properties": {"job_id": {"type": "string", "description": "Job id from run_gaea2_project"}},
+                            "required": ["job_id"],
+                        },
+                    },
                     "analyze_execution_history": {
                         "description": "Analyze Gaea2 execution history for debugging",
                         "parameters": {
@@ -318,7 +583,24 @@ class Gaea2MCPServer(BaseMCPServer):
                                     "type": "integer",
                                     "default": 10,
                                     "description": "Number of recent executions to analyze",
-                                }
+                                },
+                                "status": {
+                                    "type": "string",
+                                    "enum": ["completed", "failed", "cancelled"],
+                                    "description": "Only executions that ended this way",
+                                },
+                                "project_path": {
+                                    "type": "string",
+                                    "description": "Only executions of this project",
+                                },
+                                "since_hours": {
+                                    "type": "number",
+                                    "description": "Only executions that finished in the last N hours",
+                                },
+                                "output_format": {
+                                    "type": "string",
+                                    "description": "Also list the newest indexed output files of this format (e.g. exr)",
+                                },
                             },
                         },
                     },
@@ -341,9 +623,11 @@ class Gaea2MCPServer(BaseMCPServer):
                     },
                     "encoding": {
                         "type": "string",
-                        "enum": ["base64", "raw"],
-                        "default": "base64",
-                        "description": "How to encode the file data",
+                        "enum": ["url", "base64", "raw"],
+                        "description": (
+                            "'url' returns a signed download link; 'base64' and 'raw' inline the file data. "
+                            "Defaults to 'url' when links can be downloaded (HTTP mode), else 'base64'"
+                        ),
                     },
                 },
                 "required": ["filename"],
@@ -412,7 +696,7 @@ class Gaea2MCPServer(BaseMCPServer):
             if not output_path:
                 output_path = os.path.join(
                     self.output_dir,
-                    f"{project_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.terrain",
+                    f"{_safe_project_name(project_name)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.terrain",
                 )
 
             ensure_directory(os.path.dirname(output_path))
@@ -430,19 +714,20 @@ class Gaea2MCPServer(BaseMCPServer):
             file_validation_performed = False
             file_validation_passed = False
             file_validation_error = None
+            file_validation_cached = False
 
             # Check if we should bypass validation (for tests only)
             bypass_for_tests = os.environ.get("GAEA2_BYPASS_FILE_VALIDATION_FOR_TESTS") == "1"
 
             if self.enforce_file_validation and self.gaea_path and not bypass_for_tests:
                 try:
-                    from .validation.gaea2_file_validator import Gaea2FileValidator
+                    from .validation.gaea2_file_validator import get_file_validator
 
                     self.logger.info(f"Validating generated file in Gaea2: {output_path}")
-                    file_validator = Gaea2FileValidator(self.gaea_path)
-                    validation_result = await file_validator.validate_file(output_path, timeout=30)
+                    validation_result = await get_file_validator(self.gaea_path).validate_file(output_path, timeout=30)
 
                     file_validation_performed = True
+                    file_validation_cached = validation_result.get("cached", False)
                     file_validation_passed = validation_result["success"]
 
                     if not file_validation_passed:
@@ -490,6 +775,7 @@ class Gaea2MCPServer(BaseMCPServer):
                 "validation_applied": auto_validate,
                 "file_validation_performed": file_validation_performed,
                 "file_validation_passed": file_validation_passed,
+                "file_validation_cached": file_validation_cached,
                 "bypass_for_tests": bypass_for_tests,
             }
 
@@ -528,6 +814,139 @@ class Gaea2MCPServer(BaseMCPServer):
             self.logger.error(f"Failed to create from template: {str(e)}")
             return {"success": False, "error": str(e)}
 
+    async def create_gaea2_projects_batch(
+        self,
+        *,
+        project_name: str,
+        workflow: Dict[str, Any],
+        sweep: List[Dict[str, Any]],
+        mode: str = "grid",
+        output_dir: Optional[str] = None,
+        auto_validate: bool = True,
+    ) -> Dict[str, Any]:
+        """Create one project per variant of a property sweep
+
+        The base workflow is validated once; only the swept values are checked
+        per value. Projects are generated and written in the process pool.
+        """
+        started = time.monotonic()
+        if not isinstance(workflow, dict):
+            return {"success": False, "error": "Workflow must be a dictionary with 'nodes' and 'connections'"}
+        nodes = workflow.get("nodes", [])
+        connections = workflow.get("connections", [])
+
+        try:
+            fixes_applied = []
+            if auto_validate:
+                validation_result = await self.validator.validate_and_fix({"nodes": nodes, "connections": connections})
+                if validation_result["fixed"]:
+                    nodes = validation_result["workflow"]["nodes"]
+                    connections = validation_result["workflow"]["connections"]
+                fixes_applied = validation_result.get("fixes_applied", [])
+            axes = batch.parse_sweep(sweep, nodes)
+            variants = batch.expand_variants(axes, mode)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+        if len(variants) > self.batch_max_variants:
+            return {
+                "success": False,
+                "error": f"Sweep has {len(variants)} variants; the limit is {self.batch_max_variants}",
+            }
+
+        value_errors, warnings = batch.check_axis_values(axes, nodes, Gaea2Validator.PROPERTY_LIMITED_NODES)
+        file_name = _safe_project_name(project_name)
+        batch_dir = ensure_directory(
+            output_dir or os.path.join(self.output_dir, f"{file_name}_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        )
+
+        projects: List[Dict[str, Any]] = []
+        jobs = []
+        for index, value_indices in enumerate(variants):
+            name = f"{file_name}_{index:04d}"
+            values = tuple(axis.values[i] for axis, i in zip(axes, value_indices))
+            errors = [message for key in enumerate(value_indices) for message in value_errors.get(key, [])]
+            projects.append({"index": index, "name": name, "values": dict(zip((a.label for a in axes), values))})
+            if errors:
+                projects[index]["error"] = "; ".join(errors)
+            else:
+                jobs.append((index, name, os.path.join(batch_dir, f"{name}.terrain"), values))
+
+        # A few chunks per worker keeps the pool busy without pickling the base workflow per variant
+        chunk_size = max(1, math.ceil(len(jobs) / (self.tool_executor.process_workers * 4)))
+        chunks = [jobs[i : i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+        async def run_chunk(chunk):
+            try:
+                return await self.tool_executor.submit("process", batch.generate_chunk, nodes, connections, axes, chunk)
+            except Exception as e:
+                return [{"index": index, "error": str(e)} for index, _, _, _ in chunk]
+
+        done = 0
+        for finished in asyncio.as_completed([run_chunk(chunk) for chunk in chunks]):
+            results = await finished
+            for result in results:
+                projects[result["index"]].update(result)
+            done += len(results)
+            self.report_progress(done, len(jobs), f"Generated {done}/{len(jobs)} projects")
+
+        bypass_for_tests = os.environ.get("GAEA2_BYPASS_FILE_VALIDATION_FOR_TESTS") == "1"
+        if self.enforce_file_validation and self.gaea_path and not bypass_for_tests:
+            await self._validate_batch_files([project for project in projects if "path" in project])
+
+        generated = sum(1 for project in projects if "path" in project)
+        manifest = {
+            "project_name": project_name,
+            "created": datetime.now().isoformat(),
+            "mode": mode,
+            "axes": [
+                {"node": axis.node_id, "type": axis.node_type, "property": axis.property, "values": list(axis.values)}
+                for axis in axes
+            ],
+            "fixes_applied": fixes_applied,
+            "warnings": warnings,
+            "generated": generated,
+            "failed": len(projects) - generated,
+            "projects": projects,
+        }
+        manifest_path = os.path.join(batch_dir, "manifest.json")
+        await self.tool_executor.submit("thread", batch.write_compact, manifest_path, manifest)
+
+        return {
+            "success": generated > 0,
+            "batch_dir": batch_dir,
+            "manifest_path": manifest_path,
+            "variant_count": len(projects),
+            "generated": generated,
+            "failed": len(projects) - generated,
+            "fixes_applied": fixes_applied,
+            "warnings": warnings,
+            # Every variant is listed in the manifest; only failures are returned
+            "failures": [project for project in projects if "path" not in project],
+            "duration_seconds": round(time.monotonic() - started, 3),
+        }
+
+    async def _validate_batch_files(self, projects: List[Dict[str, Any]]):
+        """Open generated batch files in Gaea2, deleting and marking the ones that fail"""
+        from .validation.gaea2_file_validator import get_file_validator
+
+        try:
+            summary = await get_file_validator(self.gaea_path).validate_batch([project["path"] for project in projects])
+            results = {result["file_path"]: result for result in summary["results"]}
+        except Exception as e:
+            self.logger.error(f"File validation error: {str(e)}")
+            results = {}
+
+        for project in projects:
+            result = results.get(project["path"], {"success": False, "error": "File validation system error"})
+            if result.get("cached"):
+                project["validation_cached"] = True
+            if not result["success"]:
+                project["error"] = f"Generated file failed Gaea2 validation: {result.get('error', 'File failed to open')}"
+                try:
+                    os.remove(project.pop("path"))
+                except OSError as e:
+                    self.logger.error(f"Failed to delete invalid file: {e}")
+
     async def validate_and_fix_workflow(self, *, workflow: Dict[str, Any], strict_mode: bool = False) -> Dict[str, Any]:
         """Validate and fix a Gaea2 workflow"""
         try:
@@ -559,6 +978,34 @@ class Gaea2MCPServer(BaseMCPServer):
             self.logger.error(f"Validation failed: {str(e)}")
             return {"success": False, "error": str(e)}
 
+    async def start_gaea2_validation_session(self, *, workflow: Dict[str, Any]) -> Dict[str, Any]:
+        """Open an incremental validation session"""
+        if not isinstance(workflow, dict):
+            return {"success": False, "error": "Workflow must be a dictionary"}
+        try:
+            return {"success": True, **(await self.state.call(self.validation_sessions.start, workflow))}
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+    async def patch_gaea2_validation_session(self, *, session_id: str, patches: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply patches to a validation session"""
+        try:
+            return {"success": True, **(await self.state.call(self.validation_sessions.patch, session_id, patches))}
+        except KeyError as e:
+            return {"success": False, "error": e.args[0]}
+        except ValueError as e:
+            return {"success": False, "error": str(e), "session_id": session_id}
+
+    async def close_gaea2_validation_session(self, *, session_id: str, fix: bool = False) -> Dict[str, Any]:
+        """Close a validation session, returning its workflow"""
+        try:
+            workflow = await self.state.call(self.validation_sessions.close, session_id)
+        except KeyError as e:
+            return {"success": False, "error": e.args[0]}
+        if fix:
+            return await self.validate_and_fix_workflow(workflow=workflow)
+        return {"success": True, "workflow": workflow}
+
     async def analyze_workflow_patterns(
         self,
         *,
@@ -689,49 +1136,132 @@ class Gaea2MCPServer(BaseMCPServer):
         format: str = "exr",
         bake_only: Optional[List[str]] = None,
         timeout: int = 300,
+        priority: str = "normal",
+        wait: bool = True,
     ) -> Dict[str, Any]:
-        """Run a Gaea2 project via CLI"""
-        if not self.cli:
+        """Run a Gaea2 project via CLI, through the build queue"""
+        if not self.build_queue:
             return {
                 "success": False,
                 "error": "Gaea2 CLI automation not available. Set GAEA2_PATH environment variable.",
             }
 
         try:
-            result = await self.cli.run_project(
-                project_path=project_path,
-                resolution=resolution,
-                output_format=format,
-                bake_only=bake_only,
-                timeout=timeout,
-            )
-
-            # Store in history
-            self.execution_history.append(
-                {
-                    "timestamp": datetime.now().isoformat(),
-                    "project": project_path,
-                    "result": result,
+            params = {
+                "project_path": project_path,
+                "resolution": resolution,
+                "output_format": format,
+                "bake_only": bake_only,
+                "timeout": timeout,
+            }
+            notify = {"session_id": current_session_id.get(), "progress_token": current_progress_token.get()}
+            job = await self.build_queue.submit(os.path.abspath(project_path), params, priority, notify)
+            if not wait:
+                return {
+                    "success": True,
+                    "job_id": job["id"],
+                    "status": job["status"],
+                    "queue_position": job.get("queue_position"),
                 }
-            )
 
+            job = await self.build_queue.wait(job["id"])
+            if job is None:
+                return {"success": False, "error": "Build job disappeared from the queue"}
+            result = dict(job["result"] or {"success": False, "error": job.get("error") or f"Build {job['status']}"})
+            result["job_id"] = job["id"]
             return result
 
         except Exception as e:
             self.logger.error(f"CLI execution failed: {str(e)}")
             return {"success": False, "error": str(e)}
 
-    async def analyze_execution_history(self, *, last_n: int = 10) -> Dict[str, Any]:
-        """Analyze recent execution history"""
+    def _on_build_event(self, job: Dict[str, Any], event: str) -> None:
+        """Publish build progress and completion to the session that queued the build"""
+        notify = job.get("notify") or {}
+        session_id = notify.get("session_id")
+        if event == "progress":
+            self.report_progress(
+                job["progress"], 100, job.get("message"), progress_token=notify.get("progress_token"), session_id=session_id
+            )
+        params = {"jobId": job["id"], "jobType": "gaea2_build", "status": job["status"]}
+        if event == "progress":
+            params.update(progress=job["progress"], message=job.get("message"))
+            method = "notifications/job/progress"
+        elif event == "started":
+            method = "notifications/job/started"
+        elif event == "completed":
+            params["outputFiles"] = [output["path"] for output in job.get("outputs", [])]
+            method = "notifications/job/completed"
+        else:
+            params["error"] = job.get("error")
+            method = "notifications/job/failed"
+        if session_id:
+            self.publish_notification(method, params, session_id=session_id)
+
+    async def get_gaea2_build_job(self, *, job_id: str) -> Dict[str, Any]:
+        """Status, progress, result and output files of a build"""
+        job = await self.build_queue.call(self.build_queue.store.get, job_id) if self.build_queue else None
+        if job is None:
+            return {"success": False, "error": f"Build job not found: {job_id}"}
+        job.pop("notify", None)
+        return {"success": True, "job": job}
+
+    async def cancel_gaea2_build_job(self, *, job_id: str) -> Dict[str, Any]:
+        """Cancel a queued build, or stop a running one"""
+        status = await self.build_queue.cancel(job_id) if self.build_queue else None
+        if status is None:
+            return {"success": False, "error": f"Build job not found: {job_id}"}
+        if status not in ("cancelled", "cancelling"):
+            return {"success": False, "error": f"Build job already {status}", "status": status}
+        return {"success": True, "job_id": job_id, "status": status}
+
+    async def analyze_execution_history(
+        self,
+        *,
+        last_n: int = 10,
+        status: Optional[str] = None,
+        project_path: Optional[str] = None,
+        since_hours: Optional[float] = None,
+        output_format: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Analyze finished builds, most recent first"""
+        if not self.build_queue:
+            return {"success": False, "error": "Gaea2 CLI automation not available. Set GAEA2_PATH environment variable."}
+        store = self.build_queue.store
         try:
-            recent = self.execution_history[-last_n:]
+            since = time.time() - since_hours * 3600 if since_hours is not None else None
+            project = os.path.abspath(project_path) if project_path else None
+            history = await self.build_queue.call(store.history, last_n, status=status, project=project, since=since)
+            executions = [
+                {
+                    "job_id": job["id"],
+                    "timestamp": datetime.fromtimestamp(job["finished"]).isoformat(),
+                    "project": job["project"],
+                    "status": job["status"],
+                    "duration": job["duration"],
+                    "result": job["result"] or {"success": False, "error": job["error"]},
+                }
+                for job in history["jobs"]
+            ]
 
             analysis = {
-                "total_executions": len(self.execution_history),
-                "recent_executions": len(recent),
-                "success_rate": (sum(1 for e in recent if e["result"].get("success")) / len(recent) if recent else 0),
-                "executions": recent,
+                "total_executions": history["total"],
+                "recent_executions": len(executions),
+                "success_rate": history["success_rate"],
+                "average_duration": history["avg_duration"],
+                "max_duration": history["max_duration"],
+                "by_status": history["by_status"],
+                "common_errors": history["common_errors"],
+                "outputs": history["outputs"],
+                "queue": await self.build_queue.call(store.counts),
+                "executions": executions,
             }
+            if output_format:
+                # Builds write to output_<project stem> next to the project
+                prefix = os.path.join(os.path.dirname(project), f"output_{Path(project).stem}", "") if project else None
+                analysis["output_files"] = await self.build_queue.call(
+                    store.find_outputs, prefix, output_format.lower(), limit=last_n
+                )
 
             return {"success": True, "analysis": analysis}
 
@@ -739,14 +1269,62 @@ class Gaea2MCPServer(BaseMCPServer):
             self.logger.error(f"History analysis failed: {str(e)}")
             return {"success": False, "error": str(e)}
 
+    async def analyze_gaea2_heightmaps(
+        self,
+        *,
+        path: Optional[str] = None,
+        job_id: Optional[str] = None,
+        tile_size: int = 1024,
+        terrain_width: float = 5000.0,
+        terrain_height: float = 2600.0,
+        slope_bins: Optional[List[float]] = None,
+        mask_threshold: float = 0.05,
+    ) -> Dict[str, Any]:
+        """Statistics of a heightmap, or of every heightmap in a build output directory"""
+        # numpy is only imported once heightmaps are analyzed
+        from .utils import gaea2_heightmap
+
+        if job_id:
+            job = await self.build_queue.call(self.build_queue.store.get, job_id) if self.build_queue else None
+            if job is None:
+                return {"success": False, "error": f"Build job not found: {job_id}"}
+            # Builds write to output_<project stem> next to the project
+            path = os.path.join(os.path.dirname(job["project"]), f"output_{Path(job['project']).stem}")
+        if not path or not os.path.exists(path):
+            return {"success": False, "error": f"Heightmap path not found: {path}"}
+        if tile_size < 2:
+            return {"success": False, "error": "tile_size must be at least 2"}
+
+        bins = tuple(slope_bins or gaea2_heightmap.DEFAULT_SLOPE_BINS)
+        try:
+            if os.path.isdir(path):
+                return await self.tool_executor.submit(
+                    "process",
+                    gaea2_heightmap.analyze_build_outputs,
+                    path,
+                    tile_size,
+                    terrain_width,
+                    terrain_height,
+                    bins,
+                    mask_threshold,
+                )
+            heightmap = await self.tool_executor.submit(
+                "process", gaea2_heightmap.analyze_heightmap, path, tile_size, terrain_width, terrain_height, bins
+            )
+            return {"success": True, **heightmap}
+        except Exception as e:
+            self.logger.error(f"Heightmap analysis failed: {str(e)}")
+            return {"success": False, "error": str(e)}
+
     async def download_gaea2_project(
         self,
         *,
         filename: str,
         full_path: Optional[str] = None,
-        encoding: str = "base64",
+        encoding: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Download a previously created Gaea2 terrain file"""
+        encoding = encoding or self.artifacts.default_encoding()
         try:
             # Determine file path
             if full_path and os.path.exists(full_path):
@@ -770,13 +1348,25 @@ class Gaea2MCPServer(BaseMCPServer):
                         "searched_path": file_path,
                     }
 
+            # Get file info
+            file_stats = os.stat(file_path)
+
+            if encoding == "url":
+                artifact = await self.artifacts.publish_file(file_path, content_type="application/json")
+                return {
+                    "success": True,
+                    "filename": os.path.basename(file_path),
+                    "size": file_stats.st_size,
+                    "modified": datetime.fromtimestamp(file_stats.st_mtime).isoformat(),
+                    "encoding": "url",
+                    "url": artifact["url"],
+                    "artifact": artifact,
+                }
+
             # Read file
             with open(file_path, "rb") as f:
                 file_data = f.read()
 
-            # Get file info
-            file_stats = os.stat(file_path)
-
             # Encode based on requested format
             if encoding == "base64":
                 encoded_data = base64.b64encode(file_data).decode("utf-8")
@@ -10,8 +10,11 @@ TOOLS = {
     "optimize_gaea2_properties",
     "suggest_gaea2_nodes",
     "run_gaea2_project",
+    "get_gaea2_build_job",
+    "cancel_gaea2_build_job",
     "validate_gaea2_project",
     "analyze_execution_history",
+    "analyze_gaea2_heightmaps",
 }
 
 # Note: The actual tool implementations are in the Gaea2MCPServer class
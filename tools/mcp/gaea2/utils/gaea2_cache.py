@@ -1,142 +1,331 @@
 #!/usr/bin/env python3
 """
 Caching system for Gaea2 MCP operations
+
+Results are cached per operation ("validate_node", "suggest_connections", ...)
+under a digest of their parameters. The cache is a bounded LRU: entries expire
+after a TTL, and the least recently used ones are evicted once the entry count
+or the estimated size in bytes exceeds its limits.
+
+With a cache directory, entries are also written to a SQLite file. Memory
+misses fall back to it, so results survive restarts and are shared between
+processes. It is compacted periodically to drop expired entries and stay
+within the same limits.
 """
 
+import copy
 import hashlib
 import json
 import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Tuples are stored as {"__tuple__": [...]} so they survive a round trip through JSON
+TUPLE_TAG = "__tuple__"
+
+# Disk writes between compactions
+COMPACT_INTERVAL = 256
+
+COUNTERS = ("hits", "misses", "evictions", "expirations")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(repr(item) for item in value)
+    return repr(value)
+
+
+def make_key(params: Dict[str, Any]) -> str:
+    """Stable digest of operation parameters, tolerant of tuples, sets and other objects"""
+    encoded = json.dumps(params, sort_keys=True, separators=(",", ":"), default=_json_default)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _tag_tuples(value: Any) -> Any:
+    if isinstance(value, tuple):
+        return {TUPLE_TAG: [_tag_tuples(item) for item in value]}
+    if isinstance(value, list):
+        return [_tag_tuples(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _tag_tuples(item) for key, item in value.items()}
+    return value
+
+
+def _untag_tuples(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and TUPLE_TAG in obj:
+        return tuple(obj[TUPLE_TAG])
+    return obj
+
+
+def encode_value(value: Any) -> str:
+    """JSON encoding of a cached value that preserves tuples"""
+    return json.dumps(_tag_tuples(value), separators=(",", ":"))
+
+
+def decode_value(text: str) -> Any:
+    return json.loads(text, object_hook=_untag_tuples)
+
+
+class _DiskStore:
+    """SQLite table of JSON-encoded entries shared across restarts and processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        with self._lock:
+            self._connection().execute(
+                "CREATE TABLE IF NOT EXISTS entries (operation TEXT, key TEXT, expires REAL, stored REAL, size INTEGER, "
+                "value TEXT, PRIMARY KEY (operation, key))"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # Reopen after a fork; SQLite connections must not cross processes
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, operation: str, key: str) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            row = (
+                self._connection()
+                .execute("SELECT expires, value FROM entries WHERE operation = ? AND key = ?", (operation, key))
+                .fetchone()
+            )
+        return (row[0], row[1]) if row is not None else None
+
+    def put(self, operation: str, key: str, expires: float, encoded: str) -> None:
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO entries (operation, key, expires, stored, size, value) VALUES (?, ?, ?, ?, ?, ?)",
+                (operation, key, expires, time.time(), len(encoded), encoded),
+            )
+
+    def delete(self, operation: Optional[str] = None) -> None:
+        with self._lock:
+            conn = self._connection()
+            if operation is None:
+                conn.execute("DELETE FROM entries")
+            else:
+                conn.execute("DELETE FROM entries WHERE operation = ?", (operation,))
+
+    def compact(self, max_entries: int, max_bytes: int) -> int:
+        """Drop expired entries, then the oldest ones beyond the limits
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            conn = self._connection()
+            removed = conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),)).rowcount
+            rows = conn.execute("SELECT operation, key, size FROM entries ORDER BY stored DESC").fetchall()
+            total = 0
+            stale = []
+            for index, (operation, key, size) in enumerate(rows):
+                total += size
+                if index >= max_entries or total > max_bytes:
+                    stale.append((operation, key))
+            if stale:
+                conn.executemany("DELETE FROM entries WHERE operation = ? AND key = ?", stale)
+            return removed + len(stale)
 
-class Gaea2Cache:
-    """Simple in-memory cache with optional disk persistence"""
 
-    def __init__(self, cache_dir: Optional[str] = None, ttl: int = 3600):
+class Gaea2Cache:
+    """Bounded, thread-safe LRU cache with per-operation namespaces and optional disk persistence"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        ttl: int = 3600,
+        max_entries: int = 2048,
+        max_bytes: int = 32 * 1024 * 1024,
+    ):
         """
         Initialize cache
 
         Args:
             cache_dir: Directory for persistent cache (optional)
-            ttl: Time to live in seconds (default 1 hour)
+            ttl: Default time to live in seconds (default 1 hour)
+            max_entries: Maximum number of entries held
+            max_bytes: Maximum estimated size of the held entries
         """
-        self.cache: Dict[str, Dict[str, Any]] = {}
         self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
         self.cache_dir = Path(cache_dir) if cache_dir else None
-
-        if self.cache_dir:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            self._load_persistent_cache()
-
-    def _generate_key(self, operation: str, params: Dict[str, Any]) -> str:
-        """Generate cache key from operation and parameters"""
-        # Create stable string representation
-        param_str = json.dumps(params, sort_keys=True)
-        combined = f"{operation}:{param_str}"
-
-        # Hash for shorter keys
-        return hashlib.md5(combined.encode()).hexdigest()
+        self._lock = threading.Lock()
+        # (operation, key) -> (expires, size, value), least recently used first
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._disk: Optional[_DiskStore] = None
+        self._disk_writes = 0
+
+        if self.cache_dir and max_entries > 0:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._disk = _DiskStore(str(self.cache_dir / "gaea2_cache.sqlite3"))
+                self._disk.compact(max_entries, max_bytes)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Persistent cache disabled, cannot open {self.cache_dir}: {e}")
+                self._disk = None
+
+    @classmethod
+    def from_env(cls) -> "Gaea2Cache":
+        """Create a cache configured by the GAEA2_CACHE_* variables"""
+        enabled = os.environ.get("GAEA2_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+        cache_dir = os.environ.get("GAEA2_CACHE_DIR") or str(Path(tempfile.gettempdir()) / "gaea2_mcp_cache")
+        return cls(
+            cache_dir=cache_dir if enabled else None,
+            ttl=int(os.environ.get("GAEA2_CACHE_TTL", "3600")),
+            max_entries=int(os.environ.get("GAEA2_CACHE_MAX_ENTRIES", "2048")) if enabled else 0,
+            max_bytes=int(float(os.environ.get("GAEA2_CACHE_MAX_MB", "32")) * 1024 * 1024),
+        )
+
+    def _count(self, operation: str, counter: str) -> None:
+        stats = self._stats.setdefault(operation, dict.fromkeys(COUNTERS, 0))
+        stats[counter] += 1
+
+    def _remove(self, cache_key: Tuple[str, str]) -> None:
+        _, size, _ = self._entries.pop(cache_key)
+        self._bytes -= size
+
+    def _store(self, cache_key: Tuple[str, str], expires: float, size: int, value: Any) -> None:
+        if cache_key in self._entries:
+            self._remove(cache_key)
+        self._entries[cache_key] = (expires, size, value)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            evicted = next(iter(self._entries))
+            self._remove(evicted)
+            self._count(evicted[0], "evictions")
 
     def get(self, operation: str, params: Dict[str, Any]) -> Optional[Any]:
-        """Get cached result"""
-        key = self._generate_key(operation, params)
-
-        if key in self.cache:
-            entry = self.cache[key]
-            # Check if expired
-            if time.time() - entry["timestamp"] < self.ttl:
-                logger.debug(f"Cache hit for {operation}")
-                return entry["data"]
-            else:
-                # Expired
-                del self.cache[key]
-                logger.debug(f"Cache expired for {operation}")
-
+        """Get cached result, or None"""
+        cache_key = (operation, make_key(params))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(cache_key)
+                    self._count(operation, "hits")
+                    return copy.deepcopy(entry[2])
+                self._remove(cache_key)
+                self._count(operation, "expirations")
+
+        if self._disk is not None:
+            try:
+                stored = self._disk.get(*cache_key)
+                if stored is not None and stored[0] > now:
+                    value = decode_value(stored[1])
+                    with self._lock:
+                        self._store(cache_key, stored[0], len(stored[1]), value)
+                        self._count(operation, "hits")
+                    return copy.deepcopy(value)
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"Failed to read persistent cache: {e}")
+
+        with self._lock:
+            self._count(operation, "misses")
         return None
 
-    def set(self, operation: str, params: Dict[str, Any], data: Any):
-        """Set cache entry"""
-        key = self._generate_key(operation, params)
+    def set(self, operation: str, params: Dict[str, Any], data: Any, ttl: Optional[float] = None):
+        """Set cache entry, optionally with its own TTL"""
+        if self.max_entries <= 0:
+            return
+        cache_key = (operation, make_key(params))
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        try:
+            encoded: Optional[str] = encode_value(data)
+        except (TypeError, ValueError):
+            # Not JSON-serializable; keep it in memory only
+            encoded = None
+        size = len(encoded) if encoded is not None else sys.getsizeof(data)
+        if size > self.max_bytes:
+            logger.debug(f"Not caching {operation} result of {size} bytes")
+            return
 
-        self.cache[key] = {"timestamp": time.time(), "data": data}
+        with self._lock:
+            self._store(cache_key, expires, size, copy.deepcopy(data))
 
-        # Persist if cache dir is set
-        if self.cache_dir:
-            self._save_to_disk(key, operation, params, data)
+        if self._disk is not None and encoded is not None:
+            try:
+                self._disk.put(operation, cache_key[1], expires, encoded)
+                self._disk_writes += 1
+                if self._disk_writes % COMPACT_INTERVAL == 0:
+                    self._disk.compact(self.max_entries, self.max_bytes)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to save cache: {e}")
 
     def clear(self, operation: Optional[str] = None):
-        """Clear cache entries"""
-        if operation:
-            # Clear specific operation
-            keys_to_remove = []
-            for key in self.cache:
-                if key.startswith(operation):
-                    keys_to_remove.append(key)
-
-            for key in keys_to_remove:
-                del self.cache[key]
-        else:
-            # Clear all
-            self.cache.clear()
-
-    def _load_persistent_cache(self):
-        """Load cache from disk"""
-        if not self.cache_dir:
-            return
-
-        cache_file = self.cache_dir / "cache_index.json"
-        if cache_file.exists():
+        """Clear cache entries for one operation, or all of them"""
+        with self._lock:
+            if operation is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                for cache_key in [k for k in self._entries if k[0] == operation]:
+                    self._remove(cache_key)
+        if self._disk is not None:
             try:
-                with open(cache_file) as f:
-                    index = json.load(f)
-
-                # Load non-expired entries
-                current_time = time.time()
-                for key, meta in index.items():
-                    if current_time - meta["timestamp"] < self.ttl:
-                        data_file = self.cache_dir / f"{key}.json"
-                        if data_file.exists():
-                            with open(data_file) as f:
-                                self.cache[key] = {
-                                    "timestamp": meta["timestamp"],
-                                    "data": json.load(f),
-                                }
-            except Exception as e:
-                logger.warning(f"Failed to load cache: {e}")
-
-    def _save_to_disk(self, key: str, operation: str, params: Dict[str, Any], data: Any):
-        """Save cache entry to disk"""
-        if not self.cache_dir:
-            return
+                self._disk.delete(operation)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to clear persistent cache: {e}")
 
-        try:
-            # Save data
-            data_file = self.cache_dir / f"{key}.json"
-            with open(data_file, "w") as f:
-                json.dump(data, f)
-
-            # Update index
-            index_file = self.cache_dir / "cache_index.json"
-            index = {}
-            if index_file.exists():
-                with open(index_file) as f:
-                    index = json.load(f)
-
-            index[key] = {
-                "operation": operation,
-                "params": params,
-                "timestamp": time.time(),
-            }
+    def compact(self) -> int:
+        """Drop expired entries from memory and compact the persistent cache
 
-            with open(index_file, "w") as f:
-                json.dump(index, f, indent=2)
-
-        except Exception as e:
-            logger.warning(f"Failed to save cache: {e}")
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        with self._lock:
+            expired = [k for k, entry in self._entries.items() if entry[0] <= now]
+            for cache_key in expired:
+                self._remove(cache_key)
+                self._count(cache_key[0], "expirations")
+        removed = len(expired)
+        if self._disk is not None:
+            try:
+                removed += self._disk.compact(self.max_entries, self.max_bytes)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to compact persistent cache: {e}")
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, limits and per-operation hit/miss/eviction/expiration counters"""
+        with self._lock:
+            entries_by_operation: Dict[str, int] = {}
+            for operation, _ in self._entries:
+                entries_by_operation[operation] = entries_by_operation.get(operation, 0) + 1
+            operations = {
+                name: {**counters, "entries": entries_by_operation.get(name, 0)} for name, counters in self._stats.items()
+            }
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "disk": self._disk.path if self._disk is not None else None,
+                "operations": operations,
+            }
 
 
 class CachedValidator:
@@ -152,13 +341,13 @@ class CachedValidator:
         # Check cache
         params = {"node_type": node_type, "properties": properties}
         cached = self.cache.get("validate_node", params)
-        if cached:
+        if cached is not None:
             # Ensure proper typing for cached result
             assert isinstance(cached, tuple) and len(cached) == 3
             return cached
 
         # Perform validation
-        from .gaea2_property_validator import Gaea2PropertyValidator
+        from ..validation.gaea2_property_validator import Gaea2PropertyValidator
 
         validator = Gaea2PropertyValidator()
         result = validator.validate_properties(node_type, properties)
@@ -185,13 +374,13 @@ class CachedValidator:
         params = {"node_types": node_types, "connection_pattern": conn_pattern}
 
         cached = self.cache.get("suggest_connections", params)
-        if cached:
+        if cached is not None:
             # Ensure proper typing for cached result
             assert isinstance(cached, list)
             return cached
 
         # Perform suggestion
-        from .gaea2_connection_validator import Gaea2ConnectionValidator
+        from ..validation.gaea2_connection_validator import Gaea2ConnectionValidator
 
         validator = Gaea2ConnectionValidator()
         result = validator.suggest_connections(nodes, connections)
@@ -209,7 +398,7 @@ class CachedValidator:
         params = {"workflow": workflow_nodes}
 
         cached = self.cache.get("workflow_analysis", params)
-        if cached:
+        if cached is not None:
             # Ensure proper typing for cached result
             assert isinstance(cached, dict)
             return cached
@@ -230,16 +419,15 @@ class CachedValidator:
 
 
 # Global cache instance
-_global_cache = None
+_global_cache: Optional[Gaea2Cache] = None
+_global_cache_lock = threading.Lock()
 
 
 def get_cache() -> Gaea2Cache:
     """Get global cache instance"""
     global _global_cache
     if _global_cache is None:
-        # Initialize with temp directory
-        import tempfile
-
-        cache_dir = Path(tempfile.gettempdir()) / "gaea2_mcp_cache"
-        _global_cache = Gaea2Cache(str(cache_dir))
+        with _global_cache_lock:
+            if _global_cache is None:
+                _global_cache = Gaea2Cache.from_env()
     return _global_cache
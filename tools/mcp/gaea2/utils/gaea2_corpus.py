@@ -0,0 +1,256 @@
+"""Map/reduce building blocks for analyzing large Gaea2 project collections
+
+Each .terrain file is reduced to a small JSON summary (node type counts,
+typed edges, scalar property values and the main-path pattern) by
+scan_file, which runs in a process pool. Gaea2WorkflowAnalyzer merges the
+summaries as they arrive, so only one parsed project per worker is in memory.
+
+CorpusIndex keeps each file's summary with its mtime, size and content
+digest in SQLite: files whose mtime and size are unchanged are not read
+again, and files that were touched but not changed are not parsed again.
+
+LSHIndex finds patterns whose node type sets are similar to a query with
+MinHash signatures, instead of comparing the query with every pattern.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from tools.mcp.gaea2.utils.gaea2_graph import WorkflowGraph
+from tools.mcp.gaea2.utils.workflow_extractor import WorkflowExtractor
+
+# 32 bands of 2 rows: sets with Jaccard similarity 0.5 collide in at least
+# one band with probability 1 - (1 - 0.5 ** 2) ** 32 > 0.9999
+LSH_BANDS = 32
+LSH_ROWS = 2
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x6AEA2)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(LSH_BANDS * LSH_ROWS)]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    summary TEXT NOT NULL
+);
+"""
+
+
+def _token_hash(token: str) -> int:
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash(tokens: Iterable[str]) -> Optional[Tuple[int, ...]]:
+    """MinHash signature of a set of strings, or None for an empty set"""
+    hashes = [_token_hash(token) for token in set(tokens)]
+    if not hashes:
+        return None
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def jaccard(first: Iterable[str], second: Iterable[str]) -> float:
+    """Jaccard similarity of two sets of strings"""
+    first, second = set(first), set(second)
+    union = len(first | second)
+    return len(first & second) / union if union else 0.0
+
+
+class LSHIndex:
+    """Locality-sensitive hash buckets over MinHash signatures
+
+    candidates() returns every key whose set is likely to be at least half
+    similar to the query, plus some that are not; callers check the
+    similarity of the candidates themselves.
+    """
+
+    def __init__(self):
+        self._buckets: List[Dict[Tuple[int, ...], Set[Hashable]]] = [defaultdict(set) for _ in range(LSH_BANDS)]
+        self._signatures: Dict[Hashable, Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    @staticmethod
+    def _bands(signature: Tuple[int, ...]) -> Iterator[Tuple[int, ...]]:
+        for band in range(LSH_BANDS):
+            yield signature[band * LSH_ROWS : (band + 1) * LSH_ROWS]
+
+    def add(self, key: Hashable, tokens: Iterable[str]) -> None:
+        signature = minhash(tokens)
+        if signature is None or key in self._signatures:
+            return
+        self._signatures[key] = signature
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            buckets[band].add(key)
+
+    def remove(self, key: Hashable) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            buckets[band].discard(key)
+            if not buckets[band]:
+                del buckets[band]
+
+    def candidates(self, tokens: Iterable[str]) -> Set[Hashable]:
+        signature = minhash(tokens)
+        if signature is None:
+            return set()
+        found: Set[Hashable] = set()
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            found.update(buckets.get(band, ()))
+        return found
+
+
+def summarize_project(project_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Mergeable summary of one project
+
+    Raises:
+        ValueError: If the project has no nodes
+    """
+    nodes, connections = WorkflowExtractor.extract_workflow(project_data)
+    if not nodes:
+        raise ValueError("No nodes found")
+
+    type_of = {node["id"]: node["type"] for node in nodes}
+    edges = [
+        [type_of[conn["from_node"]], type_of[conn["to_node"]]]
+        for conn in connections
+        if type_of.get(conn["from_node"]) and type_of.get(conn["to_node"])
+    ]
+    properties = [
+        [node["type"], name, value]
+        for node in nodes
+        for name, value in node.get("properties", {}).items()
+        if isinstance(value, (int, float, str, bool))
+    ]
+
+    pattern = None
+    if len(nodes) >= 2:
+        graph = WorkflowGraph(nodes, connections)
+        pattern_nodes = [graph.nodes[node_id]["type"] for node_id in graph.main_sequence()]
+        if len(pattern_nodes) >= 2:
+            pattern_properties: Dict[str, Dict[str, List[Any]]] = defaultdict(dict)
+            for node in nodes:
+                if node["type"] in pattern_nodes:
+                    for name, value in node.get("properties", {}).items():
+                        pattern_properties[node["type"]].setdefault(name, []).append(value)
+            pattern = {"nodes": pattern_nodes, "properties": dict(pattern_properties)}
+
+    return {
+        "nodes": len(nodes),
+        "connections": len(connections),
+        "node_types": dict(Counter(node["type"] for node in nodes)),
+        "edges": edges,
+        "properties": properties,
+        "pattern": pattern,
+    }
+
+
+def scan_file(path: str, known_digest: Optional[str] = None) -> Dict[str, Any]:
+    """Read one project file and summarize it; runs in the process pool
+
+    When the content digest equals known_digest the file is not parsed and
+    the result has no summary. A project that cannot be parsed gets a
+    summary holding only the error, so it is not parsed again either.
+    """
+    try:
+        stat = os.stat(path)
+        with open(path, "rb") as f:
+            content = f.read()
+    except OSError as e:
+        return {"path": path, "error": str(e)}
+    scanned = {"path": path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "digest": hashlib.sha256(content).hexdigest()}
+    if scanned["digest"] == known_digest:
+        return scanned
+    try:
+        scanned["summary"] = summarize_project(json.loads(content))
+    except Exception as e:
+        scanned["summary"] = {"error": str(e)}
+    return scanned
+
+
+def scan_files(paths: List[Tuple[str, Optional[str]]], workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """scan_file over many (path, known digest) pairs, yielded in order as they finish
+
+    Small batches and a single worker run in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2 * workers:
+        for path, digest in paths:
+            yield scan_file(path, digest)
+        return
+
+    # Forked workers skip re-importing this package; elsewhere use the platform default
+    context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    chunksize = max(1, min(64, len(paths) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        yield from pool.map(scan_file, *zip(*paths), chunksize=chunksize)
+
+
+class CorpusIndex:
+    """SQLite table of file summaries keyed by path, mtime, size and digest"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Reopen after a fork; SQLite connections must not cross processes
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    def entries(self, paths: List[str]) -> Dict[str, Tuple[int, int, str, Dict[str, Any]]]:
+        """(mtime_ns, size, digest, summary) of the given paths that are indexed"""
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(paths), 500):
+                chunk = paths[start : start + 500]
+                rows = conn.execute(
+                    f"SELECT path, mtime_ns, size, digest, summary FROM files WHERE path IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for path, mtime_ns, size, digest, summary in rows:
+                    found[path] = (mtime_ns, size, digest, json.loads(summary))
+        return found
+
+    def put(self, rows: List[Tuple[str, int, int, str, Dict[str, Any]]]) -> None:
+        """Store (path, mtime_ns, size, digest, summary) rows in one transaction"""
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, digest, summary) VALUES (?, ?, ?, ?, ?)",
+                [(path, mtime_ns, size, digest, json.dumps(summary)) for path, mtime_ns, size, digest, summary in rows],
+            )
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Directed graph view of a Gaea2 workflow
+
+Validators, the repair and recovery code and the analyzers all need the same
+questions answered about a workflow's connections: who feeds whom, is there a
+cycle, what is reachable from here, what every output depends on. WorkflowGraph
+builds the adjacency once and answers them with iterative algorithms, so deep
+workflows cannot hit the recursion limit:
+
+- strongly connected components: Tarjan, O(V + E)
+- topological order: Kahn, O(V + E)
+- shortest path to a matching node: breadth-first search
+- dominators: Cooper, Harvey and Kennedy over reverse postorder
+
+Derived structures are computed on first use and cached; the graph is a
+snapshot, so build a new one after changing the workflow.
+"""
+
+from collections import deque
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+def connection_endpoints(connection: Dict[str, Any]) -> Tuple[Any, Any]:
+    """Source and target node IDs of a connection in either from_node/to_node or source/target form"""
+    source = connection.get("from_node")
+    if source is None:
+        source = connection.get("source")
+    target = connection.get("to_node")
+    if target is None:
+        target = connection.get("target")
+    return source, target
+
+
+class WorkflowGraph:
+    """Adjacency and cached graph analyses for one workflow snapshot"""
+
+    def __init__(self, nodes: Iterable[Dict[str, Any]] = (), connections: Iterable[Dict[str, Any]] = ()):
+        self.nodes: Dict[Any, Dict[str, Any]] = {}
+        for index, node in enumerate(nodes):
+            self.nodes.setdefault(node.get("id", f"node_{index}"), node)
+
+        # Vertices are the workflow's nodes followed by any IDs only seen in connections
+        self._successors: Dict[Any, List[Any]] = {node_id: [] for node_id in self.nodes}
+        self._predecessors: Dict[Any, List[Any]] = {node_id: [] for node_id in self.nodes}
+        self.edge_count = 0
+        for connection in connections:
+            source, target = connection_endpoints(connection)
+            if source is None or target is None:
+                continue
+            for vertex in (source, target):
+                if vertex not in self._successors:
+                    self._successors[vertex] = []
+                    self._predecessors[vertex] = []
+            self._successors[source].append(target)
+            self._predecessors[target].append(source)
+            self.edge_count += 1
+
+        self._components: Optional[List[List[Any]]] = None
+        self._order: Optional[List[Any]] = None
+        self._idom: Optional[Dict[Any, Any]] = None
+        self._reachable: Dict[Any, FrozenSet[Any]] = {}
+        self._dominators: Dict[Any, FrozenSet[Any]] = {}
+
+    @classmethod
+    def from_workflow(cls, workflow: Dict[str, Any]) -> "WorkflowGraph":
+        return cls(workflow.get("nodes", []), workflow.get("connections", []))
+
+    @property
+    def vertices(self) -> List[Any]:
+        return list(self._successors)
+
+    def successors(self, vertex: Any) -> List[Any]:
+        """Targets of the vertex's outgoing connections, in connection order"""
+        return self._successors.get(vertex, [])
+
+    def predecessors(self, vertex: Any) -> List[Any]:
+        """Sources of the vertex's incoming connections, in connection order"""
+        return self._predecessors.get(vertex, [])
+
+    def in_degree(self, vertex: Any) -> int:
+        return len(self.predecessors(vertex))
+
+    def out_degree(self, vertex: Any) -> int:
+        return len(self.successors(vertex))
+
+    def node_type(self, vertex: Any) -> Optional[str]:
+        node = self.nodes.get(vertex)
+        return node.get("type") if node else None
+
+    def orphans(self) -> List[Any]:
+        """Workflow nodes without any connection"""
+        return [v for v in self.nodes if not self._successors[v] and not self._predecessors[v]]
+
+    def sources(self) -> List[Any]:
+        """Workflow nodes without incoming connections"""
+        return [v for v in self.nodes if not self._predecessors[v]]
+
+    def sinks(self) -> List[Any]:
+        """Workflow nodes without outgoing connections"""
+        return [v for v in self.nodes if not self._successors[v]]
+
+    def strongly_connected_components(self) -> List[List[Any]]:
+        """Tarjan's strongly connected components, in reverse topological order"""
+        if self._components is None:
+            index: Dict[Any, int] = {}
+            low: Dict[Any, int] = {}
+            stack: List[Any] = []
+            on_stack = set()
+            components = []
+
+            for root in self._successors:
+                if root in index:
+                    continue
+                index[root] = low[root] = len(index)
+                stack.append(root)
+                on_stack.add(root)
+                work = [(root, iter(self._successors[root]))]
+                while work:
+                    vertex, children = work[-1]
+                    for child in children:
+                        if child not in index:
+                            index[child] = low[child] = len(index)
+                            stack.append(child)
+                            on_stack.add(child)
+                            work.append((child, iter(self._successors[child])))
+                            break
+                        if child in on_stack:
+                            low[vertex] = min(low[vertex], index[child])
+                    else:
+                        work.pop()
+                        if work:
+                            parent = work[-1][0]
+                            low[parent] = min(low[parent], low[vertex])
+                        if low[vertex] == index[vertex]:
+                            component = []
+                            while True:
+                                member = stack.pop()
+                                on_stack.discard(member)
+                                component.append(member)
+                                if member == vertex:
+                                    break
+                            component.reverse()
+                            components.append(component)
+            self._components = components
+        return self._components
+
+    def cycles(self) -> List[List[Any]]:
+        """One closed path [a, ..., a] for every cycle-bearing component, in vertex order
+
+        The path is the shortest cycle through the component's first vertex.
+        """
+        position = {vertex: i for i, vertex in enumerate(self._successors)}
+        cycles = []
+        for component in self.strongly_connected_components():
+            start = min(component, key=position.__getitem__)
+            if len(component) == 1:
+                if start in self._successors[start]:
+                    cycles.append([start, start])
+                continue
+            members = set(component)
+            path = self._shortest_path(start, lambda v: v == start, members.__contains__)
+            if path:
+                cycles.append(path)
+        cycles.sort(key=lambda cycle: position[cycle[0]])
+        return cycles
+
+    def topological_order(self) -> List[Any]:
+        """Kahn's topological order; vertices on or behind a cycle are left out"""
+        if self._order is None:
+            remaining = {v: len(preds) for v, preds in self._predecessors.items()}
+            queue = deque(v for v, count in remaining.items() if count == 0)
+            order = []
+            while queue:
+                vertex = queue.popleft()
+                order.append(vertex)
+                for child in self._successors[vertex]:
+                    remaining[child] -= 1
+                    if remaining[child] == 0:
+                        queue.append(child)
+            self._order = order
+        return self._order
+
+    def is_acyclic(self) -> bool:
+        return len(self.topological_order()) == len(self._successors)
+
+    def depth(self) -> int:
+        """Number of nodes on the longest path through the acyclic part of the graph"""
+        longest: Dict[Any, int] = {}
+        for vertex in self.topological_order():
+            length = longest.get(vertex, 0) + 1
+            longest[vertex] = length
+            for child in self._successors[vertex]:
+                if longest.get(child, 0) < length:
+                    longest[child] = length
+        return max(longest.values(), default=0)
+
+    def reachable(self, start: Any) -> FrozenSet[Any]:
+        """Vertices reachable from start by at least one connection"""
+        if start not in self._reachable:
+            seen = set()
+            queue = deque(self.successors(start))
+            while queue:
+                vertex = queue.popleft()
+                if vertex not in seen:
+                    seen.add(vertex)
+                    queue.extend(self._successors[vertex])
+            self._reachable[start] = frozenset(seen)
+        return self._reachable[start]
+
+    def shortest_path(
+        self,
+        start: Any,
+        goal: Callable[[Any], bool],
+        max_length: Optional[int] = None,
+    ) -> Optional[List[Any]]:
+        """Shortest path [start, ..., match] of at most max_length nodes to a vertex satisfying goal"""
+        if start not in self._successors:
+            return None
+        return self._shortest_path(start, lambda v: v != start and goal(v), lambda v: True, max_length)
+
+    def shortest_path_to_type(self, start: Any, node_type: str, max_length: Optional[int] = None) -> Optional[List[Any]]:
+        return self.shortest_path(start, lambda v: self.node_type(v) == node_type, max_length)
+
+    def _shortest_path(
+        self,
+        start: Any,
+        goal: Callable[[Any], bool],
+        allowed: Callable[[Any], bool],
+        max_length: Optional[int] = None,
+    ) -> Optional[List[Any]]:
+        parents: Dict[Any, Any] = {start: None}
+        queue = deque([(start, 1)])
+        while queue:
+            vertex, length = queue.popleft()
+            if max_length is not None and length >= max_length:
+                continue
+            for child in self._successors[vertex]:
+                if goal(child):
+                    path = [child, vertex]
+                    while parents[path[-1]] is not None:
+                        path.append(parents[path[-1]])
+                    path.reverse()
+                    return path
+                if child not in parents and allowed(child):
+                    parents[child] = vertex
+                    queue.append((child, length + 1))
+        return None
+
+    def immediate_dominators(self) -> Dict[Any, Any]:
+        """Immediate dominator of every vertex, None for entry vertices
+
+        Vertex d dominates v when every path from an entry (a vertex without
+        incoming connections) to v passes through d. Vertices only reachable
+        through an entry-less cycle treat the first such vertex as an entry.
+        """
+        if self._idom is None:
+            order, entries = self._reverse_postorder()
+            position = {vertex: i + 1 for i, vertex in enumerate(order)}
+            # Position 0 is a virtual root feeding every entry
+            preds = [[0]] + [
+                ([0] if vertex in entries else []) + [position[p] for p in self._predecessors[vertex]] for vertex in order
+            ]
+            idom: List[Optional[int]] = [0] + [None] * len(order)
+
+            changed = True
+            while changed:
+                changed = False
+                for vertex in range(1, len(idom)):
+                    new_idom = None
+                    for pred in preds[vertex]:
+                        if idom[pred] is None:
+                            continue
+                        if new_idom is None:
+                            new_idom = pred
+                            continue
+                        a, b = pred, new_idom
+                        while a != b:
+                            while a > b:
+                                a = idom[a]
+                            while b > a:
+                                b = idom[b]
+                        new_idom = a
+                    if idom[vertex] != new_idom:
+                        idom[vertex] = new_idom
+                        changed = True
+
+            self._idom = {vertex: order[idom[i + 1] - 1] if idom[i + 1] else None for i, vertex in enumerate(order)}
+        return self._idom
+
+    def dominators(self, vertex: Any) -> FrozenSet[Any]:
+        """Vertices on every path from an entry to vertex, including vertex itself"""
+        if vertex not in self._dominators:
+            idom = self.immediate_dominators()
+            chain = []
+            current = vertex if vertex in idom else None
+            while current is not None:
+                chain.append(current)
+                current = idom[current]
+            self._dominators[vertex] = frozenset(chain)
+        return self._dominators[vertex]
+
+    def _reverse_postorder(self) -> Tuple[List[Any], set]:
+        entries = [v for v, preds in self._predecessors.items() if not preds]
+        visited = set()
+        postorder: List[Any] = []
+
+        def visit(root: Any):
+            visited.add(root)
+            work = [(root, iter(self._successors[root]))]
+            while work:
+                vertex, children = work[-1]
+                for child in children:
+                    if child not in visited:
+                        visited.add(child)
+                        work.append((child, iter(self._successors[child])))
+                        break
+                else:
+                    work.pop()
+                    postorder.append(vertex)
+
+        for entry in entries:
+            visit(entry)
+        for vertex in self._successors:
+            if vertex not in visited:
+                entries.append(vertex)
+                visit(vertex)
+
+        # Entries are children of the virtual root, so reversing gives the root's reverse postorder
+        postorder.reverse()
+        return postorder, set(entries)
+
+    def main_sequence(self) -> List[Any]:
+        """Follow the first outgoing connection from the first entry node until a node repeats"""
+        if not self.nodes or not self.edge_count:
+            return []
+        start = next((v for v in self.nodes if not self._predecessors[v]), next(iter(self.nodes)))
+
+        sequence = []
+        visited = set()
+        current = start
+        while current in self.nodes and current not in visited:
+            sequence.append(current)
+            visited.add(current)
+            children = self._successors[current]
+            if not children:
+                break
+            current = children[0]
+        return sequence
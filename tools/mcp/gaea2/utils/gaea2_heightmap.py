@@ -0,0 +1,345 @@
+"""Statistics of the heightmaps written by Gaea2 builds
+
+RAW/R16 (16-bit unsigned) and R32 (32-bit float) files are memory-mapped;
+EXR files are read a band of scanlines at a time when the OpenEXR package is
+installed. Either way the map is processed in square tiles with a one pixel
+border, so memory use depends on the tile size and not on the resolution,
+and slopes along tile edges are the same as for the whole map at once.
+
+Heights are normalized to 0..1 (16-bit values are divided by 65535) and
+scaled by the terrain height; slopes use the terrain width over the map's
+pixel count. The defaults are Gaea2's default terrain of 5000 m by 2600 m.
+
+analyze_build_outputs looks at a whole build directory:
+
+- every heightmap gets elevation and slope statistics
+- erosion masks (names containing Wear, Flow, Deposits or Sediment) get the
+  fraction of pixels above a threshold
+- tiled outputs (names ending in _x<N>_y<N> or _y<N>_x<N>) get the height
+  differences along the edges shared by neighbouring tiles
+"""
+
+import math
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+RAW_DTYPES = {".raw": np.dtype("<u2"), ".r16": np.dtype("<u2"), ".r32": np.dtype("<f4")}
+HEIGHTMAP_SUFFIXES = tuple(RAW_DTYPES) + (".exr",)
+
+DEFAULT_SLOPE_BINS = (0, 5, 10, 15, 20, 30, 45, 60, 90)
+DEFAULT_TILE_SIZE = 1024
+
+EROSION_MASK_PATTERN = re.compile(r"wear|flow|deposit|sediment", re.IGNORECASE)
+TILE_PATTERN = re.compile(r"^(?P<base>.+?)_(?:x(?P<x1>\d+)_y(?P<y1>\d+)|y(?P<y2>\d+)_x(?P<x2>\d+))$", re.IGNORECASE)
+
+
+class RawHeightmap:
+    """A RAW/R16/R32 heightmap, memory-mapped
+
+    Without width and height the map is assumed to be square.
+    """
+
+    def __init__(self, path: str, width: Optional[int] = None, height: Optional[int] = None):
+        suffix = Path(path).suffix.lower()
+        if suffix not in RAW_DTYPES:
+            raise ValueError(f"Not a RAW/R16/R32 heightmap: {path}")
+        dtype = RAW_DTYPES[suffix]
+        pixels = os.path.getsize(path) // dtype.itemsize
+        if width is None and height is None:
+            width = height = math.isqrt(pixels)
+        elif width is None:
+            width = pixels // height  # type: ignore[operator]
+        elif height is None:
+            height = pixels // width
+        if width * height != pixels or width < 2 or height < 2:  # type: ignore[operator]
+            raise ValueError(f"{path} holds {pixels} pixels, which is not a {width}x{height} heightmap")
+
+        self.path = path
+        self.width, self.height = width, height
+        self.data = np.memmap(path, dtype=dtype, mode="r", shape=(height, width))
+        self.scale = 1.0 / 65535 if dtype.kind == "u" else 1.0
+
+    def rows(self, top: int, bottom: int) -> np.ndarray:
+        """Raw values of rows top..bottom-1; a view of the file, nothing is read yet"""
+        return self.data[top:bottom]
+
+    def to_float(self, block: np.ndarray) -> np.ndarray:
+        """Normalized heights of a block of raw values"""
+        values = np.asarray(block, dtype=np.float32)
+        return values * np.float32(self.scale) if self.scale != 1.0 else values
+
+    def close(self) -> None:
+        mmap = getattr(self.data, "_mmap", None)
+        self.data = None  # type: ignore[assignment]
+        if mmap is not None:
+            mmap.close()
+
+
+class ExrHeightmap:
+    """An EXR heightmap, read a band of scanlines at a time (needs OpenEXR)"""
+
+    def __init__(self, path: str, channel: Optional[str] = None):
+        try:
+            import Imath
+            import OpenEXR
+        except ImportError as e:
+            raise ImportError("Reading EXR heightmaps needs the OpenEXR package (pip install OpenEXR)") from e
+
+        self.path = path
+        self._file = OpenEXR.InputFile(path)
+        header = self._file.header()
+        window = header["dataWindow"]
+        self.width = window.max.x - window.min.x + 1
+        self.height = window.max.y - window.min.y + 1
+        self._top = window.min.y
+        channels = list(header["channels"])
+        self.channel = channel or next((name for name in ("R", "Y", "G") if name in channels), channels[0])
+        self._pixel_type = Imath.PixelType(Imath.PixelType.FLOAT)
+        self.scale = 1.0
+
+    def rows(self, top: int, bottom: int) -> np.ndarray:
+        data = self._file.channel(self.channel, self._pixel_type, self._top + top, self._top + bottom - 1)
+        return np.frombuffer(data, dtype=np.float32).reshape(bottom - top, self.width)
+
+    def to_float(self, block: np.ndarray) -> np.ndarray:
+        return np.asarray(block, dtype=np.float32)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def open_heightmap(path: str, width: Optional[int] = None, height: Optional[int] = None):
+    """Reader for a heightmap file, chosen by its extension"""
+    if Path(path).suffix.lower() == ".exr":
+        return ExrHeightmap(path)
+    return RawHeightmap(path, width, height)
+
+
+def iter_tiles(reader, tile_size: int = DEFAULT_TILE_SIZE) -> Iterator[Tuple[np.ndarray, Tuple[slice, slice]]]:
+    """Tiles of normalized heights, each with a one pixel border where the map continues
+
+    Yields:
+        (block, inner): block includes the border; block[inner] is the tile itself
+    """
+    for top in range(0, reader.height, tile_size):
+        bottom = min(reader.height, top + tile_size)
+        band_top, band_bottom = max(0, top - 1), min(reader.height, bottom + 1)
+        band = reader.rows(band_top, band_bottom)
+        rows = slice(top - band_top, bottom - band_top)
+        for left in range(0, reader.width, tile_size):
+            right = min(reader.width, left + tile_size)
+            block_left, block_right = max(0, left - 1), min(reader.width, right + 1)
+            block = reader.to_float(band[:, block_left:block_right])
+            yield block, (rows, slice(left - block_left, right - block_left))
+
+
+class _Moments:
+    """Count, mean and variance merged tile by tile (Chan et al.)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values: np.ndarray) -> None:
+        count = values.size
+        if not count:
+            return
+        mean = float(values.mean(dtype=np.float64))
+        m2 = float(np.square(values - mean, dtype=np.float64).sum())
+        delta = mean - self.mean
+        total = self.count + count
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def summary(self, scale: float = 1.0) -> Dict[str, float]:
+        std = math.sqrt(self.m2 / self.count) if self.count else 0.0
+        return {
+            "min": round(self.min * scale, 6),
+            "max": round(self.max * scale, 6),
+            "mean": round(self.mean * scale, 6),
+            "std": round(std * scale, 6),
+        }
+
+
+def analyze_heightmap(
+    path: str,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    terrain_width: float = 5000.0,
+    terrain_height: float = 2600.0,
+    slope_bins: Sequence[float] = DEFAULT_SLOPE_BINS,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Elevation and slope statistics of one heightmap
+
+    Elevations are in the units of terrain_height; slopes in degrees, with
+    a histogram over slope_bins.
+    """
+    reader = open_heightmap(path, width, height)
+    try:
+        spacing = terrain_width / reader.width
+        edges = np.asarray(slope_bins, dtype=np.float32)
+        counts = np.zeros(len(edges) - 1, dtype=np.int64)
+        elevation, slope = _Moments(), _Moments()
+
+        for block, inner in iter_tiles(reader, tile_size):
+            elevation.add(block[inner])
+            grad_y, grad_x = np.gradient(block * np.float32(terrain_height), spacing)
+            degrees = np.degrees(np.arctan(np.hypot(grad_x[inner], grad_y[inner])))
+            slope.add(degrees)
+            counts += np.histogram(degrees, bins=edges)[0]
+
+        pixels = reader.width * reader.height
+        return {
+            "path": path,
+            "width": reader.width,
+            "height": reader.height,
+            "elevation": elevation.summary(terrain_height),
+            "normalized_elevation": elevation.summary(),
+            "slope": {
+                **{key: value for key, value in slope.summary().items() if key != "min"},
+                "histogram": {
+                    "edges": [float(edge) for edge in edges],
+                    "counts": counts.tolist(),
+                    "fractions": [round(count / pixels, 6) for count in counts.tolist()],
+                },
+            },
+        }
+    finally:
+        reader.close()
+
+
+def mask_coverage(
+    path: str,
+    threshold: float = 0.05,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Fraction of a mask's pixels above threshold, and its mean"""
+    reader = open_heightmap(path, width, height)
+    try:
+        covered = 0
+        moments = _Moments()
+        for block, inner in iter_tiles(reader, tile_size):
+            values = block[inner]
+            covered += int(np.count_nonzero(values > threshold))
+            moments.add(values)
+        return {
+            "path": path,
+            "coverage": round(covered / (reader.width * reader.height), 6),
+            "mean": round(moments.mean, 6),
+            "threshold": threshold,
+        }
+    finally:
+        reader.close()
+
+
+def _edge(reader, side: str, band_rows: int) -> np.ndarray:
+    """Normalized heights along one edge of a map"""
+    if side == "top":
+        return reader.to_float(reader.rows(0, 1)[0])
+    if side == "bottom":
+        return reader.to_float(reader.rows(reader.height - 1, reader.height)[0])
+    column = 0 if side == "left" else reader.width - 1
+    return np.concatenate(
+        [
+            reader.to_float(reader.rows(top, min(reader.height, top + band_rows))[:, column])
+            for top in range(0, reader.height, band_rows)
+        ]
+    )
+
+
+def tile_seams(
+    tiles: Dict[Tuple[int, int], str], terrain_height: float = 2600.0, band_rows: int = DEFAULT_TILE_SIZE
+) -> Dict[str, Any]:
+    """Height differences along the edges shared by neighbouring tiles of a tiled build
+
+    Args:
+        tiles: Tile files by (x, y) position
+    """
+    seams: List[Dict[str, Any]] = []
+    for (x, y), path in sorted(tiles.items()):
+        for neighbour, sides in (((x + 1, y), ("right", "left")), ((x, y + 1), ("bottom", "top"))):
+            if neighbour not in tiles:
+                continue
+            first, second = open_heightmap(path), open_heightmap(tiles[neighbour])
+            try:
+                a, b = _edge(first, sides[0], band_rows), _edge(second, sides[1], band_rows)
+            finally:
+                first.close()
+                second.close()
+            if a.shape != b.shape:
+                seams.append({"tiles": [[x, y], list(neighbour)], "error": f"Edge lengths differ: {a.size} and {b.size}"})
+                continue
+            delta = np.abs(a - b) * np.float32(terrain_height)
+            seams.append(
+                {
+                    "tiles": [[x, y], list(neighbour)],
+                    "max_delta": round(float(delta.max()), 6),
+                    "mean_delta": round(float(delta.mean()), 6),
+                }
+            )
+    measured = [seam["max_delta"] for seam in seams if "max_delta" in seam]
+    return {"tile_count": len(tiles), "seams": seams, "max_delta": max(measured) if measured else None}
+
+
+def analyze_build_outputs(
+    directory: str,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    terrain_width: float = 5000.0,
+    terrain_height: float = 2600.0,
+    slope_bins: Sequence[float] = DEFAULT_SLOPE_BINS,
+    mask_threshold: float = 0.05,
+) -> Dict[str, Any]:
+    """Statistics of every heightmap, erosion mask and tiled output in a build directory
+
+    Files that cannot be read are listed under "errors".
+    """
+    heightmaps: Dict[str, Any] = {}
+    masks: Dict[str, Any] = {}
+    tiled: Dict[str, Dict[Tuple[int, int], str]] = {}
+    errors: Dict[str, str] = {}
+
+    files = sorted(p for p in Path(directory).rglob("*") if p.suffix.lower() in HEIGHTMAP_SUFFIXES and p.is_file())
+    for file_path in files:
+        name = str(file_path.relative_to(directory))
+        try:
+            if EROSION_MASK_PATTERN.search(file_path.stem):
+                masks[name] = mask_coverage(str(file_path), mask_threshold, tile_size)
+                continue
+            heightmaps[name] = analyze_heightmap(str(file_path), tile_size, terrain_width, terrain_height, slope_bins)
+        except (OSError, ValueError, ImportError) as e:
+            errors[name] = str(e)
+            continue
+        match = TILE_PATTERN.match(file_path.stem)
+        if match:
+            x, y = int(match.group("x1") or match.group("x2")), int(match.group("y1") or match.group("y2"))
+            group = str(file_path.with_name(match.group("base") + file_path.suffix).relative_to(directory))
+            tiled.setdefault(group, {})[(x, y)] = str(file_path)
+
+    seams = {}
+    for group, tiles in tiled.items():
+        try:
+            seams[group] = tile_seams(tiles, terrain_height, tile_size)
+        except (OSError, ValueError, ImportError) as e:
+            errors[group] = str(e)
+
+    return {
+        "success": True,
+        "directory": directory,
+        "heightmaps": heightmaps,
+        "erosion_coverage": masks,
+        "tile_seams": seams,
+        "errors": errors,
+    }
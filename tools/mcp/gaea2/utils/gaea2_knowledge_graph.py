@@ -9,9 +9,12 @@ intelligence of the Gaea 2 MCP tool by:
 4. Detecting incompatible combinations
 """
 
+import bisect
+import threading
+from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 class RelationType(Enum):
@@ -65,12 +68,67 @@ class PropertyConstraint:
     description: str = ""
 
 
+def popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+class PatternIndex:
+    """Inverted index and bitsets over the node types of a list of patterns
+
+    Every node type used by a pattern gets a bit; a pattern's node set is the
+    OR of its bits, so overlap with a query is a single AND plus a popcount.
+    """
+
+    def __init__(self, patterns: List[NodePattern]):
+        self.bit_of: Dict[str, int] = {}
+        self.patterns_by_node: Dict[str, List[int]] = defaultdict(list)
+        self.bitsets: List[int] = []
+        self.sizes: List[int] = []
+        for position, pattern in enumerate(patterns):
+            bits = 0
+            for node in dict.fromkeys(pattern.nodes):
+                if node not in self.bit_of:
+                    self.bit_of[node] = 1 << len(self.bit_of)
+                bits |= self.bit_of[node]
+                self.patterns_by_node[node].append(position)
+            self.bitsets.append(bits)
+            self.sizes.append(popcount(bits))
+
+    def bitset(self, nodes: Iterable[str]) -> int:
+        """Bits of the given node types; types no pattern uses are ignored"""
+        bits = 0
+        for node in nodes:
+            bits |= self.bit_of.get(node, 0)
+        return bits
+
+    def containing(self, nodes: Iterable[str]) -> List[int]:
+        """Positions of patterns that contain every one of the node types"""
+        nodes = set(nodes)
+        if not nodes:
+            return list(range(len(self.bitsets)))
+        if any(node not in self.bit_of for node in nodes):
+            return []
+        bits = self.bitset(nodes)
+        rarest = min((self.patterns_by_node[node] for node in nodes), key=len)
+        return [position for position in rarest if self.bitsets[position] & bits == bits]
+
+    def overlapping(self, nodes: Iterable[str]) -> List[int]:
+        """Positions of patterns sharing at least one node type, in pattern order"""
+        return sorted({position for node in nodes for position in self.patterns_by_node.get(node, ())})
+
+
 class Gaea2KnowledgeGraph:
     """Knowledge graph for Gaea 2 nodes and their relationships"""
 
     def __init__(self):
-        self.relationships: List[NodeRelationship] = []
-        self.patterns: List[NodePattern] = []
+        # Changed only through add_relationship()/add_pattern(), which drop the query indexes
+        self._relationships: List[NodeRelationship] = []
+        self._node_patterns: List[NodePattern] = []
+        self._relationship_index: Optional[Dict[Tuple[str, Optional[RelationType], Optional[str]], List[NodeRelationship]]] = (
+            None
+        )
+        self._pattern_index: Optional[PatternIndex] = None
+        self._index_lock = threading.Lock()
         self.property_constraints: List[PropertyConstraint] = []
         self.node_categories: Dict[str, str] = {}
         self.node_descriptions: Dict[str, str] = {}
@@ -84,6 +142,16 @@ class Gaea2KnowledgeGraph:
         self._initialize_categories()
         self._initialize_blend_modes()
 
+    @property
+    def relationships(self) -> Tuple[NodeRelationship, ...]:
+        """All relationships, in the order they were added"""
+        return tuple(self._relationships)
+
+    @property
+    def patterns(self) -> Tuple[NodePattern, ...]:
+        """All workflow patterns, in the order they were added"""
+        return tuple(self._node_patterns)
+
     def _initialize_relationships(self):
         """Initialize known node relationships"""
         # Terrain generation relationships
@@ -1101,7 +1169,9 @@ class Gaea2KnowledgeGraph:
             description=description,
             conditions=conditions or {},
         )
-        self.relationships.append(rel)
+        with self._index_lock:
+            self._relationships.append(rel)
+            self._relationship_index = None
 
     def add_pattern(
         self,
@@ -1119,7 +1189,9 @@ class Gaea2KnowledgeGraph:
             connections=connections,
             tags=tags or [],
         )
-        self.patterns.append(pattern)
+        with self._index_lock:
+            self._node_patterns.append(pattern)
+            self._pattern_index = None
 
     def add_constraint(
         self,
@@ -1143,34 +1215,64 @@ class Gaea2KnowledgeGraph:
         )
         self.property_constraints.append(constraint)
 
-    def get_relationships(self, node: str, relation_type: Optional[RelationType] = None) -> List[NodeRelationship]:
-        """Get all relationships for a node, optionally filtered by type"""
-        relationships = []
-        for rel in self.relationships:
-            if (rel.from_node == node or rel.to_node == node) and (
-                relation_type is None or rel.relation_type == relation_type
-            ):
-                relationships.append(rel)
-        return relationships
+    def get_relationships(
+        self,
+        node: str,
+        relation_type: Optional[RelationType] = None,
+        direction: Optional[str] = None,
+    ) -> List[NodeRelationship]:
+        """Get all relationships for a node, optionally filtered by type and direction
+
+        direction is "outgoing" (node is from_node), "incoming" (node is
+        to_node) or None for both.
+        """
+        return list(self._relations(node, relation_type, direction))
+
+    def _relations(
+        self, node: str, relation_type: Optional[RelationType] = None, direction: Optional[str] = None
+    ) -> List[NodeRelationship]:
+        index = self._relationship_index
+        if index is None:
+            index = self._build_relationship_index()
+        return index.get((node, relation_type, direction), [])
+
+    def _build_relationship_index(self) -> Dict[Tuple[str, Optional[RelationType], Optional[str]], List[NodeRelationship]]:
+        with self._index_lock:
+            index: Dict[Tuple[str, Optional[RelationType], Optional[str]], List[NodeRelationship]] = defaultdict(list)
+            for rel in self._relationships:
+                for relation_type in (rel.relation_type, None):
+                    index[(rel.from_node, relation_type, "outgoing")].append(rel)
+                    index[(rel.to_node, relation_type, "incoming")].append(rel)
+                    for node in {rel.from_node, rel.to_node}:
+                        index[(node, relation_type, None)].append(rel)
+            self._relationship_index = dict(index)
+            return self._relationship_index
+
+    def _patterns(self) -> PatternIndex:
+        index = self._pattern_index
+        if index is None:
+            with self._index_lock:
+                index = self._pattern_index = PatternIndex(self._node_patterns)
+        return index
 
     def get_suggested_next_nodes(self, current_nodes: List[str]) -> List[Tuple[str, float]]:
         """Suggest next nodes based on current workflow"""
         suggestions: Dict[str, float] = {}
+        present = set(current_nodes)
 
         # Check what typically follows current nodes
-        for node in current_nodes:
-            follows = self.get_relationships(node, RelationType.PRECEDES)
-            for rel in follows:
-                if rel.to_node not in current_nodes:
+        for node in dict.fromkeys(current_nodes):
+            for rel in self._relations(node, RelationType.PRECEDES, "outgoing"):
+                if rel.to_node not in present:
                     suggestions[rel.to_node] = max(suggestions.get(rel.to_node, 0), rel.strength)
 
         # Check patterns that contain current nodes
-        for pattern in self.patterns:
-            if all(node in pattern.nodes for node in current_nodes):
-                # Suggest remaining nodes from the pattern
-                for node in pattern.nodes:
-                    if node not in current_nodes:
-                        suggestions[node] = max(suggestions.get(node, 0), pattern.frequency * 0.8)
+        for position in self._patterns().containing(present):
+            pattern = self._node_patterns[position]
+            # Suggest remaining nodes from the pattern
+            for node in pattern.nodes:
+                if node not in present:
+                    suggestions[node] = max(suggestions.get(node, 0), pattern.frequency * 0.8)
 
         # Sort by suggestion strength
         return sorted(suggestions.items(), key=lambda x: x[1], reverse=True)
@@ -1181,26 +1283,30 @@ class Gaea2KnowledgeGraph:
         warnings = []
         suggestions = []
 
-        # Check for conflicts
+        present = set(nodes)
+        positions: Dict[str, List[int]] = defaultdict(list)
+        for i, node in enumerate(nodes):
+            positions[node].append(i)
+
+        # Check for conflicts with any later node, in the order of the later node
         for i, node_a in enumerate(nodes):
-            for node_b in nodes[i + 1 :]:
-                conflicts = self.get_relationships(node_a, RelationType.CONFLICTS)
-                for rel in conflicts:
-                    if rel.to_node == node_b:
-                        issues.append(f"{node_a} conflicts with {node_b}: {rel.description}")
+            conflicts = []
+            for order, rel in enumerate(self._relations(node_a, RelationType.CONFLICTS)):
+                later = positions.get(rel.to_node, [])
+                conflicts.extend((j, order, rel) for j in later[bisect.bisect_right(later, i) :])
+            for j, _, rel in sorted(conflicts, key=lambda conflict: conflict[:2]):
+                issues.append(f"{node_a} conflicts with {nodes[j]}: {rel.description}")
 
         # Check for missing requirements
         for node in nodes:
-            requirements = self.get_relationships(node, RelationType.REQUIRES)
-            for rel in requirements:
-                if rel.relation_type == RelationType.REQUIRES and rel.from_node == node and rel.to_node not in nodes:
+            for rel in self._relations(node, RelationType.REQUIRES, "outgoing"):
+                if rel.to_node not in present:
                     warnings.append(f"{node} typically requires {rel.to_node}")
 
         # Check for enhancement opportunities
         for node in nodes:
-            enhancements = self.get_relationships(node, RelationType.ENHANCES)
-            for rel in enhancements:
-                if rel.to_node in nodes and rel.from_node not in nodes:
+            for rel in self._relations(node, RelationType.ENHANCES, "incoming"):
+                if rel.from_node not in present:
                     suggestions.append(f"Consider adding {rel.from_node} to enhance {rel.to_node}")
 
         # Suggest next steps
@@ -1367,27 +1473,51 @@ class Gaea2KnowledgeGraph:
     def find_similar_patterns(self, nodes: List[str], threshold: float = 0.5) -> List[NodePattern]:
         """Find patterns similar to the given node list"""
         similar_patterns = []
+        index = self._patterns()
+        query = set(nodes)
+        bits = index.bitset(query)
 
-        for pattern in self.patterns:
+        # Patterns without a shared node score 0, so only they can be skipped
+        candidates = index.overlapping(query) if threshold > 0 else range(len(self._node_patterns))
+        for position in candidates:
             # Calculate similarity as Jaccard index
-            intersection = len(set(nodes) & set(pattern.nodes))
-            union = len(set(nodes) | set(pattern.nodes))
+            intersection = popcount(bits & index.bitsets[position])
+            union = len(query) + index.sizes[position] - intersection
             similarity = intersection / union if union > 0 else 0
 
             if similarity >= threshold:
-                similar_patterns.append((pattern, similarity))
+                similar_patterns.append((self._node_patterns[position], similarity))
 
         # Sort by similarity
         similar_patterns.sort(key=lambda x: x[1], reverse=True)
         return [p[0] for p in similar_patterns]
 
 
-# Create a global knowledge graph instance
-knowledge_graph = Gaea2KnowledgeGraph()
+_knowledge_graph: Optional[Gaea2KnowledgeGraph] = None
+_knowledge_graph_lock = threading.Lock()
+
+
+def get_knowledge_graph() -> Gaea2KnowledgeGraph:
+    """Get the shared knowledge graph, building it on first use"""
+    global _knowledge_graph
+    if _knowledge_graph is None:
+        with _knowledge_graph_lock:
+            if _knowledge_graph is None:
+                _knowledge_graph = Gaea2KnowledgeGraph()
+    return _knowledge_graph
+
+
+def __getattr__(name: str) -> Any:
+    # Keep ``from ...gaea2_knowledge_graph import knowledge_graph`` working
+    # without constructing the graph at import time
+    if name == "knowledge_graph":
+        return get_knowledge_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def enhance_workflow_with_knowledge(nodes: List[Dict[str, Any]], connections: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Enhance a workflow using the knowledge graph"""
+    knowledge_graph = get_knowledge_graph()
     node_names = [node["name"] for node in nodes]
     connection_pairs = [(c["from_node"], c["to_node"]) for c in connections]
 
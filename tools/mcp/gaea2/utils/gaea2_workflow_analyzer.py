@@ -3,13 +3,16 @@
 Gaea2 workflow analyzer - learns patterns from real projects
 """
 
+import itertools
 import json
 import logging
+import os
 from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from tools.mcp.gaea2.utils.workflow_extractor import WorkflowExtractor
+from tools.mcp.gaea2.utils import gaea2_corpus
+from tools.mcp.gaea2.utils.gaea2_corpus import CorpusIndex, LSHIndex
 
 logger = logging.getLogger(__name__)
 
@@ -51,62 +54,120 @@ class Gaea2WorkflowAnalyzer:
         self.connection_patterns = defaultdict(int)
         self.node_frequency = Counter()
         self.projects_analyzed = 0
+        # Patterns by node sequence, in the order they were found, and by node type set
+        self._pattern_by_nodes: Dict[Tuple[str, ...], WorkflowPattern] = {}
+        self._pattern_order: Dict[Tuple[str, ...], int] = {}
+        self._pattern_counter = itertools.count()
+        self._pattern_lsh = LSHIndex()
+        # (mtime_ns, size), digest and summary of each file merged by analyze_directory
+        self._merged_files: Dict[str, Tuple[Tuple[int, int], str, Dict[str, Any]]] = {}
 
     def analyze_project(self, project_path: str) -> Dict[str, Any]:
         """Analyze a single project"""
-        try:
-            with open(project_path, "r") as f:
-                project_data = json.load(f)
-
-            nodes, connections = WorkflowExtractor.extract_workflow(project_data)
-
-            if not nodes:
-                return {"success": False, "error": "No nodes found"}
-
-            # Update statistics
-            self.projects_analyzed += 1
-
-            # Analyze node frequency
-            for node in nodes:
-                self.node_frequency[node["type"]] += 1
-
-            # Analyze sequences
-            self._analyze_sequences(nodes, connections)
-
-            # Analyze property distributions
-            self._analyze_properties(nodes)
-
-            # Find patterns
-            pattern = self._extract_pattern(nodes, connections)
-            if pattern:
-                self._add_or_update_pattern(pattern)
-
-            return {
-                "success": True,
-                "nodes_analyzed": len(nodes),
-                "connections_analyzed": len(connections),
-            }
-
-        except Exception as e:
-            logger.error(f"Failed to analyze {project_path}: {str(e)}")
-            return {"success": False, "error": str(e)}
-
-    def analyze_directory(self, directory_path: str) -> Dict[str, Any]:
-        """Analyze all projects in a directory"""
-        results = []
+        scanned = gaea2_corpus.scan_file(project_path)
+        summary = scanned.get("summary") or {"error": scanned.get("error")}
+        if "error" in summary:
+            if summary["error"] != "No nodes found":
+                logger.error(f"Failed to analyze {project_path}: {summary['error']}")
+            return {"success": False, "error": summary["error"]}
+
+        self._merge_summary(summary)
+        return self._summary_result(summary)
+
+    def analyze_directory(
+        self,
+        directory_path: str,
+        workers: Optional[int] = None,
+        index_path: Optional[str] = None,
+        recursive: bool = False,
+    ) -> Dict[str, Any]:
+        """Analyze all projects in a directory
+
+        Files are read and summarized in a process pool (one worker per CPU
+        by default) and merged as they finish. Analyzing a directory again
+        skips files whose mtime and size are unchanged and replaces the
+        statistics of files that changed. With index_path, summaries are also
+        kept in a CorpusIndex, so later runs only parse new or changed files.
+        """
         path = Path(directory_path)
-
-        for file_path in path.glob("*.terrain"):
-            result = self.analyze_project(str(file_path))
-            results.append({"file": file_path.name, "result": result})
+        files = sorted(str(p) for p in (path.rglob if recursive else path.glob)("*.terrain"))
+        index = CorpusIndex(index_path) if index_path else None
+        indexed = index.entries(files) if index else {}
+        results: Dict[str, Dict[str, Any]] = {}
+        # Digest and summary of each file's last known content
+        known: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        to_scan: List[Tuple[str, Optional[str]]] = []
+        parsed = unchanged = 0
+
+        for file_path in files:
+            try:
+                stat = os.stat(file_path)
+            except OSError as e:
+                results[file_path] = {"success": False, "error": str(e)}
+                continue
+            version = (stat.st_mtime_ns, stat.st_size)
+            merged = self._merged_files.get(file_path)
+            if merged is not None and merged[0] == version:
+                results[file_path] = self._summary_result(merged[2])
+                unchanged += 1
+            elif file_path in indexed and indexed[file_path][:2] == version:
+                _, _, digest, summary = indexed[file_path]
+                results[file_path] = self._merge_file(file_path, version, digest, summary)
+                unchanged += 1
+            else:
+                if file_path in indexed:
+                    known[file_path] = indexed[file_path][2:]
+                elif merged is not None:
+                    known[file_path] = merged[1:]
+                to_scan.append((file_path, known[file_path][0] if file_path in known else None))
+
+        rows = []
+        for scanned in gaea2_corpus.scan_files(to_scan, workers):
+            file_path = scanned["path"]
+            if "digest" not in scanned:
+                results[file_path] = {"success": False, "error": scanned["error"]}
+                continue
+            if "summary" in scanned:
+                summary = scanned["summary"]
+                parsed += 1
+            else:
+                # Touched but not changed: reuse the summary of the matching digest
+                summary = known[file_path][1]
+                unchanged += 1
+            version = (scanned["mtime_ns"], scanned["size"])
+            results[file_path] = self._merge_file(file_path, version, scanned["digest"], summary)
+            rows.append((file_path, scanned["mtime_ns"], scanned["size"], scanned["digest"], summary))
+        if index:
+            index.put(rows)
+            index.close()
 
         return {
             "projects_analyzed": self.projects_analyzed,
             "total_patterns": len(self.patterns),
             "node_frequency": dict(self.node_frequency.most_common(20)),
-            "results": results,
+            "files_parsed": parsed,
+            "files_unchanged": unchanged,
+            "results": [{"file": os.path.relpath(file_path, path), "result": results[file_path]} for file_path in files],
         }
 
+    def _merge_file(self, file_path: str, version: Tuple[int, int], digest: str, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge a file's summary, replacing the one merged for an earlier version of the file"""
+        previous = self._merged_files.get(file_path)
+        self._merged_files[file_path] = (version, digest, summary)
+        if previous is not None and previous[1] == digest:
+            return self._summary_result(summary)
+        if previous is not None and "error" not in previous[2]:
+            self._merge_summary(previous[2], remove=True)
+        if "error" not in summary:
+            self._merge_summary(summary)
+        return self._summary_result(summary)
+
+    @staticmethod
+    def _summary_result(summary: Dict[str, Any]) -> Dict[str, Any]:
+        if "error" in summary:
+            return {"success": False, "error": summary["error"]}
+        return {"success": True, "nodes_analyzed": summary["nodes"], "connections_analyzed": summary["connections"]}
+
     def get_recommendations(self, current_nodes: List[str]) -> Dict[str, Any]:
         """Get recommendations based on learned patterns"""
         recommendations: Dict[str, Any] = {
@@ -125,8 +186,9 @@ class Gaea2WorkflowAnalyzer:
                     {"node": node, "frequency": count} for node, count in next_nodes.most_common(5)
                 ]
 
-        # Find similar patterns
-        for pattern in self.patterns:
+        # Find similar patterns among the LSH candidates, in the order they were found
+        candidates = sorted(self._pattern_lsh.candidates(current_nodes), key=self._pattern_order.__getitem__)
+        for pattern in (self._pattern_by_nodes[key] for key in candidates):
             similarity = self._calculate_pattern_similarity(current_nodes, pattern.nodes)
             if similarity > 0.5:
                 # Ensure we're working with a list
@@ -205,87 +267,94 @@ class Gaea2WorkflowAnalyzer:
             ],
         }
 
-    def _analyze_sequences(self, nodes: List[Dict[str, Any]], connections: List[Dict[str, Any]]):
-        """Analyze node sequences"""
-        node_map = {n["id"]: n["type"] for n in nodes}
-
-        for conn in connections:
-            from_type = node_map.get(conn["from_node"])
-            to_type = node_map.get(conn["to_node"])
-
-            if from_type and to_type:
+    def _merge_summary(self, summary: Dict[str, Any], remove: bool = False):
+        """Add a project summary (see gaea2_corpus.summarize_project) to the statistics, or take it out again"""
+        sign = -1 if remove else 1
+        self.projects_analyzed += sign
+
+        for node_type, count in summary["node_types"].items():
+            self.node_frequency[node_type] += sign * count
+            if self.node_frequency[node_type] <= 0:
+                del self.node_frequency[node_type]
+
+        # Node sequences: what follows each node type
+        for from_type, to_type in summary["edges"]:
+            key = f"{from_type}->{to_type}"
+            if remove:
+                followers = self.node_sequences[from_type]
+                if to_type in followers:
+                    followers.remove(to_type)
+                if not followers:
+                    del self.node_sequences[from_type]
+                self.connection_patterns[key] -= 1
+                if self.connection_patterns[key] <= 0:
+                    del self.connection_patterns[key]
+            else:
                 self.node_sequences[from_type].append(to_type)
-                self.connection_patterns[f"{from_type}->{to_type}"] += 1
-
-    def _analyze_properties(self, nodes: List[Dict[str, Any]]):
-        """Analyze property distributions"""
-        for node in nodes:
-            node_type = node["type"]
-            for prop_name, prop_value in node.get("properties", {}).items():
-                # Store property values for distribution analysis
-                if isinstance(prop_value, (int, float, str, bool)):
-                    self.property_distributions[node_type][prop_name].append(prop_value)
-
-    def _extract_pattern(self, nodes: List[Dict[str, Any]], connections: List[Dict[str, Any]]) -> Optional[WorkflowPattern]:
-        """Extract a workflow pattern from nodes"""
-        if len(nodes) < 2:
-            return None
-
-        # Get the sequence of node types
-        node_map = {n["id"]: n for n in nodes}
-
-        # Find the starting node (no incoming connections)
-        incoming = {c["to_node"] for c in connections}
-        start_nodes = [n for n in nodes if n["id"] not in incoming]
-
-        if not start_nodes:
-            # If no clear start, pick the first node
-            start_nodes = [nodes[0]]
-
-        # Trace the main path
-        pattern_nodes = []
-        current: Optional[Dict[str, Any]] = start_nodes[0]
-        visited = set()
-
-        while current and current["id"] not in visited:
-            pattern_nodes.append(current["type"])
-            visited.add(current["id"])
-
-            # Find next node
-            next_conn = next((c for c in connections if c["from_node"] == current["id"]), None)
-            if next_conn:
-                current = node_map.get(next_conn["to_node"])
+                self.connection_patterns[key] += 1
+
+        # Property distributions
+        for node_type, prop_name, prop_value in summary["properties"]:
+            values = self.property_distributions[node_type][prop_name]
+            if remove:
+                if prop_value in values:
+                    values.remove(prop_value)
             else:
-                current = None
-
-        if len(pattern_nodes) >= 2:
-            pattern_name = "->".join(pattern_nodes[:3])  # Use first 3 nodes as name
-            pattern = WorkflowPattern(pattern_name, pattern_nodes)
-
-            # Add property patterns
-            for node in nodes:
-                if node["type"] in pattern_nodes:
-                    for prop_name, prop_value in node.get("properties", {}).items():
-                        pattern.add_property_pattern(node["type"], prop_name, prop_value)
-
-            return pattern
-
-        return None
+                values.append(prop_value)
+
+        pattern = summary["pattern"]
+        if pattern is None:
+            return
+        if remove:
+            self._remove_pattern(pattern["nodes"], pattern["properties"])
+            return
+        new_pattern = WorkflowPattern("->".join(pattern["nodes"][:3]), pattern["nodes"])  # First 3 nodes as name
+        for node_type, props in pattern["properties"].items():
+            for prop_name, values in props.items():
+                for value in values:
+                    new_pattern.add_property_pattern(node_type, prop_name, value)
+        self._add_or_update_pattern(new_pattern)
 
     def _add_or_update_pattern(self, new_pattern: WorkflowPattern):
         """Add or update a pattern"""
-        # Check if pattern already exists
-        for existing in self.patterns:
-            if existing.nodes == new_pattern.nodes:
-                existing.frequency += 1
-                # Merge property patterns
-                for node_type, props in new_pattern.property_patterns.items():
-                    for prop_name, values in props.items():
-                        existing.add_property_pattern(node_type, prop_name, values[0])
-                return
+        key = tuple(new_pattern.nodes)
+        existing = self._pattern_by_nodes.get(key)
+        if existing is not None:
+            existing.frequency += 1
+            # Merge property patterns
+            for node_type, props in new_pattern.property_patterns.items():
+                for prop_name, values in props.items():
+                    existing.add_property_pattern(node_type, prop_name, values[0])
+            return
 
         # New pattern
         self.patterns.append(new_pattern)
+        self._index_pattern(new_pattern)
+
+    def _remove_pattern(self, nodes: List[str], properties: Dict[str, Dict[str, List[Any]]]):
+        """Take one occurrence of a pattern out again"""
+        key = tuple(nodes)
+        existing = self._pattern_by_nodes.get(key)
+        if existing is None:
+            return
+        existing.frequency -= 1
+        if existing.frequency <= 0:
+            self.patterns.remove(existing)
+            del self._pattern_by_nodes[key]
+            del self._pattern_order[key]
+            self._pattern_lsh.remove(key)
+            return
+        for node_type, props in properties.items():
+            for prop_name, values in props.items():
+                recorded = existing.property_patterns.get(node_type, {}).get(prop_name)
+                if recorded and values[0] in recorded:
+                    recorded.remove(values[0])
+
+    def _index_pattern(self, pattern: WorkflowPattern):
+        key = tuple(pattern.nodes)
+        self._pattern_by_nodes[key] = pattern
+        self._pattern_order[key] = next(self._pattern_counter)
+        self._pattern_lsh.add(key, pattern.nodes)
 
     def _calculate_pattern_similarity(self, nodes1: List[str], nodes2: List[str]) -> float:
         """Calculate similarity between two node sequences"""
@@ -293,13 +362,7 @@ class Gaea2WorkflowAnalyzer:
             return 0.0
 
         # Use Jaccard similarity
-        set1 = set(nodes1)
-        set2 = set(nodes2)
-
-        intersection = len(set1 & set2)
-        union = len(set1 | set2)
-
-        return intersection / union if union > 0 else 0.0
+        return gaea2_corpus.jaccard(nodes1, nodes2)
 
     def save_analysis(self, output_path: str):
         """Save analysis results to file"""
@@ -327,9 +390,13 @@ class Gaea2WorkflowAnalyzer:
 
         # Reconstruct patterns
         self.patterns = []
+        self._pattern_by_nodes.clear()
+        self._pattern_order.clear()
+        self._pattern_lsh = LSHIndex()
         for p_data in data.get("patterns", []):
             pattern = WorkflowPattern(p_data["name"], p_data["nodes"], p_data["frequency"])
             self.patterns.append(pattern)
+            self._index_pattern(pattern)
 
         # Load statistics
         stats = data.get("statistics", {})
@@ -4,9 +4,9 @@ Connection validation for Gaea2 workflows based on real patterns
 """
 
 import logging
-from collections import defaultdict
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Collection, Dict, List, Optional, Tuple
 
+from ..utils.gaea2_graph import WorkflowGraph, connection_endpoints
 from ..utils.gaea2_pattern_knowledge import COMMON_NODE_SEQUENCES, NODE_CONNECTION_FREQUENCY, WORKFLOW_TEMPLATES
 
 logger = logging.getLogger(__name__)
@@ -48,14 +48,14 @@ class Gaea2ConnectionValidator:
         warnings = []
 
         # Build lookup structures
-        node_map = {n.get("id", f"node_{i}"): n for i, n in enumerate(nodes)}
-        node_types = {n.get("id", f"node_{i}"): n.get("type", "Unknown") for i, n in enumerate(nodes)}
+        graph = WorkflowGraph(nodes, connections)
+        node_map = graph.nodes
+        node_types = {node_id: node.get("type", "Unknown") for node_id, node in node_map.items()}
 
         # Check basic connection validity
         for conn in connections:
             # Handle both formats: from_node/to_node and source/target
-            from_id = conn.get("from_node") or conn.get("source")
-            to_id = conn.get("to_node") or conn.get("target")
+            from_id, to_id = connection_endpoints(conn)
 
             # Check if nodes exist
             if from_id not in node_map:
@@ -69,49 +69,22 @@ class Gaea2ConnectionValidator:
             to_type = node_types[to_id]
 
             # Check if connection makes sense based on patterns
-            if from_type in NODE_CONNECTION_FREQUENCY:
-                valid_targets = NODE_CONNECTION_FREQUENCY[from_type]
-                if to_type not in valid_targets:
-                    # Check if it's in common sequences
-                    if from_type in COMMON_NODE_SEQUENCES:
-                        if to_type not in COMMON_NODE_SEQUENCES[from_type]:
-                            warnings.append(
-                                f"Unusual connection: {from_type} → {to_type} "
-                                f"(common: {', '.join(list(valid_targets.keys())[:3])})"
-                            )
-                else:
-                    # Connection exists but might be rare
-                    probability = valid_targets[to_type]
-                    # Ensure probability is numeric for comparison
-                    if isinstance(probability, str):
-                        try:
-                            probability = float(probability)
-                        except ValueError:
-                            probability = 0.5  # Default if conversion fails
-                    if probability < 0.1:
-                        warnings.append(f"Rare connection: {from_type} → {to_type} " f"(only {probability:.0%} of cases)")
+            warning = self.connection_pattern_warning(from_type, to_type)
+            if warning:
+                warnings.append(warning)
 
         # Check for orphaned nodes
-        connected_ids = set()
-        for conn in connections:
-            # Handle both formats
-            from_id = conn.get("from_node") or conn.get("source")
-            to_id = conn.get("to_node") or conn.get("target")
-            connected_ids.add(from_id)
-            connected_ids.add(to_id)
-
-        for node in nodes:
-            node_id = node.get("id", f"node_{nodes.index(node)}")
-            if node_id not in connected_ids:
-                node_type = node.get("type", "Unknown")
-                # Some nodes can be standalone
-                standalone_types = ["Export", "Unity", "Unreal", "File"]
-                if node_type not in standalone_types:
-                    node_name = node.get("name", f"node_{node_id}")
-                    warnings.append(f"Node '{node_name}' ({node_type}) is not connected")
+        for node_id in graph.orphans():
+            node = node_map[node_id]
+            node_type = node.get("type", "Unknown")
+            # Some nodes can be standalone
+            standalone_types = ["Export", "Unity", "Unreal", "File"]
+            if node_type not in standalone_types:
+                node_name = node.get("name", f"node_{node_id}")
+                warnings.append(f"Node '{node_name}' ({node_type}) is not connected")
 
         # Check for cycles
-        cycles = self._detect_cycles(connections)
+        cycles = graph.cycles()
         if cycles:
             for cycle in cycles:
                 # Cycles are errors in Gaea2, not just warnings
@@ -126,6 +99,29 @@ class Gaea2ConnectionValidator:
 
         return is_valid, errors, warnings
 
+    def connection_pattern_warning(self, from_type: str, to_type: str) -> Optional[str]:
+        """Warning for a connection that is unusual or rare in real workflows, if any"""
+        if from_type not in NODE_CONNECTION_FREQUENCY:
+            return None
+        valid_targets = NODE_CONNECTION_FREQUENCY[from_type]
+        if to_type not in valid_targets:
+            # Check if it's in common sequences
+            if from_type in COMMON_NODE_SEQUENCES and to_type not in COMMON_NODE_SEQUENCES[from_type]:
+                return f"Unusual connection: {from_type} → {to_type} (common: {', '.join(list(valid_targets.keys())[:3])})"
+            return None
+
+        # Connection exists but might be rare
+        probability = valid_targets[to_type]
+        # Ensure probability is numeric for comparison
+        if isinstance(probability, str):
+            try:
+                probability = float(probability)
+            except ValueError:
+                probability = 0.5  # Default if conversion fails
+        if probability < 0.1:
+            return f"Rare connection: {from_type} → {to_type} (only {probability:.0%} of cases)"
+        return None
+
     def suggest_connections(
         self, nodes: List[Dict[str, Any]], existing_connections: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
@@ -192,12 +188,7 @@ class Gaea2ConnectionValidator:
 
         # Check for bypass opportunities
         # (e.g., A→B→C where A→C would be more efficient)
-        node_types = {n.get("id", f"node_{i}"): n.get("type", "Unknown") for i, n in enumerate(nodes)}
-
-        # Build adjacency for path finding
-        adjacency = defaultdict(list)
-        for conn in optimized:
-            adjacency[conn["from_node"]].append(conn["to_node"])
+        graph = WorkflowGraph(nodes, optimized)
 
         # Look for long chains that could be shortened
         for start_node in nodes:
@@ -208,59 +199,14 @@ class Gaea2ConnectionValidator:
                 "Island",
             ]:
                 # These are typically starting nodes
-                paths = self._find_paths_to_type(
-                    start_node.get("id", ""),
-                    "SatMap",
-                    adjacency,
-                    node_types,
-                    max_length=6,
-                )
-
-                if paths:
-                    shortest = min(paths, key=len)
+                shortest = graph.shortest_path_to_type(start_node.get("id", ""), "SatMap", max_length=6)
+
+                if shortest:
                     if len(shortest) > 4:
                         logger.info(f"Long path detected from {start_node['type']} to SatMap: " f"{len(shortest)} nodes")
 
         return optimized
 
-    def _detect_cycles(self, connections: List[Dict[str, Any]]) -> List[List[int]]:
-        """Detect cycles in the connection graph"""
-        # Build adjacency list
-        graph = defaultdict(list)
-        for conn in connections:
-            # Handle both formats
-            from_node = conn.get("from_node") or conn.get("source")
-            to_node = conn.get("to_node") or conn.get("target")
-            graph[from_node].append(to_node)
-
-        cycles = []
-        visited = set()
-        rec_stack = set()
-
-        def dfs(node, path):
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
-
-            for neighbor in graph.get(node, []):
-                if neighbor not in visited:
-                    if dfs(neighbor, path.copy()):
-                        return True
-                elif neighbor in rec_stack:
-                    # Found cycle
-                    cycle_start = path.index(neighbor)
-                    cycles.append(path[cycle_start:] + [neighbor])
-
-            rec_stack.remove(node)
-            return False
-
-        # Check all nodes - use list() to avoid dictionary size change during iteration
-        for node in list(graph.keys()):
-            if node not in visited:
-                dfs(node, [])
-
-        return cycles
-
     def _check_workflow_patterns(
         self,
         nodes: List[Dict[str, Any]],
@@ -268,8 +214,10 @@ class Gaea2ConnectionValidator:
         warnings: List[str],
     ):
         """Check for missing common workflow patterns"""
-        node_types = [n.get("type", "Unknown") for n in nodes]
+        self.check_type_patterns({n.get("type", "Unknown") for n in nodes}, warnings)
 
+    def check_type_patterns(self, node_types: Collection[str], warnings: List[str]):
+        """Check the node types present in a workflow for missing common patterns"""
         # Check for common required nodes
         if "Erosion2" in node_types and "TextureBase" not in node_types:
             warnings.append("Workflow has Erosion2 but no TextureBase (usually needed for texturing)")
@@ -282,39 +230,9 @@ class Gaea2ConnectionValidator:
 
         # Check for export nodes
         export_types = ["Export", "Unity", "Unreal"]
-        if not any(n.get("type", "Unknown") in export_types for n in nodes):
+        if not any(t in export_types for t in node_types):
             warnings.append("No export node found - add Export node to save terrain")
 
-    def _find_paths_to_type(
-        self,
-        start: int,
-        target_type: str,
-        adjacency: Dict[int, List[int]],
-        node_types: Dict[int, str],
-        max_length: int = 10,
-    ) -> List[List[int]]:
-        """Find all paths from start node to any node of target type"""
-        paths = []
-
-        def dfs(current, path, visited):
-            if len(path) > max_length:
-                return
-
-            if node_types.get(current) == target_type and len(path) > 1:
-                paths.append(path.copy())
-                return
-
-            for neighbor in adjacency.get(current, []):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    path.append(neighbor)
-                    dfs(neighbor, path, visited)
-                    path.pop()
-                    visited.remove(neighbor)
-
-        dfs(start, [start], {start})
-        return paths
-
     def get_connection_quality_score(self, nodes: List[Dict[str, Any]], connections: List[Dict[str, Any]]) -> float:
         """Calculate a quality score for the connections (0-100)"""
         score = 100.0
@@ -341,16 +259,11 @@ class Gaea2ConnectionValidator:
                     score -= 10  # Unusual connection
 
         # Penalize orphaned nodes
-        connected_ids = set()
-        for conn in connections:
-            connected_ids.add(conn["from_node"])
-            connected_ids.add(conn["to_node"])
-
-        orphaned_count = sum(1 for n in nodes if n["id"] not in connected_ids)
-        score -= orphaned_count * 10
+        graph = WorkflowGraph(nodes, connections)
+        score -= len(graph.orphans()) * 10
 
         # Bonus for following common patterns
-        node_sequence = self._extract_main_sequence(nodes, connections)
+        node_sequence = self._extract_main_sequence(graph)
         for template in WORKFLOW_TEMPLATES.values():
             if isinstance(template, dict) and "nodes" in template:
                 if self._sequence_matches_template(node_sequence, template["nodes"]):
@@ -359,35 +272,9 @@ class Gaea2ConnectionValidator:
 
         return max(0.0, min(100.0, score))
 
-    def _extract_main_sequence(self, nodes: List[Dict[str, Any]], connections: List[Dict[str, Any]]) -> List[str]:
+    def _extract_main_sequence(self, graph: WorkflowGraph) -> List[str]:
         """Extract the main node sequence from the workflow"""
-        if not nodes or not connections:
-            return []
-
-        # Find start nodes (no incoming connections)
-        incoming = {c["to_node"] for c in connections}
-        start_nodes = [n for n in nodes if n["id"] not in incoming]
-
-        if not start_nodes:
-            start_nodes = [nodes[0]]
-
-        # Follow main path
-        sequence = []
-        current: Optional[Dict[str, Any]] = start_nodes[0]
-        visited = set()
-
-        while current and current["id"] not in visited:
-            sequence.append(current["type"])
-            visited.add(current["id"])
-
-            # Find next node
-            next_conn = next((c for c in connections if c["from_node"] == current["id"]), None)
-            if next_conn:
-                current = next((n for n in nodes if n["id"] == next_conn["to_node"]), None)
-            else:
-                current = None
-
-        return sequence
+        return [graph.nodes[node_id]["type"] for node_id in graph.main_sequence()]
 
     def _sequence_matches_template(self, sequence: List[str], template: List[str]) -> bool:
         """Check if a sequence matches a template pattern"""
@@ -2,23 +2,173 @@
 """
 Gaea2 File Validator
 Automated system to test if generated .terrain files actually open in Gaea2
+
+Gaea.Swarm opens one file per run, so validations are shared out as slots of
+an adaptive pool sized from CPU load and free memory. Results are cached by
+a hash of the terrain content and the Gaea executable, so identical files are
+only opened once. get_file_validator returns the validator shared by a server.
 """
 
 import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import hashlib
 import json
 import logging
 import os
 import re
 import shutil
 import tempfile
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..utils.gaea2_cache import get_cache
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Output that means Gaea2 has opened the file ({name} is the file's base name)
+SUCCESS_PATTERNS = [r"Opening.*{name}", r"Loading devices", r"Activated.*processor", r"Preparing Gaea"]
+
+# Output that means the file failed to load
+FAILURE_PATTERN = re.compile(
+    r"corrupt|damaged|failed to load|cannot open|missing.*data|invalid file|error.*loading", re.IGNORECASE
+)
+
+CACHE_OPERATION = "file_validation"
+
+
+def content_hash(file_path: str) -> str:
+    """SHA-256 of a terrain file's JSON, ignoring formatting
+
+    The JSON is re-serialized compactly in its original key order, since
+    Gaea2 resolves $id/$ref pairs in document order. Files that are not
+    JSON are hashed as they are.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    try:
+        data = json.dumps(json.loads(data), separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        pass
+    return hashlib.sha256(data).hexdigest()
+
+
+def executable_fingerprint(gaea_path: Path) -> str:
+    """Identify the Gaea2 build, so cached results are dropped when it changes"""
+    stat = gaea_path.stat()
+    return f"{gaea_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def system_resources() -> Tuple[int, float, Optional[float]]:
+    """CPU count, 1-minute load average and available memory in MB (None if unknown)"""
+    cpus = os.cpu_count() or 1
+    load = os.getloadavg()[0] if hasattr(os, "getloadavg") else 0.0
+    try:
+        import psutil
+
+        return cpus, load, psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return cpus, load, int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return cpus, load, None
+
+
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class AdaptiveConcurrency:
+    """Slots for concurrent Gaea2 processes, sized from the resources left
+
+    The number of slots is recomputed whenever a validation wants to start:
+    idle CPUs (CPU count minus load not caused by our own processes) and free
+    memory divided by the expected size of one Gaea2 process, capped at
+    max_workers. One validation may always run.
+
+    Thread-executor tools validate on their own event loops, so the count is
+    guarded by a thread lock and each waiter is woken on its own loop.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        mb_per_process: float = 1024,
+        probe: Callable[[], Tuple[int, float, Optional[float]]] = system_resources,
+    ):
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.mb_per_process = mb_per_process
+        self.probe = probe
+        self.active = 0
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = []
+
+    def target(self) -> int:
+        """How many validations may run at once right now"""
+        cpus, load, available_mb = self.probe()
+        idle_cpus = cpus - max(0.0, load - self.active)
+        limit = min(self.max_workers, int(idle_cpus))
+        if available_mb is not None and self.mb_per_process > 0:
+            limit = min(limit, self.active + int(available_mb // self.mb_per_process))
+        return max(1, limit)
+
+    async def acquire(self) -> None:
+        """Wait until a validation may start, and take its slot"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self.active == 0 or self.active < self.target():
+                    self.active += 1
+                    return
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self._lock:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+
+    def release(self) -> None:
+        """Give a slot back and let every waiter check the target again"""
+        with self._lock:
+            self.active -= 1
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # That loop has closed, and its waiter with it
+                pass
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Wait until a validation may start, and hold its slot"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @classmethod
+    def from_env(cls) -> "AdaptiveConcurrency":
+        """Limits configured by GAEA2_VALIDATION_MAX_WORKERS and GAEA2_VALIDATION_MB_PER_PROCESS"""
+        return cls(
+            max_workers=int(os.environ.get("GAEA2_VALIDATION_MAX_WORKERS", "0")) or None,
+            mb_per_process=float(os.environ.get("GAEA2_VALIDATION_MB_PER_PROCESS", "1024")),
+        )
+
 
 class Gaea2FileValidator:
     """Validates Gaea2 terrain files by actually opening them in Gaea2"""
@@ -42,8 +192,17 @@ class Gaea2FileValidator:
         if not self.gaea_path.exists():
             raise FileNotFoundError(f"Gaea2 executable not found at {self.gaea_path}")
 
-        # Validation history
-        self.validation_history: List[Dict[str, Any]] = []
+        # Validation history, bounded since the validator is shared by a long-running server
+        self.validation_history: Deque[Dict[str, Any]] = collections.deque(maxlen=1000)
+
+        # Shared slots for Gaea2 processes, and validations of the same content in progress
+        self.concurrency = AdaptiveConcurrency.from_env()
+        # Futures of another thread's loop cannot be awaited directly, so these are concurrent.futures
+        self._in_progress: Dict[str, "concurrent.futures.Future[Optional[Dict[str, Any]]]"] = {}
+        self._in_progress_lock = threading.Lock()
+        # How long results stay cached, and how long to wait for errors after Gaea2 reports success
+        self.cache_ttl = float(os.environ.get("GAEA2_VALIDATION_CACHE_TTL", str(7 * 24 * 3600)))
+        self.confirm_seconds = float(os.environ.get("GAEA2_VALIDATION_CONFIRM_SECONDS", "3"))
 
         # Error patterns that indicate file loading failures
         self.error_patterns = {
@@ -57,7 +216,9 @@ class Gaea2FileValidator:
             "parse_error": r"parse error|syntax error|malformed",
         }
 
-    async def validate_file(self, file_path: str, timeout: int = 30, capture_screenshot: bool = False) -> Dict[str, Any]:
+    async def validate_file(
+        self, file_path: str, timeout: int = 30, capture_screenshot: bool = False, use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
         Validate a single Gaea2 terrain file
 
@@ -65,9 +226,10 @@ class Gaea2FileValidator:
             file_path: Path to the .terrain file
             timeout: Maximum time to wait for validation (seconds)
             capture_screenshot: Whether to capture a screenshot if file opens
+            use_cache: Reuse the result for a file with the same content
 
         Returns:
-            Dictionary with validation results
+            Dictionary with validation results; "cached" is True if Gaea2 was not run
         """
         start_time = datetime.now()
 
@@ -80,173 +242,115 @@ class Gaea2FileValidator:
                 "timestamp": start_time.isoformat(),
             }
 
-        # Prepare command
-        # Use --validate flag to just check if file loads without full processing
-        cmd = [
-            str(self.gaea_path),
-            "--Filename",
-            str(file_path),
-            "--validate",  # Just validate, don't process
-            "--silent",  # Minimal output
-            "--timeout",
-            str(timeout * 1000),  # Timeout in milliseconds
-        ]
-
-        logger.info(f"Validating file: {file_path}")
+        if not use_cache:
+            return await self._run_validation(file_path, timeout, start_time)
 
         try:
-            # Run validation with real-time output monitoring
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=os.path.dirname(file_path),  # Run in file's directory
-            )
-
-            # Monitor output in real-time
-            stdout_data: List[str] = []
-            stderr_data: List[str] = []
-            success_detected = False
-            error_detected = False
-            error_message = None
-
-            # Success indicators
-            success_patterns = [
-                r"Opening.*" + os.path.basename(file_path).replace(".", r"\."),
-                r"Loading devices",
-                r"Activated.*processor",
-                r"Preparing Gaea",
-            ]
-
-            # Quick failure indicators
-            failure_patterns = [
-                r"corrupt|damaged",
-                r"failed to load",
-                r"cannot open",
-                r"missing.*data",
-                r"invalid file",
-                r"error.*loading",
-            ]
-
-            async def read_stream(stream, data_list, is_stderr=False):
-                while True:
-                    try:
-                        line = await asyncio.wait_for(stream.readline(), timeout=0.1)
-                        if not line:
-                            break
-                        line_text = line.decode("utf-8", errors="replace").strip()
-                        if line_text:
-                            data_list.append(line_text)
-                            logger.debug(f"{'stderr' if is_stderr else 'stdout'}: {line_text}")
-
-                            # Check for success patterns
-                            for pattern in success_patterns:
-                                if re.search(pattern, line_text, re.IGNORECASE):
-                                    nonlocal success_detected
-                                    success_detected = True
-                                    logger.info(f"Success pattern detected: {line_text}")
-
-                            # Check for failure patterns
-                            for pattern in failure_patterns:
-                                if re.search(pattern, line_text, re.IGNORECASE):
-                                    nonlocal error_detected, error_message
-                                    error_detected = True
-                                    error_message = line_text
-                                    logger.info(f"Error pattern detected: {line_text}")
-
-                    except asyncio.TimeoutError:
-                        continue
-                    except Exception:
-                        break
-
-            # Start reading both streams
-            stdout_task = asyncio.create_task(read_stream(process.stdout, stdout_data))
-            stderr_task = asyncio.create_task(read_stream(process.stderr, stderr_data, True))
-
-            # Wait for either success/failure detection or timeout
-            wait_time = 0.0
-            check_interval = 0.5
-            post_opening_wait = 3.0  # Wait 3 seconds after "Opening" to confirm success
-            opening_detected_time = None
-
-            while wait_time < timeout:
-                # If error detected, fail immediately
-                if error_detected:
-                    logger.info("Error detected, terminating validation")
-                    break
-
-                # If success detected, wait a bit to ensure no errors follow
-                if success_detected and not opening_detected_time:
-                    opening_detected_time = wait_time
-                    logger.info(f"Success pattern detected at {wait_time}s, waiting {post_opening_wait}s to confirm...")
-
-                # If we've waited enough after detecting opening, consider it successful
-                if opening_detected_time and (wait_time - opening_detected_time) >= post_opening_wait:
-                    logger.info("File opened successfully with no errors following")
-                    break
+            cache_params = {"content": content_hash(file_path), "gaea": executable_fingerprint(self.gaea_path)}
+        except OSError:
+            return await self._run_validation(file_path, timeout, start_time)
+        cache = get_cache()
+        key = cache_params["content"]
+
+        cached = cache.get(CACHE_OPERATION, cache_params)
+        future: "Optional[concurrent.futures.Future[Optional[Dict[str, Any]]]]" = None
+        while cached is None and future is None:
+            with self._in_progress_lock:
+                pending = self._in_progress.get(key)
+                if pending is None:
+                    future = self._in_progress[key] = concurrent.futures.Future()
+            if pending is not None:
+                # The same content is being opened right now, possibly on another loop; share its result
+                cached = await asyncio.shield(asyncio.wrap_future(pending))
+        if cached is not None:
+            result = {
+                **cached,
+                "file_path": file_path,
+                "duration": (datetime.now() - start_time).total_seconds(),
+                "timestamp": start_time.isoformat(),
+                "cached": True,
+            }
+            self.validation_history.append(result)
+            return result
 
-                # Check if process has ended
-                if process.returncode is not None:
-                    break
+        assert future is not None
+        result = None
+        try:
+            result = await self._run_validation(file_path, timeout, start_time)
+            if result.pop("conclusive", False):
+                cache.set(CACHE_OPERATION, cache_params, result, ttl=self.cache_ttl)
+        finally:
+            # Waiters run their own validation if this one was cancelled
+            with self._in_progress_lock:
+                del self._in_progress[key]
+            future.set_result(result)
+        return result
 
-                await asyncio.sleep(check_interval)
-                wait_time += check_interval
+    async def _run_validation(self, file_path: str, timeout: int, start_time: datetime) -> Dict[str, Any]:
+        """Open the file in Gaea2 and classify the output
 
-            # Kill the process if still running
-            if process.returncode is None:
-                logger.info("Terminating Gaea2 process")
-                process.kill()
-                await process.wait()
+        The result has "conclusive" set when the outcome does not depend on
+        timing (a pattern fired or Gaea2 exited), i.e. when it may be cached.
+        """
+        try:
+            # Prepare command
+            # Use --validate flag to just check if file loads without full processing
+            cmd = [
+                str(self.gaea_path),
+                "--Filename",
+                str(file_path),
+                "--validate",  # Just validate, don't process
+                "--silent",  # Minimal output
+                "--timeout",
+                str(timeout * 1000),  # Timeout in milliseconds
+            ]
 
-            # Cancel reading tasks
-            stdout_task.cancel()
-            stderr_task.cancel()
-            try:
-                await stdout_task
-                await stderr_task
-            except asyncio.CancelledError:
-                pass
+            async with self.concurrency.slot():
+                logger.info(f"Validating file: {file_path}")
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=os.path.dirname(file_path) or None,  # Run in file's directory
+                )
+                watched = await self._watch_process(process, os.path.basename(file_path), timeout)
 
-            # Compile output
-            stdout_text = "\n".join(stdout_data)
-            stderr_text = "\n".join(stderr_data)
+            stdout_data, stderr_data = watched["stdout"], watched["stderr"]
+            success_detected, error_detected = watched["success_detected"], watched["error_detected"]
 
             # Determine final success status
             if error_detected:
                 success = False
-                error = error_message or "File validation failed"
-            elif success_detected and not error_detected:
+                error_text = watched["error_message"] or "File validation failed"
+            elif success_detected:
                 success = True
-                error = None
-            elif wait_time >= timeout:
+                error_text = None
+            elif watched["timed_out"]:
                 # If we timed out without detecting success or error patterns
                 # but the file name appears in output, consider it a success
                 if any("Opening" in line for line in stdout_data):
                     success = True
-                    error = None
+                    error_text = None
                 else:
                     success = False
-                    error = "Validation timed out without clear success/failure"
+                    error_text = "Validation timed out without clear success/failure"
             else:
                 success = process.returncode == 0
-                error = "Process ended without clear result" if not success else None
-
-            # Parse error messages if failed
-            error_info = self._parse_errors(stdout_text + stderr_text) if not success else None
+                error_text = "Process ended without clear result" if not success else None
 
-            # Calculate duration
-            duration = (datetime.now() - start_time).total_seconds()
+            stdout_text = "\n".join(stdout_data)
+            stderr_text = "\n".join(stderr_data)
 
             result = {
                 "success": success,
                 "file_path": file_path,
                 "return_code": process.returncode,
-                "duration": duration,
+                "duration": (datetime.now() - start_time).total_seconds(),
                 "timestamp": start_time.isoformat(),
                 "stdout": stdout_text,
                 "stderr": stderr_text,
-                "error": error,
-                "error_info": error_info,
+                "error": error_text,
+                "error_info": self._parse_errors(stdout_text + stderr_text) if not success else None,
                 "success_detected": success_detected,
                 "error_detected": error_detected,
             }
@@ -254,7 +358,7 @@ class Gaea2FileValidator:
             # Store in history
             self.validation_history.append(result)
 
-            return result
+            return {**result, "conclusive": not watched["timed_out"]}
 
         except Exception as e:
             logger.error(f"Error validating file {file_path}: {e}")
@@ -267,6 +371,83 @@ class Gaea2FileValidator:
                 "timestamp": start_time.isoformat(),
             }
 
+    async def _watch_process(self, process: asyncio.subprocess.Process, file_name: str, timeout: float) -> Dict[str, Any]:
+        """Read Gaea2's output as it arrives and stop as soon as the outcome is known
+
+        Returns on the first failure line, on process exit, at the timeout, or
+        confirm_seconds after the first success line if nothing fails by then.
+        The process is killed if it is still running.
+        """
+        success_pattern = re.compile(
+            "|".join(pattern.format(name=re.escape(file_name)) for pattern in SUCCESS_PATTERNS), re.IGNORECASE
+        )
+        watched: Dict[str, Any] = {"stdout": [], "stderr": [], "error_message": None}
+        succeeded, failed = asyncio.Event(), asyncio.Event()
+
+        async def pump(stream: asyncio.StreamReader, lines: List[str], name: str):
+            try:
+                async for raw in stream:
+                    line = raw.decode("utf-8", errors="replace").strip()
+                    if not line:
+                        continue
+                    lines.append(line)
+                    logger.debug(f"{name}: {line}")
+                    if success_pattern.search(line) and not succeeded.is_set():
+                        logger.info(f"Success pattern detected: {line}")
+                        succeeded.set()
+                    if FAILURE_PATTERN.search(line) and not failed.is_set():
+                        logger.info(f"Error pattern detected: {line}")
+                        watched["error_message"] = line
+                        failed.set()
+            except (ValueError, ConnectionError):
+                # Line longer than the stream limit, or the pipe broke
+                pass
+
+        loop = asyncio.get_running_loop()
+        pumps = [
+            asyncio.ensure_future(pump(process.stdout, watched["stdout"], "stdout")),
+            asyncio.ensure_future(pump(process.stderr, watched["stderr"], "stderr")),
+        ]
+        exited = asyncio.ensure_future(process.wait())
+        success_seen = asyncio.ensure_future(succeeded.wait())
+        failure_seen = asyncio.ensure_future(failed.wait())
+        deadline = loop.time() + timeout
+
+        async def wait_any(futures, until: float):
+            remaining = until - loop.time()
+            if remaining > 0:
+                await asyncio.wait(futures, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+
+        try:
+            await wait_any({exited, success_seen, failure_seen}, deadline)
+            if success_seen.done() and not (failure_seen.done() or exited.done()):
+                # Gaea2 reports success before it has finished loading; give errors a moment to appear
+                await wait_any({exited, failure_seen}, min(deadline, loop.time() + self.confirm_seconds))
+                confirmed = not (failure_seen.done() or exited.done())
+            else:
+                confirmed = False
+            watched["timed_out"] = not (exited.done() or failure_seen.done() or confirmed)
+
+            if exited.done():
+                # Read what the process wrote before it exited
+                await asyncio.wait(pumps, timeout=1.0)
+            else:
+                logger.info("Terminating Gaea2 process")
+                with contextlib.suppress(ProcessLookupError):
+                    process.kill()
+                await process.wait()
+        finally:
+            if process.returncode is None:
+                with contextlib.suppress(ProcessLookupError):
+                    process.kill()
+            for future in pumps + [exited, success_seen, failure_seen]:
+                future.cancel()
+            await asyncio.gather(*pumps, exited, success_seen, failure_seen, return_exceptions=True)
+
+        watched["success_detected"] = succeeded.is_set()
+        watched["error_detected"] = failed.is_set()
+        return watched
+
     def _parse_errors(self, output: str) -> Dict[str, Any]:
         """Parse error messages from Gaea2 output"""
         error_info: Dict[str, Any] = {
@@ -309,13 +490,16 @@ class Gaea2FileValidator:
 
         return error_info
 
-    async def validate_batch(self, file_paths: List[str], concurrent: int = 4, stop_on_error: bool = False) -> Dict[str, Any]:
+    async def validate_batch(
+        self, file_paths: List[str], concurrent: Optional[int] = None, stop_on_error: bool = False
+    ) -> Dict[str, Any]:
         """
         Validate multiple files in batch
 
         Args:
             file_paths: List of file paths to validate
-            concurrent: Number of concurrent validations
+            concurrent: Upper limit on concurrent validations. Gaea2 processes are
+                always limited by the validator's adaptive slots (see AdaptiveConcurrency)
             stop_on_error: Stop batch if any validation fails
 
         Returns:
@@ -324,7 +508,7 @@ class Gaea2FileValidator:
         logger.info(f"Starting batch validation of {len(file_paths)} files")
 
         results = []
-        semaphore = asyncio.Semaphore(concurrent)
+        semaphore = asyncio.Semaphore(concurrent or len(file_paths) or 1)
 
         async def validate_with_semaphore(file_path):
             async with semaphore:
@@ -357,6 +541,7 @@ class Gaea2FileValidator:
             "validated": len(results),
             "successful": sum(1 for r in results if r["success"]),
             "failed": sum(1 for r in results if not r["success"]),
+            "cached": sum(1 for r in results if r.get("cached")),
             "error_types": {},
             "common_errors": [],
             "results": results,
@@ -547,16 +732,33 @@ MOST COMMON ERRORS
         return report
 
 
+_validators: Dict[str, Gaea2FileValidator] = {}
+_validators_lock = threading.Lock()
+
+
+def get_file_validator(gaea_path: Optional[Path] = None) -> Gaea2FileValidator:
+    """Get the validator shared by everything that opens files with this Gaea2 executable
+
+    Sharing it shares the adaptive slots, so concurrent tool calls and batches
+    together never start more Gaea2 processes than the machine can hold.
+    """
+    key = str(gaea_path or os.environ.get("GAEA2_PATH", ""))
+    with _validators_lock:
+        if key not in _validators:
+            _validators[key] = Gaea2FileValidator(gaea_path)
+        return _validators[key]
+
+
 # Integration function for MCP server
 async def validate_gaea2_file(file_path: str, timeout: int = 30) -> Dict[str, Any]:
     """MCP tool function to validate a Gaea2 file"""
-    validator = Gaea2FileValidator()
+    validator = get_file_validator()
     return await validator.validate_file(file_path, timeout)
 
 
-async def validate_gaea2_batch(file_paths: List[str], concurrent: int = 4) -> Dict[str, Any]:
+async def validate_gaea2_batch(file_paths: List[str], concurrent: Optional[int] = None) -> Dict[str, Any]:
     """MCP tool function to validate multiple Gaea2 files"""
-    validator = Gaea2FileValidator()
+    validator = get_file_validator()
     return await validator.validate_batch(file_paths, concurrent)
 
 
@@ -6,7 +6,7 @@ from collections import defaultdict
 from typing import Any, Dict, List, Optional, cast
 
 from ..schema.gaea2_schema import NODE_PROPERTY_DEFINITIONS, validate_node_properties
-from ..utils.gaea2_cache import Gaea2Cache
+from ..utils.gaea2_cache import get_cache
 from ..utils.gaea2_connection_utils import normalize_connections
 
 
@@ -14,7 +14,7 @@ class OptimizedGaea2Validator:
     """Optimized validator with caching and efficient data structures."""
 
     def __init__(self):
-        self.cache = Gaea2Cache()
+        self.cache = get_cache()
         self._validation_cache = {}
         self._property_cache_hits = 0
         self._connection_cache_hits = 0
@@ -246,7 +246,7 @@ class OptimizedGaea2Validator:
             "validation_cache_size": len(self._validation_cache),
             "property_cache_hits": self._property_cache_hits,
             "connection_cache_hits": self._connection_cache_hits,
-            "gaea2_cache_size": len(self.cache.cache),
+            "gaea2_cache_size": len(self.cache),
         }
 
 
@@ -0,0 +1,469 @@
+"""Incremental Gaea2 workflow validation
+
+Gaea2Validator.validate_and_fix() checks a whole workflow on every call. A
+client that builds a workflow a node at a time can instead open a session:
+the workflow is sent once, changed with patches, and each patch revalidates
+only the nodes and connections it touches. Patch operations::
+
+    {"op": "add_node", "node": {"id": 3, "type": "Erosion2", "properties": {...}}}
+    {"op": "remove_node", "id": 3}  # also removes its connections
+    {"op": "update_node", "id": 3, "type": "Erosion2", "properties": {"Duration": 0.1}}
+    {"op": "set_property", "id": 3, "name": "Duration", "value": 0.1}
+    {"op": "remove_property", "id": 3, "name": "Duration"}
+    {"op": "add_connection", "connection": {"from_node": 1, "to_node": 3, "to_port": "In"}}
+    {"op": "remove_connection", "connection": {"from_node": 1, "to_node": 3, "to_port": "In"}}
+
+Node checks (type, property count, property values) depend only on a node's
+type and properties, so their results are memoized under a hash of the two
+and shared by all nodes and sessions. Sessions report the problems
+validate_and_fix() reports but do not fix them; run validate_and_fix() on the
+final workflow for that.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+import uuid
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, MutableMapping, Optional, Set, Tuple
+
+from ...core.state import MemoryMapping
+
+# (from_node, to_node, from_port, to_port), node ids as strings
+ConnectionKey = Tuple[str, str, str, str]
+
+# Node types that may legitimately have no connections
+ENDPOINT_TYPES = {"Export", "SatMap", "OutputBuffer"}
+
+
+def node_hash(node: Dict[str, Any]) -> str:
+    """Stable hash of the parts of a node that node checks depend on"""
+    encoded = json.dumps(
+        {"type": node.get("type"), "properties": node.get("properties", {})},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=repr,
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def connection_key(connection: Dict[str, Any]) -> ConnectionKey:
+    """Identity of a connection, accepting from_node/to_node or source/target"""
+    source = connection.get("from_node", connection.get("source"))
+    target = connection.get("to_node", connection.get("target"))
+    if source is None or target is None:
+        raise ValueError("Connection needs 'from_node' and 'to_node'")
+    return (
+        str(source),
+        str(target),
+        str(connection.get("from_port", "Out")),
+        str(connection.get("to_port", "In")),
+    )
+
+
+class NodeCheckMemo:
+    """Bounded LRU of node check results keyed by node hash"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        """Cached result for ``key``, computing it on a miss
+
+        Returns:
+            (result, whether it was cached)
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result, True
+        result = compute()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result, False
+
+
+class ValidationSession:
+    """A workflow kept between calls and revalidated patch by patch"""
+
+    def __init__(self, session_id: str, validator: Any, memo: NodeCheckMemo):
+        self.session_id = session_id
+        self.validator = validator
+        self.memo = memo
+        self.version = 0
+
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.connections: Dict[ConnectionKey, Dict[str, Any]] = {}
+        # Connections by either endpoint id, including ids with no node (yet)
+        self.connections_by_node: Dict[str, Set[ConnectionKey]] = {}
+        # Successor counts per node, for cycle checks
+        self.successors: Dict[str, Counter] = {}
+        self.type_counts: Counter = Counter()
+
+        # Messages of the last check of each node and connection
+        self.node_messages: Dict[str, Tuple[List[str], List[str]]] = {}
+        self.connection_messages: Dict[ConnectionKey, Tuple[List[str], List[str]]] = {}
+        # Connections that close a cycle, with their error message
+        self.cycles: Dict[ConnectionKey, str] = {}
+
+        self._dirty_nodes: Set[str] = set()
+        self._dirty_connections: Set[ConnectionKey] = set()
+        self._removed_connection = False
+        self._memo_hits = 0
+
+    # Loading and patching
+
+    def load(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a complete workflow as the session's starting point"""
+        for node in workflow.get("nodes", []):
+            self._add_node(node)
+        for connection in workflow.get("connections", []):
+            self._add_connection(connection)
+        return self._revalidate()
+
+    def apply(self, patches: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply patches in order and revalidate what they touched
+
+        Raises:
+            ValueError: for an unknown operation or one that does not apply.
+                The session is left partly patched; callers discard it.
+        """
+        handlers = {
+            "add_node": lambda p: self._add_node(p.get("node") or {}),
+            "remove_node": lambda p: self._remove_node(self._node_id(p)),
+            "update_node": lambda p: self._update_node(self._node_id(p), p.get("type"), p.get("properties") or {}),
+            "set_property": lambda p: self._update_node(self._node_id(p), None, {self._property_name(p): p.get("value")}),
+            "remove_property": lambda p: self._remove_property(self._node_id(p), self._property_name(p)),
+            "add_connection": lambda p: self._add_connection(p.get("connection") or {}),
+            "remove_connection": lambda p: self._remove_connection(p.get("connection") or {}),
+        }
+        for index, patch in enumerate(patches):
+            handler = handlers.get(patch.get("op", ""))
+            if handler is None:
+                raise ValueError(f"Patch {index}: unknown op '{patch.get('op')}', expected one of {', '.join(handlers)}")
+            try:
+                handler(patch)
+            except ValueError as e:
+                raise ValueError(f"Patch {index} ({patch['op']}): {e}") from None
+        self.version += 1
+        return self._revalidate()
+
+    def workflow(self) -> Dict[str, Any]:
+        """Current workflow, in the format validate_and_fix() accepts"""
+        return {
+            "nodes": copy.deepcopy(list(self.nodes.values())),
+            "connections": copy.deepcopy(list(self.connections.values())),
+        }
+
+    def _node_id(self, patch: Dict[str, Any]) -> str:
+        node_id = str(patch.get("id"))
+        if node_id not in self.nodes:
+            raise ValueError(f"no node with id {patch.get('id')}")
+        return node_id
+
+    @staticmethod
+    def _property_name(patch: Dict[str, Any]) -> str:
+        if not patch.get("name"):
+            raise ValueError("missing property 'name'")
+        return str(patch["name"])
+
+    def _touch_node(self, node_id: str) -> None:
+        """Mark a node and its connections for revalidation"""
+        self._dirty_nodes.add(node_id)
+        self._dirty_connections.update(self.connections_by_node.get(node_id, ()))
+
+    def _add_node(self, node: Dict[str, Any]) -> None:
+        if "id" not in node:
+            raise ValueError("node is missing required 'id' field")
+        node_id = str(node["id"])
+        if node_id in self.nodes:
+            raise ValueError(f"node id {node['id']} already exists")
+        node = copy.deepcopy(node)
+        node.setdefault("properties", {})
+        self.nodes[node_id] = node
+        self.type_counts[node.get("type")] += 1
+        self._touch_node(node_id)
+
+    def _remove_node(self, node_id: str) -> None:
+        node = self.nodes.pop(node_id)
+        self.type_counts[node.get("type")] -= 1
+        for key in list(self.connections_by_node.get(node_id, ())):
+            self._remove_connection_key(key)
+        self.node_messages.pop(node_id, None)
+        self._dirty_nodes.discard(node_id)
+
+    def _update_node(self, node_id: str, node_type: Optional[str], properties: Dict[str, Any]) -> None:
+        node = self.nodes[node_id]
+        if node_type is not None and node_type != node.get("type"):
+            self.type_counts[node.get("type")] -= 1
+            self.type_counts[node_type] += 1
+            node["type"] = node_type
+        node["properties"].update(copy.deepcopy(properties))
+        self._touch_node(node_id)
+
+    def _remove_property(self, node_id: str, name: str) -> None:
+        self.nodes[node_id]["properties"].pop(name, None)
+        self._touch_node(node_id)
+
+    def _add_connection(self, connection: Dict[str, Any]) -> None:
+        key = connection_key(connection)
+        if key in self.connections:
+            return
+        self.connections[key] = copy.deepcopy(connection)
+        source, target = key[0], key[1]
+        for node_id in (source, target):
+            self.connections_by_node.setdefault(node_id, set()).add(key)
+            # The first connection changes whether the node is connected
+            if len(self.connections_by_node[node_id]) == 1 and node_id in self.nodes:
+                self._dirty_nodes.add(node_id)
+        self.successors.setdefault(source, Counter())[target] += 1
+        self._dirty_connections.add(key)
+
+        # Adding u -> v closes a cycle when u is reachable from v
+        path = self._path(target, source)
+        if path is not None:
+            self.cycles[key] = f"Circular dependency detected: {' → '.join([source] + path)}"
+
+    def _remove_connection(self, connection: Dict[str, Any]) -> None:
+        key = connection_key(connection)
+        if key not in self.connections:
+            raise ValueError(f"no connection {key[0]}.{key[2]} -> {key[1]}.{key[3]}")
+        self._remove_connection_key(key)
+
+    def _remove_connection_key(self, key: ConnectionKey) -> None:
+        del self.connections[key]
+        source, target = key[0], key[1]
+        for node_id in (source, target):
+            keys = self.connections_by_node.get(node_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.connections_by_node[node_id]
+                    if node_id in self.nodes:
+                        self._dirty_nodes.add(node_id)
+        successors = self.successors[source]
+        successors[target] -= 1
+        if successors[target] <= 0:
+            del successors[target]
+        self.connection_messages.pop(key, None)
+        self._dirty_connections.discard(key)
+        self.cycles.pop(key, None)
+        self._removed_connection = True
+
+    def _path(self, start: str, goal: str) -> Optional[List[str]]:
+        """Nodes on a path from start to goal (inclusive), by breadth-first search"""
+        parents: Dict[str, Optional[str]] = {start: None}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if current == goal:
+                path = [current]
+                while parents[path[-1]] is not None:
+                    path.append(parents[path[-1]])  # type: ignore[arg-type]
+                return path[::-1]
+            for successor in self.successors.get(current, ()):
+                if successor not in parents:
+                    parents[successor] = current
+                    queue.append(successor)
+        return None
+
+    # Checks
+
+    def _check_node(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Checks that depend only on a node's type and properties"""
+        node_type = node.get("type")
+        properties = node.get("properties", {})
+        facts: Dict[str, Any] = {
+            "type_valid": bool(node_type) and self.validator.accurate_validator.validate_node_type(node_type),
+            "property_count": len(properties),
+            "property_issues": [],
+        }
+        if node_type:
+            _, issues, _ = self.validator.property_validator.validate_properties(node_type, properties)
+            facts["property_issues"] = issues
+        return facts
+
+    def _node_messages(self, node_id: str) -> Tuple[List[str], List[str]]:
+        node = self.nodes[node_id]
+        facts, cached = self.memo.get(node_hash(node), lambda: self._check_node(node))
+        self._memo_hits += cached
+
+        errors: List[str] = []
+        warnings: List[str] = []
+        node_type = node.get("type")
+        if not node_type:
+            errors.append(f"Node {node_id} missing required 'type' field")
+        elif not facts["type_valid"]:
+            errors.append(f"Invalid node type '{node_type}' for node id '{node_id}'")
+        if node_type in self.validator.PROPERTY_LIMITED_NODES and facts["property_count"] > 3:
+            errors.append(
+                f"Node '{node_type}' (id: {node_id}) has {facts['property_count']} properties. "
+                f"This node type must have <= 3 properties to open in Gaea2."
+            )
+        name = node.get("name", node_type)
+        warnings.extend(f"Node '{name}' (id: {node_id}): {issue}" for issue in facts["property_issues"])
+        if node_id not in self.connections_by_node and node_type not in ENDPOINT_TYPES:
+            warnings.append(f"Node '{node_type}' (id: {node_id}) is not connected to any other nodes")
+        return errors, warnings
+
+    def _connection_messages(self, key: ConnectionKey) -> Tuple[List[str], List[str]]:
+        source, target = key[0], key[1]
+        errors: List[str] = []
+        warnings: List[str] = []
+        if source not in self.nodes:
+            errors.append(f"Connection references non-existent source node: {source}")
+        if target not in self.nodes:
+            errors.append(f"Connection references non-existent target node: {target}")
+        if not errors:
+            warning = self.validator.connection_validator.connection_pattern_warning(
+                self.nodes[source].get("type", "Unknown"), self.nodes[target].get("type", "Unknown")
+            )
+            if warning:
+                warnings.append(warning)
+        return errors, warnings
+
+    def _revalidate(self) -> Dict[str, Any]:
+        for node_id in self._dirty_nodes:
+            self.node_messages[node_id] = self._node_messages(node_id)
+        for key in self._dirty_connections:
+            self.connection_messages[key] = self._connection_messages(key)
+
+        # Removing a connection can only break cycles, so recheck the known ones
+        if self._removed_connection:
+            for key in list(self.cycles):
+                path = self._path(key[1], key[0])
+                if path is None:
+                    del self.cycles[key]
+                else:
+                    self.cycles[key] = f"Circular dependency detected: {' → '.join([key[0]] + path)}"
+
+        revalidated = {
+            "nodes": len(self._dirty_nodes),
+            "connections": len(self._dirty_connections),
+            "memo_hits": self._memo_hits,
+        }
+        self._dirty_nodes.clear()
+        self._dirty_connections.clear()
+        self._removed_connection = False
+        self._memo_hits = 0
+        return self.report(revalidated)
+
+    def report(self, revalidated: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Current errors and warnings of the whole workflow"""
+        errors: List[str] = []
+        warnings: List[str] = []
+        for node_id in self.nodes:
+            node_errors, node_warnings = self.node_messages[node_id]
+            errors.extend(node_errors)
+            warnings.extend(node_warnings)
+        for key in self.connections:
+            connection_errors, connection_warnings = self.connection_messages[key]
+            errors.extend(connection_errors)
+            warnings.extend(connection_warnings)
+        errors.extend(self.cycles.values())
+        node_types = {node_type for node_type, count in self.type_counts.items() if count > 0 and node_type}
+        self.validator.connection_validator.check_type_patterns(node_types, warnings)
+
+        return {
+            "session_id": self.session_id,
+            "version": self.version,
+            "valid": not errors,
+            "errors": errors,
+            "warnings": warnings,
+            "node_count": len(self.nodes),
+            "connection_count": len(self.connections),
+            "revalidated": revalidated or {"nodes": 0, "connections": 0, "memo_hits": 0},
+        }
+
+
+class ValidationSessionManager:
+    """Open validation sessions, shared between HTTP workers through the state backend
+
+    Each worker keeps its sessions in memory. The workflow and version of
+    every session are also written to ``store`` after each patch, so a worker
+    that has not seen a session (or has an older version) rebuilds it from
+    there. The store drops the oldest sessions itself: pass a state backend
+    mapping created with ``max_items``.
+    """
+
+    def __init__(self, validator: Any, store: Optional[MutableMapping[str, Any]] = None, max_sessions: int = 64):
+        self.validator = validator
+        self.store = store if store is not None else MemoryMapping(max_items=max_sessions)
+        self.max_sessions = max_sessions
+        self.memo = NodeCheckMemo()
+        self._sessions: "OrderedDict[str, ValidationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
+        """Open a session on a workflow and validate it"""
+        session = ValidationSession(uuid.uuid4().hex[:16], self.validator, self.memo)
+        report = session.load(workflow)
+        with self._lock:
+            self._keep(session)
+        return report
+
+    def patch(self, session_id: str, patches: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply patches to a session
+
+        Raises:
+            KeyError: if the session does not exist
+            ValueError: if a patch does not apply; the session is unchanged
+        """
+        with self._lock:
+            session = self._session(session_id)
+            try:
+                report = session.apply(patches)
+            except ValueError:
+                # Rebuilt from the last stored version on next use
+                self._sessions.pop(session_id, None)
+                raise
+            self._keep(session)
+            return report
+
+    def report(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return self._session(session_id).report()
+
+    def close(self, session_id: str) -> Dict[str, Any]:
+        """Close a session and return its final workflow"""
+        with self._lock:
+            session = self._session(session_id)
+            self._sessions.pop(session_id, None)
+            self.store.pop(session_id, None)
+            return session.workflow()
+
+    def _session(self, session_id: str) -> ValidationSession:
+        stored = self.store.get(session_id)
+        if stored is None:
+            self._sessions.pop(session_id, None)
+            raise KeyError(f"Unknown validation session: {session_id}")
+        session = self._sessions.get(session_id)
+        if session is None or session.version != stored["version"]:
+            session = ValidationSession(session_id, self.validator, self.memo)
+            session.load(stored["workflow"])
+            session.version = stored["version"]
+            self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _keep(self, session: ValidationSession) -> None:
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        self.store[session.session_id] = {
+            "workflow": session.workflow(),
+            "version": session.version,
+            "updated": datetime.utcnow().isoformat(),
+        }
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
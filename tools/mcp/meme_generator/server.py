@@ -65,13 +65,14 @@ class MemeGeneratorMCPServer(BaseMCPServer):
             self.meme_output_dir = ensure_directory(os.path.join(temp_dir, "memes"))
             self.logger.warning(f"Using fallback temp directory: {temp_dir}")
 
-        initialize_generator(self.templates_dir, self.meme_output_dir)
+        initialize_generator(self.templates_dir, self.meme_output_dir, self.artifacts)
 
     def get_tools(self) -> Dict[str, Dict[str, Any]]:
         """Return available meme generation tools"""
         return {
             "generate_meme": {
                 "description": "Generate a meme from a template with text overlays",
+                "executor": "process",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -99,12 +100,19 @@ class MemeGeneratorMCPServer(BaseMCPServer):
                             "default": True,
                             "description": "Upload meme to get shareable URL (uses 0x0.st)",
                         },
+                        "feedback_encoding": {
+                            "type": "string",
+                            "enum": ["url", "base64"],
+                            "default": "base64",
+                            "description": "Return the image and thumbnail as download links, or inline the thumbnail",
+                        },
                     },
                     "required": ["template", "texts"],
                 },
             },
             "list_meme_templates": {
                 "description": "List all available meme templates",
+                "cacheable": {"ttl": 300},
                 "parameters": {
                     "type": "object",
                     "properties": {},
@@ -112,6 +120,7 @@ class MemeGeneratorMCPServer(BaseMCPServer):
             },
             "get_meme_template_info": {
                 "description": "Get detailed information about a specific meme template",
+                "cacheable": {"ttl": 300, "key_fields": ["template_id"]},
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -157,6 +166,7 @@ class MemeGeneratorMCPServer(BaseMCPServer):
         font_size_override: Optional[Dict[str, int]] = None,
         auto_resize: bool = True,
         upload: bool = True,
+        feedback_encoding: str = "base64",
     ) -> Dict[str, Any]:
         """Generate a meme with visual feedback and optional upload
 
@@ -166,13 +176,14 @@ class MemeGeneratorMCPServer(BaseMCPServer):
             font_size_override: Custom font sizes
             auto_resize: Auto-adjust font size
             upload: Upload to get shareable URL
+            feedback_encoding: "url" for artifact links, "base64" to inline the thumbnail
 
         Returns:
             Dictionary with meme data, visual feedback, and optional share URL
         """
         try:
             # Generate meme (now returns compact WebP with visual feedback and optional upload)
-            result = await generate_meme(template, texts, font_size_override, auto_resize, upload)
+            result = await generate_meme(template, texts, font_size_override, auto_resize, upload, feedback_encoding)
 
             # The tool now returns a compact response with visual feedback included
             return dict(result)
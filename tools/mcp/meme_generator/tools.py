@@ -154,6 +154,7 @@ class MemeGenerator:
         auto_resize: bool = True,
         thumbnail_only: bool = False,
         return_pil_image: bool = False,
+        raw_bytes: bool = False,
     ) -> Dict[str, Any]:
         """Generate a meme from template with text overlays
 
@@ -164,6 +165,7 @@ class MemeGenerator:
             auto_resize: Whether to auto-resize text
             thumbnail_only: Generate only a thumbnail
             return_pil_image: Return PIL Image object in addition to base64
+            raw_bytes: Return the encoded image as bytes ("image_bytes") instead of base64
 
         Returns:
             Dict with success status, image data, and optional PIL Image
@@ -223,7 +225,6 @@ class MemeGenerator:
                         stroke_width=area.get("stroke_width", 2),
                     )
 
-            # Generate image with base64 encoding
             if thumbnail_only:
                 max_width = 150  # Very small thumbnail
                 if img.width > max_width:
@@ -245,13 +246,16 @@ class MemeGenerator:
 
             result = {
                 "success": True,
-                "image_data": base64.b64encode(img_data).decode("utf-8"),
                 "format": format_type,
                 "template_used": template_id,
                 "text_positions": text_positions,
                 "size_kb": len(img_data) / 1024,
                 "thumbnail": thumbnail_only,
             }
+            if raw_bytes:
+                result["image_bytes"] = img_data
+            else:
+                result["image_data"] = base64.b64encode(img_data).decode("utf-8")
 
             # Optionally return the PIL Image object for reuse
             if return_pil_image:
@@ -262,15 +266,16 @@ class MemeGenerator:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    def create_thumbnail_from_image(self, img: Image.Image, max_width: int = 150) -> Dict[str, Any]:
+    def create_thumbnail_from_image(self, img: Image.Image, max_width: int = 150, raw_bytes: bool = False) -> Dict[str, Any]:
         """Create a thumbnail from an existing PIL Image
 
         Args:
             img: PIL Image object
             max_width: Maximum width for thumbnail
+            raw_bytes: Return the WebP data as bytes ("image_bytes") instead of base64
 
         Returns:
-            Dict with thumbnail data in base64
+            Dict with thumbnail data in base64 (or bytes)
         """
         try:
             # Create a copy to avoid modifying the original
@@ -287,12 +292,12 @@ class MemeGenerator:
             thumbnail.save(buffer, format="WEBP", quality=30, method=6)
             img_data = buffer.getvalue()
 
-            return {
-                "success": True,
-                "image_data": base64.b64encode(img_data).decode("utf-8"),
-                "format": "webp",
-                "size_kb": len(img_data) / 1024,
-            }
+            result = {"success": True, "format": "webp", "size_kb": len(img_data) / 1024}
+            if raw_bytes:
+                result["image_bytes"] = img_data
+            else:
+                result["image_data"] = base64.b64encode(img_data).decode("utf-8")
+            return result
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -321,13 +326,16 @@ class MemeGenerator:
 # Global instances
 generator = None
 output_directory = None
+# ArtifactStore of the server, used to return images as links instead of base64
+artifact_store: Any = None
 
 
-def initialize_generator(templates_dir: str, output_dir: Optional[str] = None) -> None:
-    """Initialize the meme generator with output directory"""
-    global generator, output_directory
+def initialize_generator(templates_dir: str, output_dir: Optional[str] = None, artifacts: Any = None) -> None:
+    """Initialize the meme generator with output directory and artifact store"""
+    global generator, output_directory, artifact_store
     generator = MemeGenerator(templates_dir)
     output_directory = output_dir
+    artifact_store = artifacts
 
 
 @register_tool("generate_meme")
@@ -337,6 +345,7 @@ async def generate_meme(
     font_size_override: Optional[Dict[str, int]] = None,
     auto_resize: bool = True,
     upload: bool = True,
+    feedback_encoding: str = "base64",
 ) -> Dict[str, Any]:
     """Generate a meme from a template with visual feedback thumbnail and optional upload
 
@@ -346,6 +355,8 @@ async def generate_meme(
         font_size_override: Optional custom font sizes for specific areas
         auto_resize: Whether to automatically resize text to fit
         upload: Whether to upload the meme and return a shareable URL (default: True)
+        feedback_encoding: "url" returns the image and thumbnail as artifact links,
+            "base64" inlines the thumbnail (also used when no artifact store is set)
     """
     if generator is None:
         return {"success": False, "error": "Meme generator not initialized"}
@@ -358,11 +369,12 @@ async def generate_meme(
         auto_resize,
         thumbnail_only=False,
         return_pil_image=True,  # Request PIL image for efficient thumbnail generation
+        raw_bytes=True,
     )
+    use_artifacts = feedback_encoding == "url" and artifact_store is not None
 
     if result.get("success"):
         # Save full-size image to file
-        import base64
         import tempfile
         import time
 
@@ -373,9 +385,8 @@ async def generate_meme(
         timestamp = int(time.time())
         output_path = os.path.join(save_dir, f"meme_{template}_{timestamp}_{os.getpid()}.png")
 
-        img_data = base64.b64decode(result["image_data"])
         with open(output_path, "wb") as f:
-            f.write(img_data)
+            f.write(result["image_bytes"])
 
         # Upload the meme if requested
         share_url = None
@@ -404,7 +415,7 @@ async def generate_meme(
         # Create thumbnail from the already-generated PIL image (optimization)
         if "pil_image" in result:
             # Use the existing PIL image to create thumbnail - avoids re-rendering
-            thumbnail_result = generator.create_thumbnail_from_image(result["pil_image"])
+            thumbnail_result = generator.create_thumbnail_from_image(result["pil_image"], raw_bytes=use_artifacts)
         else:
             # Fallback to old method if PIL image not available
             thumbnail_result = generator.generate_meme(
@@ -413,23 +424,37 @@ async def generate_meme(
                 font_size_override,
                 auto_resize,
                 thumbnail_only=True,
+                raw_bytes=use_artifacts,
             )
 
+        if use_artifacts:
+            thumbnail_name = os.path.splitext(os.path.basename(output_path))[0] + "_thumb.webp"
+            visual_feedback = {
+                "format": "webp",
+                "encoding": "url",
+                "size_kb": thumbnail_result.get("size_kb", 0),
+                **artifact_store.put_bytes(thumbnail_result.get("image_bytes", b""), thumbnail_name),
+            }
+        else:
+            visual_feedback = {
+                "format": "webp",
+                "encoding": "base64",
+                "data": thumbnail_result.get("image_data", ""),  # Use thumbnail data
+                "size_kb": thumbnail_result.get("size_kb", 0),
+            }
+
         # Build response
         response = {
             "success": True,
             "output_path": output_path,
             "template_used": result.get("template_used"),
             "text_positions": result.get("text_positions"),
-            "visual_feedback": {
-                "format": "webp",
-                "encoding": "base64",
-                "data": thumbnail_result.get("image_data", ""),  # Use thumbnail data
-                "size_kb": thumbnail_result.get("size_kb", 0),
-            },
+            "visual_feedback": visual_feedback,
             "full_size_kb": result.get("size_kb", 0),
             "message": f"Meme generated and saved to {output_path}",
         }
+        if use_artifacts:
+            response["artifact"] = artifact_store.put_file(output_path, content_type="image/png")
 
         # Add share URL if upload was successful
         if share_url:
@@ -450,8 +475,8 @@ async def generate_meme(
         return response
 
     # Error case
-    if "image_data" in result:
-        del result["image_data"]
+    result.pop("image_data", None)
+    result.pop("image_bytes", None)
     return result
 
 